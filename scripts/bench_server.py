@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Local load generator for the vis daemon server.
+
+Sends /search requests at several concurrency levels and reports throughput
+and latency percentiles, so batching settings (server.batch_window_ms,
+server.max_batch_size) can be compared on real hardware.
+
+Usage:
+    python scripts/bench_server.py --concurrency 1 4 16 --requests 200
+    python scripts/bench_server.py --queries queries.txt --method semantic
+"""
+
+import sys
+import time
+import asyncio
+import argparse
+import statistics
+from pathlib import Path
+from typing import List
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from src.constants import DEFAULT_PORT  # noqa: E402
+
+DEFAULT_QUERIES = [
+    "TDD", "리팩토링", "클린 코드", "도메인 주도 설계", "테스트 주도 개발",
+    "spring boot", "kubernetes 배포", "아키텍처 결정 기록", "code review", "pair programming",
+]
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(int(round(pct / 100 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+async def _run_level(base_url: str, queries: List[str], concurrency: int, total: int,
+                     method: str, top_k: int) -> dict:
+    """Run `total` requests with `concurrency` workers and collect latencies"""
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(total))
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=60.0,
+                                 limits=httpx.Limits(max_connections=concurrency)) as client:
+        async def worker():
+            nonlocal errors
+            for i in counter:
+                params = {"query": queries[i % len(queries)], "search_method": method, "top_k": top_k}
+                started = time.perf_counter()
+                try:
+                    response = await client.get("/search", params=params)
+                    if response.status_code != 200:
+                        errors += 1
+                        continue
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+        elapsed = time.perf_counter() - started
+
+    return {
+        "concurrency": concurrency,
+        "ok": len(latencies),
+        "errors": errors,
+        "qps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50": statistics.median(latencies) if latencies else 0.0,
+        "p95": _percentile(latencies, 95) if latencies else 0.0,
+        "p99": _percentile(latencies, 99) if latencies else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="vis server load generator")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--requests", type=int, default=100, help="Requests per concurrency level")
+    parser.add_argument("--method", default="semantic", choices=["semantic", "hybrid", "keyword", "colbert"])
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--queries", type=Path, help="File with one query per line")
+    parser.add_argument("--warmup", type=int, default=5, help="Sequential warm-up requests")
+    args = parser.parse_args()
+
+    queries = DEFAULT_QUERIES
+    if args.queries:
+        queries = [line.strip() for line in args.queries.read_text(encoding="utf-8").splitlines() if line.strip()]
+
+    base_url = f"http://{args.host}:{args.port}"
+    try:
+        httpx.get(f"{base_url}/health", timeout=2.0).raise_for_status()
+    except httpx.HTTPError as e:
+        print(f"❌ Server not reachable at {base_url}: {e}")
+        sys.exit(1)
+
+    if args.warmup:
+        asyncio.run(_run_level(base_url, queries, 1, args.warmup, args.method, args.top_k))
+
+    print(f"method={args.method} top_k={args.top_k} requests/level={args.requests} queries={len(queries)}")
+    print(f"{'conc':>5} {'ok':>6} {'err':>5} {'qps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for concurrency in args.concurrency:
+        r = asyncio.run(_run_level(base_url, queries, concurrency, args.requests, args.method, args.top_k))
+        print(f"{r['concurrency']:>5} {r['ok']:>6} {r['errors']:>5} {r['qps']:>8.1f} "
+              f"{r['p50']:>8.1f} {r['p95']:>8.1f} {r['p99']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
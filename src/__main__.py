@@ -10,7 +10,10 @@ import os
 import argparse
 import logging
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
+
+# 경량 모듈: 데몬 클라이언트 경로에서도 의존성 로드 없이 사용
+from src.utils.output_manager import resolve_output_path
 
 # 데이터 디렉토리 결정 (캐시, 설정, 모델 저장 위치)
 # 우선순위: 환경변수 VAULT_INTELLIGENCE_HOME > 기본값 ~/git/vault-intelligence
@@ -41,7 +44,7 @@ def _load_deps():
     global AdvancedSearchEngine, SearchQuery, DuplicateDetector
     global TopicCollector, TopicAnalyzer, SemanticTagger, TaggingResult
     global MOCGenerator, ContentClusterer, LearningReviewer
-    global TagAnalyzer, TopicConnector, resolve_output_path, yaml
+    global TagAnalyzer, TopicConnector, yaml
 
     if _deps_loaded:
         return DEPENDENCIES_AVAILABLE
@@ -61,7 +64,6 @@ def _load_deps():
         from src.features.learning_reviewer import LearningReviewer
         from src.features.tag_analyzer import TagAnalyzer
         from src.features.topic_connector import TopicConnector
-        from src.utils.output_manager import resolve_output_path
         import yaml
         DEPENDENCIES_AVAILABLE = True
     except ImportError as e:
@@ -381,6 +383,8 @@ def run_search(vault_path: str, query: str, top_k: int, threshold: float, config
         for result in results:
             print(f"{result.rank}. {result.document.title}")
             print(f"   경로: {result.document.path}")
+            if result.section:
+                print(f"   섹션: #{result.section}")
             print(f"   유사도: {result.similarity_score:.4f}")
             print(f"   타입: {result.match_type}")
             if result.matched_keywords:
@@ -396,43 +400,121 @@ def run_search(vault_path: str, query: str, top_k: int, threshold: float, config
         return False
 
 
-def run_duplicate_detection(vault_path: str, config: dict):
+def _daemon_client(vault_path: str):
+    """같은 vault를 서빙 중인 데몬의 클라이언트 (없으면 None → 로컬 엔진으로 실행)
+
+    데몬은 인덱스와 모델을 이미 메모리에 올려 두었으므로 명령마다 엔진을 새로 만들지 않는다.
+    """
+    from src.client import VisClient
+
+    client = VisClient()
+    try:
+        health = client.health()
+    except Exception:  # 미실행(ServerNotRunning) 또는 통신 오류
+        client.close()
+        return None
+
+    wanted = Path(vault_path).expanduser().resolve()
+    served = health.get("vault")
+    if health.get("indexed") and served and Path(served).expanduser().resolve() == wanted:
+        print("⚡ 실행 중인 visd의 인덱스를 사용합니다.")
+        return client
+
+    # server.vaults로 함께 서빙 중인 다른 vault인지 확인
+    try:
+        hosted = client.vaults() if health.get("vaults") else []
+    except Exception:
+        hosted = []
+    for vault in hosted:
+        if vault.get("path") and Path(vault["path"]).expanduser().resolve() == wanted:
+            if vault.get("loaded") and not vault.get("indexed"):
+                break
+            client.vault = vault["name"]
+            print(f"⚡ 실행 중인 visd의 '{vault['name']}' vault 인덱스를 사용합니다.")
+            return client
+    client.close()
+    return None
+
+
+def run_profile(args) -> None:
+    """실행 중인 데몬의 스택 샘플링 결과를 collapsed 파일로 저장하고 요약 출력"""
+    import httpx
+    from src.client import VisClient, ServerNotRunning
+
+    print(f"🔬 서버 프로파일링 중... ({args.seconds:g}초)")
+    try:
+        with VisClient() as client:
+            report = client.profile(seconds=args.seconds, interval_ms=args.interval_ms,
+                                    memory_top=args.memory_top, include_idle=args.include_idle)
+    except ServerNotRunning:
+        print("❌ visd가 실행 중이 아닙니다.")
+        print("   visd start")
+        sys.exit(1)
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 404:
+            print("❌ 프로파일링이 꺼져 있습니다. config/settings.yaml의 server.debug.profile: true 후 서버를 재시작하세요.")
+        else:
+            print(f"❌ 프로파일링 실패: {e.response.text}")
+        sys.exit(1)
+
+    Path(args.output).write_text(report["collapsed"], encoding="utf-8")
+    print(f"📊 샘플 {report['samples']}회 (대기 스택 {report['idle_samples']}개 제외)")
+    print("\n🔥 가장 많이 샘플된 함수:")
+    total = sum(report["threads"].values()) or 1
+    for item in report["top_functions"][:10]:
+        print(f"   {item['samples'] / total * 100:5.1f}%  {item['frame']}")
+    if report.get("top_allocations"):
+        print("\n🧠 메모리 할당 상위 위치 (프로파일링 중 할당, 해제되지 않은 것):")
+        for item in report["top_allocations"][:10]:
+            print(f"   {item['size_bytes'] / 1024:8.1f} KB  {item['count']:6d}개  {item['file']}:{item['line']}")
+    print(f"\n✅ collapsed 스택 저장: {args.output}")
+    print(f"   flamegraph.pl {args.output} > profile.svg  또는 https://www.speedscope.app 에서 열기")
+
+
+def _load_search_engine(vault_path: str, config: dict):
+    """로컬 검색 엔진 생성 (인덱스가 없으면 구축, 실패 시 None)"""
+    cache_dir = str(data_dir / "cache")
+    search_engine = AdvancedSearchEngine(vault_path, cache_dir, config)
+    
+    if not search_engine.indexed:
+        print("📚 인덱스 구축 중...")
+        if not search_engine.build_index():
+            print("❌ 인덱스 구축 실패")
+            return None
+    return search_engine
+
+
+def run_duplicate_detection(vault_path: str, config: dict, client=None):
     """중복 문서 감지 실행"""
     try:
         print("🔍 중복 문서 감지 시작...")
         
-        # 검색 엔진 초기화
-        cache_dir = str(data_dir / "cache")
-        search_engine = AdvancedSearchEngine(vault_path, cache_dir, config)
-        
-        if not search_engine.indexed:
-            print("📚 인덱스 구축 중...")
-            if not search_engine.build_index():
-                print("❌ 인덱스 구축 실패")
+        if client is not None:
+            report = client.duplicates()
+        else:
+            from src.features.vault_reports import duplicate_report
+            search_engine = _load_search_engine(vault_path, config)
+            if search_engine is None:
                 return False
+            report = duplicate_report(search_engine, config)
         
-        # 중복 감지기 초기화
-        detector = DuplicateDetector(search_engine, config)
-        
-        # 중복 분석 수행
-        analysis = detector.find_duplicates()
-        
+        groups = report['groups']
         print(f"\n📊 중복 분석 결과:")
         print("-" * 50)
-        print(f"전체 문서: {analysis.total_documents}개")
-        print(f"중복 그룹: {analysis.get_group_count()}개")
-        print(f"중복 문서: {analysis.duplicate_count}개")
-        print(f"고유 문서: {analysis.unique_count}개")
-        print(f"중복 비율: {analysis.get_duplicate_ratio():.1%}")
+        print(f"전체 문서: {report['total_documents']}개")
+        print(f"중복 그룹: {len(groups)}개")
+        print(f"중복 문서: {report['duplicate_count']}개")
+        print(f"고유 문서: {report['unique_count']}개")
+        print(f"중복 비율: {report['duplicate_ratio']:.1%}")
         
-        if analysis.duplicate_groups:
+        if groups:
             print(f"\n📋 중복 그룹 상세:")
-            for group in analysis.duplicate_groups[:5]:  # 상위 5개만 표시
-                print(f"\n그룹 {group.id}:")
-                print(f"  문서 수: {group.get_document_count()}개")
-                print(f"  평균 유사도: {group.average_similarity:.4f}")
-                for doc in group.documents:
-                    print(f"    - {doc.path} ({doc.word_count}단어)")
+            for group in groups[:5]:  # 상위 5개만 표시
+                print(f"\n그룹 {group['id']}:")
+                print(f"  문서 수: {len(group['documents'])}개")
+                print(f"  평균 유사도: {group['average_similarity']:.4f}")
+                for doc in group['documents']:
+                    print(f"    - {doc['path']} ({doc['word_count']}단어)")
         
         return True
         
@@ -441,7 +523,7 @@ def run_duplicate_detection(vault_path: str, config: dict):
         return False
 
 
-def run_topic_collection(vault_path: str, topic: str, top_k: int, threshold: float, output_file: str, config: dict, use_expansion: bool = False, include_synonyms: bool = True, include_hyde: bool = True):
+def run_topic_collection(vault_path: str, topic: str, top_k: int, threshold: float, output_file: str, config: dict, use_expansion: bool = False, include_synonyms: bool = True, include_hyde: bool = True, client=None):
     """주제별 문서 수집 실행"""
     try:
         print(f"📚 주제 '{topic}' 문서 수집 시작...")
@@ -453,53 +535,47 @@ def run_topic_collection(vault_path: str, topic: str, top_k: int, threshold: flo
                 expand_features.append("HyDE")
             print(f"📝 쿼리 확장 모드 활성화: {', '.join(expand_features)}")
         
-        # 검색 엔진 초기화
-        cache_dir = str(data_dir / "cache")
-        search_engine = AdvancedSearchEngine(vault_path, cache_dir, config)
-        
-        if not search_engine.indexed:
-            print("📚 인덱스 구축 중...")
-            if not search_engine.build_index():
-                print("❌ 인덱스 구축 실패")
-                return False
-        
-        # 주제 수집기 초기화
-        collector = TopicCollector(search_engine, config)
-        
         # 출력 파일 경로 결정 (--output 플래그가 있을 때만)
         resolved_output = resolve_output_path(vault_path, output_file, "collect", topic)
-
-        # 주제별 문서 수집
-        collection = collector.collect_topic(
-            topic=topic,
+        options = dict(
             top_k=top_k,
             threshold=threshold,
-            output_file=resolved_output,
             use_expansion=use_expansion,
             include_synonyms=include_synonyms,
-            include_hyde=include_hyde
+            include_hyde=include_hyde,
+            render=resolved_output is not None
         )
         
+        if client is not None:
+            report = client.collect(topic, **options)
+        else:
+            from src.features.vault_reports import collection_report
+            search_engine = _load_search_engine(vault_path, config)
+            if search_engine is None:
+                return False
+            report = collection_report(search_engine, topic, config=config, **options)
+        
         print(f"\n📊 수집 결과:")
         print("-" * 50)
-        print(f"주제: {collection.metadata.topic}")
-        print(f"수집 문서: {collection.metadata.total_documents}개")
-        print(f"총 단어수: {collection.metadata.total_word_count:,}개")
-        print(f"총 크기: {collection.metadata.total_size_bytes / 1024:.1f}KB")
+        print(f"주제: {report['topic']}")
+        print(f"수집 문서: {report['total_documents']}개")
+        print(f"총 단어수: {report['total_word_count']:,}개")
+        print(f"총 크기: {report['total_size_bytes'] / 1024:.1f}KB")
         
-        if collection.metadata.tag_distribution:
+        if report['tag_distribution']:
             print(f"\n🏷️ 태그 분포:")
-            for tag, count in sorted(collection.metadata.tag_distribution.items(), 
+            for tag, count in sorted(report['tag_distribution'].items(), 
                                    key=lambda x: x[1], reverse=True)[:10]:
                 print(f"  {tag}: {count}개")
         
-        if collection.metadata.directory_distribution:
+        if report['directory_distribution']:
             print(f"\n📁 디렉토리 분포:")
-            for dir_path, count in sorted(collection.metadata.directory_distribution.items(), 
+            for dir_path, count in sorted(report['directory_distribution'].items(), 
                                        key=lambda x: x[1], reverse=True)[:10]:
                 print(f"  {dir_path}: {count}개")
         
-        if resolved_output:
+        if resolved_output and report['total_documents']:
+            Path(resolved_output).write_text(report['document'], encoding='utf-8')
             print(f"\n💾 결과가 {resolved_output}에 저장되었습니다.")
         
         return True
@@ -575,28 +651,30 @@ def run_topic_analysis(vault_path: str, output_file: str, config: dict):
 
 
 def run_related_documents(vault_path: str, file_path: str, top_k: int, config: dict, 
-                         include_centrality: bool = True, similarity_threshold: float = 0.3):
+                         include_centrality: bool = True, similarity_threshold: float = 0.3, client=None):
     """관련 문서 추천 실행"""
     try:
         print(f"🔗 '{file_path}' 관련 문서 찾기...")
         
-        # 검색 엔진 초기화
-        cache_dir = str(data_dir / "cache")
-        search_engine = AdvancedSearchEngine(vault_path, cache_dir, config)
-        
-        if not search_engine.indexed:
-            print("📚 인덱스 구축 중...")
-            if not search_engine.build_index():
-                print("❌ 인덱스 구축 실패")
+        if client is not None:
+            related_results = client.related(
+                file_path,
+                top_k=top_k,
+                similarity_threshold=similarity_threshold,
+                include_centrality=include_centrality
+            )
+        else:
+            from src.features.vault_reports import related_report
+            search_engine = _load_search_engine(vault_path, config)
+            if search_engine is None:
                 return False
-        
-        # 관련 문서 찾기
-        related_results = search_engine.get_related_documents(
-            document_path=file_path,
-            top_k=top_k,
-            include_centrality_boost=include_centrality,
-            similarity_threshold=similarity_threshold
-        )
+            related_results = related_report(
+                search_engine,
+                file_path,
+                top_k=top_k,
+                similarity_threshold=similarity_threshold,
+                include_centrality=include_centrality
+            )
         
         if not related_results:
             print("❌ 관련 문서를 찾을 수 없습니다.")
@@ -606,14 +684,14 @@ def run_related_documents(vault_path: str, file_path: str, top_k: int, config: d
         print("-" * 80)
         
         for result in related_results:
-            print(f"{result.rank}. {result.document.title}")
-            print(f"   경로: {result.document.path}")
-            print(f"   관련도: {result.similarity_score:.4f}")
-            print(f"   타입: {result.match_type}")
-            if result.document.tags:
-                print(f"   태그: {', '.join(result.document.tags)}")
-            if result.snippet:
-                print(f"   내용: {result.snippet[:100]}...")
+            print(f"{result['rank']}. {result['title']}")
+            print(f"   경로: {result['path']}")
+            print(f"   관련도: {result['score']:.4f}")
+            print(f"   타입: {result['match_type']}")
+            if result.get('tags'):
+                print(f"   태그: {', '.join(result['tags'])}")
+            if result.get('snippet'):
+                print(f"   내용: {result['snippet'][:100]}...")
             print()
         
         return True
@@ -624,26 +702,27 @@ def run_related_documents(vault_path: str, file_path: str, top_k: int, config: d
 
 
 def run_knowledge_gap_analysis(vault_path: str, config: dict, output_file: str = None,
-                              similarity_threshold: float = 0.3, min_connections: int = 2):
+                              similarity_threshold: float = 0.3, min_connections: int = 2, client=None):
     """지식 공백 분석 실행"""
     try:
         print("🔍 지식 공백 분석 시작...")
         
-        # 검색 엔진 초기화
-        cache_dir = str(data_dir / "cache")
-        search_engine = AdvancedSearchEngine(vault_path, cache_dir, config)
-        
-        if not search_engine.indexed:
-            print("📚 인덱스 구축 중...")
-            if not search_engine.build_index():
-                print("❌ 인덱스 구축 실패")
-                return False
-        
         # 지식 공백 분석 수행
-        analysis = search_engine.analyze_knowledge_gaps(
-            similarity_threshold=similarity_threshold,
-            min_connections=min_connections
-        )
+        if client is not None:
+            analysis = client.knowledge_gaps(
+                similarity_threshold=similarity_threshold,
+                min_connections=min_connections
+            )
+        else:
+            from src.features.vault_reports import knowledge_gap_report
+            search_engine = _load_search_engine(vault_path, config)
+            if search_engine is None:
+                return False
+            analysis = knowledge_gap_report(
+                search_engine,
+                similarity_threshold=similarity_threshold,
+                min_connections=min_connections
+            )
         
         if not analysis:
             print("❌ 분석 결과가 없습니다.")
@@ -788,6 +867,13 @@ def run_reindex(vault_path: str, force: bool, config: dict, sample_size: Optiona
         
         search_engine = AdvancedSearchEngine(vault_path, cache_dir, temp_config)
         
+        # 중단(Ctrl+C, 프로세스 종료)된 재인덱싱이 있으면 이어서 진행
+        from .core.reindex_checkpoint import ReindexCheckpointStore
+        checkpoint = ReindexCheckpointStore(cache_dir).load()
+        if checkpoint is not None and not colbert_only:
+            print(f"♻️ 중단된 재인덱싱을 이어서 진행합니다 (마지막 단계: {checkpoint.phase} "
+                  f"{checkpoint.done}/{checkpoint.total})")
+        
         # 진행률 표시 함수
         def progress_callback(current, total):
             percentage = (current / total) * 100
@@ -796,18 +882,25 @@ def run_reindex(vault_path: str, force: bool, config: dict, sample_size: Optiona
         # Dense 임베딩 인덱스 구축 (colbert_only가 아닌 경우)
         if not colbert_only:
             print("📚 Dense 임베딩 인덱스 구축 중...")
+            # ColBERT도 같은 체크포인트로 구축 → 중단돼도 다음 실행이 남은 문서부터 이어감
             success = search_engine.build_index(
                 force_rebuild=force, 
                 progress_callback=progress_callback,
-                sample_size=sample_size
+                sample_size=sample_size,
+                with_colbert=with_colbert
             )
             
             if not success:
                 print("❌ Dense 임베딩 인덱싱 실패!")
                 return False
+            if with_colbert:
+                if search_engine._colbert_ready():
+                    print("✅ ColBERT 인덱싱 완료!")
+                else:
+                    print("⚠️ ColBERT 인덱싱 실패, 계속 진행...")
         
-        # ColBERT 인덱싱
-        if with_colbert or colbert_only:
+        # ColBERT만 인덱싱
+        if colbert_only:
             print("🎯 ColBERT 인덱싱 시작...")
             try:
                 from .features.colbert_search import ColBERTSearchEngine
@@ -1826,120 +1919,40 @@ def run_connect_status(
 def run_graph(vault_path: str, file_path: str, top_k: int, config: dict,
               similarity_threshold: float = 0.3, output_file: str = None,
               no_open: bool = False, depth: int = 1,
-              expand_threshold: float = 0.5):
+              expand_threshold: float = 0.5, client=None):
     """문서 관계 그래프 생성 (multi-depth BFS)"""
     try:
+        from src.features.related_graph import resolve_document_path
+
         # Normalize to absolute path (matching doc.path in index)
-        fp = Path(file_path)
-        if not fp.is_absolute():
-            fp = Path(vault_path) / fp
-        file_path = str(fp.resolve())
+        file_path = resolve_document_path(vault_path, file_path)
 
         print(f"📊 '{file_path}' 관계 그래프 생성 중... (depth={depth})")
 
-        # 1. Search engine init
-        cache_dir = str(data_dir / "cache")
-        search_engine = AdvancedSearchEngine(vault_path, cache_dir, config)
-
-        if not search_engine.indexed:
-            print("📚 인덱스 구축 중...")
-            if not search_engine.build_index():
-                print("❌ 인덱스 구축 실패")
+        # 1. Nodes (multi-depth BFS over related documents) and edges (semantic + wikilinks)
+        options = dict(top_k=top_k, similarity_threshold=similarity_threshold,
+                       depth=depth, expand_threshold=expand_threshold)
+        if client is not None:
+            graph = client.graph(file_path, **options)
+        else:
+            from src.features.vault_reports import graph_report
+            search_engine = _load_search_engine(vault_path, config)
+            if search_engine is None:
                 return False
+            graph = graph_report(search_engine, vault_path, file_path, **options)
 
-        # 2. BFS: collect nodes per depth
-        #    visited: path -> (score, depth, parent_path)
-        visited = {file_path: (1.0, 0, None)}
-        #    semantic_edges: [(source, result)] across all depths
-        all_semantic_results = []  # (source_path, result)
-        frontier = [file_path]
-
-        for current_depth in range(1, depth + 1):
-            next_frontier = []
-            for source_path in frontier:
-                source_score = visited[source_path][0]
-                # Score-proportional top-k: parent score * base top-k
-                depth_top_k = max(3, round(top_k * source_score))
-                results = search_engine.get_related_documents(
-                    document_path=source_path,
-                    top_k=depth_top_k,
-                    include_centrality_boost=False,
-                    similarity_threshold=similarity_threshold
-                )
-                if not results:
-                    continue
-
-                for r in results:
-                    p = r.document.path
-                    all_semantic_results.append((source_path, r))
-                    if p not in visited:
-                        visited[p] = (r.similarity_score, current_depth, source_path)
-                        # Expand in next depth only if score >= expand_threshold
-                        if r.similarity_score >= expand_threshold:
-                            next_frontier.append(p)
-
-            frontier = next_frontier
-            if not frontier:
-                break
-            print(f"  depth {current_depth}: {len(next_frontier)} nodes to expand")
-
-        if len(visited) <= 1:
+        if len(graph["nodes"]) <= 1:
             print("❌ 관련 문서를 찾을 수 없습니다.")
             return False
 
-        # 3. Parse wikilinks
-        from src.features.wikilink_parser import WikilinkParser
-        wl_parser = WikilinkParser(vault_path)
-
-        all_paths = set(visited.keys())
-        wikilinks = {}  # source_path -> [target_paths]
-        for p in all_paths:
-            raw_links = wl_parser.extract_from_file(p)
-            resolved = []
-            for link in raw_links:
-                target = wl_parser.resolve_link(link)
-                if target and target in all_paths:
-                    resolved.append(target)
-            if resolved:
-                wikilinks[p] = resolved
-
-        # 4. Build graph data
+        # 2. Render
         from src.visualization.graph_renderer import (
             KnowledgeGraphRenderer, GraphNode, GraphEdge
         )
 
-        nodes = []
-        score_map = {}
-        for p, (score, d, _parent) in visited.items():
-            nodes.append(GraphNode(
-                id=p, label=Path(p).stem,
-                path=p, is_center=(d == 0), score=score, depth=d,
-            ))
-            score_map[p] = score
-
-        # Edges: combine semantic + wikilinks
-        edge_set = {}  # (src, tgt) -> (edge_type, weight)
-        for source_path, r in all_semantic_results:
-            tgt = r.document.path
-            if tgt in all_paths:
-                key = tuple(sorted([source_path, tgt]))
-                if key not in edge_set:
-                    edge_set[key] = ("semantic", r.similarity_score)
-
-        for src, targets in wikilinks.items():
-            for tgt in targets:
-                key = tuple(sorted([src, tgt]))
-                if key in edge_set:
-                    edge_set[key] = ("both", edge_set[key][1])
-                else:
-                    edge_set[key] = ("wikilink", score_map.get(tgt, 0.5))
-
-        edges = [
-            GraphEdge(source=k[0], target=k[1], edge_type=v[0], weight=v[1])
-            for k, v in edge_set.items()
-        ]
+        nodes = [GraphNode(**n) for n in graph["nodes"]]
+        edges = [GraphEdge(**e) for e in graph["edges"]]
 
-        # 5. Render
         out = output_file or str(Path(vault_path) / ".obsidian-tools" / "knowledge-graph.html")
         renderer = KnowledgeGraphRenderer()
         title = f"Knowledge Graph: {Path(file_path).stem} (depth={depth})"
@@ -1947,8 +1960,8 @@ def run_graph(vault_path: str, file_path: str, top_k: int, config: dict,
 
         # Stats per depth
         depth_counts = {}
-        for _p, (_, d, _) in visited.items():
-            depth_counts[d] = depth_counts.get(d, 0) + 1
+        for n in nodes:
+            depth_counts[n.depth] = depth_counts.get(n.depth, 0) + 1
         print(f"\nGraph: {len(nodes)} nodes, {len(edges)} edges")
         for d in sorted(depth_counts):
             label = "center" if d == 0 else f"depth {d}"
@@ -1979,60 +1992,55 @@ def run_moc_generation(
     output_file: Optional[str],
     config: dict,
     include_orphans: bool = False,
-    use_expansion: bool = True
+    use_expansion: bool = True,
+    client=None
 ):
     """MOC 생성 실행"""
     try:
         print(f"📚 '{topic}' MOC 생성 시작...")
         
-        # 검색 엔진 초기화
-        cache_dir = str(data_dir / "cache")
-        search_engine = AdvancedSearchEngine(vault_path, cache_dir, config)
-        
-        if not search_engine.indexed:
-            print("📚 인덱스 구축 중...")
-            if not search_engine.build_index():
-                print("❌ 인덱스 구축 실패")
-                return False
-        
-        # MOC 생성기 초기화
-        moc_generator = MOCGenerator(search_engine, config)
-        
         # 출력 파일 경로 결정 (--output 플래그가 있을 때만)
         resolved_output = resolve_output_path(vault_path, output_file, "moc", topic)
-        
-        # MOC 생성
-        moc_data = moc_generator.generate_moc(
-            topic=topic,
+        options = dict(
             top_k=top_k,
             threshold=threshold,
             include_orphans=include_orphans,
             use_expansion=use_expansion,
-            output_file=resolved_output
+            render=resolved_output is not None
         )
         
+        if client is not None:
+            moc = client.generate_moc(topic, **options)
+        else:
+            from src.features.vault_reports import moc_report
+            search_engine = _load_search_engine(vault_path, config)
+            if search_engine is None:
+                return False
+            moc = moc_report(search_engine, topic, config=config, **options)
+        
         print(f"\n📊 MOC 생성 결과:")
         print("-" * 50)
-        print(f"주제: {moc_data.topic}")
-        print(f"총 문서: {moc_data.total_documents}개")
-        print(f"핵심 문서: {len(moc_data.core_documents)}개")
-        print(f"카테고리: {len(moc_data.categories)}개")
-        print(f"학습 경로: {len(moc_data.learning_path)}단계")
-        print(f"관련 주제: {len(moc_data.related_topics)}개")
-        print(f"최근 업데이트: {len(moc_data.recent_updates)}개")
-        print(f"문서 관계: {len(moc_data.relationships)}개")
-        
-        if moc_data.categories:
+        print(f"주제: {moc['topic']}")
+        print(f"총 문서: {moc['total_documents']}개")
+        print(f"핵심 문서: {len(moc['core_documents'])}개")
+        print(f"카테고리: {len(moc['categories'])}개")
+        print(f"학습 경로: {len(moc['learning_path'])}단계")
+        print(f"관련 주제: {len(moc['related_topics'])}개")
+        print(f"최근 업데이트: {moc['recent_update_count']}개")
+        print(f"문서 관계: {moc['relationship_count']}개")
+        
+        if moc['categories']:
             print(f"\n📋 카테고리별 문서 분포:")
-            for category in moc_data.categories:
-                print(f"  {category.name}: {len(category.documents)}개 문서")
+            for category in moc['categories']:
+                print(f"  {category['name']}: {category['document_count']}개 문서")
         
-        if moc_data.learning_path:
+        if moc['learning_path']:
             print(f"\n🛤️ 학습 경로:")
-            for step in moc_data.learning_path:
-                print(f"  {step.step}. {step.title} ({step.difficulty_level}) - {len(step.documents)}개 문서")
+            for step in moc['learning_path']:
+                print(f"  {step['step']}. {step['title']} ({step['difficulty_level']}) - {step['document_count']}개 문서")
         
-        if resolved_output:
+        if resolved_output and moc['total_documents']:
+            Path(resolved_output).write_text(moc['document'], encoding='utf-8')
             print(f"\n💾 MOC 파일이 {resolved_output}에 저장되었습니다.")
             
         return True
@@ -2043,6 +2051,24 @@ def run_moc_generation(
         return False
 
 
+def _read_batch_queries(source: str) -> List[str]:
+    """배치 검색 쿼리 읽기 (한 줄에 하나, 빈 줄과 #으로 시작하는 줄 제외)"""
+    if source == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        lines = Path(source).read_text(encoding="utf-8").splitlines()
+    return [line.strip() for line in lines if line.strip() and not line.strip().startswith("#")]
+
+
+def _print_search_results(results: List[dict]) -> None:
+    """서버 검색 결과 출력"""
+    for i, r in enumerate(results, 1):
+        section = f"#{r['section']}" if r.get('section') else ""
+        print(f"\n{i}. [{r['score']:.4f}] {r['path']}{section}")
+        if r.get('snippet'):
+            print(f"   {r['snippet'][:150]}")
+
+
 def main():
     """메인 함수"""
     parser = argparse.ArgumentParser(
@@ -2060,11 +2086,13 @@ def main():
 
     # --- search ---
     p = subparsers.add_parser("search", help="하이브리드 검색 (semantic, keyword, colbert)")
-    p.add_argument("query", help="검색 쿼리")
+    p.add_argument("query", nargs="?", help="검색 쿼리 (--batch 사용 시 생략)")
+    p.add_argument("--batch", metavar="FILE", help="파일의 쿼리를 한 번에 검색 (한 줄에 하나, '-'면 표준 입력, #으로 시작하는 줄 무시)")
     p.add_argument("--top-k", type=int, default=10, help="상위 K개 결과 (기본값: 10)")
     p.add_argument("--threshold", type=float, default=0.3, help="유사도 임계값 (기본값: 0.3)")
     p.add_argument("--rerank", action="store_true", help="재순위화 활성화 (BGE Reranker V2-M3)")
     p.add_argument("--search-method", choices=["semantic", "keyword", "hybrid", "colbert"], default="hybrid", help="검색 방법 (기본값: hybrid)")
+    p.add_argument("--deadline-ms", type=float, help="응답 시간 예산 (ms). 예산 안에 끝날 때만 ColBERT 재채점/재순위화 실행")
     p.add_argument("--expand", action="store_true", help="쿼리 확장 활성화 (동의어 + HyDE)")
     p.add_argument("--no-synonyms", action="store_true", help="동의어 확장 비활성화")
     p.add_argument("--no-hyde", action="store_true", help="HyDE 확장 비활성화")
@@ -2202,6 +2230,7 @@ def main():
     from src.constants import DEFAULT_PORT
     p = subparsers.add_parser("serve", help="백그라운드 검색 서버 시작")
     p.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"서버 포트 (기본값: {DEFAULT_PORT})")
+    p.add_argument("--workers", type=int, help="워커 프로세스 수 (2 이상이면 메모리 매핑 인덱스 공유, 기본값: server.workers)")
 
     # --- stop ---
     subparsers.add_parser("stop", help="검색 서버 중지")
@@ -2209,6 +2238,15 @@ def main():
     # --- status ---
     subparsers.add_parser("status", help="검색 서버 상태 확인")
 
+    # --- profile ---
+    p = subparsers.add_parser("profile", help="실행 중인 서버 프로파일링 (server.debug.profile 필요)")
+    p.add_argument("--seconds", type=float, default=5.0, help="샘플링 시간 (초, 기본값: 5)")
+    p.add_argument("--interval-ms", type=float, default=5.0, help="스택 샘플 간격 (밀리초, 기본값: 5)")
+    p.add_argument("--memory-top", type=int, default=20, help="메모리 할당 상위 위치 수 (0이면 tracemalloc 생략)")
+    p.add_argument("--include-idle", action="store_true", help="작업 대기 중인 스레드 스택도 포함")
+    p.add_argument("-o", "--output", default="vis-profile.folded",
+                   help="collapsed 스택 파일 (flamegraph.pl, speedscope 입력, 기본값: vis-profile.folded)")
+
     # --- init ---
     subparsers.add_parser("init", help="시스템 초기화")
 
@@ -2234,7 +2272,7 @@ def main():
     # Fast-path commands: no ML dependencies or config needed
     if args.command == "serve":
         from src.server import run_server
-        run_server(port=args.port)
+        run_server(port=args.port, workers=args.workers)
         return
 
     if args.command == "stop":
@@ -2250,27 +2288,53 @@ def main():
             print(f"✅ 서버 실행 중")
             print(f"   문서 수: {info['document_count']}")
             print(f"   인덱스: {'구축됨' if info['indexed'] else '미구축'}")
+            if not info.get('ready', True):
+                print(f"   준비 중: {info.get('phase', 'starting')}")
         else:
             print("❌ 서버가 실행 중이 아닙니다. vis serve로 시작하세요.")
         return
 
+    if args.command == "profile":
+        run_profile(args)
+        return
+
     # search: daemon required
     if args.command == "search":
         from src.client import VisClient, ServerNotRunning
         client = VisClient()
+        if args.batch:
+            try:
+                queries = _read_batch_queries(args.batch)
+            except OSError as e:
+                print(f"❌ 쿼리 파일을 읽을 수 없습니다: {e}")
+                sys.exit(1)
+        elif args.query is None:
+            parser.error("search: 검색 쿼리 또는 --batch FILE이 필요합니다")
         try:
+            if args.batch:
+                batch_results = client.search_batch(
+                    queries, top_k=args.top_k,
+                    threshold=args.threshold,
+                    search_method=args.search_method,
+                    rerank=args.rerank, auto_start=False,
+                )
+                for query, results in zip(queries, batch_results):
+                    print(f"\n🔍 {query} ({len(results)}개)")
+                    print("-" * 80)
+                    _print_search_results(results)
+                print(f"\n✅ {len(queries)}개 쿼리 검색 완료!")
+                return
+
             results = client.search(
                 query=args.query, top_k=args.top_k,
                 threshold=args.threshold,
                 search_method=args.search_method,
                 rerank=args.rerank, auto_start=False,
+                deadline_ms=args.deadline_ms,
             )
             print(f"\n📄 검색 결과 ({len(results)}개):")
             print("-" * 80)
-            for i, r in enumerate(results, 1):
-                print(f"\n{i}. [{r['score']:.4f}] {r['path']}")
-                if r.get('snippet'):
-                    print(f"   {r['snippet'][:150]}")
+            _print_search_results(results)
             print("\n✅ 검색 완료!")
             return
         except ServerNotRunning:
@@ -2325,17 +2389,19 @@ def main():
             sys.exit(1)
     
     elif args.command == "duplicates":
-        if not check_dependencies():
+        client = _daemon_client(vault_path)
+        if client is None and not check_dependencies():
             sys.exit(1)
         
-        if run_duplicate_detection(vault_path, config):
+        if run_duplicate_detection(vault_path, config, client=client):
             print("✅ 중복 감지 완료!")
         else:
             print("❌ 중복 감지 실패!")
             sys.exit(1)
     
     elif args.command == "collect":
-        if not check_dependencies():
+        client = _daemon_client(vault_path)
+        if client is None and not check_dependencies():
             sys.exit(1)
 
         if run_topic_collection(
@@ -2347,7 +2413,8 @@ def main():
             config,
             use_expansion=args.expand,
             include_synonyms=not args.no_synonyms,
-            include_hyde=not args.no_hyde
+            include_hyde=not args.no_hyde,
+            client=client
         ):
             print("✅ 주제 수집 완료!")
         else:
@@ -2380,7 +2447,8 @@ def main():
             sys.exit(1)
     
     elif args.command == "related":
-        if not check_dependencies():
+        client = _daemon_client(vault_path)
+        if client is None and not check_dependencies():
             sys.exit(1)
 
         if run_related_documents(
@@ -2389,7 +2457,8 @@ def main():
             args.top_k,
             config,
             include_centrality=True,  # 항상 중심성 점수 포함
-            similarity_threshold=args.similarity_threshold
+            similarity_threshold=args.similarity_threshold,
+            client=client
         ):
             print("✅ 관련 문서 찾기 완료!")
         else:
@@ -2397,7 +2466,8 @@ def main():
             sys.exit(1)
     
     elif args.command == "analyze-gaps":
-        if not check_dependencies():
+        client = _daemon_client(vault_path)
+        if client is None and not check_dependencies():
             sys.exit(1)
         
         if run_knowledge_gap_analysis(
@@ -2405,7 +2475,8 @@ def main():
             config,
             output_file=args.output,
             similarity_threshold=args.similarity_threshold,
-            min_connections=args.min_connections
+            min_connections=args.min_connections,
+            client=client
         ):
             print("✅ 지식 공백 분석 완료!")
         else:
@@ -2446,7 +2517,8 @@ def main():
             sys.exit(1)
     
     elif args.command == "generate-moc":
-        if not check_dependencies():
+        client = _daemon_client(vault_path)
+        if client is None and not check_dependencies():
             sys.exit(1)
 
         if run_moc_generation(
@@ -2457,7 +2529,8 @@ def main():
             output_file=args.output,
             config=config,
             include_orphans=args.include_orphans,
-            use_expansion=args.expand
+            use_expansion=args.expand,
+            client=client
         ):
             print("✅ MOC 생성 완료!")
         else:
@@ -2604,7 +2677,8 @@ def main():
             sys.exit(1)
 
     elif args.command == "graph":
-        if not check_dependencies():
+        client = _daemon_client(vault_path)
+        if client is None and not check_dependencies():
             sys.exit(1)
 
         graph_depth = min(args.depth, 3)  # cap at 3
@@ -2618,6 +2692,7 @@ def main():
             no_open=args.no_open,
             depth=graph_depth,
             expand_threshold=args.expand_threshold,
+            client=client,
         ):
             print("✅ 그래프 생성 완료!")
         else:
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Admission control for the vis daemon server.
+
+Rerank and ColBERT searches cost orders of magnitude more than dense or
+lexical search. Each cost class (search method, or "rerank") gets its own
+concurrency limit and bounded wait queue, all classes share a total
+concurrency limit, and freed slots go to cheaper classes first. Requests are
+shed early instead of piling up:
+
+- 429 when the class queue is already full (the client is sending too many
+  expensive requests; back off)
+- 503 when the request cannot start before its queue deadline, judged from
+  the observed service time of the class, or when it actually times out
+
+A request that carries several searches (a batch) acquires with a weight and
+holds that many slots of its class, capped at what the class can ever grant.
+"""
+
+import math
+import time
+import heapq
+import asyncio
+import itertools
+import logging
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CLASS = {"concurrency": 8, "queue": 64, "queue_timeout_seconds": 1.0, "priority": 0}
+
+# rerank/colbert: one at a time, a short queue, willing to wait longer, served after cheap methods
+# analysis: topic analyses (/collect, /moc) that run many searches, served after every search
+DEFAULT_CLASSES = {
+    "semantic": {},
+    "keyword": {},
+    "hybrid": {},
+    "colbert": {"concurrency": 1, "queue": 4, "queue_timeout_seconds": 5.0, "priority": 1},
+    "rerank": {"concurrency": 1, "queue": 4, "queue_timeout_seconds": 5.0, "priority": 1},
+    "analysis": {"concurrency": 1, "queue": 4, "queue_timeout_seconds": 10.0, "priority": 2},
+}
+
+# Weight of the newest sample in the per-class service time average
+_EWMA_ALPHA = 0.2
+
+
+def cost_class(search_method: str, rerank: bool) -> str:
+    """Admission class of a search: reranking dominates the cost of any method"""
+    return "rerank" if rerank else search_method
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is shed; carries the HTTP status and Retry-After"""
+
+    def __init__(self, cost_class: str, status_code: int, reason: str, retry_after: float):
+        super().__init__(f"{cost_class} request rejected: {reason}")
+        self.cost_class = cost_class
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = max(1, math.ceil(retry_after))
+
+
+class AdmissionTicket:
+    """A granted slot; release() is idempotent so several cleanup paths may call it"""
+
+    __slots__ = ("controller", "cost_class", "weight", "started", "released")
+
+    def __init__(self, controller: "AdmissionController", cost_class: str, weight: int = 1):
+        self.controller = controller
+        self.cost_class = cost_class
+        self.weight = weight
+        self.started = time.monotonic()
+        self.released = False
+
+    def release(self) -> None:
+        if not self.released:
+            self.released = True
+            self.controller._release(self)
+
+    async def __aenter__(self) -> "AdmissionTicket":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self.release()
+
+
+class AdmissionController:
+    """Per-class concurrency limits and bounded priority queues (single event loop)"""
+
+    def __init__(self, classes: Optional[Dict[str, Dict]] = None, max_concurrent: int = 8):
+        """
+        Args:
+            classes: cost class -> {concurrency, queue, queue_timeout_seconds, priority};
+                missing keys use DEFAULT_CLASS, unknown classes use DEFAULT_CLASS entirely
+            max_concurrent: Total searches running at once across all classes
+        """
+        merged = {name: dict(settings) for name, settings in DEFAULT_CLASSES.items()}
+        for name, settings in (classes or {}).items():
+            merged.setdefault(name, {}).update(settings or {})
+        self.classes = {name: {**DEFAULT_CLASS, **settings} for name, settings in merged.items()}
+        self.max_concurrent = max(int(max_concurrent), 1)
+
+        self._running: Dict[str, int] = {}
+        self._queued: Dict[str, int] = {}
+        self._service_time: Dict[str, float] = {}
+        self._total_running = 0
+        # (priority, seq, cost_class, future, weight)
+        self._waiters: List = []
+        self._seq = itertools.count()
+
+        self.rejected: Dict[tuple, int] = {}
+
+    def _settings(self, cost_class: str) -> Dict:
+        return self.classes.get(cost_class, DEFAULT_CLASS)
+
+    def _concurrency(self, cost_class: str) -> int:
+        return max(int(self._settings(cost_class)["concurrency"]), 1)
+
+    def _has_capacity(self, cost_class: str, weight: int = 1) -> bool:
+        return (self._total_running + weight <= self.max_concurrent
+                and self._running.get(cost_class, 0) + weight <= self._concurrency(cost_class))
+
+    def _grant(self, cost_class: str, weight: int = 1) -> AdmissionTicket:
+        self._running[cost_class] = self._running.get(cost_class, 0) + weight
+        self._total_running += weight
+        return AdmissionTicket(self, cost_class, weight)
+
+    def max_weight(self, cost_class: str) -> int:
+        """Most slots a single request of this class can hold (weights are capped to it)"""
+        return min(self._concurrency(cost_class), self.max_concurrent)
+
+    def try_acquire(self, cost_class: str) -> Optional[AdmissionTicket]:
+        """A slot of cost_class only if one is free and no request is waiting, else None
+
+        For background work (cache prewarming) that must never delay or displace live
+        searches: it ranks below every queued request and is not counted as rejected.
+        """
+        if self._waiters or not self._has_capacity(cost_class):
+            return None
+        return self._grant(cost_class)
+
+    def estimated_wait(self, cost_class: str) -> float:
+        """Seconds until a new request of this class would start, from observed service times"""
+        ahead = self._queued.get(cost_class, 0) + 1
+        service = self._service_time.get(cost_class, 0.0)
+        return ahead * service / self._concurrency(cost_class)
+
+    def _reject(self, cost_class: str, status_code: int, reason: str, retry_after: float) -> AdmissionRejected:
+        key = (cost_class, reason)
+        self.rejected[key] = self.rejected.get(key, 0) + 1
+        logger.warning(f"Admission rejected {cost_class} request: {reason}")
+        return AdmissionRejected(cost_class, status_code, reason, retry_after)
+
+    async def acquire(
+        self,
+        cost_class: str,
+        deadline: Optional[float] = None,
+        weight: int = 1
+    ) -> AdmissionTicket:
+        """Wait for a slot of cost_class
+
+        Args:
+            deadline: time.monotonic() by which the request must have started;
+                defaults to now + the class queue_timeout_seconds
+            weight: Slots to hold, e.g. the number of searches in a batch
+                (capped at max_weight(cost_class))
+
+        Raises:
+            AdmissionRejected: queue full (429), deadline unreachable or expired (503)
+        """
+        settings = self._settings(cost_class)
+        priority = settings["priority"]
+        weight = min(max(int(weight), 1), self.max_weight(cost_class))
+
+        # No queue jumping past a waiter of the same or higher priority that could start now
+        if self._has_capacity(cost_class, weight) and not any(
+                w[0] <= priority and self._has_capacity(w[2], w[4]) for w in self._waiters):
+            return self._grant(cost_class, weight)
+
+        if self._queued.get(cost_class, 0) >= int(settings["queue"]):
+            raise self._reject(cost_class, 429, "queue_full", self.estimated_wait(cost_class))
+
+        now = time.monotonic()
+        queue_deadline = now + float(settings["queue_timeout_seconds"])
+        deadline = min(deadline, queue_deadline) if deadline is not None else queue_deadline
+        expected = self.estimated_wait(cost_class)
+        if now + expected > deadline:
+            raise self._reject(cost_class, 503, "deadline", expected)
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (priority, next(self._seq), cost_class, future, weight)
+        heapq.heappush(self._waiters, entry)
+        self._queued[cost_class] = self._queued.get(cost_class, 0) + 1
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout=max(deadline - now, 0.0))
+        except asyncio.TimeoutError:
+            if future.done() and not future.cancelled():
+                # Granted at the same moment the wait timed out: keep the slot
+                return future.result()
+            raise self._reject(cost_class, 503, "timeout", self.estimated_wait(cost_class))
+        except asyncio.CancelledError:
+            # Client went away while queued; hand back a slot granted in the meantime
+            if future.done() and not future.cancelled():
+                future.result().release()
+            raise
+        finally:
+            if not future.done():
+                future.cancel()
+            if entry in self._waiters:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                self._queued[cost_class] -= 1
+
+    def _release(self, ticket: AdmissionTicket) -> None:
+        cost_class = ticket.cost_class
+        self._running[cost_class] -= ticket.weight
+        self._total_running -= ticket.weight
+
+        # Service time per slot, so a batch does not inflate the estimate for single searches
+        elapsed = (time.monotonic() - ticket.started) / ticket.weight
+        previous = self._service_time.get(cost_class)
+        self._service_time[cost_class] = (
+            elapsed if previous is None else (1 - _EWMA_ALPHA) * previous + _EWMA_ALPHA * elapsed)
+
+        self._wake()
+
+    def _wake(self) -> None:
+        """Grant freed slots to waiters in (priority, arrival) order"""
+        for entry in sorted(self._waiters):
+            if self._total_running >= self.max_concurrent:
+                break
+            _, _, cost_class, future, weight = entry
+            if future.done() or not self._has_capacity(cost_class, weight):
+                continue
+            self._waiters.remove(entry)
+            self._queued[cost_class] -= 1
+            future.set_result(self._grant(cost_class, weight))
+        heapq.heapify(self._waiters)
+
+    def statistics(self) -> Dict:
+        """Running/queued counts and average service time per class, rejections by reason"""
+        names = sorted(set(self.classes) | set(self._running))
+        return {
+            "max_concurrent": self.max_concurrent,
+            "running": self._total_running,
+            "classes": {
+                name: {
+                    "running": self._running.get(name, 0),
+                    "queued": self._queued.get(name, 0),
+                    "avg_service_ms": round(self._service_time.get(name, 0.0) * 1000, 3),
+                }
+                for name in names
+            },
+            "rejected": {f"{name}:{reason}": count for (name, reason), count in sorted(self.rejected.items())},
+        }
@@ -3,21 +3,31 @@
 HTTP thin client for Vault Intelligence System V2 daemon server.
 
 This client communicates with the vis server running as a separate process,
-automatically starting it if needed.
+automatically starting it if needed. Requests go over one pooled keep-alive
+connection, through the daemon's Unix domain socket when it is available.
 """
 
+import os
 import sys
+import socket
+import json
 import time
 import logging
 import subprocess
-from typing import List, Dict
+from typing import Dict, Iterator, List, Optional, Union
 
 import httpx
 
-from .constants import DEFAULT_PORT, PID_FILE
+from .constants import DEFAULT_PORT, PID_FILE, socket_path as default_socket_path
 
 logger = logging.getLogger(__name__)
 
+LOOPBACK_HOSTS = ("127.0.0.1", "localhost", "::1")
+
+# Endpoints that take ?vault= (the batch endpoint takes it in the JSON body)
+VAULT_PATHS = frozenset({"/search", "/search/stream", "/search/batch", "/related", "/duplicates",
+                         "/gaps", "/graph", "/collect", "/moc", "/jobs/reindex"})
+
 
 class ServerNotRunning(Exception):
     """Exception raised when server is not running and auto_start=False"""
@@ -27,40 +37,148 @@ class ServerNotRunning(Exception):
 class VisClient:
     """HTTP client for vis daemon server"""
 
-    def __init__(self, host: str = "127.0.0.1", port: int = DEFAULT_PORT):
+    def __init__(self, host: str = "127.0.0.1", port: int = DEFAULT_PORT,
+                 socket_path: Optional[str] = None, use_socket: bool = True, vault: Optional[str] = None):
         """
         Initialize VisClient.
 
         Args:
             host: Server host
             port: Server port
+            socket_path: Unix domain socket of the daemon (default: $VIS_SOCKET,
+                then the socket the local daemon on `port` creates)
+            use_socket: Prefer the Unix socket over TCP when it exists
+            vault: Named vault (server.vaults) to search and analyze; None = the boot vault
         """
         self.host = host
         self.port = port
         self.base_url = f"http://{host}:{port}"
+        if socket_path is None and host in LOOPBACK_HOSTS:
+            socket_path = os.environ.get("VIS_SOCKET") or str(default_socket_path(port))
+        self.socket_path = socket_path if use_socket and hasattr(socket, "AF_UNIX") else None
+        self.vault = vault
+
+        self._client: Optional[httpx.Client] = None
+        self._socket_failed = False
+        self.transport = "tcp"
+
+    def _http(self) -> httpx.Client:
+        """Pooled keep-alive client, created on first use"""
+        if self._client is None:
+            transport = None
+            self.transport = "tcp"
+            if self.socket_path and not self._socket_failed and os.path.exists(self.socket_path):
+                transport = httpx.HTTPTransport(uds=self.socket_path)
+                self.transport = "uds"
+            self._client = httpx.Client(
+                transport=transport,
+                timeout=30.0,
+                limits=httpx.Limits(max_keepalive_connections=4, keepalive_expiry=60.0)
+            )
+        return self._client
+
+    def close(self) -> None:
+        """Close pooled connections"""
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    def __enter__(self) -> "VisClient":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _request(self, method: str, path: str, auto_start: bool = False, stream: bool = False,
+                 **kwargs) -> httpx.Response:
+        """
+        Send a request on the pooled connection.
+
+        There is no pre-flight health check: a connect failure on the Unix socket
+        (e.g. a stale socket file) falls back to TCP, and only when TCP also
+        cannot connect is the server started (auto_start) or ServerNotRunning raised.
+
+        With stream=True the body is not read; the caller must close the response.
+
+        Raises:
+            ServerNotRunning: If the server cannot be reached and auto_start=False
+        """
+        url = f"{self.base_url}{path}"
+        if self.vault and path in VAULT_PATHS:
+            if "json" in kwargs:
+                kwargs["json"] = {**kwargs["json"], "vault": self.vault}
+            else:
+                kwargs["params"] = {**(kwargs.get("params") or {}), "vault": self.vault}
+
+        def send() -> httpx.Response:
+            client = self._http()
+            if stream:
+                return client.send(client.build_request(method, url, **kwargs), stream=True)
+            return client.request(method, url, **kwargs)
+
+        for _ in range(2):
+            try:
+                return send()
+            except httpx.ConnectError:
+                via_socket = self.transport == "uds"
+                self.close()
+                if not via_socket:
+                    break
+                # Stale socket file (daemon gone or restarted without it): retry over TCP
+                logger.debug(f"Unix socket {self.socket_path} unreachable, falling back to TCP")
+                self._socket_failed = True
+
+        if not auto_start:
+            raise ServerNotRunning("Server is not running. Start with auto_start=True or manually start the server.")
+        self._start_server()
+        return send()
+
+    def _health_status(self) -> Optional[Dict]:
+        """/health body, or None if the server does not answer"""
+        try:
+            response = self._request("GET", "/health", timeout=2.0)
+        except (ServerNotRunning, httpx.TimeoutException, httpx.RequestError):
+            return None
+        if response.status_code != 200:
+            return None
+        try:
+            return response.json()
+        except ValueError:
+            return {}
 
     def is_server_running(self) -> bool:
         """
-        Check if server is running by calling /health endpoint.
+        Check if server is running (live) by calling /health endpoint.
 
         Returns:
             True if server is running and responsive, False otherwise
         """
-        try:
-            with httpx.Client(timeout=2.0) as client:
-                response = client.get(f"{self.base_url}/health")
-                return response.status_code == 200
-        except (httpx.ConnectError, httpx.TimeoutException, httpx.RequestError):
-            return False
+        return self._health_status() is not None
+
+    def is_server_ready(self) -> bool:
+        """
+        Check if server is ready: index loaded and warm-up finished.
+
+        Servers that do not report readiness are ready as soon as they answer.
+        """
+        health = self._health_status()
+        return health is not None and health.get("ready", True)
 
-    def _start_server(self) -> None:
+    def _start_server(self, live_timeout: float = 30, ready_timeout: float = 180) -> None:
         """
-        Start server as background process.
+        Start server as background process and wait until it is ready.
+
+        Args:
+            live_timeout: Seconds for the server to start answering /health
+            ready_timeout: Further seconds to wait for warm-up once it answers;
+                past that the server is used anyway (searches report their own errors)
 
         Raises:
-            RuntimeError: If server fails to start within 30 seconds
+            RuntimeError: If server does not answer within live_timeout
         """
         logger.info(f"Starting vis server on {self.host}:{self.port}...")
+        self.close()
+        self._socket_failed = False
 
         # Start server process
         cmd = [
@@ -84,18 +202,28 @@ class VisClient:
         except Exception as e:
             raise RuntimeError(f"Failed to start server process: {e}")
 
-        # Wait for server to be ready (up to 30 seconds)
-        max_wait = 30
         start_time = time.time()
-
-        while time.time() - start_time < max_wait:
-            if self.is_server_running():
-                logger.info("✅ Server is ready")
-                return
+        live_since = None
+
+        while True:
+            health = self._health_status()
+            if health is not None:
+                if health.get("ready", True):
+                    logger.info("✅ Server is ready")
+                    break
+                if live_since is None:
+                    live_since = time.time()
+                    logger.info(f"Server is up, waiting for readiness ({health.get('phase', 'starting')})...")
+                elif time.time() - live_since >= ready_timeout:
+                    logger.warning(f"Server is up but not ready after {ready_timeout:.0f} seconds")
+                    break
+            elif time.time() - start_time >= live_timeout:
+                raise RuntimeError(f"Server failed to start within {live_timeout:.0f} seconds")
 
             time.sleep(0.5)
 
-        raise RuntimeError(f"Server failed to start within {max_wait} seconds")
+        # Reconnect so the Unix socket is picked up once the daemon has created it
+        self.close()
 
     def _ensure_server(self) -> None:
         """
@@ -114,7 +242,8 @@ class VisClient:
         threshold: float = 0.0,
         search_method: str = "hybrid",
         rerank: bool = False,
-        auto_start: bool = True
+        auto_start: bool = True,
+        deadline_ms: Optional[float] = None
     ) -> List[Dict]:
         """
         Execute search query.
@@ -126,6 +255,8 @@ class VisClient:
             search_method: Search method (semantic, keyword, hybrid, colbert)
             rerank: Enable reranking
             auto_start: Auto-start server if not running
+            deadline_ms: Latency budget; ColBERT rescoring and reranking are
+                skipped when they would not fit
 
         Returns:
             List of search result dictionaries
@@ -134,11 +265,6 @@ class VisClient:
             ServerNotRunning: If server is not running and auto_start=False
             httpx.HTTPError: If request fails
         """
-        if not self.is_server_running():
-            if not auto_start:
-                raise ServerNotRunning("Server is not running. Start with auto_start=True or manually start the server.")
-            self._ensure_server()
-
         # Build query parameters
         params = {
             "query": query,
@@ -147,13 +273,106 @@ class VisClient:
             "search_method": search_method,
             "rerank": rerank
         }
+        if deadline_ms is not None:
+            params["deadline_ms"] = deadline_ms
 
-        # Execute request
-        with httpx.Client(timeout=30.0) as client:
-            response = client.get(f"{self.base_url}/search", params=params)
-            response.raise_for_status()
-            data = response.json()
-            return data.get("results", [])
+        # Execute request (starts the server on connect failure if auto_start)
+        response = self._request("GET", "/search", auto_start=auto_start, params=params, timeout=30.0)
+        response.raise_for_status()
+        return response.json().get("results", [])
+
+    def search_batch(
+        self,
+        queries: List[Union[str, Dict]],
+        top_k: int = 10,
+        threshold: float = 0.0,
+        search_method: str = "hybrid",
+        rerank: bool = False,
+        auto_start: bool = True
+    ) -> List[List[Dict]]:
+        """
+        Execute many search queries in one request.
+
+        Args:
+            queries: Query strings, or dicts with "query" and optional per-query
+                top_k/threshold/search_method/rerank overrides
+            top_k: Default number of results per query
+            threshold: Default similarity threshold
+            search_method: Default search method (semantic, keyword, hybrid, colbert)
+            rerank: Default reranking flag
+            auto_start: Auto-start server if not running
+
+        Returns:
+            One list of search result dictionaries per query, in input order
+
+        Raises:
+            ServerNotRunning: If server is not running and auto_start=False
+            httpx.HTTPError: If request fails
+        """
+        if not queries:
+            return []
+
+        payload = {
+            "queries": queries,
+            "top_k": top_k,
+            "threshold": threshold,
+            "search_method": search_method,
+            "rerank": rerank
+        }
+
+        # Long timeout: a batch may include reranked or ColBERT queries
+        response = self._request("POST", "/search/batch", auto_start=auto_start, json=payload, timeout=300.0)
+        response.raise_for_status()
+        return [item.get("results", []) for item in response.json().get("responses", [])]
+
+    def search_stream(
+        self,
+        query: str,
+        top_k: int = 10,
+        threshold: float = 0.0,
+        search_method: str = "hybrid",
+        rerank: bool = False,
+        auto_start: bool = True
+    ) -> Iterator[Dict]:
+        """
+        Execute a progressive search, yielding events as the server sends them.
+
+        Events are dicts with an "event" key: "results" (with "stage", "final" and
+        "results"; reranked/ColBERT searches send a fast "initial" stage first),
+        "error", and a last "done" event carrying per-stage timings.
+
+        Args:
+            query: Search query
+            top_k: Number of results to return
+            threshold: Similarity threshold
+            search_method: Search method (semantic, keyword, hybrid, colbert)
+            rerank: Enable reranking
+            auto_start: Auto-start server if not running
+
+        Raises:
+            ServerNotRunning: If server is not running and auto_start=False
+            httpx.HTTPError: If request fails
+        """
+        params = {
+            "query": query,
+            "top_k": top_k,
+            "threshold": threshold,
+            "search_method": search_method,
+            "rerank": rerank,
+            "format": "ndjson"
+        }
+
+        response = self._request("GET", "/search/stream", auto_start=auto_start, stream=True,
+                                 params=params, timeout=60.0)
+        try:
+            if response.is_error:
+                response.read()
+                response.raise_for_status()
+            for line in response.iter_lines():
+                if line.strip():
+                    yield json.loads(line)
+        finally:
+            response.close()
 
     def reindex(self, force: bool = False) -> Dict:
         """
@@ -168,15 +387,98 @@ class VisClient:
         Raises:
             httpx.HTTPError: If request fails
         """
-        # Ensure server is running
-        self._ensure_server()
-
-        # Execute request
+        # Execute request (server is started if not running)
         params = {"force": force}
-        with httpx.Client(timeout=300.0) as client:  # Long timeout for reindexing
-            response = client.post(f"{self.base_url}/reindex", params=params)
-            response.raise_for_status()
-            return response.json()
+        response = self._request("POST", "/reindex", auto_start=True, params=params,
+                                 timeout=300.0)  # Long timeout for reindexing
+        response.raise_for_status()
+        return response.json()
+
+    def start_reindex(self, force: bool = False, with_colbert: bool = False) -> Dict:
+        """Start a full reindex job on the server and return its state without waiting"""
+        response = self._request("POST", "/jobs/reindex", auto_start=True,
+                                 params={"force": force, "with_colbert": with_colbert})
+        response.raise_for_status()
+        return response.json()
+
+    def get_job(self, job_id: str) -> Dict:
+        """State of an index job (phase, documents_done/documents_total, throughput, eta_seconds)"""
+        response = self._request("GET", f"/jobs/{job_id}")
+        response.raise_for_status()
+        return response.json()
+
+    def cancel_job(self, job_id: str) -> Dict:
+        """Cancel a running reindex job; it stops at its next checkpoint"""
+        response = self._request("POST", f"/jobs/{job_id}/cancel")
+        response.raise_for_status()
+        return response.json()
+
+    def _get_json(self, path: str, params: Optional[Dict] = None, timeout: float = 300.0):
+        """GET an analysis endpoint on a running server (never auto-starts: the CLI falls back to a local engine)"""
+        response = self._request("GET", path, params=params, timeout=timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def related(self, path: str, top_k: int = 5, similarity_threshold: float = 0.3,
+                include_centrality: bool = True) -> List[Dict]:
+        """Documents related to a note (path or title), as result dictionaries with tags"""
+        return self._get_json("/related", {"path": path, "top_k": top_k,
+                                           "similarity_threshold": similarity_threshold,
+                                           "include_centrality": include_centrality})
+
+    def duplicates(self) -> Dict:
+        """Duplicate groups with per-document path/title/word_count"""
+        return self._get_json("/duplicates")
+
+    def knowledge_gaps(self, similarity_threshold: float = 0.3, min_connections: int = 2) -> Dict:
+        """Knowledge gap analysis (same structure as AdvancedSearchEngine.analyze_knowledge_gaps)"""
+        return self._get_json("/gaps", {"similarity_threshold": similarity_threshold,
+                                        "min_connections": min_connections})
+
+    def graph(self, path: str, top_k: int = 10, similarity_threshold: float = 0.3,
+              depth: int = 1, expand_threshold: float = 0.5) -> Dict:
+        """Related-document graph: {"center", "nodes", "edges"}"""
+        return self._get_json("/graph", {"path": path, "top_k": top_k,
+                                         "similarity_threshold": similarity_threshold,
+                                         "depth": depth, "expand_threshold": expand_threshold})
+
+    def collect(self, topic: str, top_k: int = 100, threshold: float = 0.3, use_expansion: bool = False,
+                include_synonyms: bool = True, include_hyde: bool = True, render: bool = False) -> Dict:
+        """Topic collection summary; with render=True also the document to save ("document")"""
+        return self._get_json("/collect", {"topic": topic, "top_k": top_k, "threshold": threshold,
+                                           "use_expansion": use_expansion,
+                                           "include_synonyms": include_synonyms,
+                                           "include_hyde": include_hyde, "render": render})
+
+    def generate_moc(self, topic: str, top_k: int = 100, threshold: float = 0.3,
+                     include_orphans: bool = False, use_expansion: bool = True, render: bool = False) -> Dict:
+        """MOC summary; with render=True also the MOC markdown ("document")"""
+        return self._get_json("/moc", {"topic": topic, "top_k": top_k, "threshold": threshold,
+                                       "include_orphans": include_orphans,
+                                       "use_expansion": use_expansion, "render": render})
+
+    def profile(self, seconds: float = 5.0, interval_ms: float = 5.0, memory_top: int = 20,
+                include_idle: bool = False) -> Dict:
+        """
+        Sample the server's Python stacks for `seconds` (needs server.debug.profile).
+
+        Returns:
+            Dictionary with "collapsed" (folded stacks for flame graph tools),
+            "top_functions", per-thread sample counts and "top_allocations"
+
+        Raises:
+            ServerNotRunning: If server is not running
+            httpx.HTTPError: If request fails (404 when profiling is disabled)
+        """
+        return self._get_json("/debug/profile", {"seconds": seconds, "interval_ms": interval_ms,
+                                                 "memory_top": memory_top, "include_idle": include_idle},
+                              timeout=seconds + 30.0)
+
+    def vaults(self) -> List[Dict]:
+        """Vaults hosted by the server with load state and estimated index memory"""
+        response = self._request("GET", "/vaults", timeout=5.0)
+        response.raise_for_status()
+        return response.json().get("vaults", [])
 
     def health(self) -> Dict:
         """
@@ -186,12 +488,12 @@ class VisClient:
             Health status dictionary
 
         Raises:
+            ServerNotRunning: If server is not running
             httpx.HTTPError: If request fails
         """
-        with httpx.Client(timeout=5.0) as client:
-            response = client.get(f"{self.base_url}/health")
-            response.raise_for_status()
-            return response.json()
+        response = self._request("GET", "/health", timeout=5.0)
+        response.raise_for_status()
+        return response.json()
 
     @staticmethod
     def stop_server() -> None:
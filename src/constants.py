@@ -4,3 +4,8 @@ from pathlib import Path
 
 DEFAULT_PORT = 8741
 PID_FILE = Path.home() / ".vis-server.pid"
+
+
+def socket_path(port: int = DEFAULT_PORT) -> Path:
+    """Unix domain socket served alongside TCP by the daemon on `port`"""
+    return Path.home() / f".vis-server-{port}.sock"
@@ -33,6 +33,21 @@ class CachedEmbedding:
     word_count: Optional[int] = None
 
 
+@dataclass
+class CachedPassage:
+    """캐시된 패시지 임베딩 정보"""
+    passage_id: str
+    parent_path: str
+    parent_hash: str
+    passage_index: int
+    anchor: str
+    passage_hash: str
+    token_count: int
+    embedding: np.ndarray
+    model_name: str
+    created_at: Optional[datetime] = None
+
+
 class EmbeddingCache:
     """임베딩 캐시 관리 시스템"""
     
@@ -111,8 +126,32 @@ class EmbeddingCache:
                     CREATE INDEX IF NOT EXISTS idx_colbert_file_hash ON colbert_embeddings(file_hash)
                 """)
                 
+                # 패시지 임베딩 테이블 생성 (긴 노트의 섹션/청크 단위)
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS passage_embeddings (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        passage_id TEXT NOT NULL UNIQUE,
+                        parent_path TEXT NOT NULL,
+                        parent_hash TEXT NOT NULL,
+                        passage_index INTEGER NOT NULL,
+                        anchor TEXT,
+                        passage_hash TEXT NOT NULL,
+                        token_count INTEGER,
+                        embedding BLOB NOT NULL,
+                        model_name TEXT NOT NULL,
+                        embedding_dimension INTEGER NOT NULL,
+                        created_at TIMESTAMP NOT NULL
+                    )
+                """)
+                cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_passage_parent_path ON passage_embeddings(parent_path)
+                """)
+                cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_passage_hash ON passage_embeddings(passage_hash)
+                """)
+                
                 conn.commit()
-                logger.info("데이터베이스 초기화 완료 (ColBERT 테이블 포함)")
+                logger.info("데이터베이스 초기화 완료 (ColBERT/패시지 테이블 포함)")
         
         except Exception as e:
             logger.error(f"데이터베이스 초기화 실패: {e}")
@@ -548,6 +587,177 @@ class EmbeddingCache:
             return {}
 
 
+    # ===== 패시지 임베딩 관련 메서드 =====
+    
+    @staticmethod
+    def make_passage_id(parent_path: str, passage_index: int) -> str:
+        """패시지 id 생성 (부모 문서 경로 + 순번)"""
+        return f"{parent_path}#p{passage_index}"
+    
+    def store_passage_embeddings(
+        self,
+        parent_path: str,
+        parent_hash: str,
+        passages: List,
+        embeddings: np.ndarray,
+        model_name: str
+    ) -> bool:
+        """문서의 패시지 임베딩 전체 교체 저장
+        
+        Args:
+            parent_path: 부모 문서 경로
+            parent_hash: 부모 문서 해시
+            passages: Passage 목록 (index, anchor, passage_hash, token_count)
+            embeddings: 패시지별 임베딩 (len(passages), dim)
+            model_name: 모델명
+        """
+        try:
+            created_at = datetime.now().isoformat()
+            rows = []
+            for passage, embedding in zip(passages, embeddings):
+                embedding = np.asarray(embedding, dtype=np.float32)
+                rows.append((
+                    self.make_passage_id(parent_path, passage.index), parent_path, parent_hash,
+                    passage.index, passage.anchor, passage.passage_hash, passage.token_count,
+                    self._serialize_embedding(embedding), model_name, len(embedding), created_at
+                ))
+            
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute("DELETE FROM passage_embeddings WHERE parent_path = ?", (parent_path,))
+                cursor.executemany("""
+                    INSERT INTO passage_embeddings
+                    (passage_id, parent_path, parent_hash, passage_index, anchor, passage_hash,
+                     token_count, embedding, model_name, embedding_dimension, created_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, rows)
+                conn.commit()
+            
+            logger.debug(f"패시지 임베딩 저장 완료: {parent_path} ({len(rows)}개)")
+            return True
+        
+        except Exception as e:
+            logger.error(f"패시지 임베딩 저장 실패: {parent_path}, {e}")
+            return False
+    
+    def get_passage_embeddings(
+        self,
+        parent_path: str,
+        parent_hash: Optional[str] = None
+    ) -> Optional[List[CachedPassage]]:
+        """문서의 패시지 임베딩 조회 (부모 해시 불일치 시 None)"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT passage_id, parent_hash, passage_index, anchor, passage_hash,
+                           token_count, embedding, model_name, embedding_dimension, created_at
+                    FROM passage_embeddings
+                    WHERE parent_path = ?
+                    ORDER BY passage_index
+                """, (parent_path,))
+                rows = cursor.fetchall()
+            
+            if not rows:
+                return None
+            
+            if parent_hash and any(row[1] != parent_hash for row in rows):
+                logger.debug(f"파일이 변경됨 (패시지): {parent_path}")
+                return None
+            
+            return [
+                CachedPassage(
+                    passage_id=passage_id,
+                    parent_path=parent_path,
+                    parent_hash=row_parent_hash,
+                    passage_index=passage_index,
+                    anchor=anchor or "",
+                    passage_hash=passage_hash,
+                    token_count=token_count or 0,
+                    embedding=self._deserialize_embedding(embedding_data, dimension),
+                    model_name=model_name,
+                    created_at=datetime.fromisoformat(created_at) if created_at else None
+                )
+                for (passage_id, row_parent_hash, passage_index, anchor, passage_hash,
+                     token_count, embedding_data, model_name, dimension, created_at) in rows
+            ]
+        
+        except Exception as e:
+            logger.error(f"패시지 임베딩 조회 실패: {parent_path}, {e}")
+            return None
+    
+    def get_passage_embeddings_by_hash(
+        self,
+        passage_hashes: List[str],
+        model_name: str
+    ) -> Dict[str, np.ndarray]:
+        """패시지 해시로 기존 임베딩 조회 (내용이 같은 섹션 재사용)
+        
+        Returns:
+            passage_hash → 임베딩 (조회된 것만)
+        """
+        found: Dict[str, np.ndarray] = {}
+        unique_hashes = list(dict.fromkeys(passage_hashes))
+        if not unique_hashes:
+            return found
+        
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                # SQLite 변수 개수 제한을 피하기 위해 나눠서 조회
+                for i in range(0, len(unique_hashes), 500):
+                    chunk = unique_hashes[i:i + 500]
+                    placeholders = ",".join("?" * len(chunk))
+                    cursor.execute(f"""
+                        SELECT passage_hash, embedding, embedding_dimension
+                        FROM passage_embeddings
+                        WHERE model_name = ? AND passage_hash IN ({placeholders})
+                    """, [model_name] + chunk)
+                    for passage_hash, embedding_data, dimension in cursor.fetchall():
+                        if passage_hash not in found:
+                            found[passage_hash] = self._deserialize_embedding(embedding_data, dimension)
+            return found
+        
+        except Exception as e:
+            logger.error(f"패시지 해시 조회 실패: {e}")
+            return found
+    
+    def remove_passage_embeddings(self, parent_path: str) -> bool:
+        """문서의 패시지 임베딩 삭제"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute("DELETE FROM passage_embeddings WHERE parent_path = ?", (parent_path,))
+                conn.commit()
+                return cursor.rowcount > 0
+        
+        except Exception as e:
+            logger.error(f"패시지 임베딩 삭제 실패: {parent_path}, {e}")
+            return False
+    
+    def get_passage_statistics(self) -> Dict:
+        """패시지 캐시 통계"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT COUNT(*), COUNT(DISTINCT parent_path), AVG(token_count), MAX(token_count)
+                    FROM passage_embeddings
+                """)
+                total, parents, avg_tokens, max_tokens = cursor.fetchone()
+                
+                return {
+                    "total_passages": total,
+                    "documents": parents,
+                    "avg_tokens": int(avg_tokens or 0),
+                    "max_tokens": int(max_tokens or 0)
+                }
+        
+        except Exception as e:
+            logger.error(f"패시지 통계 생성 실패: {e}")
+            return {}
+
+
 def test_cache():
     """캐시 시스템 테스트"""
     import tempfile
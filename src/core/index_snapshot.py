@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Index Snapshot Store for Vault Intelligence System V2
+
+여러 서버 워커 프로세스가 공유하는 읽기 전용 인덱스 스냅샷
+- 임베딩 행렬(원본/정규화), 패시지 배열은 .npy로 저장 후 np.load(mmap_mode='r')로 매핑
+  → 같은 파일의 페이지 캐시를 모든 워커가 공유 (워커마다 사본을 만들지 않음)
+- 문서 메타데이터/패시지 id는 JSON (본문은 텍스트 저장소에서 필요할 때 읽음)
+- 키워드 역색인(CSR 배열), 최근접 이웃 표, 중심성 점수도 함께 저장 → 서버 시작 시 재계산 없음
+- vault 지문(파일 경로/크기/수정 시각 요약): 적재 전 현재 vault와 비교해 낡은 스냅샷 거부
+- 인덱스 설정(모델, max_length, 임베딩 차원, 패시지/노트 임베딩 구성): 엔진 설정과 다르면 거부
+- 게시(publish): 임시 디렉토리에 모두 기록한 뒤 rename, CURRENT 포인터를 os.replace로 교체
+  → 워커는 항상 완성된 스냅샷 하나만 보게 됨
+"""
+
+import os
+import json
+import time
+import uuid
+import shutil
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+try:
+    from .vault_processor import Document
+    from .lexical_index import LexicalIndex
+except ImportError:
+    from vault_processor import Document
+    from lexical_index import LexicalIndex
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CURRENT_FILE = "CURRENT"
+MANIFEST_FILE = "manifest.json"
+# 2: 키워드 역색인, 최근접 이웃 표, 중심성, vault 지문 추가
+# 3: 인덱스 설정 추가 (설정이 없는 이전 스냅샷은 적재하지 않음)
+SNAPSHOT_FORMAT = 3
+
+_ARRAYS = ("embeddings", "embeddings_normalized", "passage_embeddings", "passage_offsets", "passage_doc_indices",
+           "neighbors", "neighbor_scores", "centrality")
+
+
+def index_settings(engine) -> Dict:
+    """스냅샷 내용을 결정하는 엔진 설정 (바뀌면 임베딩을 다시 만들어야 함)"""
+    model = getattr(engine, "engine", None)
+    passage_config = getattr(engine, "passage_config", None) or {}
+    return {
+        "model": getattr(model, "model_name", None),
+        "max_length": getattr(model, "max_length", None),
+        "embedding_dimension": getattr(model, "embedding_dimension", None),
+        "passages": bool(passage_config.get("enabled", False)),
+        "passage_max_tokens": passage_config.get("max_tokens", 512),
+        "split_on_headings": passage_config.get("split_on_headings", True),
+        "compose_note_embeddings": bool(passage_config.get("compose_note_embeddings", False)),
+    }
+
+
+class IndexSnapshotStore:
+    """버전별 인덱스 스냅샷 디렉토리와 CURRENT 포인터 관리"""
+
+    def __init__(self, root: str, keep: int = 2):
+        """
+        Args:
+            root: 스냅샷 루트 디렉토리
+            keep: 현재 스냅샷 외에 남겨둘 이전 스냅샷 수 (아직 매핑 중인 워커 보호)
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.keep = max(int(keep), 0)
+
+    def current_id(self) -> Optional[str]:
+        """현재 게시된 스냅샷 id (없으면 None)"""
+        try:
+            snapshot_id = (self.root / CURRENT_FILE).read_text(encoding="utf-8").strip()
+        except FileNotFoundError:
+            return None
+        return snapshot_id or None
+
+    def read_manifest(self, snapshot_id: Optional[str] = None) -> Optional[Dict]:
+        snapshot_id = snapshot_id or self.current_id()
+        if snapshot_id is None:
+            return None
+        try:
+            with open(self.root / snapshot_id / MANIFEST_FILE, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def publish(self, engine, vault_fingerprint: Optional[Dict] = None) -> str:
+        """엔진의 현재 인덱스를 새 스냅샷으로 기록하고 CURRENT로 지정
+
+        Args:
+            vault_fingerprint: 인덱스를 만든 vault 상태 (없으면 엔진의 VaultProcessor로 계산)
+
+        Returns:
+            게시된 스냅샷 id
+        """
+        if not engine.indexed or engine.embeddings is None:
+            raise ValueError("게시할 인덱스가 없습니다.")
+
+        if vault_fingerprint is None and getattr(engine, "processor", None) is not None:
+            vault_fingerprint = engine.processor.vault_fingerprint()
+
+        snapshot_id = f"v{engine.index_version:06d}-{uuid.uuid4().hex[:8]}"
+        staging = self.root / f".tmp-{snapshot_id}"
+        staging.mkdir(parents=True)
+
+        try:
+            embeddings = np.asarray(engine.embeddings, dtype=np.float32)
+            arrays = {
+                "embeddings": embeddings,
+                "embeddings_normalized": engine._get_normalized_embeddings(),
+                "passage_embeddings": engine.passage_embeddings,
+                "passage_offsets": engine.passage_offsets,
+                "passage_doc_indices": engine.passage_doc_indices,
+            }
+
+            # 파생 구조: 역색인/이웃 표는 없으면 지금 계산, 중심성은 이미 계산된 경우에만 저장
+            lexical_index = engine._get_lexical_index() if hasattr(engine, "_get_lexical_index") else None
+            if lexical_index is not None:
+                lexical_index.save(staging)
+            neighbors = engine.get_neighbor_table() if hasattr(engine, "get_neighbor_table") else None
+            if neighbors is not None:
+                arrays["neighbors"], arrays["neighbor_scores"] = neighbors
+            centrality_version, centrality = getattr(engine, "_centrality", (None, None))
+            if centrality and centrality_version == engine.index_version:
+                arrays["centrality"] = np.array(
+                    [centrality.get(doc.path, np.nan) for doc in engine.documents], dtype=np.float32)
+            for name, array in arrays.items():
+                if array is not None:
+                    np.save(staging / f"{name}.npy", np.ascontiguousarray(array))
+
+            # 텍스트 저장소가 없으면 본문을 메타데이터에 포함 (워커가 스니펫을 만들 수 있게)
+            include_content = engine.text_store is None
+            documents = []
+            for doc in engine.documents:
+                meta = {
+                    "path": doc.path,
+                    "title": doc.title,
+                    "tags": doc.tags,
+                    "frontmatter": doc.frontmatter,
+                    "word_count": doc.word_count,
+                    "char_count": doc.char_count,
+                    "file_size": doc.file_size,
+                    "modified_at": doc.modified_at.isoformat() if isinstance(doc.modified_at, datetime) else None,
+                    "file_hash": doc.file_hash,
+                }
+                if include_content:
+                    meta["content"] = doc.get_content()
+                documents.append(meta)
+
+            with open(staging / "documents.json", "w", encoding="utf-8") as f:
+                json.dump(documents, f, ensure_ascii=False, default=str)
+            with open(staging / "passages.json", "w", encoding="utf-8") as f:
+                json.dump({
+                    "ids": list(engine.passage_ids),
+                    "anchors": list(engine.passage_anchors),
+                    "hashes": list(engine.passage_hashes),
+                    "texts": list(engine.passage_texts),
+                }, f, ensure_ascii=False)
+
+            manifest = {
+                "id": snapshot_id,
+                "format": SNAPSHOT_FORMAT,
+                "index_version": engine.index_version,
+                "created_at": time.time(),
+                "documents": len(documents),
+                "passages": len(engine.passage_ids),
+                "embedding_dimension": int(embeddings.shape[1]) if embeddings.ndim == 2 else 0,
+                "is_sampled": bool(getattr(engine, "is_sampled", False)),
+                "vault": vault_fingerprint,
+                "settings": index_settings(engine),
+                "lexical_index": lexical_index is not None,
+            }
+            with open(staging / MANIFEST_FILE, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+            os.rename(staging, self.root / snapshot_id)
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        # 포인터 교체는 rename 한 번 (읽는 쪽은 이전 id 또는 새 id만 보게 됨)
+        pointer = self.root / f"{CURRENT_FILE}.tmp-{os.getpid()}"
+        pointer.write_text(snapshot_id, encoding="utf-8")
+        os.replace(pointer, self.root / CURRENT_FILE)
+
+        self._prune(snapshot_id)
+        logger.info(f"인덱스 스냅샷 게시: {snapshot_id} ({manifest['documents']}개 문서, {manifest['passages']}개 패시지)")
+        return snapshot_id
+
+    def load(self, engine, snapshot_id: Optional[str] = None,
+             vault_fingerprint: Optional[Dict] = None) -> Optional[str]:
+        """스냅샷을 메모리 매핑으로 엔진에 적재 (모델·캐시·텍스트 저장소는 엔진 것을 사용)
+
+        인덱스 설정(index_settings)이 엔진과 다른 스냅샷은 적재하지 않는다.
+
+        Args:
+            vault_fingerprint: 주어지면 스냅샷의 vault 지문과 같을 때만 적재
+
+        Returns:
+            적재한 스냅샷 id, 게시된 스냅샷이 없거나 낡았거나 실패하면 None
+        """
+        snapshot_id = snapshot_id or self.current_id()
+        manifest = self.read_manifest(snapshot_id)
+        if manifest is None:
+            return None
+        if manifest.get("format", 1) > SNAPSHOT_FORMAT:
+            logger.warning(f"지원하지 않는 스냅샷 형식: {snapshot_id} (format {manifest.get('format')})")
+            return None
+        settings = index_settings(engine)
+        if manifest.get("settings") != settings:
+            changed = sorted(
+                key for key in settings
+                if (manifest.get("settings") or {}).get(key, object()) != settings[key]
+            )
+            logger.info(f"인덱스 설정이 스냅샷과 다름: {snapshot_id} 적재 생략 ({', '.join(changed)})")
+            return None
+        if vault_fingerprint is not None and manifest.get("vault") != vault_fingerprint:
+            logger.info(f"vault가 스냅샷 이후 변경됨: {snapshot_id} 적재 생략")
+            return None
+
+        directory = self.root / snapshot_id
+        try:
+            arrays = {
+                name: np.load(directory / f"{name}.npy", mmap_mode="r")
+                for name in _ARRAYS
+                if (directory / f"{name}.npy").exists()
+            }
+            with open(directory / "documents.json", "r", encoding="utf-8") as f:
+                metadata: List[Dict] = json.load(f)
+            with open(directory / "passages.json", "r", encoding="utf-8") as f:
+                passages = json.load(f)
+            lexical_index = LexicalIndex.load(directory)
+        except Exception as e:
+            logger.error(f"인덱스 스냅샷 적재 실패: {snapshot_id}, {e}")
+            return None
+
+        embeddings = arrays["embeddings"]
+        documents = []
+        for i, meta in enumerate(metadata):
+            modified_at = meta.get("modified_at")
+            doc = Document(
+                path=meta["path"],
+                title=meta["title"],
+                content=meta.get("content", ""),
+                tags=meta.get("tags") or [],
+                frontmatter=meta.get("frontmatter") or {},
+                word_count=meta.get("word_count", 0),
+                char_count=meta.get("char_count", 0),
+                file_size=meta.get("file_size", 0),
+                modified_at=datetime.fromisoformat(modified_at) if modified_at else datetime.fromtimestamp(0),
+                file_hash=meta["file_hash"],
+                embedding=embeddings[i]
+            )
+            if "content" not in meta and engine.text_store is not None:
+                doc.detach_content(engine.text_store)
+            documents.append(doc)
+
+        engine.documents = documents
+        engine.embeddings = embeddings
+        engine._normalized_embeddings = (embeddings, arrays.get("embeddings_normalized"))
+        engine._reset_passage_index()
+        if "passage_embeddings" in arrays:
+            engine.passage_embeddings = arrays["passage_embeddings"]
+            engine.passage_offsets = arrays["passage_offsets"]
+            engine.passage_doc_indices = arrays["passage_doc_indices"]
+            engine.passage_ids = passages.get("ids", [])
+            engine.passage_anchors = passages.get("anchors", [])
+            engine.passage_hashes = passages.get("hashes", [])
+            engine.passage_texts = passages.get("texts", [])
+        engine.is_sampled = manifest.get("is_sampled", False)
+        engine.index_version = manifest.get("index_version", 0)
+        engine.indexed = bool(documents)
+
+        version = engine.index_version
+        engine._lexical_index = (version, lexical_index) if lexical_index is not None else (None, None)
+        if "neighbors" in arrays:
+            engine._neighbors = (version, arrays["neighbors"], arrays["neighbor_scores"])
+        else:
+            engine._neighbors = (None, None, None)
+        if "centrality" in arrays:
+            engine._centrality = (version, {
+                doc.path: float(score) for doc, score in zip(documents, arrays["centrality"].tolist())
+                if not np.isnan(score)
+            })
+        else:
+            engine._centrality = (None, None)
+
+        logger.info(f"인덱스 스냅샷 적재: {snapshot_id} ({len(documents)}개 문서, 메모리 매핑)")
+        return snapshot_id
+
+    def _prune(self, current: str) -> None:
+        """오래된 스냅샷 정리 (이미 매핑한 워커는 삭제 후에도 기존 페이지를 계속 읽을 수 있음)"""
+        snapshots = sorted(
+            (path for path in self.root.iterdir()
+             if path.is_dir() and not path.name.startswith(".") and path.name != current),
+            key=lambda path: path.stat().st_mtime,
+            reverse=True
+        )
+        for stale in snapshots[self.keep:]:
+            shutil.rmtree(stale, ignore_errors=True)
+
+
+def test_index_snapshot():
+    """인덱스 스냅샷 게시/적재 테스트"""
+    import tempfile
+    from types import SimpleNamespace
+
+    class _Engine(SimpleNamespace):
+        def _get_normalized_embeddings(self):
+            return self.embeddings / np.linalg.norm(self.embeddings, axis=1, keepdims=True)
+
+        def _reset_passage_index(self):
+            self.passage_embeddings = self.passage_offsets = self.passage_doc_indices = None
+            self.passage_ids, self.passage_anchors, self.passage_hashes, self.passage_texts = [], [], [], []
+
+    source = _Engine(
+        indexed=True, index_version=3, text_store=None, is_sampled=False,
+        embeddings=np.random.rand(3, 4).astype(np.float32),
+        documents=[
+            Document(f"/vault/{i}.md", f"노트 {i}", f"본문 {i}", [], {}, 2, 4, 10, datetime.now(), f"h{i}")
+            for i in range(3)
+        ]
+    )
+    source._reset_passage_index()
+
+    with tempfile.TemporaryDirectory() as root:
+        store = IndexSnapshotStore(root)
+        snapshot_id = store.publish(source)
+
+        target = _Engine(text_store=None)
+        print(f"적재: {store.load(target) == snapshot_id}, 매핑: {isinstance(target.embeddings, np.memmap)}")
+        print(f"본문: {target.documents[1].get_content()}, 버전: {target.index_version}")
+
+
+if __name__ == "__main__":
+    test_index_snapshot()
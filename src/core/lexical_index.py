@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Lexical Index for Vault Intelligence System V2
+
+키워드 검색용 역색인 (검색할 때마다 모든 문서 본문을 읽지 않도록)
+- 단어: 소문자 본문에서 [a-zA-Z가-힣0-9]+ 연속 구간 (키워드 추출 규칙과 동일)
+- 키워드는 같은 문자 집합으로만 이루어지므로 본문 안의 키워드 출현은 항상 한 단어 안에 있음
+  → 키워드를 포함하는 단어들의 빈도 합 = content.lower().count(keyword) (기존 부분 문자열 매칭과 동일)
+- 저장 형식: 단어 목록(JSON) + CSR 배열(offsets/docs/tfs, .npy) → np.load(mmap_mode='r')로 매핑
+"""
+
+import re
+import json
+import bisect
+import logging
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r'[a-zA-Z가-힣0-9]+')
+
+_ARRAYS = ("lexical_offsets", "lexical_docs", "lexical_tfs")
+TERMS_FILE = "lexical_terms.json"
+
+
+class LexicalIndex:
+    """단어 → (문서 인덱스, 빈도) 역색인"""
+
+    def __init__(self, terms: List[str], offsets: np.ndarray, docs: np.ndarray, tfs: np.ndarray):
+        """
+        Args:
+            terms: 정렬된 단어 목록
+            offsets: 단어별 postings 시작 위치 (len(terms) + 1)
+            docs: postings 문서 인덱스
+            tfs: postings 단어 빈도
+        """
+        self.terms = terms
+        self.offsets = offsets
+        self.docs = docs
+        self.tfs = tfs
+        # 부분 문자열 탐색용: 단어를 개행으로 이어 붙인 문자열과 단어별 시작 위치
+        self._joined = "\n".join(terms)
+        self._starts = []
+        position = 0
+        for term in terms:
+            self._starts.append(position)
+            position += len(term) + 1
+
+    @classmethod
+    def build(cls, documents: Iterable) -> "LexicalIndex":
+        """문서 목록의 본문으로 색인 구축 (문서 인덱스 = 목록 순서)"""
+        postings: Dict[str, List] = {}
+        for doc_index, doc in enumerate(documents):
+            for term, count in Counter(TOKEN_PATTERN.findall(doc.get_content().lower())).items():
+                postings.setdefault(term, []).append((doc_index, count))
+
+        terms = sorted(postings)
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        for i, term in enumerate(terms):
+            offsets[i + 1] = offsets[i] + len(postings[term])
+        docs = np.empty(int(offsets[-1]), dtype=np.int32)
+        tfs = np.empty(int(offsets[-1]), dtype=np.int32)
+        for i, term in enumerate(terms):
+            entries = postings[term]
+            docs[offsets[i]:offsets[i + 1]] = [d for d, _ in entries]
+            tfs[offsets[i]:offsets[i + 1]] = [c for _, c in entries]
+
+        logger.info(f"키워드 역색인 구축: {len(terms)}개 단어, {len(docs)}개 postings")
+        return cls(terms, offsets, docs, tfs)
+
+    def content_frequencies(self, keyword: str) -> Dict[int, int]:
+        """키워드(소문자)의 문서별 본문 출현 횟수 (출현하지 않는 문서는 없음)"""
+        frequencies: Dict[int, int] = {}
+        if not keyword or "\n" in keyword:
+            return frequencies
+
+        position = self._joined.find(keyword)
+        while position != -1:
+            term_index = bisect.bisect_right(self._starts, position) - 1
+            term = self.terms[term_index]
+            per_term = term.count(keyword)
+            start, end = int(self.offsets[term_index]), int(self.offsets[term_index + 1])
+            for doc_index, tf in zip(self.docs[start:end].tolist(), self.tfs[start:end].tolist()):
+                frequencies[doc_index] = frequencies.get(doc_index, 0) + tf * per_term
+            # 같은 단어 안의 다음 출현은 per_term에 이미 포함 → 다음 단어부터 탐색
+            position = self._joined.find(keyword, self._starts[term_index] + len(term) + 1)
+        return frequencies
+
+    def save(self, directory: Path) -> None:
+        directory = Path(directory)
+        with open(directory / TERMS_FILE, "w", encoding="utf-8") as f:
+            json.dump(self.terms, f, ensure_ascii=False)
+        for name, array in zip(_ARRAYS, (self.offsets, self.docs, self.tfs)):
+            np.save(directory / f"{name}.npy", array)
+
+    @classmethod
+    def load(cls, directory: Path, mmap: bool = True) -> Optional["LexicalIndex"]:
+        """저장된 색인 적재 (없으면 None)"""
+        directory = Path(directory)
+        if not (directory / TERMS_FILE).exists():
+            return None
+        with open(directory / TERMS_FILE, "r", encoding="utf-8") as f:
+            terms = json.load(f)
+        arrays = [np.load(directory / f"{name}.npy", mmap_mode="r" if mmap else None) for name in _ARRAYS]
+        return cls(terms, *arrays)
+
+
+def test_lexical_index():
+    """역색인 테스트"""
+    from types import SimpleNamespace
+
+    texts = ["TDD 테스트 주도 개발, testing tests", "리팩토링과 테스트코드"]
+    docs = [SimpleNamespace(get_content=lambda text=text: text) for text in texts]
+    index = LexicalIndex.build(docs)
+
+    for keyword in ("test", "테스트", "tdd", "없음"):
+        expected = {i: text.lower().count(keyword) for i, text in enumerate(texts)
+                    if keyword in text.lower()}
+        print(f"{keyword}: {index.content_frequencies(keyword)} (기대값 {expected})")
+
+
+if __name__ == "__main__":
+    test_lexical_index()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Passage Splitter for Vault Intelligence System V2
+
+긴 노트를 헤딩 단위 섹션과 토큰 길이 제한 기반 패시지로 분할
+- 코드 블록 내부의 '#'는 헤딩으로 취급하지 않음
+- 섹션이 max_tokens를 넘으면 문단 → 단어 순으로 다시 분할
+"""
+
+import re
+import hashlib
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+HEADING_PATTERN = re.compile(r'^(#{1,6})\s+(.+?)\s*#*\s*$')
+FENCE_PATTERN = re.compile(r'^\s*(```|~~~)')
+
+
+@dataclass
+class Section:
+    """헤딩으로 구분된 섹션"""
+    anchor: str  # 헤딩 텍스트 (헤딩 이전 서문은 "")
+    level: int
+    text: str
+
+
+@dataclass
+class Passage:
+    """임베딩 단위 패시지"""
+    index: int
+    anchor: str
+    text: str
+    token_count: int
+    passage_hash: str
+
+
+def approximate_token_count(text: str) -> int:
+    """토크나이저 없이 사용하는 대략적인 토큰 수 (공백 단어 기준 + 한글 보정)"""
+    words = text.split()
+    if not words:
+        return 0
+    # 한글은 서브워드로 더 잘게 나뉘는 경향이 있어 1.5배 보정
+    hangul = len(re.findall(r'[가-힣]', text))
+    return int(len(words) + hangul * 0.5)
+
+
+def split_sections(markdown: str) -> List[Section]:
+    """마크다운 본문을 헤딩 단위 섹션으로 분할
+
+    Args:
+        markdown: frontmatter를 제거한 마크다운 본문
+
+    Returns:
+        섹션 목록 (빈 섹션 제외)
+    """
+    sections: List[Section] = []
+    anchor, level = "", 0
+    buffer: List[str] = []
+    in_fence = False
+
+    def _flush():
+        text = "\n".join(buffer).strip()
+        if text:
+            sections.append(Section(anchor=anchor, level=level, text=text))
+
+    for line in markdown.splitlines():
+        if FENCE_PATTERN.match(line):
+            in_fence = not in_fence
+            buffer.append(line)
+            continue
+
+        match = None if in_fence else HEADING_PATTERN.match(line)
+        if match:
+            _flush()
+            buffer = []
+            level = len(match.group(1))
+            anchor = match.group(2).strip()
+            continue
+
+        buffer.append(line)
+
+    _flush()
+    return sections
+
+
+def _split_by_tokens(
+    text: str,
+    max_tokens: int,
+    count_tokens: Callable[[str], int]
+) -> List[str]:
+    """max_tokens 이하 조각으로 분할 (문단 우선, 긴 문단은 단어 단위)"""
+    if count_tokens(text) <= max_tokens:
+        return [text]
+
+    chunks: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+
+    for paragraph in re.split(r'\n\s*\n', text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        paragraph_tokens = count_tokens(paragraph)
+
+        if paragraph_tokens > max_tokens:
+            if current:
+                chunks.append("\n\n".join(current))
+                current, current_tokens = [], 0
+            # 단어 단위 윈도우 (토큰/단어 비율로 윈도우 크기 추정)
+            words = paragraph.split()
+            tokens_per_word = max(paragraph_tokens / max(len(words), 1), 1.0)
+            window = max(int(max_tokens / tokens_per_word), 1)
+            for start in range(0, len(words), window):
+                chunks.append(" ".join(words[start:start + window]))
+            continue
+
+        if current and current_tokens + paragraph_tokens > max_tokens:
+            chunks.append("\n\n".join(current))
+            current, current_tokens = [], 0
+        current.append(paragraph)
+        current_tokens += paragraph_tokens
+
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+
+def split_passages(
+    markdown: str,
+    max_tokens: int = 512,
+    split_on_headings: bool = True,
+    count_tokens: Optional[Callable[[str], int]] = None,
+    clean: Optional[Callable[[str], str]] = None,
+    context: str = ""
+) -> List[Passage]:
+    """노트를 패시지로 분할
+
+    Args:
+        markdown: frontmatter를 제거한 마크다운 본문
+        max_tokens: 패시지당 최대 토큰 수
+        split_on_headings: 헤딩 단위 분할 여부 (False면 토큰 길이로만 분할)
+        count_tokens: 토큰 수 계산 함수 (기본: approximate_token_count)
+        clean: 패시지 텍스트 정리 함수 (예: VaultProcessor._clean_content)
+        context: 임베딩 시 함께 넣는 문맥 (예: 노트 제목) - 패시지 해시에 포함
+
+    Returns:
+        패시지 목록
+    """
+    count_tokens = count_tokens or approximate_token_count
+
+    if split_on_headings:
+        sections = split_sections(markdown)
+    else:
+        text = markdown.strip()
+        sections = [Section(anchor="", level=0, text=text)] if text else []
+
+    passages: List[Passage] = []
+    for section in sections:
+        body = clean(section.text) if clean else section.text
+        if not body.strip():
+            continue
+        for chunk in _split_by_tokens(body, max_tokens, count_tokens):
+            passages.append(Passage(
+                index=len(passages),
+                anchor=section.anchor,
+                text=chunk,
+                token_count=count_tokens(chunk),
+                passage_hash=hashlib.md5(f"{context}\n{section.anchor}\n{chunk}".encode("utf-8")).hexdigest()
+            ))
+    return passages
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Query Embedding Cache for Vault Intelligence System V2
+
+쿼리 임베딩 LRU 캐시
+- 정규화된 텍스트 + 모델명 + max_length 기준으로 dense 임베딩 재사용
+- 짧은 텍스트(쿼리)만 캐시하여 문서 본문이 캐시를 밀어내지 않도록 함
+- 선택적으로 SQLite에 저장해 서버 재시작 후에도 유지 (검색 경로 밖에서 주기적으로 일괄 기록)
+- 쿼리 원문은 디스크에 남기지 않음 (키는 해시, query_text 열은 빈 문자열)
+"""
+
+import time
+import atexit
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+try:
+    from .search_stages import record_cache
+except ImportError:
+    from search_stages import record_cache
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def normalize_query(text: str) -> str:
+    """캐시 키용 쿼리 정규화 (앞뒤 공백 제거, 연속 공백 축약)"""
+    return " ".join((text or "").split())
+
+
+class QueryEmbeddingCache:
+    """크기 제한이 있는 쿼리 임베딩 LRU 캐시"""
+
+    def __init__(
+        self,
+        model_name: str,
+        max_length: int,
+        max_entries: int = 1024,
+        max_chars: int = 512,
+        cache_dir: Optional[str] = None,
+        flush_interval: float = 5.0
+    ):
+        """
+        Args:
+            model_name: 임베딩 모델명 (바뀌면 기존 항목 무효화)
+            max_length: 인코딩 최대 토큰 길이 (키에 포함)
+            max_entries: 메모리에 유지할 최대 항목 수
+            max_chars: 캐시 대상 텍스트 최대 길이 (초과 시 캐시하지 않음)
+            cache_dir: 지정 시 SQLite로 영속화 (None이면 메모리 전용)
+            flush_interval: 새 항목을 SQLite에 일괄 기록하는 주기 (초)
+        """
+        self.model_name = model_name
+        self.max_length = max_length
+        self.max_entries = max(max_entries, 1)
+        self.max_chars = max_chars
+        self.db_path: Optional[Path] = None
+        self.flush_interval = max(flush_interval, 0.1)
+
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        # 아직 기록하지 않은 항목과 삭제할 키 (flush 스레드가 일괄 처리)
+        self._dirty: Dict[str, Tuple[np.ndarray, float]] = {}
+        self._evicted: set = set()
+        self._flush_lock = threading.Lock()
+        self._flusher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.hits = 0
+        self.misses = 0
+        self.skipped = 0
+
+        if cache_dir:
+            try:
+                cache_path = Path(cache_dir)
+                cache_path.mkdir(parents=True, exist_ok=True)
+                self.db_path = cache_path / "query_embeddings.db"
+                self._init_database()
+                self._load_persisted()
+            except Exception as e:
+                logger.warning(f"쿼리 임베딩 캐시 영속화 비활성화: {e}")
+                self.db_path = None
+
+    def _init_database(self) -> None:
+        """데이터베이스 초기화 (다른 모델의 항목은 삭제)"""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS query_embeddings (
+                    cache_key TEXT PRIMARY KEY,
+                    query_text TEXT NOT NULL,
+                    model_name TEXT NOT NULL,
+                    max_length INTEGER NOT NULL,
+                    embedding BLOB NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            """)
+            cursor.execute(
+                "DELETE FROM query_embeddings WHERE model_name != ? OR max_length != ?",
+                (self.model_name, self.max_length)
+            )
+            if cursor.rowcount > 0:
+                logger.info(f"모델 변경으로 쿼리 임베딩 캐시 {cursor.rowcount}개 무효화")
+            # 이전 버전이 기록한 쿼리 원문 제거
+            cursor.execute("UPDATE query_embeddings SET query_text = '' WHERE query_text != ''")
+            conn.commit()
+
+    def _load_persisted(self) -> None:
+        """최근 사용 순으로 max_entries개까지 메모리에 적재"""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT cache_key, embedding
+                FROM query_embeddings
+                ORDER BY last_used DESC
+                LIMIT ?
+            """, (self.max_entries,))
+            rows = cursor.fetchall()
+
+        # 오래된 것부터 넣어야 LRU 순서가 유지됨
+        for cache_key, embedding_data in reversed(rows):
+            self._entries[cache_key] = np.frombuffer(embedding_data, dtype=np.float32).copy()
+
+        if rows:
+            logger.info(f"쿼리 임베딩 캐시 복원: {len(rows)}개")
+
+    def make_key(self, text: str) -> str:
+        """정규화 텍스트 + 모델 + max_length 기반 캐시 키"""
+        raw = f"{self.model_name}\n{self.max_length}\n{normalize_query(text)}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def is_cacheable(self, text: str) -> bool:
+        """캐시 대상 여부 (짧은 쿼리만)"""
+        normalized = normalize_query(text)
+        return bool(normalized) and len(normalized) <= self.max_chars
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        """캐시 조회 (히트 시 복사본 반환)"""
+        if not self.is_cacheable(text):
+            self.skipped += 1
+            return None
+
+        key = self.make_key(text)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+
+        record_cache("query_embedding", entry is not None)
+        return entry.copy() if entry is not None else None
+
+    def put(self, text: str, embedding: np.ndarray) -> None:
+        """캐시 저장 (0 벡터 등 실패 결과는 저장하지 않음)"""
+        if not self.is_cacheable(text):
+            return
+
+        embedding = np.asarray(embedding, dtype=np.float32)
+        if embedding.size == 0 or not np.any(embedding):
+            return
+
+        key = self.make_key(text)
+        with self._lock:
+            self._entries[key] = embedding.copy()
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                evicted = self._entries.popitem(last=False)[0]
+                if self.db_path is not None:
+                    self._dirty.pop(evicted, None)
+                    self._evicted.add(evicted)
+            if self.db_path is not None:
+                self._evicted.discard(key)
+                self._dirty[key] = (embedding, time.time())
+
+        if self.db_path is not None:
+            self._ensure_flusher()
+
+    def _ensure_flusher(self) -> None:
+        """주기적 기록 스레드 시작 (검색 경로에서 SQLite 커밋을 하지 않도록)"""
+        if self._flusher is not None:
+            return
+        with self._flush_lock:
+            if self._flusher is not None:
+                return
+            self._flusher = threading.Thread(target=self._flush_loop, name="vis-query-cache-flush", daemon=True)
+            self._flusher.start()
+            atexit.register(self.flush)
+
+    def _flush_loop(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self) -> int:
+        """대기 중인 항목 저장 및 밀려난 항목 삭제 (한 트랜잭션)
+
+        Returns:
+            기록한 항목 수
+        """
+        if self.db_path is None:
+            return 0
+        with self._flush_lock:
+            with self._lock:
+                dirty, self._dirty = self._dirty, {}
+                evicted, self._evicted = self._evicted, set()
+            if not dirty and not evicted:
+                return 0
+            try:
+                with sqlite3.connect(self.db_path) as conn:
+                    cursor = conn.cursor()
+                    cursor.executemany("""
+                        INSERT OR REPLACE INTO query_embeddings
+                        (cache_key, query_text, model_name, max_length, embedding, last_used)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                    """, [
+                        (key, "", self.model_name, self.max_length, embedding.tobytes(), used)
+                        for key, (embedding, used) in dirty.items()
+                    ])
+                    if evicted:
+                        cursor.executemany(
+                            "DELETE FROM query_embeddings WHERE cache_key = ?",
+                            [(k,) for k in evicted]
+                        )
+                    conn.commit()
+            except Exception as e:
+                logger.debug(f"쿼리 임베딩 캐시 저장 실패: {e}")
+                return 0
+            return len(dirty)
+
+    def close(self) -> None:
+        """기록 스레드 종료 후 남은 항목 저장"""
+        self._stop.set()
+        if self._flusher is not None:
+            self._flusher.join(timeout=self.flush_interval + 1)
+        self.flush()
+
+    def invalidate(self, model_name: Optional[str] = None, max_length: Optional[int] = None) -> None:
+        """전체 무효화 (모델/max_length 변경 시 새 값으로 교체)"""
+        with self._lock:
+            self._entries.clear()
+            self._dirty.clear()
+            self._evicted.clear()
+            if model_name:
+                self.model_name = model_name
+            if max_length:
+                self.max_length = max_length
+
+        if self.db_path is not None:
+            try:
+                with sqlite3.connect(self.db_path) as conn:
+                    conn.execute("DELETE FROM query_embeddings")
+                    conn.commit()
+            except Exception as e:
+                logger.warning(f"쿼리 임베딩 캐시 삭제 실패: {e}")
+
+        logger.info("쿼리 임베딩 캐시 무효화")
+
+    def get_statistics(self) -> Dict:
+        """캐시 통계"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "skipped": self.skipped,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "persistent": self.db_path is not None,
+            "pending_writes": len(self._dirty)
+        }
+
+
+def test_query_embedding_cache():
+    """쿼리 임베딩 캐시 테스트"""
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache = QueryEmbeddingCache("test-model", 512, max_entries=2, cache_dir=temp_dir)
+        cache.put("TDD  테스트", np.ones(4))
+        cache.put("리팩토링", np.full(4, 2.0))
+        print(f"정규화 히트: {cache.get('TDD 테스트') is not None}")
+
+        cache.put("클린 코드", np.full(4, 3.0))
+        print(f"LRU 축출: {cache.get('리팩토링') is None}")
+        cache.flush()
+
+        reopened = QueryEmbeddingCache("test-model", 512, max_entries=2, cache_dir=temp_dir)
+        print(f"재시작 후 복원: {reopened.get('클린 코드') is not None}")
+
+        changed = QueryEmbeddingCache("other-model", 512, max_entries=2, cache_dir=temp_dir)
+        print(f"모델 변경 무효화: {changed.get('클린 코드') is None}")
+        print(f"통계: {cache.get_statistics()}")
+
+
+if __name__ == "__main__":
+    test_query_embedding_cache()
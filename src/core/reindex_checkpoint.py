@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Reindex Checkpoint for Vault Intelligence System V2
+
+전체 재인덱싱의 진행 상황을 캐시 디렉토리에 기록해 중단/취소된 재구축을 이어서 진행
+- 임베딩은 청크 단위로 캐시에 저장되므로 체크포인트에는 시작 시각과 진행 단계만 기록
+- 강제 재구축(force): 이전 강제 재구축의 체크포인트가 남아 있으면 그 시작 시각 이후에 저장된
+  캐시 항목은 "이미 다시 만든 것"으로 보고 재사용 → 죽거나 취소된 지점부터 이어감
+- 일반 재구축: 청크마다 캐시에 저장되므로 캐시 히트만으로 이어짐
+- BuildProgress: 단계/진행률 보고와 취소 확인 (서버 작업이 구현, 기본은 아무것도 하지 않음)
+"""
+
+import os
+import json
+import time
+import logging
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_FILE = "reindex_checkpoint.json"
+
+
+class ReindexCancelled(Exception):
+    """재인덱싱 취소 요청으로 구축을 중단함"""
+
+
+class BuildProgress:
+    """인덱스 구축 진행 보고 인터페이스 (기본 구현은 아무것도 하지 않음)"""
+
+    def start_phase(self, phase: str, total: int = 0) -> None:
+        """새 단계 시작 (total: 처리할 문서 수, 모르면 0)"""
+
+    def advance(self, count: int = 1) -> None:
+        """현재 단계에서 count개 문서 처리 완료"""
+
+    def is_cancelled(self) -> bool:
+        """취소 요청 여부"""
+        return False
+
+
+@dataclass
+class ReindexCheckpoint:
+    """진행 중(또는 중단된) 전체 재인덱싱 한 건"""
+    force: bool
+    with_colbert: bool = False
+    started_at: float = field(default_factory=time.time)
+    phase: str = "scanning"
+    done: int = 0
+    total: int = 0
+    status: str = "running"  # running, cancelled, failed (죽은 프로세스는 running으로 남음)
+    updated_at: float = field(default_factory=time.time)
+
+
+class ReindexCheckpointStore:
+    """캐시 디렉토리의 체크포인트 파일 읽기/쓰기"""
+
+    def __init__(self, cache_dir: str):
+        self.path = Path(cache_dir) / CHECKPOINT_FILE
+
+    def load(self) -> Optional[ReindexCheckpoint]:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            return ReindexCheckpoint(**data)
+        except FileNotFoundError:
+            return None
+        except (TypeError, ValueError) as e:
+            logger.warning(f"재인덱싱 체크포인트를 읽을 수 없어 무시합니다: {e}")
+            return None
+
+    def save(self, checkpoint: ReindexCheckpoint) -> None:
+        """다른 프로세스가 중간 상태를 보지 않도록 임시 파일에 쓴 뒤 교체"""
+        checkpoint.updated_at = time.time()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(asdict(checkpoint)), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+    def clear(self) -> None:
+        self.path.unlink(missing_ok=True)
+
+
+class ReindexRun:
+    """전체 재구축 한 번: 단계 진행을 체크포인트에 기록하고 BuildProgress에 전달"""
+
+    def __init__(self, cache_dir: str, force: bool, with_colbert: bool = False,
+                 progress: Optional[BuildProgress] = None):
+        """
+        Args:
+            cache_dir: 캐시 디렉토리 (체크포인트 위치)
+            force: 강제 재구축 여부
+            with_colbert: ColBERT 인덱스 포함 여부
+            progress: 진행 보고/취소 확인 대상
+        """
+        self.store = ReindexCheckpointStore(cache_dir)
+        self.progress = progress or BuildProgress()
+
+        previous = self.store.load()
+        self.resumed = previous is not None
+        if force and previous is not None and previous.force:
+            # 이전 강제 재구축이 시작된 뒤 저장된 항목은 다시 만들지 않음
+            self.checkpoint = ReindexCheckpoint(force=True, with_colbert=with_colbert,
+                                                started_at=previous.started_at)
+            logger.info(f"중단된 강제 재구축을 이어서 진행합니다 "
+                        f"(이전 단계: {previous.phase} {previous.done}/{previous.total})")
+        else:
+            self.resumed = self.resumed and not force
+            self.checkpoint = ReindexCheckpoint(force=force, with_colbert=with_colbert)
+        self.store.save(self.checkpoint)
+
+    @property
+    def reuse_after(self) -> Optional[float]:
+        """강제 재구축이면 이 시각 이후 저장된 캐시만 재사용 (일반 재구축은 None = 모두 재사용)"""
+        return self.checkpoint.started_at if self.checkpoint.force else None
+
+    def is_reusable(self, created_at) -> bool:
+        """캐시 항목 생성 시각(datetime)이 이번 재구축에서 재사용 가능한지"""
+        reuse_after = self.reuse_after
+        if reuse_after is None:
+            return True
+        return created_at is not None and created_at.timestamp() >= reuse_after
+
+    def start_phase(self, phase: str, total: int = 0) -> None:
+        self._check_cancelled()
+        self.checkpoint.phase = phase
+        self.checkpoint.done = 0
+        self.checkpoint.total = total
+        self.store.save(self.checkpoint)
+        self.progress.start_phase(phase, total)
+
+    def advance(self, count: int = 1) -> None:
+        self.checkpoint.done += count
+        self.store.save(self.checkpoint)
+        self.progress.advance(count)
+        self._check_cancelled()
+
+    def _check_cancelled(self) -> None:
+        if self.progress.is_cancelled():
+            raise ReindexCancelled(f"재인덱싱 취소됨 ({self.checkpoint.phase} "
+                                   f"{self.checkpoint.done}/{self.checkpoint.total})")
+
+    def finish(self) -> None:
+        """완료: 체크포인트 삭제"""
+        self.store.clear()
+
+    def abort(self, status: str) -> None:
+        """취소/실패: 다음 재구축이 이어갈 수 있도록 체크포인트 유지"""
+        self.checkpoint.status = status
+        try:
+            self.store.save(self.checkpoint)
+        except OSError as e:
+            logger.warning(f"재인덱싱 체크포인트 저장 실패: {e}")
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Search Stage Timing for Vault Intelligence System V2
+
+검색 단계별 소요 시간 측정 및 요청 단위 추적 훅
+- 단계: encode(쿼리 임베딩), score(유사도 계산), keyword(키워드 매칭),
+  fuse(하이브리드 결합), rerank(재순위화), snippet(스니펫 생성), queue(작업 풀 대기),
+  admission(서버 입장 제어 대기)
+- 관찰자: 프로세스 전역 콜백 (서버 /metrics 히스토그램)
+- SearchTrace: contextvars로 현재 요청에만 붙는 추적 (Server-Timing, explain)
+- 관찰자와 추적이 모두 없으면 시간을 재지 않음 (CLI 단독 실행 시 비용 없음)
+"""
+
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+STAGES = ("admission", "queue", "encode", "score", "keyword", "fuse", "rerank", "snippet")
+
+StageObserver = Callable[[str, float], None]
+
+_observers: List[StageObserver] = []
+_observers_lock = threading.Lock()
+
+
+def add_stage_observer(observer: StageObserver) -> None:
+    """단계 소요 시간 콜백 등록 (stage, seconds)"""
+    global _observers
+    with _observers_lock:
+        if observer not in _observers:
+            # 측정 중인 스레드가 순회하는 리스트를 바꾸지 않도록 새 리스트로 교체
+            _observers = _observers + [observer]
+
+
+def remove_stage_observer(observer: StageObserver) -> None:
+    """단계 소요 시간 콜백 해제"""
+    global _observers
+    with _observers_lock:
+        _observers = [o for o in _observers if o is not observer]
+
+
+class SearchTrace:
+    """요청 하나의 단계별 시간, 후보 수, 점수 변화, 캐시 적중 기록
+
+    explain=False면 단계 시간과 캐시 적중만 기록하고, 점수는 explain=True일 때만 모은다.
+    """
+
+    def __init__(self, explain: bool = False):
+        self.explain = explain
+        self.stages: Dict[str, float] = {}
+        self.candidates: Dict[str, int] = {}
+        self.cache: Dict[str, Dict[str, int]] = {}
+        self.scores: Dict[str, Dict[str, float]] = {}  # 문서 경로 -> {단계: 점수}
+        self.notes: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def add_stage(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def add_candidates(self, leg: str, count: int) -> None:
+        with self._lock:
+            self.candidates[leg] = self.candidates.get(leg, 0) + count
+
+    def add_cache(self, name: str, hit: bool) -> None:
+        with self._lock:
+            counts = self.cache.setdefault(name, {"hits": 0, "misses": 0})
+            counts["hits" if hit else "misses"] += 1
+
+    def add_scores(self, stage: str, scored: Iterable) -> None:
+        """(문서 경로, 점수) 목록 기록"""
+        with self._lock:
+            for path, score in scored:
+                self.scores.setdefault(path, {})[stage] = float(score)
+
+    def merge(self, other: "SearchTrace") -> None:
+        """다른 추적(예: 여러 요청이 공유한 배치 실행)의 단계 시간과 캐시 적중을 합침"""
+        for stage, seconds in list(other.stages.items()):
+            self.add_stage(stage, seconds)
+        with self._lock:
+            for name, counts in list(other.cache.items()):
+                mine = self.cache.setdefault(name, {"hits": 0, "misses": 0})
+                mine["hits"] += counts["hits"]
+                mine["misses"] += counts["misses"]
+
+    def server_timing(self, total: Optional[float] = None) -> str:
+        """Server-Timing 헤더 값 (밀리초)"""
+        parts = [f"{stage};dur={seconds * 1000:.2f}" for stage, seconds in self.stages.items()]
+        for name, counts in self.cache.items():
+            parts.append(f"{name.replace('_', '-')}-cache;desc=\"hit={counts['hits']} miss={counts['misses']}\"")
+        if total is not None:
+            parts.append(f"total;dur={total * 1000:.2f}")
+        return ", ".join(parts)
+
+    def to_dict(self, order: Optional[List[str]] = None) -> Dict:
+        """explain 응답용 사전 (order: 최종 결과 경로 순서, 나머지 후보는 뒤에)"""
+        order = [path for path in (order or []) if path in self.scores]
+        ordered = set(order)
+        ranked = order + [path for path in self.scores if path not in ordered]
+        return {
+            "stages_ms": {stage: round(seconds * 1000, 3) for stage, seconds in self.stages.items()},
+            "candidates": dict(self.candidates),
+            "cache": {name: dict(counts) for name, counts in self.cache.items()},
+            "scores": [{"path": path, **self.scores[path]} for path in ranked],
+            **self.notes
+        }
+
+
+_current_trace: ContextVar[Optional[SearchTrace]] = ContextVar("vis_search_trace", default=None)
+
+
+def current_trace() -> Optional[SearchTrace]:
+    """현재 컨텍스트의 추적 (없으면 None)"""
+    return _current_trace.get()
+
+
+@contextmanager
+def activate_trace(trace: Optional[SearchTrace]):
+    """with activate_trace(trace): ... 구간 동안 현재 컨텍스트의 추적 지정 (None이면 해제)"""
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+def record_stage(stage: str, seconds: float) -> None:
+    """단계 소요 시간을 관찰자와 현재 추적에 전달"""
+    for observer in _observers:
+        try:
+            observer(stage, seconds)
+        except Exception as e:
+            logger.debug(f"단계 관찰자 호출 실패: {e}")
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add_stage(stage, seconds)
+
+
+def record_candidates(leg: str, count: int) -> None:
+    """검색 경로(semantic/keyword/...)별 후보 수 기록"""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add_candidates(leg, count)
+
+
+def record_cache(name: str, hit: bool) -> None:
+    """캐시 적중 여부 기록"""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add_cache(name, hit)
+
+
+def record_scores(stage: str, results: Iterable) -> None:
+    """SearchResult 목록의 현재 점수 기록 (explain 추적일 때만)"""
+    trace = _current_trace.get()
+    if trace is not None and trace.explain:
+        trace.add_scores(stage, ((r.document.path, r.similarity_score) for r in results))
+
+
+class StageTimer:
+    """with StageTimer("encode"): ... 형태로 단계 소요 시간을 관찰자/추적에 전달"""
+
+    __slots__ = ("stage", "started")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self.started = None
+
+    def __enter__(self):
+        if _observers or _current_trace.get() is not None:
+            self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.started is not None:
+            record_stage(self.stage, time.perf_counter() - self.started)
+        return False
+
+
+def test_search_stages():
+    """단계 측정 훅 테스트"""
+    recorded = []
+    observer = lambda stage, seconds: recorded.append((stage, seconds))
+
+    with StageTimer("encode"):
+        pass
+    print(f"관찰자 없음 → 기록 없음: {recorded == []}")
+
+    add_stage_observer(observer)
+    with StageTimer("score"):
+        time.sleep(0.01)
+    remove_stage_observer(observer)
+    print(f"기록: {recorded}")
+
+    with activate_trace(SearchTrace(explain=True)) as trace:
+        with StageTimer("encode"):
+            time.sleep(0.005)
+        record_cache("query_embedding", hit=False)
+        record_candidates("semantic", 20)
+    print(f"Server-Timing: {trace.server_timing()}")
+    print(f"explain: {trace.to_dict()}")
+
+
+if __name__ == "__main__":
+    test_search_stages()
@@ -10,6 +10,7 @@ BGE-M3 기반 고품질 임베딩 시스템
 """
 
 import os
+import time
 import logging
 from typing import List, Optional, Union, Tuple, Dict, Any
 import numpy as np
@@ -27,6 +28,13 @@ from FlagEmbedding import BGEM3FlagModel
 # BM25 for sparse retrieval
 from rank_bm25 import BM25Okapi
 
+try:
+    from .passage_splitter import approximate_token_count
+    from .query_embedding_cache import QueryEmbeddingCache
+except ImportError:
+    from passage_splitter import approximate_token_count
+    from query_embedding_cache import QueryEmbeddingCache
+
 # 기본 라이브러리
 from sklearn.metrics.pairwise import cosine_similarity
 import pickle
@@ -48,7 +56,10 @@ class AdvancedEmbeddingEngine:
         use_fp16: bool = False,
         batch_size: int = 4,
         max_length: int = 4096,
-        num_workers: int = 6
+        num_workers: int = 6,
+        token_budget: Optional[int] = None,
+        max_batch_size: int = 64,
+        query_cache: Optional[QueryEmbeddingCache] = None
     ):
         """
         Args:
@@ -59,6 +70,9 @@ class AdvancedEmbeddingEngine:
             batch_size: 배치 크기
             max_length: 최대 토큰 길이
             num_workers: 워커 프로세스 수
+            token_budget: 배치당 토큰 예산 (패딩 포함, 기본: batch_size * max_length)
+            max_batch_size: 길이 버킷 배치의 최대 문서 수
+            query_cache: 쿼리 임베딩 LRU 캐시 (None이면 캐시하지 않음)
         """
         self.model_name = model_name
         self.cache_dir = cache_dir or "cache"
@@ -67,6 +81,19 @@ class AdvancedEmbeddingEngine:
         self.batch_size = batch_size
         self.max_length = max_length
         self.num_workers = num_workers
+        self.token_budget = token_budget or batch_size * max_length
+        self.max_batch_size = max(max_batch_size, 1)
+        
+        # 콘텐츠 해시 → 토큰 수 (재인덱싱 시 토크나이저 재실행 방지)
+        self._token_length_cache: Dict[str, int] = {}
+        self.last_encode_stats: Dict[str, Any] = {}
+        
+        # 쿼리 임베딩 캐시 (다른 모델/토큰 길이로 만든 항목은 무효화)
+        self.query_cache = query_cache
+        if query_cache is not None and (
+            query_cache.model_name != model_name or query_cache.max_length != max_length
+        ):
+            query_cache.invalidate(model_name, max_length)
         
         logger.info(f"BGE-M3 임베딩 엔진 초기화: {model_name}")
         logger.info(f"장치: {self.device}, FP16: {self.use_fp16}, 배치크기: {self.batch_size}")
@@ -148,21 +175,26 @@ class AdvancedEmbeddingEngine:
         self.is_fitted = True
         logger.info(f"✅ 문서 인덱싱 완료: {len(documents)}개 문서")
     
+    def release_document_texts(self) -> None:
+        """fit_documents()가 보관한 원문/토큰 사본 해제 (BM25 통계와 임베딩은 유지)"""
+        self.document_contents = []
+        self.tokenized_docs = []
+
     def _generate_dense_embeddings(self, documents: List[str]) -> None:
-        """Dense embeddings 생성 (최적화된 배치 처리 + Rich 진행률)"""
+        """Dense embeddings 생성"""
+        self.dense_embeddings = self.encode_documents(documents)
+    
+    def encode_documents(self, documents: List[str]) -> np.ndarray:
+        """문서 dense embeddings 생성 (길이 버킷 배치 처리 + Rich 진행률)"""
         try:
             total_docs = len(documents)
-            # 최적화된 청크 크기: MPS 가속을 위해 더 큰 배치 활용
-            chunk_size = max(200, self.batch_size * 20)  # 청크 크기 증가
             
             console = Console()
             console.print(f"🚀 [bold green]BGE-M3 Dense 임베딩 생성 시작[/bold green]")
-            console.print(f"📊 총 문서: {total_docs:,}개 | 배치크기: {self.batch_size} | 청크크기: {chunk_size}")
-            console.print(f"⚡ 가속: MPS | 토큰길이: {self.max_length} | 워커: {self.num_workers}")
+            console.print(f"📊 총 문서: {total_docs:,}개 | 토큰 예산: {self.token_budget:,} | 최대 배치: {self.max_batch_size}")
+            console.print(f"⚡ 장치: {self.device} | 토큰길이: {self.max_length} | 워커: {self.num_workers}")
             
-            all_embeddings = []
-            
-            # Rich 진행률 표시로 청크 단위 처리
+            # Rich 진행률 표시로 배치 단위 처리
             with Progress(
                 SpinnerColumn(),
                 TextColumn("[progress.description]{task.description}"),
@@ -175,39 +207,24 @@ class AdvancedEmbeddingEngine:
                 
                 task = progress.add_task("임베딩 생성 중...", total=total_docs)
                 
-                for i in range(0, total_docs, chunk_size):
-                    chunk_docs = documents[i:i + chunk_size]
-                    chunk_num = i // chunk_size + 1
-                    total_chunks = (total_docs + chunk_size - 1) // chunk_size
-                    
-                    progress.update(task, description=f"청크 {chunk_num}/{total_chunks} 처리 중...")
-                    
-                    # 최적화된 배치 처리로 임베딩 생성
-                    embeddings_result = self.model.encode(
-                        chunk_docs,
-                        batch_size=self.batch_size,
-                        max_length=self.max_length,
-                        return_dense=True,
-                        return_sparse=False,
-                        return_colbert_vecs=False
-                    )
-                    
-                    all_embeddings.append(embeddings_result['dense_vecs'])
-                    
-                    # 진행률 업데이트
-                    processed_docs = min(i + len(chunk_docs), total_docs)
-                    progress.update(task, completed=processed_docs)
-            
-            # 모든 청크의 임베딩을 합침
-            self.dense_embeddings = np.vstack(all_embeddings) if all_embeddings else np.zeros((0, self.embedding_dimension))
-            
-            console.print(f"✅ [bold green]Dense embeddings 생성 완료[/bold green]: {self.dense_embeddings.shape}")
-            console.print(f"📈 성능 향상: MPS 가속 + 배치크기 {self.batch_size} + 청크 최적화")
+                def _on_batch(done: int, total: int) -> None:
+                    progress.update(task, completed=done, description=f"임베딩 생성 중... ({done}/{total})")
+                
+                embeddings = self.encode_bucketed(documents, progress_callback=_on_batch)
+            
+            stats = self.last_encode_stats
+            console.print(f"✅ [bold green]Dense embeddings 생성 완료[/bold green]: {embeddings.shape}")
+            if stats:
+                console.print(
+                    f"📈 처리량: {stats['tokens_per_sec']:,.0f} tokens/s, {stats['docs_per_sec']:.1f} docs/s "
+                    f"| 배치 {stats['batches']}개 | 패딩 효율 {stats['padding_efficiency']:.0%}"
+                )
+            return embeddings
             
         except Exception as e:
             logger.error(f"Dense embeddings 생성 실패: {e}")
             # 폴백: 제로 벡터 생성
-            self.dense_embeddings = np.zeros((len(documents), self.embedding_dimension))
+            return np.zeros((len(documents), self.embedding_dimension))
     
     def _build_bm25_index(self, documents: List[str]) -> None:
         """BM25 인덱스 구축"""
@@ -228,11 +245,16 @@ class AdvancedEmbeddingEngine:
             self.bm25_model = None
     
     def encode_text(self, text: str) -> np.ndarray:
-        """단일 텍스트의 dense embedding 생성"""
+        """단일 텍스트의 dense embedding 생성 (짧은 텍스트는 쿼리 캐시 사용)"""
         try:
             if not text or not text.strip():
                 text = "빈 텍스트"
             
+            if self.query_cache is not None:
+                cached = self.query_cache.get(text)
+                if cached is not None:
+                    return cached
+            
             # BGE-M3로 dense embedding 생성
             result = self.model.encode(
                 [text.strip()],
@@ -243,7 +265,10 @@ class AdvancedEmbeddingEngine:
                 return_colbert_vecs=False
             )
             
-            return result['dense_vecs'][0]
+            embedding = result['dense_vecs'][0]
+            if self.query_cache is not None:
+                self.query_cache.put(text, embedding)
+            return embedding
             
         except Exception as e:
             logger.error(f"텍스트 임베딩 생성 실패: {e}")
@@ -255,38 +280,204 @@ class AdvancedEmbeddingEngine:
         batch_size: int = None,
         show_progress: bool = True
     ) -> np.ndarray:
-        """다중 텍스트의 배치 dense embedding 생성"""
+        """다중 텍스트의 배치 dense embedding 생성 (길이 버킷 배치)
+        
+        batch_size를 지정하면 해당 크기를 배치 상한으로 사용한다.
+        쿼리 캐시에 있는 짧은 텍스트는 다시 인코딩하지 않는다.
+        """
         try:
-            if batch_size is None:
-                batch_size = self.batch_size
-            
-            # 빈 텍스트 처리
-            processed_texts = []
-            for i, text in enumerate(texts):
-                if text and text.strip():
-                    processed_texts.append(text.strip())
-                else:
-                    processed_texts.append(f"빈 텍스트 {i}")
-            
-            # BGE-M3로 배치 embedding 생성
-            result = self.model.encode(
-                processed_texts,
-                batch_size=batch_size,
-                max_length=self.max_length,
-                return_dense=True,
-                return_sparse=False,
-                return_colbert_vecs=False
-            )
+            embeddings = np.zeros((len(texts), self.embedding_dimension), dtype=np.float32)
+            pending = list(range(len(texts)))
+            
+            if self.query_cache is not None:
+                pending = []
+                for i, text in enumerate(texts):
+                    cached = self.query_cache.get(text) if text and text.strip() else None
+                    if cached is None:
+                        pending.append(i)
+                    else:
+                        embeddings[i] = cached
+            
+            if pending:
+                encoded = self.encode_bucketed(
+                    [texts[i] for i in pending],
+                    max_batch_size=batch_size
+                )
+                embeddings[pending] = encoded
+                if self.query_cache is not None:
+                    for i, embedding in zip(pending, encoded):
+                        if texts[i] and texts[i].strip():
+                            self.query_cache.put(texts[i], embedding)
             
             if show_progress:
-                logger.info(f"배치 임베딩 생성 완료: {len(texts)}개 텍스트")
+                stats = self.last_encode_stats if pending else {}
+                logger.info(
+                    f"배치 임베딩 생성 완료: {len(texts)}개 텍스트, 캐시 {len(texts) - len(pending)}개 "
+                    f"({stats.get('tokens_per_sec', 0):,.0f} tokens/s, {stats.get('docs_per_sec', 0):.1f} docs/s)"
+                )
             
-            return result['dense_vecs']
+            return embeddings
             
         except Exception as e:
             logger.error(f"배치 임베딩 생성 실패: {e}")
             return np.zeros((len(texts), self.embedding_dimension))
-    
+
+    def count_tokens(self, text: str) -> int:
+        """모델 토크나이저 기준 토큰 수 (토크나이저가 없으면 근사치)"""
+        tokenizer = getattr(self.model, "tokenizer", None)
+        if tokenizer is not None:
+            try:
+                return len(tokenizer.encode(text, add_special_tokens=False))
+            except Exception as e:
+                logger.debug(f"토크나이저 토큰 수 계산 실패, 근사치 사용: {e}")
+        return approximate_token_count(text)
+
+    def measure_token_lengths(self, texts: List[str]) -> List[int]:
+        """텍스트별 토큰 수 (콘텐츠 해시 기준 캐시, 미스만 일괄 토크나이즈)"""
+        keys = [hashlib.md5(text.encode("utf-8")).hexdigest() for text in texts]
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in self._token_length_cache and key not in missing:
+                missing[key] = text
+        
+        if missing:
+            missing_keys = list(missing)
+            missing_texts = [missing[key] for key in missing_keys]
+            tokenizer = getattr(self.model, "tokenizer", None)
+            lengths = None
+            if tokenizer is not None:
+                try:
+                    lengths = []
+                    for i in range(0, len(missing_texts), 256):
+                        encoded = tokenizer(missing_texts[i:i + 256], add_special_tokens=True)["input_ids"]
+                        lengths.extend(len(ids) for ids in encoded)
+                except Exception as e:
+                    logger.debug(f"일괄 토크나이즈 실패, 근사치 사용: {e}")
+                    lengths = None
+            if lengths is None:
+                # 특수 토큰 2개 보정
+                lengths = [approximate_token_count(text) + 2 for text in missing_texts]
+            
+            if len(self._token_length_cache) > 200_000:
+                self._token_length_cache.clear()
+            self._token_length_cache.update(zip(missing_keys, lengths))
+        
+        return [self._token_length_cache[key] for key in keys]
+
+    @staticmethod
+    def plan_length_batches(
+        lengths: List[int],
+        token_budget: int,
+        max_batch_size: int
+    ) -> List[List[int]]:
+        """길이순 정렬 후 토큰 예산 안에서 배치 구성
+        
+        배치 비용은 (문서 수 × 배치 내 최대 길이)로 추정한다.
+        길이 오름차순으로 채우므로 새로 추가되는 문서가 항상 최대 길이가 된다.
+        
+        Returns:
+            원래 인덱스의 배치 목록
+        """
+        order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+        batches: List[List[int]] = []
+        current: List[int] = []
+        
+        for idx in order:
+            length = max(int(lengths[idx]), 1)
+            if current and (len(current) >= max_batch_size or (len(current) + 1) * length > token_budget):
+                batches.append(current)
+                current = []
+            current.append(idx)
+        
+        if current:
+            batches.append(current)
+        return batches
+
+    def encode_bucketed(
+        self,
+        texts: List[str],
+        max_length: Optional[int] = None,
+        lengths: Optional[List[int]] = None,
+        max_batch_size: Optional[int] = None,
+        progress_callback=None
+    ) -> np.ndarray:
+        """토큰 길이 인지 배치 임베딩
+        
+        비슷한 길이끼리 묶어 패딩 낭비를 줄이고, 배치 크기는 토큰 예산으로 정한다.
+        결과는 입력 순서로 복원되며 처리량은 last_encode_stats에 기록된다.
+        
+        Args:
+            texts: 텍스트 목록
+            max_length: 최대 토큰 길이 (기본: self.max_length)
+            lengths: 미리 계산한 토큰 수 (없으면 measure_token_lengths)
+            max_batch_size: 배치 문서 수 상한 (기본: self.max_batch_size)
+            progress_callback: (완료 수, 전체 수) 콜백
+        """
+        max_length = max_length or self.max_length
+        max_batch_size = max_batch_size or self.max_batch_size
+        embeddings = np.zeros((len(texts), self.embedding_dimension), dtype=np.float32)
+        if not texts:
+            self.last_encode_stats = {}
+            return embeddings
+        
+        processed = [text.strip() if text and text.strip() else f"빈 텍스트 {i}" for i, text in enumerate(texts)]
+        if lengths is None:
+            lengths = self.measure_token_lengths(processed)
+        clipped = [min(max(int(length), 1), max_length) for length in lengths]
+        # 최대 길이 문서 1개는 예산과 무관하게 처리할 수 있어야 함
+        token_budget = max(self.token_budget, max_length)
+        batches = self.plan_length_batches(clipped, token_budget, max_batch_size)
+        
+        started = time.perf_counter()
+        done = 0
+        padded_tokens = 0
+        for batch in batches:
+            result = self.model.encode(
+                [processed[i] for i in batch],
+                batch_size=len(batch),
+                max_length=max_length,
+                return_dense=True,
+                return_sparse=False,
+                return_colbert_vecs=False
+            )
+            embeddings[batch] = np.asarray(result['dense_vecs'], dtype=np.float32)
+            padded_tokens += len(batch) * max(clipped[i] for i in batch)
+            done += len(batch)
+            if progress_callback:
+                progress_callback(done, len(texts))
+        
+        elapsed = max(time.perf_counter() - started, 1e-9)
+        total_tokens = sum(clipped)
+        self.last_encode_stats = {
+            "documents": len(texts),
+            "tokens": total_tokens,
+            "batches": len(batches),
+            "seconds": elapsed,
+            "tokens_per_sec": total_tokens / elapsed,
+            "docs_per_sec": len(texts) / elapsed,
+            "padding_efficiency": total_tokens / max(padded_tokens, 1)
+        }
+        return embeddings
+
+    def encode_passages(
+        self,
+        texts: List[str],
+        max_length: int = 512,
+        token_counts: Optional[List[int]] = None
+    ) -> np.ndarray:
+        """패시지 배치 임베딩 (길이 버킷 배치 처리)
+
+        Args:
+            texts: 패시지 텍스트 목록
+            max_length: 패시지 최대 토큰 길이
+            token_counts: 미리 계산한 토큰 수 (없으면 토크나이저로 측정)
+        """
+        try:
+            return self.encode_bucketed(texts, max_length=max_length, lengths=token_counts)
+        except Exception as e:
+            logger.error(f"패시지 임베딩 생성 실패: {e}")
+            return np.zeros((len(texts), self.embedding_dimension), dtype=np.float32)
+
     def semantic_search(
         self, 
         query: str, 
@@ -473,7 +664,8 @@ class AdvancedEmbeddingEngine:
             "cache_dir": self.cache_dir,
             "is_fitted": self.is_fitted,
             "document_count": len(self.document_paths) if self.document_paths else 0,
-            "has_bm25": self.bm25_model is not None
+            "has_bm25": self.bm25_model is not None,
+            "query_cache": self.query_cache.get_statistics() if self.query_cache is not None else None
         }
     
     def preprocess_text(self, text: str) -> str:
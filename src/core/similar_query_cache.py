@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Similar Query Cache for Vault Intelligence System V2
+
+의미가 거의 같은 쿼리(예: "TDD 사례" / "TDD 예시")의 후보 문서 재사용
+- 최근 쿼리의 정규화 임베딩을 작은 행렬(최대 max_entries행)에 보관하고 각 쿼리의 상위 후보 문서 인덱스를 함께 저장
+- 새 쿼리와의 코사인 유사도가 threshold 이상인 항목이 있으면 그 후보 집합(여러 개면 합집합)만 새 쿼리로 다시 채점
+  → 전체 문서 행렬곱을 생략하고 후보 수만큼만 계산
+- 인덱스 버전이 바뀌면 전부 무효화 (문서 인덱스가 달라지므로)
+"""
+
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+try:
+    from .search_stages import record_cache
+except ImportError:
+    from search_stages import record_cache
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CandidateReuse:
+    """근접 중복 쿼리의 후보 집합을 재사용했다는 표시 (검색 결과에 첨부)"""
+    similarity: float  # 가장 비슷한 캐시 쿼리와의 코사인 유사도
+    candidates: int  # 다시 채점한 후보 문서 수
+
+
+class SimilarQueryCache:
+    """최근 쿼리 임베딩 행렬과 후보 문서 집합 (링 버퍼)"""
+
+    def __init__(self, max_entries: int = 256, threshold: float = 0.95, candidates: int = 100,
+                 max_blend: int = 3):
+        """
+        Args:
+            max_entries: 보관할 최근 쿼리 수 (행렬 행 수)
+            threshold: 후보를 재사용할 최소 코사인 유사도
+            candidates: 쿼리마다 저장할 상위 후보 문서 수 (이보다 많은 결과를 요청하면 재사용하지 않음)
+            max_blend: 임계값을 넘는 캐시 쿼리 중 후보를 합칠 최대 개수
+        """
+        self.max_entries = max(max_entries, 1)
+        self.threshold = threshold
+        self.candidates = max(candidates, 1)
+        self.max_blend = max(max_blend, 1)
+
+        self._matrix: Optional[np.ndarray] = None  # (max_entries, 차원), 정규화된 쿼리 임베딩
+        self._candidates: Dict[int, np.ndarray] = {}  # 행 → 후보 문서 인덱스
+        self._next = 0
+        self._version = None
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def _check_version(self, version, dimension: int) -> None:
+        """인덱스 버전/차원이 바뀌면 비움 (lock 보유 상태)"""
+        if version != self._version or self._matrix is None or self._matrix.shape[1] != dimension:
+            self._matrix = np.zeros((self.max_entries, dimension), dtype=np.float32)
+            self._candidates.clear()
+            self._next = 0
+            self._version = version
+
+    def lookup(self, query_embedding: np.ndarray, version, top_k: int) -> Optional[Tuple[np.ndarray, CandidateReuse]]:
+        """
+        비슷한 캐시 쿼리의 후보 집합 조회
+
+        Args:
+            query_embedding: 정규화된 쿼리 임베딩 (1차원)
+            version: 인덱스 버전
+            top_k: 요청 결과 수
+
+        Returns:
+            (후보 문서 인덱스, 재사용 정보) 또는 None
+        """
+        with self._lock:
+            self._check_version(version, len(query_embedding))
+            if not self._candidates or top_k > self.candidates:
+                self.misses += 1
+                record_cache("similar_query", False)
+                return None
+
+            rows = np.fromiter(self._candidates.keys(), dtype=np.int64)
+            similarities = self._matrix[rows] @ query_embedding
+            order = np.argsort(similarities)[::-1][:self.max_blend]
+            matched = [rows[i] for i in order if similarities[i] >= self.threshold]
+            if not matched:
+                self.misses += 1
+                record_cache("similar_query", False)
+                return None
+
+            # 여러 쿼리가 임계값을 넘으면 후보를 합쳐 누락을 줄임
+            candidates = np.unique(np.concatenate([self._candidates[row] for row in matched]))
+            self.hits += 1
+            record_cache("similar_query", True)
+            return candidates, CandidateReuse(similarity=float(similarities[order[0]]), candidates=len(candidates))
+
+    def add(self, query_embedding: np.ndarray, scores: np.ndarray, version) -> None:
+        """전체 채점한 쿼리의 상위 후보 저장 (query_embedding은 정규화된 1차원)"""
+        count = min(self.candidates, len(scores))
+        if count == 0:
+            return
+        top = np.argpartition(scores, -count)[-count:] if count < len(scores) else np.arange(len(scores))
+        with self._lock:
+            self._check_version(version, len(query_embedding))
+            row = self._next
+            self._matrix[row] = query_embedding
+            self._candidates[row] = top.astype(np.int64)
+            self._next = (row + 1) % self.max_entries
+
+    def get_statistics(self) -> Dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._candidates),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "threshold": self.threshold,
+            }
@@ -0,0 +1,542 @@
+#!/usr/bin/env python3
+"""
+Document Text Store for Vault Intelligence System V2
+
+압축 블록 기반 문서 텍스트 저장소
+- 문서 id + 콘텐츠 해시 기준으로 정리된 본문 텍스트를 보관
+- 여러 문서를 하나의 블록으로 묶어 zstd(가능 시) 또는 zlib으로 압축
+- 최근 사용 블록만 메모리에 유지하여 상주 메모리를 vault 크기와 분리
+"""
+
+import time
+import zlib
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class DocumentTextStore:
+    """블록 단위로 압축 저장되는 문서 텍스트 저장소"""
+
+    def __init__(
+        self,
+        cache_dir: str,
+        codec: str = "zstd",
+        block_size: int = 64 * 1024,
+        block_cache_size: int = 16,
+        compression_level: Optional[int] = None,
+        retire_grace_seconds: float = 600.0
+    ):
+        """
+        Args:
+            cache_dir: 캐시 디렉토리 경로
+            codec: 압축 방식 ("zstd" 또는 "zlib", zstd 미설치 시 zlib 사용)
+            block_size: 블록 하나에 담을 원본 텍스트 크기 (바이트)
+            block_cache_size: 메모리에 유지할 압축 해제 블록 수
+            compression_level: 압축 레벨 (None이면 codec 기본값)
+            retire_grace_seconds: compact()로 퇴역한 블록을 삭제하기 전 유예 시간
+                (스냅샷을 아직 다시 읽지 않은 읽기 워커 보호)
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.cache_dir / "document_texts.db"
+
+        if codec == "zstd" and not ZSTD_AVAILABLE:
+            logger.info("zstandard 미설치로 zlib 압축을 사용합니다.")
+            codec = "zlib"
+        if codec not in ("zstd", "zlib"):
+            raise ValueError(f"지원하지 않는 압축 방식: {codec}")
+
+        self.codec = codec
+        self.block_size = block_size
+        self.block_cache_size = block_cache_size
+        self.compression_level = compression_level
+        self.retire_grace_seconds = max(retire_grace_seconds, 0.0)
+
+        self._lock = threading.RLock()
+        # doc_id -> (content_hash, block_id, offset, length)
+        self._entries: Dict[str, Tuple[str, int, int, int]] = {}
+        # block_id -> 압축 해제된 블록 (LRU)
+        self._block_cache: "OrderedDict[int, bytes]" = OrderedDict()
+        # 아직 기록되지 않은 블록
+        self._pending = bytearray()
+        self._pending_entries: Dict[str, Tuple[str, int, int]] = {}
+        self._next_block_id = 0
+        self._garbage_bytes = 0
+
+        self._init_database()
+        self._load_entries()
+
+        logger.info(f"문서 텍스트 저장소 초기화: {self.db_path} (압축: {self.codec})")
+
+    def _init_database(self):
+        """SQLite 데이터베이스 초기화"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS text_blocks (
+                        block_id INTEGER PRIMARY KEY,
+                        codec TEXT NOT NULL,
+                        raw_size INTEGER NOT NULL,
+                        data BLOB NOT NULL
+                    )
+                """)
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS text_entries (
+                        doc_id TEXT PRIMARY KEY,
+                        content_hash TEXT NOT NULL,
+                        block_id INTEGER NOT NULL,
+                        offset INTEGER NOT NULL,
+                        length INTEGER NOT NULL
+                    )
+                """)
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS retired_blocks (
+                        block_id INTEGER PRIMARY KEY,
+                        retired_at REAL NOT NULL
+                    )
+                """)
+                cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_text_entries_block ON text_entries(block_id)
+                """)
+                conn.commit()
+        except Exception as e:
+            logger.error(f"텍스트 저장소 초기화 실패: {e}")
+            raise
+
+    def _load_entries(self):
+        """엔트리 위치 정보를 메모리로 로딩 (텍스트 자체는 로딩하지 않음)"""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT doc_id, content_hash, block_id, offset, length FROM text_entries")
+            for doc_id, content_hash, block_id, offset, length in cursor.fetchall():
+                self._entries[doc_id] = (content_hash, block_id, offset, length)
+
+            cursor.execute("SELECT COALESCE(MAX(block_id), -1) FROM text_blocks")
+            max_block_id = cursor.fetchone()[0]
+            # 퇴역 블록은 이미 정리된 것이므로 가비지로 세지 않음
+            cursor.execute(
+                "SELECT COALESCE(SUM(raw_size), 0) FROM text_blocks "
+                "WHERE block_id NOT IN (SELECT block_id FROM retired_blocks)"
+            )
+            total_raw = cursor.fetchone()[0]
+
+        self._next_block_id = max_block_id + 1
+        live_bytes = sum(length for _, _, _, length in self._entries.values())
+        self._garbage_bytes = max(0, total_raw - live_bytes)
+
+    def reload(self) -> None:
+        """다른 프로세스가 기록한 엔트리 위치 다시 읽기 (읽기 전용 워커가 새 스냅샷 적재 시 호출)"""
+        with self._lock:
+            self._entries = {}
+            self._block_cache.clear()
+            self._pending = bytearray()
+            self._pending_entries = {}
+            self._load_entries()
+
+    # ===== 압축 =====
+
+    def _compress(self, data: bytes) -> bytes:
+        if self.codec == "zstd":
+            level = self.compression_level if self.compression_level is not None else 3
+            return zstandard.ZstdCompressor(level=level).compress(data)
+        level = self.compression_level if self.compression_level is not None else 6
+        return zlib.compress(data, level)
+
+    @staticmethod
+    def _decompress(data: bytes, codec: str) -> bytes:
+        if codec == "zstd":
+            if not ZSTD_AVAILABLE:
+                raise RuntimeError("zstd 블록을 읽으려면 zstandard 패키지가 필요합니다.")
+            return zstandard.ZstdDecompressor().decompress(data)
+        return zlib.decompress(data)
+
+    # ===== 쓰기 =====
+
+    def put(self, doc_id: str, content_hash: str, text: str) -> bool:
+        """텍스트 저장 (동일 해시가 이미 있으면 건너뜀)
+
+        Returns:
+            새로 기록했으면 True
+        """
+        with self._lock:
+            if self._current_hash(doc_id) == content_hash:
+                return False
+
+            data = (text or "").encode("utf-8")
+            self._discard(doc_id)
+            self._pending_entries[doc_id] = (content_hash, len(self._pending), len(data))
+            self._pending.extend(data)
+
+            if len(self._pending) >= self.block_size:
+                self.flush()
+            return True
+
+    def put_many(self, items: Iterable[Tuple[str, str, str]]) -> int:
+        """(doc_id, content_hash, text) 목록 저장 후 flush
+
+        Returns:
+            새로 기록된 문서 수
+        """
+        written = 0
+        with self._lock:
+            for doc_id, content_hash, text in items:
+                if self.put(doc_id, content_hash, text):
+                    written += 1
+            self.flush()
+        return written
+
+    def flush(self) -> None:
+        """대기 중인 블록을 압축하여 기록"""
+        with self._lock:
+            if not self._pending_entries:
+                self._pending = bytearray()
+                return
+
+            raw = bytes(self._pending)
+            block_id = self._next_block_id
+            compressed = self._compress(raw)
+
+            try:
+                with sqlite3.connect(self.db_path) as conn:
+                    cursor = conn.cursor()
+                    cursor.execute(
+                        "INSERT INTO text_blocks (block_id, codec, raw_size, data) VALUES (?, ?, ?, ?)",
+                        (block_id, self.codec, len(raw), compressed)
+                    )
+                    cursor.executemany(
+                        "INSERT OR REPLACE INTO text_entries (doc_id, content_hash, block_id, offset, length) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        [
+                            (doc_id, content_hash, block_id, offset, length)
+                            for doc_id, (content_hash, offset, length) in self._pending_entries.items()
+                        ]
+                    )
+                    conn.commit()
+            except Exception as e:
+                logger.error(f"텍스트 블록 기록 실패: {e}")
+                raise
+
+            for doc_id, (content_hash, offset, length) in self._pending_entries.items():
+                self._entries[doc_id] = (content_hash, block_id, offset, length)
+
+            self._remember_block(block_id, raw)
+            self._next_block_id += 1
+            self._pending = bytearray()
+            self._pending_entries = {}
+            logger.debug(f"텍스트 블록 기록: #{block_id} ({len(raw):,} → {len(compressed):,} bytes)")
+
+    def remove(self, doc_id: str) -> bool:
+        """텍스트 삭제"""
+        with self._lock:
+            if doc_id not in self._entries and doc_id not in self._pending_entries:
+                return False
+            self._discard(doc_id)
+            try:
+                with sqlite3.connect(self.db_path) as conn:
+                    conn.execute("DELETE FROM text_entries WHERE doc_id = ?", (doc_id,))
+                    conn.commit()
+            except Exception as e:
+                logger.error(f"텍스트 삭제 실패: {doc_id}, {e}")
+                return False
+            return True
+
+    def retain(self, doc_ids: Iterable[str]) -> int:
+        """지정된 문서 외의 텍스트 삭제
+
+        Returns:
+            삭제된 문서 수
+        """
+        keep = set(doc_ids)
+        with self._lock:
+            stale = [doc_id for doc_id in self._entries if doc_id not in keep]
+            for doc_id in stale:
+                self.remove(doc_id)
+        return len(stale)
+
+    def _discard(self, doc_id: str) -> None:
+        """기존 엔트리를 가비지로 처리 (잠금 보유 상태에서 호출)"""
+        if doc_id in self._pending_entries:
+            # 대기 블록의 바이트는 flush 시 함께 기록되므로 가비지로만 집계
+            self._garbage_bytes += self._pending_entries.pop(doc_id)[2]
+        if doc_id in self._entries:
+            self._garbage_bytes += self._entries.pop(doc_id)[3]
+
+    def _current_hash(self, doc_id: str) -> Optional[str]:
+        if doc_id in self._pending_entries:
+            return self._pending_entries[doc_id][0]
+        if doc_id in self._entries:
+            return self._entries[doc_id][0]
+        return None
+
+    # ===== 읽기 =====
+
+    def has_text(self, doc_id: str, content_hash: Optional[str] = None) -> bool:
+        """텍스트 존재 여부 확인"""
+        with self._lock:
+            current = self._current_hash(doc_id)
+        if current is None:
+            return False
+        return content_hash is None or current == content_hash
+
+    def get_text(
+        self,
+        doc_id: str,
+        content_hash: Optional[str] = None,
+        max_chars: Optional[int] = None
+    ) -> Optional[str]:
+        """텍스트 조회
+
+        Args:
+            doc_id: 문서 id
+            content_hash: 기대하는 콘텐츠 해시 (불일치 시 None)
+            max_chars: 앞부분만 필요한 경우 최대 문자 수
+
+        Returns:
+            텍스트 또는 None
+        """
+        with self._lock:
+            if doc_id in self._pending_entries:
+                entry_hash, offset, length = self._pending_entries[doc_id]
+                if content_hash and content_hash != entry_hash:
+                    return None
+                data = bytes(self._pending[offset:offset + length])
+            else:
+                entry = self._entries.get(doc_id)
+                if entry is None:
+                    return None
+                entry_hash, block_id, offset, length = entry
+                if content_hash and content_hash != entry_hash:
+                    return None
+                block = self._read_block(block_id)
+                if block is None:
+                    return None
+                data = block[offset:offset + length]
+
+        text = data.decode("utf-8", errors="replace")
+        if max_chars is not None:
+            return text[:max_chars]
+        return text
+
+    def _read_block(self, block_id: int) -> Optional[bytes]:
+        """블록 읽기 (LRU 캐시 사용, 잠금 보유 상태에서 호출)"""
+        block = self._block_cache.get(block_id)
+        if block is not None:
+            self._block_cache.move_to_end(block_id)
+            return block
+
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT codec, data FROM text_blocks WHERE block_id = ?", (block_id,))
+                row = cursor.fetchone()
+            if not row:
+                logger.warning(f"텍스트 블록 없음: #{block_id}")
+                return None
+            codec, data = row
+            block = self._decompress(data, codec)
+        except Exception as e:
+            logger.error(f"텍스트 블록 읽기 실패: #{block_id}, {e}")
+            return None
+
+        self._remember_block(block_id, block)
+        return block
+
+    def _remember_block(self, block_id: int, block: bytes) -> None:
+        self._block_cache[block_id] = block
+        self._block_cache.move_to_end(block_id)
+        while len(self._block_cache) > self.block_cache_size:
+            self._block_cache.popitem(last=False)
+
+    # ===== 유지보수 =====
+
+    def garbage_ratio(self) -> float:
+        """기록된 바이트 중 더 이상 참조되지 않는 비율"""
+        with self._lock:
+            live = sum(length for _, _, _, length in self._entries.values())
+            total = live + self._garbage_bytes
+        return self._garbage_bytes / total if total else 0.0
+
+    def compact(self, min_garbage_ratio: float = 0.5) -> bool:
+        """가비지 비율이 높으면 살아있는 텍스트만 새 블록으로 재기록
+
+        새 블록은 항상 증가하는 block_id로 기록하고, 엔트리 전환과 기존 블록 퇴역 표시는
+        한 트랜잭션에서 처리한다. 퇴역 블록은 retire_grace_seconds가 지난 뒤에 삭제하므로
+        아직 reload하지 않은 읽기 워커도 이전 위치로 계속 읽을 수 있다.
+
+        Returns:
+            압축 정리를 수행했으면 True
+        """
+        with self._lock:
+            self.flush()
+            purged = self._purge_retired()
+            if self.garbage_ratio() < min_garbage_ratio:
+                if purged:
+                    self._vacuum()
+                return False
+
+            old_blocks = sorted(self._stored_block_ids())
+            live_items: List[Tuple[str, str, bytes]] = []
+            for doc_id, (content_hash, _, _, _) in sorted(self._entries.items(), key=lambda x: (x[1][1], x[1][2])):
+                text = self.get_text(doc_id)
+                if text is not None:
+                    live_items.append((doc_id, content_hash, text.encode("utf-8")))
+
+            # 새 블록 구성 (기존 block_id와 겹치지 않음)
+            blocks: List[Tuple[int, bytes]] = []
+            entries: Dict[str, Tuple[str, int, int, int]] = {}
+            block_id = self._next_block_id
+            buffer = bytearray()
+            for doc_id, content_hash, data in live_items:
+                entries[doc_id] = (content_hash, block_id, len(buffer), len(data))
+                buffer.extend(data)
+                if len(buffer) >= self.block_size:
+                    blocks.append((block_id, bytes(buffer)))
+                    block_id += 1
+                    buffer = bytearray()
+            if buffer:
+                blocks.append((block_id, bytes(buffer)))
+                block_id += 1
+
+            try:
+                with sqlite3.connect(self.db_path) as conn:
+                    cursor = conn.cursor()
+                    cursor.executemany(
+                        "INSERT INTO text_blocks (block_id, codec, raw_size, data) VALUES (?, ?, ?, ?)",
+                        [(new_id, self.codec, len(raw), self._compress(raw)) for new_id, raw in blocks]
+                    )
+                    cursor.execute("DELETE FROM text_entries")
+                    cursor.executemany(
+                        "INSERT INTO text_entries (doc_id, content_hash, block_id, offset, length) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        [(doc_id,) + entry for doc_id, entry in entries.items()]
+                    )
+                    retired_at = time.time()
+                    cursor.executemany(
+                        "INSERT OR IGNORE INTO retired_blocks (block_id, retired_at) VALUES (?, ?)",
+                        [(old_id, retired_at) for old_id in old_blocks]
+                    )
+                    conn.commit()
+            except Exception as e:
+                logger.error(f"텍스트 저장소 정리 실패: {e}")
+                raise
+
+            self._entries = entries
+            self._block_cache.clear()
+            self._garbage_bytes = 0
+            self._next_block_id = block_id
+
+            logger.info(f"텍스트 저장소 정리 완료: {len(live_items)}개 문서, 퇴역 블록 {len(old_blocks)}개")
+            return True
+
+    def _stored_block_ids(self) -> set:
+        """퇴역하지 않은 기록 블록 id (잠금 보유 상태에서 호출)"""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT block_id FROM text_blocks WHERE block_id NOT IN (SELECT block_id FROM retired_blocks)"
+            )
+            return {row[0] for row in cursor.fetchall()}
+
+    def _purge_retired(self) -> int:
+        """유예 시간이 지난 퇴역 블록 삭제 (잠금 보유 상태에서 호출)
+
+        Returns:
+            삭제된 블록 수
+        """
+        cutoff = time.time() - self.retire_grace_seconds
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    "DELETE FROM text_blocks WHERE block_id IN "
+                    "(SELECT block_id FROM retired_blocks WHERE retired_at <= ?)",
+                    (cutoff,)
+                )
+                purged = cursor.rowcount
+                cursor.execute("DELETE FROM retired_blocks WHERE retired_at <= ?", (cutoff,))
+                conn.commit()
+        except Exception as e:
+            logger.warning(f"퇴역 블록 삭제 실패: {e}")
+            return 0
+        if purged > 0:
+            logger.debug(f"퇴역 텍스트 블록 삭제: {purged}개")
+        return max(purged, 0)
+
+    def _vacuum(self) -> None:
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.execute("VACUUM")
+        except Exception as e:
+            logger.debug(f"VACUUM 실패: {e}")
+
+    def get_statistics(self) -> Dict:
+        """저장소 통계"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT COUNT(*), COALESCE(SUM(raw_size), 0), COALESCE(SUM(LENGTH(data)), 0) FROM text_blocks")
+                block_count, raw_size, compressed_size = cursor.fetchone()
+
+            with self._lock:
+                cached_bytes = sum(len(block) for block in self._block_cache.values())
+                document_count = len(self._entries) + len(self._pending_entries)
+
+            return {
+                "codec": self.codec,
+                "documents": document_count,
+                "blocks": block_count,
+                "raw_bytes": raw_size,
+                "compressed_bytes": compressed_size,
+                "compression_ratio": round(raw_size / compressed_size, 2) if compressed_size else 0.0,
+                "garbage_ratio": round(self.garbage_ratio(), 3),
+                "block_cache_bytes": cached_bytes
+            }
+        except Exception as e:
+            logger.error(f"텍스트 저장소 통계 생성 실패: {e}")
+            return {}
+
+
+def test_text_store():
+    """텍스트 저장소 테스트"""
+    import tempfile
+    import shutil
+
+    try:
+        temp_dir = tempfile.mkdtemp()
+        store = DocumentTextStore(temp_dir, block_size=256)
+
+        texts = {f"doc_{i}.md": f"문서 {i} 내용입니다. " * (i + 5) for i in range(20)}
+        written = store.put_many((doc_id, f"hash{i}", text) for i, (doc_id, text) in enumerate(texts.items()))
+        print(f"저장: {written}개")
+
+        reopened = DocumentTextStore(temp_dir, block_size=256)
+        ok = all(reopened.get_text(doc_id) == text for doc_id, text in texts.items())
+        print(f"재오픈 후 조회 일치: {ok}")
+        print(f"해시 불일치 시 None: {reopened.get_text('doc_0.md', 'other') is None}")
+        print(f"통계: {reopened.get_statistics()}")
+
+        shutil.rmtree(temp_dir)
+        print("✅ 텍스트 저장소 테스트 완료!")
+        return True
+
+    except Exception as e:
+        print(f"❌ 텍스트 저장소 테스트 실패: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    test_text_store()
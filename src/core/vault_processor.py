@@ -25,7 +25,7 @@ class Document:
     """문서 정보를 담는 데이터 클래스"""
     path: str
     title: str
-    content: str
+    content: Optional[str]  # detach_content() 이후 None → get_content() 사용
     tags: List[str]
     frontmatter: Dict
     word_count: int
@@ -35,6 +35,44 @@ class Document:
     file_hash: str
     embedding: Optional[object] = None
 
+    def get_content(self) -> str:
+        """본문 반환 (detach_content() 이후에는 텍스트 저장소에서 읽음)
+
+        content 필드는 분리된 문서에서 None이므로 본문이 필요한 곳은 이 메서드를 사용
+        """
+        if self.content is not None:
+            return self.content
+
+        text_store = getattr(self, '_text_store', None)
+        if text_store is None:
+            return ""
+
+        text = text_store.get_text(self.path, self.file_hash)
+        if text is None:
+            logger.warning(f"텍스트 저장소에서 본문을 찾을 수 없음: {self.path}")
+            return ""
+        return text
+
+    def detach_content(self, text_store) -> None:
+        """본문을 텍스트 저장소로 넘기고 메모리에서 해제 (content = None)
+
+        저장소 참조는 dataclass 필드가 아니므로 비교/repr/asdict에 포함되지 않음
+        """
+        self._text_store = text_store
+        self.content = None
+
+    @property
+    def content_loaded(self) -> bool:
+        """본문이 메모리에 상주하는지 여부"""
+        return self.content is not None
+
+    def __getstate__(self) -> Dict:
+        """pickle/copy 시 저장소 연결 대신 본문을 담아 독립적인 문서로 만듦"""
+        state = dict(self.__dict__)
+        if state.pop('_text_store', None) is not None and state.get('content') is None:
+            state['content'] = self.get_content()
+        return state
+
 
 class VaultProcessor:
     """Vault 파일 처리기"""
@@ -96,35 +134,11 @@ class VaultProcessor:
                 # 폴더 필터링 로직
                 current_path = Path(root)
                 relative_path = current_path.relative_to(self.vault_path)
-                relative_str = str(relative_path)
-                
-                # include_folders가 설정된 경우: 해당 폴더들만 포함
-                if self.include_folders:
-                    should_include = False
-                    for include_folder in self.include_folders:
-                        if relative_str == include_folder or relative_str.startswith(include_folder + '/') or relative_str == '.':
-                            should_include = True
-                            break
-                    if not should_include:
-                        continue
-                
-                # exclude_folders 추가 필터링
-                if self.exclude_folders:
-                    should_exclude = False
-                    for exclude_folder in self.exclude_folders:
-                        if relative_str == exclude_folder or relative_str.startswith(exclude_folder + '/'):
-                            should_exclude = True
-                            break
-                    if should_exclude:
-                        continue
+                if not self._is_folder_included(str(relative_path)):
+                    continue
                 
                 for file_name in file_names:
-                    # 파일 확장자 필터링
-                    if not any(file_name.endswith(ext) for ext in self.file_extensions):
-                        continue
-                    
-                    # 제외 파일 패턴 필터링
-                    if self._should_exclude_file(file_name):
+                    if not self._is_file_name_included(file_name):
                         continue
                     
                     file_path = Path(root) / file_name
@@ -137,6 +151,64 @@ class VaultProcessor:
             logger.error(f"파일 검색 실패: {e}")
             return []
     
+    def _is_folder_included(self, relative_str: str) -> bool:
+        """include_folders / exclude_folders 기준 폴더 포함 여부 (vault 기준 상대 경로)"""
+        # include_folders가 설정된 경우: 해당 폴더들만 포함
+        if self.include_folders:
+            should_include = False
+            for include_folder in self.include_folders:
+                if relative_str == include_folder or relative_str.startswith(include_folder + '/') or relative_str == '.':
+                    should_include = True
+                    break
+            if not should_include:
+                return False
+        
+        # exclude_folders 추가 필터링
+        if self.exclude_folders:
+            for exclude_folder in self.exclude_folders:
+                if relative_str == exclude_folder or relative_str.startswith(exclude_folder + '/'):
+                    return False
+        
+        return True
+    
+    def _is_file_name_included(self, file_name: str) -> bool:
+        """확장자 / 제외 패턴 기준 파일 포함 여부"""
+        # 파일 확장자 필터링
+        if not any(file_name.endswith(ext) for ext in self.file_extensions):
+            return False
+        
+        # 제외 파일 패턴 필터링
+        return not self._should_exclude_file(file_name)
+    
+    def vault_fingerprint(self) -> Dict:
+        """처리 대상 파일의 (상대 경로, 크기, 수정 시각) 요약 - 파일을 읽지 않고 stat만 사용
+        
+        인덱스 스냅샷이 현재 vault와 같은 상태에서 만들어졌는지 빠르게 확인하는 데 사용
+        """
+        digest = hashlib.sha1()
+        files = sorted(self.find_all_files())
+        for file_path in files:
+            try:
+                stat = file_path.stat()
+            except OSError:
+                continue
+            relative = file_path.relative_to(self.vault_path).as_posix()
+            digest.update(f"{relative}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode("utf-8"))
+        return {"files": len(files), "digest": digest.hexdigest()}
+    
+    def should_process(self, file_path: Path) -> bool:
+        """find_all_files()와 같은 규칙으로 처리 대상 여부 판단 (파일 감시용, 삭제된 경로도 판단 가능)"""
+        try:
+            relative_path = Path(file_path).relative_to(self.vault_path)
+        except ValueError:
+            return False
+        
+        if any(part in self.excluded_dirs for part in relative_path.parts[:-1]):
+            return False
+        if not self._is_folder_included(str(relative_path.parent)):
+            return False
+        return self._is_file_name_included(relative_path.name)
+    
     def _should_exclude_file(self, file_name: str) -> bool:
         """파일이 제외 패턴에 매칭되는지 확인"""
         for pattern in self.excluded_files:
@@ -406,7 +478,7 @@ class VaultProcessor:
         
         for doc in documents:
             if (query_lower in doc.title.lower() or 
-                query_lower in doc.content.lower() or
+                query_lower in doc.get_content().lower() or
                 any(query_lower in tag.lower() for tag in doc.tags)):
                 results.append(doc)
         
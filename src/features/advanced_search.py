@@ -7,10 +7,12 @@ Sentence Transformers 기반 의미적 검색 및 하이브리드 검색 엔진
 
 import os
 import re
+import time
 import logging
-from typing import List, Dict, Optional, Tuple, Union
+import threading
+from typing import Callable, List, Dict, Optional, Set, Tuple, Union
 from pathlib import Path
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 from datetime import datetime
 import numpy as np
 from collections import defaultdict
@@ -24,6 +26,13 @@ except ImportError:
 from ..core.sentence_transformer_engine import SentenceTransformerEngine
 from ..core.embedding_cache import EmbeddingCache, CachedEmbedding
 from ..core.vault_processor import VaultProcessor, Document
+from ..core.text_store import DocumentTextStore
+from ..core.query_embedding_cache import QueryEmbeddingCache
+from ..core.similar_query_cache import CandidateReuse, SimilarQueryCache
+from ..core.passage_splitter import Passage, split_passages
+from ..core.lexical_index import LexicalIndex
+from ..core.search_stages import StageTimer, record_candidates, record_scores
+from ..core.reindex_checkpoint import BuildProgress, ReindexCancelled, ReindexRun
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -38,6 +47,8 @@ class SearchResult:
     matched_keywords: List[str] = None
     snippet: str = ""
     rank: int = 0
+    section: str = ""  # 가장 잘 맞은 패시지의 헤딩 앵커 (패시지 모드)
+    reuse: Optional[CandidateReuse] = None  # 근접 중복 쿼리의 후보 집합으로 채점한 경우
 
 
 @dataclass 
@@ -52,6 +63,35 @@ class SearchQuery:
     exclude_paths: List[str] = None
 
 
+@dataclass
+class TieredSearchResult:
+    """마감 시간 기반 단계별 검색 결과"""
+    results: List[SearchResult]
+    tiers: List[Dict] = field(default_factory=list)  # 단계별 {tier, ran, ms | reason, estimated_ms, remaining_ms}
+    deadline_ms: Optional[float] = None
+    elapsed_ms: float = 0.0
+
+    @property
+    def degraded(self) -> bool:
+        """요청한 단계 중 건너뛴 단계가 있는지"""
+        return any(not tier["ran"] for tier in self.tiers)
+
+
+def _model_weight_bytes(model, depth: int = 3) -> int:
+    """모델 래퍼(.model 체인)를 따라가 torch 파라미터 크기 합산 (알 수 없으면 0)"""
+    for _ in range(depth):
+        if model is None:
+            return 0
+        parameters = getattr(model, 'parameters', None)
+        if callable(parameters):
+            try:
+                return sum(p.numel() * p.element_size() for p in parameters())
+            except Exception:
+                return 0
+        model = getattr(model, 'model', None)
+    return 0
+
+
 class AdvancedSearchEngine:
     """고급 검색 엔진"""
     
@@ -59,31 +99,81 @@ class AdvancedSearchEngine:
         self,
         vault_path: str,
         cache_dir: str,
-        config: Dict = None
+        config: Dict = None,
+        auto_load: bool = True,
+        embedding_engine: Optional[SentenceTransformerEngine] = None,
+        model_host: Optional["AdvancedSearchEngine"] = None
     ):
         """
         Args:
             vault_path: Vault 경로
             cache_dir: 캐시 디렉토리
             config: 검색 설정
+            auto_load: 생성 시 캐시된 임베딩으로 인덱스 복원 (스냅샷을 적재할 워커는 False)
+            embedding_engine: 다른 엔진의 임베딩 모델을 공유 (여러 vault를 한 프로세스에서 서빙할 때 모델 1개만 로드)
+            model_host: 보조 모델(재순위화, ColBERT 가중치)을 빌려올 엔진 (ColBERT 인덱스는 엔진마다 따로)
         """
         self.vault_path = Path(vault_path)
         self.cache_dir = cache_dir
         self.config = config or {}
         
-        # 핵심 컴포넌트 초기화 (성능 최적화 설정)
-        self.engine = SentenceTransformerEngine(
+        # 쿼리 임베딩 LRU 캐시 (반복 쿼리의 BGE-M3 forward pass 생략)
+        model_config = self.config.get('model', {})
+        query_cache_config = self.config.get('query_cache', {})
+        query_cache = None
+        if embedding_engine is None and query_cache_config.get('enabled', True):
+            query_cache = QueryEmbeddingCache(
+                model_name=model_config.get('name', 'BAAI/bge-m3'),
+                max_length=model_config.get('max_length', 4096),
+                max_entries=query_cache_config.get('max_entries', 1024),
+                max_chars=query_cache_config.get('max_chars', 512),
+                cache_dir=cache_dir if query_cache_config.get('persist', True) else None,
+                flush_interval=query_cache_config.get('flush_interval_seconds', 5)
+            )
+        
+        # 핵심 컴포넌트 초기화 (성능 최적화 설정) - 공유 모델이 있으면 그대로 사용 (쿼리 캐시 포함)
+        self.engine = embedding_engine or SentenceTransformerEngine(
             model_name=self.config.get('model', {}).get('name', 'BAAI/bge-m3'),
             cache_dir=self.config.get('model', {}).get('cache_folder', 'models'),
             device=self.config.get('model', {}).get('device'),
             use_fp16=self.config.get('model', {}).get('use_fp16', False),
             batch_size=self.config.get('model', {}).get('batch_size', 4),
             max_length=self.config.get('model', {}).get('max_length', 4096),
-            num_workers=self.config.get('model', {}).get('num_workers', 6)
+            num_workers=self.config.get('model', {}).get('num_workers', 6),
+            token_budget=self.config.get('model', {}).get('token_budget'),
+            max_batch_size=self.config.get('model', {}).get('max_batch_size', 64),
+            query_cache=query_cache
         )
         
         self.cache = EmbeddingCache(cache_dir)
         
+        # 근접 중복 쿼리 캐시 (비슷한 쿼리는 이전 후보만 다시 채점)
+        similar_config = self.config.get('similar_query_cache', {})
+        self.similar_query_cache: Optional[SimilarQueryCache] = None
+        if similar_config.get('enabled', False):
+            self.similar_query_cache = SimilarQueryCache(
+                max_entries=similar_config.get('max_entries', 256),
+                threshold=similar_config.get('threshold', 0.95),
+                candidates=similar_config.get('candidates', 100),
+                max_blend=similar_config.get('max_blend', 3)
+            )
+        
+        # 문서 본문 압축 저장소 (본문을 메모리에 상주시키지 않음)
+        text_store_config = self.config.get('text_store', {})
+        self.text_store: Optional[DocumentTextStore] = None
+        if text_store_config.get('enabled', True):
+            try:
+                self.text_store = DocumentTextStore(
+                    cache_dir,
+                    codec=text_store_config.get('codec', 'zstd'),
+                    block_size=text_store_config.get('block_size_kb', 64) * 1024,
+                    block_cache_size=text_store_config.get('block_cache_size', 16),
+                    retire_grace_seconds=text_store_config.get('retire_grace_seconds', 600)
+                )
+            except Exception as e:
+                logger.warning(f"텍스트 저장소 초기화 실패, 본문을 메모리에 유지합니다: {e}")
+                self.text_store = None
+        
         self.processor = VaultProcessor(
             str(vault_path),
             excluded_dirs=self.config.get('vault', {}).get('excluded_dirs'),
@@ -100,24 +190,65 @@ class AdvancedSearchEngine:
         self.indexed = False
         self.is_sampled = False
         self.sample_size = None
+        # 인덱스가 바뀔 때마다 증가 (서버 결과 캐시 무효화 기준)
+        self.index_version = 0
+        # (원본 임베딩 배열, 정규화 배열) - 원본이 바뀔 때만 다시 정규화
+        self._normalized_embeddings: Tuple[Optional[np.ndarray], Optional[np.ndarray]] = (None, None)
+        
+        # 패시지 인덱스 (긴 노트를 섹션/청크 단위로 임베딩)
+        self.passage_config = self.config.get('passages', {})
+        self.passage_embeddings: Optional[np.ndarray] = None  # 정규화된 패시지 임베딩
+        self.passage_offsets: Optional[np.ndarray] = None  # 문서별 패시지 시작 위치
+        self.passage_doc_indices: Optional[np.ndarray] = None  # 패시지 그룹 → 문서 인덱스
+        self.passage_ids: List[str] = []
+        self.passage_anchors: List[str] = []
+        self.passage_hashes: List[str] = []
+        self.passage_texts: List[str] = []  # 텍스트 저장소가 없을 때만 사용
+        # (패시지 그룹 → 문서 배열, 문서 → 패시지 그룹 배열) - 후보 채점용, 패시지 배열이 바뀔 때만 재구성
+        self._passage_groups: Tuple[Optional[np.ndarray], Optional[np.ndarray]] = (None, None)
+        
+        # 지연 로드한 보조 모델 (재순위화/ColBERT) - 엔진 복사본과 공유해 요청마다 다시 로드하지 않음
+        self._resident_models: Dict[str, object] = {}
+        self._resident_lock = threading.Lock()
+        self._model_host = model_host
+        self._colbert_index_version: Optional[int] = None
+        # 단계별 관측 비용 (후보 1개당 초, 지수 이동 평균) - 엔진 복사본과 공유
+        self._tier_costs: Dict[str, float] = {}
+        
+        self._reset_derived_index()
         
         logger.info(f"고급 검색 엔진 초기화: {vault_path}")
         
         # 기존 인덱스 자동 로드 시도
-        self.load_index()
+        if auto_load:
+            self.load_index()
     
-    def build_index(self, force_rebuild: bool = False, progress_callback=None, sample_size: Optional[int] = None) -> bool:
+    def build_index(
+        self,
+        force_rebuild: bool = False,
+        progress_callback=None,
+        sample_size: Optional[int] = None,
+        with_colbert: bool = False,
+        progress: Optional[BuildProgress] = None
+    ) -> bool:
         """검색 인덱스 구축
         
+        임베딩은 indexing.checkpoint_every개 문서마다 캐시에 저장하고 진행 상황을 체크포인트로 남긴다.
+        중단(프로세스 종료)/취소된 재구축은 다시 실행하면 저장된 지점부터 이어서 진행한다.
+        
         Args:
             force_rebuild: 강제 재구축 여부
             progress_callback: 진행률 콜백
             sample_size: 샘플링할 문서 수 (None이면 전체 처리)
+            with_colbert: ColBERT 인덱스도 함께 구축
+            progress: 단계/진행률 보고 및 취소 확인 (취소되면 ReindexCancelled 발생)
         """
+        run = ReindexRun(self.cache.cache_dir, force_rebuild, with_colbert=with_colbert, progress=progress)
         try:
             logger.info("검색 인덱스 구축 시작...")
             
             # 문서 처리
+            run.start_phase("scanning")
             self.documents = self.processor.process_all_files(progress_callback)
             logger.info(f"처리된 문서: {len(self.documents)}개")
             
@@ -131,14 +262,14 @@ class AdvancedSearchEngine:
                 logger.warning(f"⚠️  대규모 vault 감지 ({len(self.documents)}개 문서)")
                 logger.warning(f"📊 성능 최적화를 위해 --sample-size {recommended_size} 옵션 사용을 권장합니다")
             
-            # BGE-M3 임베딩 엔진 훈련 (샘플링 지원)
-            all_contents = [doc.content for doc in self.documents]
-            all_paths = [doc.path for doc in self.documents]
-            self.engine.fit_documents(all_contents, all_paths, sample_size=sample_size)
-            logger.info("BGE-M3 임베딩 엔진 훈련 완료")
-            
             # 샘플링 모드일 때는 BGE-M3 엔진의 임베딩을 직접 사용
             if sample_size and sample_size < len(self.documents):
+                all_contents = [doc.get_content() for doc in self.documents]
+                all_paths = [doc.path for doc in self.documents]
+                self.engine.fit_documents(all_contents, all_paths, sample_size=sample_size)
+                self.engine.release_document_texts()
+                del all_contents
+                logger.info("BGE-M3 임베딩 엔진 훈련 완료")
                 logger.info("📊 샘플링 모드: BGE-M3 엔진의 임베딩을 직접 사용")
                 embeddings_list = []
                 
@@ -167,82 +298,90 @@ class AdvancedSearchEngine:
                     self.sample_size = len(sampled_documents)
                     
                     logger.info(f"✅ 샘플링 인덱스 구축 완료: {len(sampled_documents)}개 문서")
+                    self._build_passage_index(force_rebuild)
+                    self._offload_document_texts()
                     
                     # 샘플링 인덱스 저장
                     self.save_index()
+                    self.index_version += 1
+                    if with_colbert:
+                        self._build_colbert_index(force_rebuild=force_rebuild, run=run)
+                    run.finish()
                     
                     return True
             
-            # 전체 문서 처리 (기존 로직)
-            embeddings_list = []
+            # 전체 문서 처리: 캐시 히트는 재사용하고 미스만 길이 버킷 배치로 한 번에 임베딩
+            embeddings_list: List[Optional[np.ndarray]] = [None] * len(self.documents)
+            missing_indices = []
             cache_hits = 0
             new_embeddings = 0
             
             for i, doc in enumerate(self.documents):
-                try:
-                    # 캐시에서 임베딩 조회
-                    cached = self.cache.get_embedding(
-                        str(self.vault_path / doc.path), 
-                        doc.file_hash
-                    )
+                cached = self.cache.get_embedding(
+                    str(self.vault_path / doc.path), 
+                    doc.file_hash
+                )
+                
+                if cached is None or not run.is_reusable(cached.created_at):
+                    missing_indices.append(i)
+                elif (isinstance(cached.embedding, np.ndarray) and 
+                      cached.embedding.size > 0 and 
+                      not np.allclose(cached.embedding, 0)):
+                    embeddings_list[i] = cached.embedding
+                    doc.embedding = cached.embedding
+                    cache_hits += 1
+                else:
+                    logger.warning(f"유효하지 않은 캐시 임베딩: {doc.path}")
+                    missing_indices.append(i)
+            
+            encodable = []
+            for i in missing_indices:
+                doc = self.documents[i]
+                if doc.get_content().strip():
+                    encodable.append(i)
+                else:
+                    logger.warning(f"빈 내용 문서: {doc.path}")
+            
+            run.start_phase("embedding", len(encodable))
+            if encodable:
+                logger.info(f"🔄 신규/변경 문서 {len(encodable)}개 임베딩 생성 (캐시 히트 {cache_hits}개)")
+                # 청크마다 캐시에 저장 → 중단돼도 다음 실행은 남은 청크부터
+                chunk_size = max(int(self.config.get('indexing', {}).get('checkpoint_every', 256)), 1)
+                for start in range(0, len(encodable), chunk_size):
+                    chunk = encodable[start:start + chunk_size]
+                    encoded = self._encode_note_embeddings(chunk, force_rebuild=force_rebuild)
                     
-                    if cached and not force_rebuild:
-                        # 캐시된 임베딩 검증
-                        if (isinstance(cached.embedding, np.ndarray) and 
-                            cached.embedding.size > 0 and 
-                            not np.allclose(cached.embedding, 0)):
-                            embeddings_list.append(cached.embedding)
-                            doc.embedding = cached.embedding
-                            cache_hits += 1
-                        else:
-                            logger.warning(f"유효하지 않은 캐시 임베딩: {doc.path}")
-                            # 새로 생성
-                            embedding = self.engine.encode_text(doc.content)
-                            embeddings_list.append(embedding)
-                            doc.embedding = embedding
+                    for i in chunk:
+                        doc = self.documents[i]
+                        embedding = encoded[i]
+                        if np.allclose(embedding, 0):
+                            logger.warning(f"0인 임베딩 생성됨: {doc.path}")
+                            continue
+                        
+                        embeddings_list[i] = embedding
+                        doc.embedding = embedding
+                        try:
                             self.cache.store_embedding(
                                 str(self.vault_path / doc.path),
                                 embedding,
                                 self.engine.model_name,
                                 doc.word_count
                             )
-                            new_embeddings += 1
-                    else:
-                        # 새 임베딩 생성
-                        if doc.content and doc.content.strip():
-                            embedding = self.engine.encode_text(doc.content)
-                            if embedding is not None and not np.allclose(embedding, 0):
-                                embeddings_list.append(embedding)
-                                doc.embedding = embedding
-                                
-                                # 캐시에 저장
-                                self.cache.store_embedding(
-                                    str(self.vault_path / doc.path),
-                                    embedding,
-                                    self.engine.model_name,
-                                    doc.word_count
-                                )
-                                new_embeddings += 1
-                            else:
-                                logger.warning(f"0인 임베딩 생성됨: {doc.path}")
-                                empty_embedding = np.zeros(self.engine.embedding_dimension)
-                                embeddings_list.append(empty_embedding)
-                                doc.embedding = empty_embedding
-                        else:
-                            logger.warning(f"빈 내용 문서: {doc.path}")
-                            empty_embedding = np.zeros(self.engine.embedding_dimension)
-                            embeddings_list.append(empty_embedding)
-                            doc.embedding = empty_embedding
+                        except Exception as e:
+                            logger.error(f"임베딩 캐시 저장 실패: {doc.path}, {e}")
+                        new_embeddings += 1
+                        
+                        # 진행률 콜백
+                        if progress_callback and new_embeddings % 50 == 0:
+                            progress_callback(new_embeddings, len(encodable))
                     
-                    # 진행률 콜백
-                    if progress_callback and (i + 1) % 50 == 0:
-                        progress_callback(i + 1, len(self.documents))
-                
-                except Exception as e:
-                    logger.error(f"임베딩 처리 실패: {doc.path}, {e}")
-                    # 빈 임베딩으로 대체
+                    run.advance(len(chunk))
+            
+            # 임베딩 실패/빈 문서는 제로 벡터로 대체
+            for i, doc in enumerate(self.documents):
+                if embeddings_list[i] is None:
                     empty_embedding = np.zeros(self.engine.embedding_dimension)
-                    embeddings_list.append(empty_embedding)
+                    embeddings_list[i] = empty_embedding
                     doc.embedding = empty_embedding
             
             # 임베딩 배열 생성
@@ -255,16 +394,29 @@ class AdvancedSearchEngine:
                 logger.info(f"- 캐시 히트: {cache_hits}개")
                 logger.info(f"- 신규 임베딩: {new_embeddings}개")
                 logger.info(f"- 임베딩 형태: {self.embeddings.shape}")
+                self._build_passage_index(force_rebuild, run=run)
+                self._offload_document_texts()
                 
                 # 인덱스 저장
+                run.start_phase("saving")
                 self.save_index()
+                self.index_version += 1
+                
+                if with_colbert:
+                    self._build_colbert_index(force_rebuild=force_rebuild, run=run)
+                run.finish()
                 
                 return True
             
             return False
         
+        except ReindexCancelled as e:
+            logger.warning(f"인덱스 구축 취소: {e}")
+            run.abort("cancelled")
+            raise
         except Exception as e:
             logger.error(f"인덱스 구축 실패: {e}")
+            run.abort("failed")
             return False
     
     def load_index(self) -> bool:
@@ -300,10 +452,13 @@ class AdvancedSearchEngine:
             missing_docs = []
             cached_docs = []
             
-            for doc in self.documents:
+            missing_indices = []
+            
+            for i, doc in enumerate(self.documents):
                 cached = self.cache.get_embedding(doc.path, doc.file_hash)
                 if cached is None:
                     missing_docs.append(doc)
+                    missing_indices.append(i)
                 else:
                     cached_docs.append(doc)
                     cached_embeddings.append(cached.embedding)
@@ -318,8 +473,8 @@ class AdvancedSearchEngine:
             # 누락 문서만 임베딩 생성
             if missing_docs:
                 logger.info(f"🔄 누락된 {len(missing_docs)}개 문서만 임베딩 생성...")
-                missing_texts = [doc.content for doc in missing_docs]
-                missing_embeddings = self.engine.encode_texts(missing_texts)
+                encoded = self._encode_note_embeddings(missing_indices)
+                missing_embeddings = np.array([encoded[i] for i in missing_indices])
                 
                 # 캐시에 저장
                 for doc, embedding in zip(missing_docs, missing_embeddings):
@@ -346,18 +501,600 @@ class AdvancedSearchEngine:
             for i, doc in enumerate(self.documents):
                 doc.embedding = self.embeddings[i]
             
-            # BM25 인덱스 재구축 (빠름)
-            from rank_bm25 import BM25Okapi
-            tokenized_docs = [doc.content.split() for doc in self.documents]
-            self.bm25 = BM25Okapi(tokenized_docs)
+            self._build_passage_index()
+            self._offload_document_texts()
             
             self.indexed = True
+            self.index_version += 1
             logger.info(f"✅ 점진적 인덱스 복원 완료: {len(self.documents)}개 문서 ({len(missing_docs)}개 새로 추가)")
             return True
         except Exception as e:
             logger.error(f"인덱스 로딩 실패: {e}")
             return False
+
+    def rebuild_index(
+        self,
+        force_rebuild: bool = False,
+        with_colbert: bool = False,
+        progress: Optional[BuildProgress] = None
+    ) -> Optional["AdvancedSearchEngine"]:
+        """복사본에서 build_index()를 실행해 반환 (현재 인스턴스는 검색을 계속 처리)
+
+        build_index()는 문서 목록/임베딩/패시지 배열을 모두 새 객체로 교체하므로
+        얕은 복사본에서 실행해도 원본 인덱스는 바뀌지 않는다. 실패 시 None, 취소 시 ReindexCancelled.
+        """
+        import copy
+
+        clone = copy.copy(self)
+        if not clone.build_index(force_rebuild=force_rebuild, with_colbert=with_colbert, progress=progress):
+            return None
+        return clone
+
+    def refresh_documents(
+        self,
+        changed_paths: List[str],
+        removed_paths: Optional[List[str]] = None
+    ) -> Optional["AdvancedSearchEngine"]:
+        """변경/삭제된 파일만 반영한 새 엔진 인스턴스 반환 (현재 인스턴스는 수정하지 않음)
+
+        모델·임베딩 캐시·텍스트 저장소는 공유하고 문서 목록과 임베딩 배열만 새로 구성하므로,
+        검색 중인 인스턴스를 건드리지 않고 반환값으로 교체(swap)하면 된다.
+
+        Args:
+            changed_paths: 추가/수정된 파일 경로 (절대 경로 또는 vault 기준 상대 경로)
+            removed_paths: 삭제된 파일 경로
+
+        Returns:
+            갱신된 엔진 인스턴스, 실패 시 None
+        """
+        import copy
+
+        if not self.indexed or self.is_sampled:
+            logger.warning("점진적 갱신 불가: 전체 인덱스가 없거나 샘플링 인덱스입니다.")
+            return None
+
+        try:
+            changed = {str(self.vault_path / p) for p in changed_paths}
+            removed = {str(self.vault_path / p) for p in (removed_paths or [])} - changed
+            touched = changed | removed
+
+            # 변경 없는 문서는 Document 객체와 임베딩을 그대로 재사용
+            documents: List[Document] = []
+            vectors: List[Optional[np.ndarray]] = []
+            for doc, embedding in zip(self.documents, self.embeddings):
+                if doc.path not in touched:
+                    documents.append(doc)
+                    vectors.append(embedding)
+
+            # 추가/수정 문서 처리 (사라졌거나 처리 대상이 아니면 삭제로 취급)
+            missing_indices = []
+            for path in sorted(changed):
+                file_path = Path(path)
+                doc = None
+                if file_path.exists() and self.processor.should_process(file_path):
+                    doc = self.processor.process_file(file_path)
+                if doc is None:
+                    removed.add(path)
+                    continue
+
+                cached = self.cache.get_embedding(doc.path, doc.file_hash)
+                if (cached is not None and cached.embedding.size > 0 and
+                        not np.allclose(cached.embedding, 0)):
+                    doc.embedding = cached.embedding
+                    vectors.append(cached.embedding)
+                else:
+                    missing_indices.append(len(documents))
+                    vectors.append(None)
+                documents.append(doc)
+
+            clone = copy.copy(self)
+            clone.documents = documents
+
+            encodable = [i for i in missing_indices if documents[i].get_content().strip()]
+            if encodable:
+                encoded = clone._encode_note_embeddings(encodable)
+                for i in encodable:
+                    embedding = encoded[i]
+                    if np.allclose(embedding, 0):
+                        logger.warning(f"0인 임베딩 생성됨: {documents[i].path}")
+                        continue
+                    vectors[i] = embedding
+                    documents[i].embedding = embedding
+                    self.cache.store_embedding(
+                        documents[i].path,
+                        embedding,
+                        self.engine.model_name,
+                        documents[i].word_count
+                    )
+
+            for i in missing_indices:
+                if vectors[i] is None:
+                    vectors[i] = np.zeros(self.engine.embedding_dimension)
+                    documents[i].embedding = vectors[i]
+
+            for path in removed:
+                self.cache.remove_embedding(path)
+                self.cache.remove_passage_embeddings(path)
+
+            clone.embeddings = (
+                np.array(vectors) if vectors
+                else np.zeros((0, self.engine.embedding_dimension))
+            )
+            clone.indexed = bool(documents)
+            # 변경 없는 노트의 패시지는 현재 인스턴스의 배열에서 가져오고 바뀐 노트만 캐시를 조회
+            clone._build_passage_index(reuse=self._passage_rows(exclude=touched | removed))
+            clone._offload_document_texts()
+            clone.save_index()
+            clone.index_version = self.index_version + 1
+
+            logger.info(
+                f"✅ 점진적 갱신 완료: {len(changed) - len(changed & removed)}개 반영, "
+                f"{len(removed)}개 제거 (신규 임베딩 {len(encodable)}개, 총 {len(documents)}개 문서)"
+            )
+            return clone
+
+        except Exception as e:
+            logger.error(f"점진적 갱신 실패: {e}")
+            return None
+
+    def _offload_document_texts(self) -> None:
+        """문서 본문을 텍스트 저장소로 옮기고 Document에서는 해제"""
+        if self.text_store is None or not self.documents:
+            return
+        
+        try:
+            written = self.text_store.put_many(
+                (doc.path, doc.file_hash, doc.content)
+                for doc in self.documents
+                if doc.content_loaded
+            )
+            
+            for doc in self.documents:
+                doc.detach_content(self.text_store)
+            
+            # 샘플링 인덱스는 일부 문서만 담으므로 정리하지 않음
+            if not self.is_sampled:
+                self.text_store.retain([doc.path for doc in self.documents] + self.passage_ids)
+            self.text_store.compact()
+            
+            logger.info(f"본문 텍스트 저장소 반영: {written}개 갱신, {len(self.documents)}개 분리")
+        except Exception as e:
+            logger.warning(f"본문 텍스트 저장소 반영 실패, 메모리에 유지합니다: {e}")
+
+    def memory_usage(self) -> Dict[str, int]:
+        """인덱스가 차지하는 메모리 추정치 (바이트, 구성 요소별 + total)
+        
+        모델 가중치는 제외 (여러 vault가 공유, resident_model_bytes 참고). 스냅샷에서 메모리 매핑한 배열도 크기대로 계산한다.
+        """
+        def nbytes(*arrays) -> int:
+            return sum(int(a.nbytes) for a in arrays if isinstance(a, np.ndarray))
+        
+        lexical = self._lexical_index[1]
+        usage = {
+            'embeddings': nbytes(self.embeddings, getattr(self, '_normalized_embeddings', (None, None))[1]),
+            # 문서별 임베딩이 행렬의 뷰가 아니라 별도 배열이면 따로 계산
+            'document_embeddings': sum(
+                nbytes(doc.embedding) for doc in self.documents
+                if isinstance(doc.embedding, np.ndarray)
+                and not (isinstance(self.embeddings, np.ndarray) and np.may_share_memory(doc.embedding, self.embeddings))
+            ),
+            'passages': nbytes(self.passage_embeddings, self.passage_offsets, self.passage_doc_indices),
+            'lexical_index': nbytes(lexical.offsets, lexical.docs, lexical.tfs) if lexical is not None else 0,
+            'neighbors': nbytes(self._neighbors[1], self._neighbors[2]),
+            # ColBERT 토큰 임베딩은 vault마다 따로 (모델 가중치는 공유)
+            'colbert_index': nbytes(*getattr(getattr(self, '_resident_models', {}).get('colbert'), 'colbert_embeddings', [])),
+            # 메타데이터는 문서당 고정 추정치 + 메모리에 남은 본문
+            'documents': sum(
+                512 + (len(doc.content) * 2 if doc.content_loaded else 0) for doc in self.documents
+            ),
+        }
+        usage['total'] = sum(usage.values())
+        return usage
+    
+    def _reset_derived_index(self) -> None:
+        """인덱스 버전별 파생 구조 (키워드 역색인, 최근접 이웃 표, 중심성) 초기화
+        
+        각 구조는 (인덱스 버전, 값)으로 보관하고 처음 필요할 때 구축하거나 스냅샷에서 적재한다.
+        """
+        self._lexical_index: Tuple[Optional[int], Optional[LexicalIndex]] = (None, None)
+        self._neighbors: Tuple[Optional[int], Optional[np.ndarray], Optional[np.ndarray]] = (None, None, None)
+        self._centrality: Tuple[Optional[int], Optional[Dict[str, float]]] = (None, None)
+        self._derived_lock = threading.Lock()
     
+    def _reset_passage_index(self) -> None:
+        """패시지 인덱스 초기화"""
+        self.passage_embeddings = None
+        self.passage_offsets = None
+        self.passage_doc_indices = None
+        self.passage_ids = []
+        self.passage_anchors = []
+        self.passage_hashes = []
+        self.passage_texts = []
+
+    def _split_document_passages(self, doc: Document) -> List[Passage]:
+        """원본 파일을 읽어 헤딩/토큰 기준 패시지로 분할"""
+        with open(self.vault_path / doc.path, 'r', encoding='utf-8') as f:
+            raw_content = f.read()
+
+        _, body = self.processor._extract_frontmatter(raw_content)
+        return split_passages(
+            body,
+            max_tokens=self.passage_config.get('max_tokens', 512),
+            split_on_headings=self.passage_config.get('split_on_headings', True),
+            count_tokens=self.engine.count_tokens,
+            clean=self.processor._clean_content,
+            context=doc.title
+        )
+
+    def _embed_document_passages(
+        self,
+        doc_indices: List[int],
+        reuse_cached: bool = True
+    ) -> Dict[int, List[Tuple[Passage, np.ndarray]]]:
+        """문서들을 패시지로 나눠 임베딩하고 캐시에 저장
+
+        내용(제목+헤딩+본문 해시)이 같은 패시지는 캐시된 임베딩을 재사용하고
+        바뀐 패시지만 새로 임베딩한다.
+
+        Returns:
+            문서 인덱스 → [(패시지, 임베딩)] (분할 실패 문서 제외)
+        """
+        split: Dict[int, List[Passage]] = {}
+        for doc_idx in doc_indices:
+            doc = self.documents[doc_idx]
+            try:
+                passages = self._split_document_passages(doc)
+            except Exception as e:
+                logger.warning(f"패시지 분할 실패: {doc.path}, {e}")
+                continue
+            if passages:
+                split[doc_idx] = passages
+
+        all_hashes = [p.passage_hash for passages in split.values() for p in passages]
+        reused = self.cache.get_passage_embeddings_by_hash(all_hashes, self.engine.model_name) if reuse_cached else {}
+        # 이전 인코딩 실패로 캐시된 0 벡터는 재사용하지 않고 다시 임베딩
+        reused = {h: embedding for h, embedding in reused.items() if not np.allclose(embedding, 0)}
+
+        pending = [
+            (doc_idx, passage)
+            for doc_idx, passages in split.items()
+            for passage in passages
+            if passage.passage_hash not in reused
+        ]
+        encoded: Dict[str, np.ndarray] = {}
+        if pending:
+            # 패시지만으로는 어느 노트인지 알 수 없으므로 제목을 앞에 붙여 임베딩
+            embeddings = self.engine.encode_passages(
+                [f"{self.documents[doc_idx].title}\n{passage.text}" for doc_idx, passage in pending],
+                max_length=self.passage_config.get('max_tokens', 512)
+            )
+            for (_, passage), embedding in zip(pending, embeddings):
+                # encode_passages는 실패 시 0 벡터를 돌려줌 → 캐시하지 않음
+                if not np.allclose(embedding, 0):
+                    encoded[passage.passage_hash] = embedding
+
+        logger.info(f"🔄 패시지 임베딩: {len(all_hashes) - len(pending)}개 재사용, {len(pending)}개 신규")
+
+        results: Dict[int, List[Tuple[Passage, np.ndarray]]] = {}
+        for doc_idx, passages in split.items():
+            doc = self.documents[doc_idx]
+            if any(p.passage_hash not in reused and p.passage_hash not in encoded for p in passages):
+                # 일부 패시지 임베딩 실패 → 저장하지 않고 다음 갱신 때 다시 시도
+                logger.warning(f"0인 패시지 임베딩 생성됨: {doc.path}")
+                continue
+            items = [
+                (p, reused[p.passage_hash] if p.passage_hash in reused else encoded[p.passage_hash])
+                for p in passages
+            ]
+            self.cache.store_passage_embeddings(
+                doc.path, doc.file_hash,
+                [p for p, _ in items],
+                np.array([embedding for _, embedding in items]),
+                self.engine.model_name
+            )
+            results[doc_idx] = items
+        return results
+
+    def _encode_note_embeddings(self, doc_indices: List[int], force_rebuild: bool = False) -> Dict[int, np.ndarray]:
+        """문서 임베딩 생성 (passages.compose_note_embeddings면 섹션 단위 재사용, 강제 재구축이면 섹션도 새로 임베딩)"""
+        encoded: Dict[int, np.ndarray] = {}
+        if self.passage_config.get('compose_note_embeddings', False):
+            encoded = self._compose_note_embeddings(doc_indices, force_rebuild=force_rebuild)
+
+        remaining = [i for i in doc_indices if i not in encoded]
+        if remaining:
+            embeddings = self.engine.encode_documents([self.documents[i].get_content() for i in remaining])
+            encoded.update(zip(remaining, embeddings))
+        return encoded
+
+    def _compose_note_embeddings(self, doc_indices: List[int], force_rebuild: bool = False) -> Dict[int, np.ndarray]:
+        """섹션 임베딩의 토큰 가중 평균으로 노트 임베딩 구성
+
+        노트 일부만 수정된 경우 바뀐 섹션만 임베딩하므로 재인덱싱 비용이 수정량에 비례한다.
+
+        Returns:
+            문서 인덱스 → 정규화된 노트 임베딩 (구성 실패 문서 제외)
+        """
+        composed: Dict[int, np.ndarray] = {}
+        for doc_idx, items in self._embed_document_passages(doc_indices, reuse_cached=not force_rebuild).items():
+            vectors = np.array([embedding for _, embedding in items], dtype=np.float32)
+            weights = np.array([max(p.token_count, 1) for p, _ in items], dtype=np.float32)
+            note_vector = (weights[:, None] * vectors).sum(axis=0) / weights.sum()
+            norm = float(np.linalg.norm(note_vector))
+            if norm > 0:
+                composed[doc_idx] = note_vector / norm
+        return composed
+
+    def _passage_rows(self, exclude: Set[str]) -> Dict[str, List[Tuple]]:
+        """현재 패시지 인덱스를 문서 경로별 행으로 분해 (_build_passage_index의 reuse 인자용)
+
+        exclude에 없는 모든 문서를 포함하며, 패시지 인덱스에 없는 (단일 패시지) 노트는 빈 목록
+        """
+        rows: Dict[str, List[Tuple]] = {doc.path: [] for doc in self.documents if doc.path not in exclude}
+        if self.passage_embeddings is None:
+            return rows
+
+        ends = list(self.passage_offsets[1:]) + [len(self.passage_ids)]
+        for start, end, doc_idx in zip(self.passage_offsets, ends, self.passage_doc_indices):
+            path = self.documents[doc_idx].path
+            if path not in rows:
+                continue
+            rows[path] = [
+                (position - start, self.passage_anchors[position], self.passage_hashes[position],
+                 self.passage_texts[position] if self.passage_texts else None,
+                 self.passage_embeddings[position])
+                for position in range(int(start), int(end))
+            ]
+        return rows
+
+    def _build_passage_index(
+        self,
+        force_rebuild: bool = False,
+        run: Optional[ReindexRun] = None,
+        reuse: Optional[Dict[str, List[Tuple]]] = None
+    ) -> None:
+        """긴 노트의 패시지 임베딩 인덱스 구축 (passages.enabled일 때만)
+
+        패시지가 2개 이상인 노트만 패시지 인덱스에 포함하고,
+        짧은 노트는 문서 단위 임베딩을 그대로 사용한다.
+        run이 있으면 청크마다 진행을 기록하고, 강제 재구축이라도 이번 재구축에서 이미 저장한 노트는 재사용한다.
+        reuse(경로 → 행, _passage_rows 참고)에 있는 문서는 캐시를 다시 읽지 않고 그 행을 그대로 쓴다.
+        """
+        self._reset_passage_index()
+        if not self.passage_config.get('enabled', False) or not self.documents:
+            return
+
+        try:
+            # doc_idx -> [(passage_index, anchor, passage_hash, text 또는 None, embedding)]
+            doc_passages: Dict[int, List[Tuple]] = {}
+            stale: List[int] = []
+            cache_hits = 0
+
+            for doc_idx, doc in enumerate(self.documents):
+                if reuse is not None and doc.path in reuse:
+                    if reuse[doc.path]:
+                        doc_passages[doc_idx] = reuse[doc.path]
+                    cache_hits += 1
+                    continue
+                if run is not None:
+                    cached = self.cache.get_passage_embeddings(doc.path, doc.file_hash)
+                    if cached is not None and not all(run.is_reusable(c.created_at) for c in cached):
+                        cached = None
+                else:
+                    cached = None if force_rebuild else self.cache.get_passage_embeddings(doc.path, doc.file_hash)
+                if cached is not None and any(np.allclose(c.embedding, 0) for c in cached):
+                    cached = None  # 이전 인코딩 실패로 저장된 0 벡터
+                if cached is None:
+                    stale.append(doc_idx)
+                    continue
+                if len(cached) > 1:
+                    doc_passages[doc_idx] = [
+                        (c.passage_index, c.anchor, c.passage_hash, None, c.embedding)
+                        for c in cached
+                    ]
+                cache_hits += 1
+
+            if run is not None:
+                run.start_phase("passages", len(stale))
+            chunk_size = max(int(self.config.get('indexing', {}).get('checkpoint_every', 256)), 1)
+            embedded: Dict[int, List[Tuple[Passage, np.ndarray]]] = {}
+            for start in range(0, len(stale), chunk_size):
+                chunk = stale[start:start + chunk_size]
+                embedded.update(self._embed_document_passages(chunk, reuse_cached=not force_rebuild))
+                if run is not None:
+                    run.advance(len(chunk))
+            if embedded:
+                for doc_idx, items in embedded.items():
+                    if len(items) > 1:
+                        doc_passages[doc_idx] = [
+                            (p.index, p.anchor, p.passage_hash, p.text, embedding)
+                            for p, embedding in items
+                        ]
+
+            if not doc_passages:
+                logger.info("패시지 인덱스 대상 문서 없음 (모든 노트가 단일 패시지)")
+                return
+
+            # 문서 순서대로 연속 배치해 reduceat으로 집계할 수 있게 구성
+            vectors, offsets, doc_indices, new_texts = [], [], [], []
+            for doc_idx in sorted(doc_passages):
+                doc = self.documents[doc_idx]
+                offsets.append(len(vectors))
+                doc_indices.append(doc_idx)
+                for passage_index, anchor, passage_hash, text, embedding in doc_passages[doc_idx]:
+                    passage_id = EmbeddingCache.make_passage_id(doc.path, passage_index)
+                    vectors.append(embedding)
+                    self.passage_ids.append(passage_id)
+                    self.passage_anchors.append(anchor)
+                    self.passage_hashes.append(passage_hash)
+                    if text is not None:
+                        new_texts.append((passage_id, passage_hash, text))
+
+            matrix = np.asarray(vectors, dtype=np.float32)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            self.passage_embeddings = matrix / np.maximum(norms, 1e-12)
+            self.passage_offsets = np.asarray(offsets, dtype=np.int64)
+            self.passage_doc_indices = np.asarray(doc_indices, dtype=np.int64)
+
+            # 스니펫용 패시지 텍스트: 저장소가 있으면 디스크로, 없으면 새로 분할한 것만 메모리에
+            if self.text_store is not None:
+                self.text_store.put_many(new_texts)
+            else:
+                text_by_id = {passage_id: text for passage_id, _, text in new_texts}
+                self.passage_texts = [text_by_id.get(passage_id, "") for passage_id in self.passage_ids]
+
+            logger.info(
+                f"✅ 패시지 인덱스 구축 완료: {len(doc_indices)}개 노트, {len(self.passage_ids)}개 패시지 "
+                f"(캐시 히트 {cache_hits}개 노트)"
+            )
+
+        except ReindexCancelled:
+            self._reset_passage_index()
+            raise
+        except Exception as e:
+            logger.error(f"패시지 인덱스 구축 실패, 문서 단위 검색으로 동작합니다: {e}")
+            self._reset_passage_index()
+
+    @staticmethod
+    def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+        """행 단위 L2 정규화"""
+        matrix = np.asarray(matrix, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+        return matrix / np.maximum(norms, 1e-12)
+
+    def _get_normalized_embeddings(self) -> np.ndarray:
+        """정규화된 문서 임베딩 (쿼리마다 다시 정규화하지 않도록 배열 단위로 캐시)"""
+        source, normalized = getattr(self, '_normalized_embeddings', (None, None))
+        if source is not self.embeddings or normalized is None:
+            normalized = self._normalize_rows(self.embeddings)
+            self._normalized_embeddings = (self.embeddings, normalized)
+        return normalized
+
+    def _get_passage_groups(self) -> np.ndarray:
+        """문서 인덱스 → 패시지 그룹 번호 (패시지 인덱스에 없으면 -1), 패시지 배열이 바뀔 때까지 재사용"""
+        source, groups = getattr(self, '_passage_groups', (None, None))
+        if source is not self.passage_doc_indices or groups is None or len(groups) != len(self.documents):
+            groups = np.full(len(self.documents), -1, dtype=np.int64)
+            groups[self.passage_doc_indices] = np.arange(len(self.passage_doc_indices))
+            self._passage_groups = (self.passage_doc_indices, groups)
+        return groups
+
+    def _score_documents(self, query_embedding: np.ndarray) -> Tuple[np.ndarray, Dict[int, int]]:
+        """쿼리에 대한 문서별 점수 계산
+
+        Returns:
+            (문서별 점수, 문서 인덱스 → 최고 점수 패시지 위치)
+        """
+        scores, best_passages = self._score_documents_batch(np.asarray(query_embedding)[None, :])
+        return scores[0], best_passages[0]
+
+    def _score_queries(
+        self,
+        query_embeddings: np.ndarray,
+        top_ks: List[int]
+    ) -> List[Tuple[np.ndarray, Dict[int, int], Optional[CandidateReuse]]]:
+        """쿼리별 문서 점수 계산, 근접 중복 쿼리 캐시에 걸리면 그 후보만 채점
+
+        Returns:
+            쿼리 순서대로 (문서별 점수, 최고 점수 패시지 위치, 재사용 정보 또는 None)
+        """
+        cache = getattr(self, 'similar_query_cache', None)
+        if cache is None:
+            scores, best_passages = self._score_documents_batch(query_embeddings)
+            return [(scores[i], best_passages[i], None) for i in range(len(scores))]
+        
+        normalized = self._normalize_rows(query_embeddings)
+        version = (self.index_version, id(self.embeddings))
+        scored: List = [None] * len(normalized)
+        misses = []
+        for i, query in enumerate(normalized):
+            hit = cache.lookup(query, version, top_ks[i])
+            if hit is None:
+                misses.append(i)
+            else:
+                candidates, reuse = hit
+                scores, best_passages = self._score_candidates(query, candidates)
+                scored[i] = (scores, best_passages, reuse)
+        
+        if misses:
+            scores, best_passages = self._score_documents_batch(normalized[misses])
+            for j, i in enumerate(misses):
+                scored[i] = (scores[j], best_passages[j], None)
+                cache.add(normalized[i], scores[j], version)
+        return scored
+
+    def _score_candidates(self, query: np.ndarray, candidates: np.ndarray) -> Tuple[np.ndarray, Dict[int, int]]:
+        """정규화된 쿼리로 후보 문서만 채점 (나머지 문서는 -inf)"""
+        scores = np.full(len(self.documents), -np.inf, dtype=np.float32)
+        scores[candidates] = self._get_normalized_embeddings()[candidates] @ query
+        best_passages: Dict[int, int] = {}
+        if self.passage_embeddings is None or len(self.passage_ids) == 0:
+            return scores, best_passages
+        
+        # _score_documents_batch와 같은 집계를 후보 문서의 패시지에만 적용
+        aggregation = self.passage_config.get('aggregation', 'max')
+        top_m = max(int(self.passage_config.get('top_m', 3)), 1)
+        bounds = np.append(self.passage_offsets, len(self.passage_embeddings))
+        groups = self._get_passage_groups()
+        for doc_idx in candidates:
+            group = groups[doc_idx]
+            if group < 0:
+                continue
+            start, end = bounds[group], bounds[group + 1]
+            group_scores = self.passage_embeddings[start:end] @ query
+            best_passages[int(doc_idx)] = int(start + np.argmax(group_scores))
+            if aggregation == 'max':
+                scores[doc_idx] = group_scores.max()
+            else:
+                scores[doc_idx] = np.sort(group_scores)[-top_m:].mean()
+        return scores, best_passages
+
+    def _score_documents_batch(self, query_embeddings: np.ndarray) -> Tuple[np.ndarray, List[Dict[int, int]]]:
+        """여러 쿼리의 문서별 점수를 한 번의 행렬곱으로 계산
+
+        Args:
+            query_embeddings: (쿼리 수, 차원)
+
+        Returns:
+            ((쿼리 수, 문서 수) 점수, 쿼리별 {문서 인덱스 → 최고 점수 패시지 위치})
+        """
+        queries = self._normalize_rows(query_embeddings)
+        scores = queries @ self._get_normalized_embeddings().T
+        best_passages: List[Dict[int, int]] = [{} for _ in range(len(queries))]
+
+        if self.passage_embeddings is None or len(self.passage_ids) == 0:
+            return scores, best_passages
+
+        # (패시지 수, 쿼리 수)
+        passage_scores = self.passage_embeddings @ queries.T
+
+        aggregation = self.passage_config.get('aggregation', 'max')
+        top_m = max(int(self.passage_config.get('top_m', 3)), 1)
+        bounds = np.append(self.passage_offsets, len(passage_scores))
+
+        if aggregation == 'max':
+            scores[:, self.passage_doc_indices] = np.maximum.reduceat(passage_scores, self.passage_offsets, axis=0).T
+
+        for group, doc_idx in enumerate(self.passage_doc_indices):
+            start, end = bounds[group], bounds[group + 1]
+            group_scores = passage_scores[start:end]
+            best = start + np.argmax(group_scores, axis=0)
+            for q in range(len(queries)):
+                best_passages[q][int(doc_idx)] = int(best[q])
+            if aggregation != 'max':
+                top = np.sort(group_scores, axis=0)[-top_m:]
+                scores[:, doc_idx] = top.mean(axis=0)
+
+        return scores, best_passages
+
+    def _get_passage_text(self, position: int) -> str:
+        """패시지 텍스트 조회 (스니펫용)"""
+        if self.passage_texts:
+            return self.passage_texts[position]
+        if self.text_store is not None:
+            return self.text_store.get_text(self.passage_ids[position], self.passage_hashes[position]) or ""
+        return ""
+
     def save_index(self) -> bool:
         """인덱스 저장"""
         try:
@@ -401,35 +1138,13 @@ class AdvancedSearchEngine:
         
         try:
             # 쿼리 임베딩 생성
-            query_embedding = self.engine.encode_text(query)
-            
-            # 유사도 계산
-            similarities = self.engine.calculate_similarities(
-                query_embedding, 
-                self.embeddings
-            )
+            with StageTimer("encode"):
+                query_embedding = self.engine.encode_text(query)
             
-            # 상위 결과 선택
-            results = self.engine.find_most_similar(
-                query_embedding,
-                self.embeddings,
-                top_k=min(top_k, len(self.documents))
-            )
-            
-            # SearchResult 객체 생성
-            search_results = []
-            for rank, (idx, similarity) in enumerate(results):
-                if similarity >= threshold:
-                    snippet = self._generate_snippet(self.documents[idx], query)
-                    
-                    result = SearchResult(
-                        document=self.documents[idx],
-                        similarity_score=similarity,
-                        match_type="semantic",
-                        snippet=snippet,
-                        rank=rank + 1
-                    )
-                    search_results.append(result)
+            # 유사도 계산 (패시지 모드면 노트별 패시지 점수 집계)
+            with StageTimer("score"):
+                [(scores, best_passages, reuse)] = self._score_queries(np.asarray(query_embedding)[None, :], [top_k])
+            search_results = self._build_semantic_results(query, scores, best_passages, top_k, threshold, reuse)
             
             logger.info(f"의미적 검색 완료: {len(search_results)}개 결과")
             return search_results
@@ -438,6 +1153,89 @@ class AdvancedSearchEngine:
             logger.error(f"의미적 검색 실패: {e}")
             return []
     
+    def semantic_search_batch(
+        self,
+        queries: List[str],
+        top_ks: Optional[List[int]] = None,
+        thresholds: Optional[List[float]] = None
+    ) -> List[List[SearchResult]]:
+        """여러 쿼리의 의미적 검색을 한 번의 인코딩과 한 번의 행렬곱으로 처리
+        
+        Args:
+            queries: 쿼리 목록
+            top_ks: 쿼리별 결과 수 (기본 10)
+            thresholds: 쿼리별 유사도 임계값 (기본 0.0)
+        
+        Returns:
+            쿼리 순서대로의 검색 결과 목록
+        """
+        if not queries:
+            return []
+        if not self.indexed:
+            if not self.load_index():
+                logger.warning("인덱스가 구축되지 않았습니다.")
+                return [[] for _ in queries]
+        
+        top_ks = top_ks or [10] * len(queries)
+        thresholds = thresholds or [0.0] * len(queries)
+        
+        try:
+            with StageTimer("encode"):
+                query_embeddings = self.engine.encode_texts(queries, show_progress=False)
+            with StageTimer("score"):
+                scored = self._score_queries(query_embeddings, top_ks)
+            
+            results = [
+                self._build_semantic_results(query, scores, best_passages, top_k, threshold, reuse)
+                for query, (scores, best_passages, reuse), top_k, threshold
+                in zip(queries, scored, top_ks, thresholds)
+            ]
+            logger.info(f"배치 의미적 검색 완료: {len(queries)}개 쿼리")
+            return results
+        
+        except Exception as e:
+            logger.error(f"배치 의미적 검색 실패: {e}")
+            return [[] for _ in queries]
+    
+    def _build_semantic_results(
+        self,
+        query: str,
+        scores: np.ndarray,
+        best_passages: Dict[int, int],
+        top_k: int,
+        threshold: float,
+        reuse: Optional[CandidateReuse] = None
+    ) -> List[SearchResult]:
+        """점수 벡터에서 상위 결과의 SearchResult 생성"""
+        top_indices = np.argsort(scores)[::-1][:min(top_k, len(self.documents))]
+        
+        search_results = []
+        with StageTimer("snippet"):
+            for rank, idx in enumerate(top_indices):
+                similarity = float(scores[idx])
+                if similarity < threshold:
+                    continue
+                
+                section = ""
+                passage_text = None
+                passage_position = best_passages.get(int(idx))
+                if passage_position is not None:
+                    section = self.passage_anchors[passage_position]
+                    passage_text = self._get_passage_text(passage_position) or None
+                
+                search_results.append(SearchResult(
+                    document=self.documents[idx],
+                    similarity_score=similarity,
+                    match_type="semantic",
+                    snippet=self._generate_snippet(self.documents[idx], query, content=passage_text),
+                    rank=rank + 1,
+                    section=section,
+                    reuse=reuse
+                ))
+        record_candidates("semantic", len(search_results))
+        record_scores("semantic", search_results)
+        return search_results
+    
     def keyword_search(
         self,
         query: str,
@@ -453,29 +1251,38 @@ class AdvancedSearchEngine:
             keywords = self._extract_keywords(query)
             results = []
             
-            for doc in self.documents:
-                match_score, matched_kw = self._calculate_keyword_match(
-                    doc, keywords, case_sensitive
-                )
-                
-                if match_score > 0:
-                    snippet = self._generate_snippet(doc, query)
-                    
-                    result = SearchResult(
-                        document=doc,
-                        similarity_score=match_score,
-                        match_type="keyword",
-                        matched_keywords=matched_kw,
-                        snippet=snippet
+            with StageTimer("keyword"):
+                lexical_index = self._get_lexical_index()
+                if lexical_index is not None and case_sensitive:
+                    matches = self._case_sensitive_keyword_matches(lexical_index, keywords)
+                elif lexical_index is not None:
+                    matches = self._indexed_keyword_matches(lexical_index, keywords)
+                else:
+                    matches = (
+                        (doc, *self._calculate_keyword_match(doc, keywords, case_sensitive))
+                        for doc in self.documents
                     )
-                    results.append(result)
-            
-            # 점수 순으로 정렬
-            results.sort(key=lambda x: x.similarity_score, reverse=True)
+                
+                for doc, match_score, matched_kw in matches:
+                    if match_score > 0:
+                        result = SearchResult(
+                            document=doc,
+                            similarity_score=match_score,
+                            match_type="keyword",
+                            matched_keywords=matched_kw
+                        )
+                        results.append(result)
+                
+                # 점수 순으로 정렬
+                results.sort(key=lambda x: x.similarity_score, reverse=True)
             
-            # 순위 할당 및 상위 k개 선택
-            for rank, result in enumerate(results[:top_k]):
-                result.rank = rank + 1
+            # 순위 할당 및 상위 k개 선택 (스니펫은 반환할 결과만 생성)
+            with StageTimer("snippet"):
+                for rank, result in enumerate(results[:top_k]):
+                    result.rank = rank + 1
+                    result.snippet = self._generate_snippet(result.document, query)
+            record_candidates("keyword", len(results))
+            record_scores("keyword", results[:top_k])
             
             logger.info(f"키워드 검색 완료: {len(results[:top_k])}개 결과")
             return results[:top_k]
@@ -490,51 +1297,59 @@ class AdvancedSearchEngine:
         top_k: int = 10,
         semantic_weight: float = 0.7,
         keyword_weight: float = 0.3,
-        threshold: float = 0.0
+        threshold: float = 0.0,
+        semantic_results: Optional[List[SearchResult]] = None
     ) -> List[SearchResult]:
-        """하이브리드 검색 (의미적 + 키워드)"""
+        """하이브리드 검색 (의미적 + 키워드)
+        
+        semantic_results를 주면 (예: 배치 검색으로 미리 구한 top_k * 2개) 의미적 검색을 생략한다.
+        """
         try:
             # 각각의 검색 수행
-            semantic_results = self.semantic_search(query, top_k * 2, 0.0)
+            if semantic_results is None:
+                semantic_results = self.semantic_search(query, top_k * 2, 0.0)
             keyword_results = self.keyword_search(query, top_k * 2)
             
             # 결과 통합
-            combined_scores = defaultdict(float)
-            all_results = {}
-            
-            # 의미적 검색 결과 처리
-            for result in semantic_results:
-                doc_path = result.document.path
-                combined_scores[doc_path] += result.similarity_score * semantic_weight
-                all_results[doc_path] = result
-                all_results[doc_path].match_type = "hybrid"
-            
-            # 키워드 검색 결과 처리  
-            for result in keyword_results:
-                doc_path = result.document.path
-                combined_scores[doc_path] += result.similarity_score * keyword_weight
+            with StageTimer("fuse"):
+                combined_scores = defaultdict(float)
+                all_results = {}
                 
-                if doc_path in all_results:
-                    # 키워드 정보 추가
-                    all_results[doc_path].matched_keywords = result.matched_keywords
-                else:
+                # 의미적 검색 결과 처리
+                for result in semantic_results:
+                    doc_path = result.document.path
+                    combined_scores[doc_path] += result.similarity_score * semantic_weight
                     all_results[doc_path] = result
                     all_results[doc_path].match_type = "hybrid"
+                
+                # 키워드 검색 결과 처리  
+                for result in keyword_results:
+                    doc_path = result.document.path
+                    combined_scores[doc_path] += result.similarity_score * keyword_weight
+                
+                    if doc_path in all_results:
+                        # 키워드 정보 추가
+                        all_results[doc_path].matched_keywords = result.matched_keywords
+                    else:
+                        all_results[doc_path] = result
+                        all_results[doc_path].match_type = "hybrid"
+                
+                # 통합 점수로 정렬
+                final_results = []
+                for doc_path, combined_score in combined_scores.items():
+                    if combined_score >= threshold:
+                        result = all_results[doc_path]
+                        result.similarity_score = combined_score
+                        final_results.append(result)
+                
+                final_results.sort(key=lambda x: x.similarity_score, reverse=True)
+                
+                # 순위 할당
+                for rank, result in enumerate(final_results[:top_k]):
+                    result.rank = rank + 1
             
-            # 통합 점수로 정렬
-            final_results = []
-            for doc_path, combined_score in combined_scores.items():
-                if combined_score >= threshold:
-                    result = all_results[doc_path]
-                    result.similarity_score = combined_score
-                    final_results.append(result)
-            
-            final_results.sort(key=lambda x: x.similarity_score, reverse=True)
-            
-            # 순위 할당
-            for rank, result in enumerate(final_results[:top_k]):
-                result.rank = rank + 1
-            
+            record_candidates("fused", len(final_results))
+            record_scores("fused", final_results[:top_k])
             logger.info(f"하이브리드 검색 완료: {len(final_results[:top_k])}개 결과")
             return final_results[:top_k]
         
@@ -620,17 +1435,80 @@ class AdvancedSearchEngine:
         keywords = re.findall(r'[a-zA-Z가-힣0-9]+', query)
         return [kw.lower() for kw in keywords if len(kw) >= 2]
     
+    def _get_lexical_index(self) -> Optional[LexicalIndex]:
+        """현재 인덱스 버전의 키워드 역색인 (search.lexical_index: false면 None)"""
+        if not self.config.get('search', {}).get('lexical_index', True) or not self.documents:
+            return None
+        version, index = self._lexical_index
+        if index is not None and version == self.index_version:
+            return index
+        with self._derived_lock:
+            version, index = self._lexical_index
+            if index is None or version != self.index_version:
+                index = LexicalIndex.build(self.documents)
+                self._lexical_index = (self.index_version, index)
+            return index
+    
+    def _indexed_keyword_matches(self, lexical_index: LexicalIndex, keywords: List[str]):
+        """_calculate_keyword_match와 같은 점수를 역색인으로 계산 (본문을 읽지 않음)
+        
+        Yields:
+            (문서, 점수, 매칭 키워드) - 점수가 0인 문서 제외
+        """
+        if not keywords:
+            return
+        content_hits = [lexical_index.content_frequencies(kw) for kw in keywords]
+        
+        for doc_index, doc in enumerate(self.documents):
+            title = doc.title.lower()
+            tags = [tag.lower() for tag in doc.tags]
+            matched_keywords = []
+            total_score = 0.0
+            
+            for keyword, hits in zip(keywords, content_hits):
+                if keyword in title:
+                    total_score += 3.0
+                    matched_keywords.append(keyword)
+                elif any(keyword in tag for tag in tags):
+                    total_score += 2.0
+                    matched_keywords.append(keyword)
+                elif doc_index in hits:
+                    total_score += min(hits[doc_index] * 1.0, 5.0)
+                    matched_keywords.append(keyword)
+            
+            if matched_keywords:
+                yield doc, total_score * len(matched_keywords) / len(keywords), matched_keywords
+    
+    def _case_sensitive_keyword_matches(self, lexical_index: LexicalIndex, keywords: List[str]):
+        """대소문자 구분 키워드 매칭 - 역색인으로 본문 후보를 좁힌 뒤 후보 문서만 본문을 읽음
+        
+        대소문자를 구분한 출현은 소문자 본문에서도 출현하므로, 역색인에 없는 문서는
+        본문 점수가 0 (제목/태그만 비교)
+        """
+        if not keywords:
+            return
+        candidates = set()
+        for keyword in keywords:
+            candidates.update(lexical_index.content_frequencies(keyword.lower()))
+        
+        for doc_index, doc in enumerate(self.documents):
+            content = None if doc_index in candidates else ""
+            yield (doc, *self._calculate_keyword_match(doc, keywords, True, content=content))
+    
     def _calculate_keyword_match(
         self,
         document: Document,
         keywords: List[str],
-        case_sensitive: bool = False
+        case_sensitive: bool = False,
+        content: Optional[str] = None
     ) -> Tuple[float, List[str]]:
-        """문서와 키워드 매칭 점수 계산"""
+        """문서와 키워드 매칭 점수 계산 (content를 주면 문서 본문 대신 사용)"""
         if not keywords:
             return 0.0, []
         
-        content = document.content if case_sensitive else document.content.lower()
+        if content is None:
+            content = document.get_content()
+        content = content if case_sensitive else content.lower()
         title = document.title if case_sensitive else document.title.lower()
         tags = document.tags if case_sensitive else [tag.lower() for tag in document.tags]
         
@@ -663,11 +1541,18 @@ class AdvancedSearchEngine:
         
         return final_score, matched_keywords
     
-    def _generate_snippet(self, document: Document, query: str, max_length: int = 150) -> str:
-        """검색 결과 스니펫 생성"""
+    def _generate_snippet(
+        self,
+        document: Document,
+        query: str,
+        max_length: int = 150,
+        content: Optional[str] = None
+    ) -> str:
+        """검색 결과 스니펫 생성 (content를 주면 해당 패시지에서 추출)"""
         try:
             keywords = self._extract_keywords(query)
-            content = document.content
+            if content is None:
+                content = document.get_content()
             
             if not keywords:
                 return content[:max_length] + "..." if len(content) > max_length else content
@@ -694,7 +1579,7 @@ class AdvancedSearchEngine:
         
         except Exception as e:
             logger.error(f"스니펫 생성 실패: {e}")
-            return document.content[:max_length] + "..."
+            return document.get_content()[:max_length] + "..."
     
     def get_search_statistics(self) -> Dict:
         """검색 엔진 통계"""
@@ -707,6 +1592,10 @@ class AdvancedSearchEngine:
                 "embedding_dimension": self.engine.embedding_dimension,
                 "model_name": self.engine.model_name,
                 "cache_statistics": cache_stats,
+                "query_cache_statistics": (
+                    self.engine.query_cache.get_statistics()
+                    if getattr(self.engine, 'query_cache', None) is not None else {}
+                ),
                 "vault_statistics": vault_stats,
                 "indexed": self.indexed
             }
@@ -723,6 +1612,7 @@ class AdvancedSearchEngine:
         final_k: int = 10,
         threshold: float = 0.0,
         use_reranker: bool = True,
+        initial_results: Optional[List[SearchResult]] = None,
         **search_kwargs
     ) -> List[SearchResult]:
         """
@@ -735,63 +1625,35 @@ class AdvancedSearchEngine:
             final_k: 최종 반환할 결과 수
             threshold: 유사도 임계값
             use_reranker: 재순위화 사용 여부
+            initial_results: 이미 구한 1차 검색 결과 (스트리밍 응답에서 먼저 보낸 결과 재사용)
             **search_kwargs: 추가 검색 매개변수
             
         Returns:
             재순위화된 검색 결과 (SearchResult 형태로 변환)
         """
-        # Reranker가 요청되었지만 사용 불가능한 경우
-        if use_reranker:
-            try:
-                from .reranker import BGEReranker, RerankerPipeline
-                
-                # 설정에서 reranker 정보 가져오기
-                reranker_config = self.config.get('reranker', {})
-                
-                # Reranker 초기화
-                reranker = BGEReranker(
-                    model_name=reranker_config.get('model_name', 'BAAI/bge-reranker-v2-m3'),
-                    use_fp16=reranker_config.get('use_fp16', True),
-                    cache_folder=reranker_config.get('cache_folder', self.config.get('model', {}).get('cache_folder')),
-                    device=reranker_config.get('device', self.config.get('model', {}).get('device'))
-                )
-                
-                if reranker.is_available():
-                    # 파이프라인 생성 및 실행
-                    pipeline = RerankerPipeline(self, reranker, self.config)
-                    rerank_results = pipeline.search_and_rerank(
-                        query=query,
-                        search_method=search_method,
-                        initial_k=initial_k,
-                        final_k=final_k,
-                        similarity_threshold=threshold,
-                        **search_kwargs
-                    )
-                    
-                    # RerankResult를 SearchResult로 변환
-                    search_results = []
-                    for rerank_result in rerank_results:
-                        # 원본 SearchResult를 복사하고 점수 업데이트
-                        search_result = rerank_result.search_result
-                        search_result.similarity_score = rerank_result.rerank_score
-                        search_result.rank = rerank_result.new_rank + 1
-                        search_result.match_type = f"{search_result.match_type}_reranked"
-                        search_results.append(search_result)
-                    
-                    logger.info(f"재순위화 검색 완료: {len(search_results)}개 결과")
-                    return search_results
-                else:
-                    logger.warning("Reranker를 사용할 수 없습니다. 일반 검색으로 진행합니다.")
-                    use_reranker = False
-                    
-            except ImportError:
-                logger.warning("Reranker 모듈을 가져올 수 없습니다. 일반 검색으로 진행합니다.")
-                use_reranker = False
-            except Exception as e:
-                logger.warning(f"Reranker 초기화 실패: {e}. 일반 검색으로 진행합니다.")
-                use_reranker = False
+        # Reranker가 요청되었지만 사용 불가능하면 일반 검색으로 진행
+        reranker = self._get_reranker() if use_reranker else None
+        if reranker is not None:
+            from .reranker import RerankerPipeline
+            
+            # 파이프라인 생성 및 실행
+            pipeline = RerankerPipeline(self, reranker, self.config)
+            rerank_results = pipeline.search_and_rerank(
+                query=query,
+                search_method=search_method,
+                initial_k=initial_k,
+                final_k=final_k,
+                similarity_threshold=threshold,
+                initial_results=initial_results,
+                **search_kwargs
+            )
+            search_results = self._to_reranked_results(rerank_results)
+            logger.info(f"재순위화 검색 완료: {len(search_results)}개 결과")
+            return search_results
         
         # 일반 검색 수행 (reranker 없이)
+        if initial_results is not None:
+            return initial_results[:final_k]
         if search_method == "semantic":
             return self.semantic_search(query, top_k=final_k, threshold=threshold, **search_kwargs)
         elif search_method == "keyword":
@@ -803,11 +1665,243 @@ class AdvancedSearchEngine:
         else:
             raise ValueError(f"지원하지 않는 검색 방법: {search_method}")
     
+    def _get_reranker(self):
+        """상주 재순위화 모델 (사용할 수 없으면 None)"""
+        try:
+            from .reranker import BGEReranker
+            
+            # 설정에서 reranker 정보 가져오기
+            reranker_config = self.config.get('reranker', {})
+            
+            # Reranker 초기화 (한 번 로드 후 재사용)
+            reranker = self._get_resident_model('reranker', lambda: BGEReranker(
+                model_name=reranker_config.get('model_name', 'BAAI/bge-reranker-v2-m3'),
+                use_fp16=reranker_config.get('use_fp16', True),
+                cache_folder=reranker_config.get('cache_folder', self.config.get('model', {}).get('cache_folder')),
+                device=reranker_config.get('device', self.config.get('model', {}).get('device'))
+            ))
+            if reranker.is_available():
+                return reranker
+            logger.warning("Reranker를 사용할 수 없습니다. 일반 검색으로 진행합니다.")
+        except ImportError:
+            logger.warning("Reranker 모듈을 가져올 수 없습니다. 일반 검색으로 진행합니다.")
+        except Exception as e:
+            logger.warning(f"Reranker 초기화 실패: {e}. 일반 검색으로 진행합니다.")
+        return None
+    
+    def _to_reranked_results(self, rerank_results) -> List[SearchResult]:
+        """RerankResult 목록을 재순위화 점수의 SearchResult 목록으로 변환"""
+        search_results = []
+        for rerank_result in rerank_results:
+            # 원본 SearchResult의 점수/순위 갱신
+            search_result = rerank_result.search_result
+            search_result.similarity_score = rerank_result.rerank_score
+            search_result.rank = rerank_result.new_rank + 1
+            search_result.match_type = f"{search_result.match_type}_reranked"
+            search_results.append(search_result)
+        
+        record_scores("rerank", search_results)
+        return search_results
+    
+    def _get_resident_model(self, name: str, factory: Callable[[], object]):
+        """보조 모델(재순위화/ColBERT)을 한 번만 로드해 재사용
+        
+        사용할 수 없는 모델(미설치/로드 실패)은 캐시하지 않아 다음 호출에서 다시 시도한다.
+        model_host가 있으면 재순위화 모델은 host의 것을 그대로 사용한다.
+        """
+        host = getattr(self, '_model_host', None)
+        if host is not None and name == 'reranker':
+            return host._get_resident_model(name, factory)
+        with self._resident_lock:
+            model = self._resident_models.get(name)
+            if model is None:
+                model = factory()
+                if model.is_available():
+                    self._resident_models[name] = model
+            return model
+    
+    def _loaded_model(self, name: str):
+        """이미 로드된 보조 모델 (로드하지 않음, 재순위화 모델은 model_host 것 포함)"""
+        model = self._resident_models.get(name)
+        host = getattr(self, '_model_host', None)
+        if model is None and host is not None and name == 'reranker':
+            model = host._resident_models.get(name)
+        return model
+    
+    def resident_model_bytes(self) -> Dict[str, int]:
+        """이 엔진이 로드한 모델 가중치 크기 (바이트, 모델별)
+        
+        model_host에서 빌린 모델은 host 쪽에서 한 번만 계산한다.
+        """
+        usage = {}
+        if getattr(self, '_model_host', None) is None and getattr(self.engine, 'model', None) is not None:
+            usage['embedding'] = _model_weight_bytes(self.engine.model)
+        for name, model in list(getattr(self, '_resident_models', {}).items()):
+            if name == 'colbert' and getattr(self, '_model_host', None) is not None:
+                continue
+            usage[name] = _model_weight_bytes(model)
+        return usage
+    
+    def get_resident_models(self) -> List[str]:
+        """메모리에 상주 중인 모델 목록 (임베딩 모델 + 로드된 보조 모델)"""
+        models = []
+        if getattr(self.engine, 'model', None) is not None:
+            models.append(f"embedding:{self.engine.model_name}")
+        for name, model in list(self._resident_models.items()):
+            models.append(f"{name}:{getattr(model, 'model_name', name)}")
+        return models
+
+    def warm_up(
+        self,
+        queries: Optional[List[str]] = None,
+        models: Optional[List[str]] = None
+    ) -> Dict[str, Optional[float]]:
+        """첫 검색이 치르는 지연 비용을 미리 지불 (서버 준비 단계)
+
+        - encode: 대표 쿼리 인코딩 (쿼리 캐시를 거치지 않아 첫 추론/커널 선택이 실제로 일어남)
+        - search: 대표 쿼리 하이브리드 검색 (정규화 임베딩, 키워드 역색인 준비)
+        - reranker / colbert: models에 있으면 모델을 로드하고 한 번 실행 (ColBERT는 인덱스 구축 포함)
+
+        Args:
+            queries: 대표 쿼리 (없으면 앞쪽 문서 제목 3개)
+            models: 미리 로드할 보조 모델 이름
+
+        Returns:
+            단계별 소요 시간 (ms), 사용할 수 없거나 실패한 단계는 None
+        """
+        queries = [q for q in (queries or []) if q and q.strip()]
+        if not queries:
+            queries = [doc.title for doc in self.documents[:3] if doc.title] if self.indexed else []
+        timings: Dict[str, Optional[float]] = {}
+        if not queries:
+            logger.info("워밍업할 대표 쿼리가 없습니다.")
+            return timings
+
+        def timed(step: str, run: Callable[[], bool]) -> None:
+            started = time.perf_counter()
+            try:
+                ok = run()
+            except Exception as e:
+                logger.warning(f"워밍업 {step} 단계 실패: {e}")
+                ok = False
+            timings[step] = round((time.perf_counter() - started) * 1000, 3) if ok else None
+
+        def encode() -> bool:
+            self.engine.encode_documents(queries)
+            return True
+
+        def search() -> bool:
+            for query in queries:
+                self.hybrid_search(query, top_k=5)
+            return True
+
+        def reranker() -> bool:
+            model = self._get_reranker()
+            if model is None:
+                return False
+            candidates = self.hybrid_search(queries[0], top_k=5) if self.indexed else []
+            if candidates:
+                model.rerank(queries[0], candidates, top_k=len(candidates))
+            return True
+
+        def colbert() -> bool:
+            if self._get_colbert_engine() is None:
+                return False
+            if self.indexed:
+                self.colbert_search(queries[0], top_k=1)
+            return True
+
+        timed("encode", encode)
+        if self.indexed:
+            timed("search", search)
+        steps = {"reranker": reranker, "colbert": colbert}
+        for name in models or []:
+            if name in steps:
+                timed(name, steps[name])
+            else:
+                logger.warning(f"알 수 없는 워밍업 모델: {name}")
+
+        logger.info(f"워밍업 완료: {timings}")
+        return timings
+
+    def _get_colbert_engine(self):
+        """인덱스가 준비된 상주 ColBERT 엔진 (사용할 수 없으면 None)"""
+        colbert_engine = self._get_colbert_model()
+        if not colbert_engine.is_available():
+            logger.warning("ColBERT 엔진을 사용할 수 없습니다.")
+            return None
+        
+        # 인덱스가 없거나 문서 인덱스가 바뀌었으면 구축 (캐시를 활용하여 전체 문서 처리 가능)
+        if not colbert_engine.is_indexed or self._colbert_index_version != self.index_version:
+            if not self._build_colbert_index():
+                return None
+        return colbert_engine
+    
+    def _get_colbert_model(self):
+        """상주 ColBERT 엔진 (한 번 로드 후 재사용, 인덱스 구축 여부와 무관)
+        
+        model_host가 있으면 host의 BGE-M3 가중치를 공유하고 인덱스만 이 vault 것으로 만든다.
+        """
+        from .colbert_search import ColBERTSearchEngine
+        
+        # ColBERT 엔진 설정
+        colbert_config = self.config.get('colbert', {})
+        host = getattr(self, '_model_host', None)
+        shared = None
+        if host is not None and 'colbert' not in self._resident_models:
+            host_engine = host._get_colbert_model()
+            shared = host_engine.model if host_engine.is_available() else None
+        
+        # ColBERT 엔진 초기화 (캐시 포함, 한 번 로드 후 재사용)
+        return self._get_resident_model('colbert', lambda: ColBERTSearchEngine(
+            model_name=colbert_config.get('model_name', 'BAAI/bge-m3'),
+            device=colbert_config.get('device', self.config.get('model', {}).get('device')),
+            use_fp16=colbert_config.get('use_fp16', True),
+            cache_folder=colbert_config.get('cache_folder', self.config.get('model', {}).get('cache_folder')),
+            max_length=colbert_config.get('max_length', self.config.get('model', {}).get('max_length', 4096)),
+            cache_dir=self.cache_dir,
+            enable_cache=colbert_config.get('enable_cache', True),
+            model=shared
+        ))
+    
+    def _build_colbert_index(self, force_rebuild: bool = False, run: Optional[ReindexRun] = None) -> bool:
+        """상주 ColBERT 엔진에 현재 문서 인덱스 구축 (run이 있으면 배치마다 진행 기록/취소 확인)"""
+        colbert_config = self.config.get('colbert', {})
+        colbert_engine = self._get_colbert_model()
+        if not colbert_engine.is_available():
+            logger.warning("ColBERT 엔진을 사용할 수 없어 ColBERT 인덱스를 건너뜁니다.")
+            return False
+        
+        logger.info("ColBERT 인덱스 구축 중...")
+        max_docs = colbert_config.get('max_documents', None)  # None이면 전체 문서
+        if run is not None:
+            total = len(self.documents) if not max_docs else min(max_docs, len(self.documents))
+            run.start_phase("colbert", total)
+        if not colbert_engine.build_index(
+            self.documents,
+            batch_size=colbert_config.get('batch_size', 4),
+            max_documents=max_docs,
+            force_rebuild=force_rebuild,
+            reuse_after=run.reuse_after if run is not None else None,
+            on_batch=run.advance if run is not None else None
+        ):
+            logger.error("ColBERT 인덱스 구축 실패")
+            return False
+        self._colbert_index_version = self.index_version
+        return True
+    
+    def _colbert_ready(self) -> bool:
+        """ColBERT 모델이 로드되어 있고 인덱스가 현재 문서 인덱스와 일치하는지 (첫 호출 비용 없음)"""
+        colbert_engine = self._resident_models.get('colbert')
+        return (colbert_engine is not None and colbert_engine.is_indexed
+                and self._colbert_index_version == self.index_version)
+    
     def colbert_search(
         self,
         query: str,
         top_k: int = 10,
-        threshold: float = 0.0
+        threshold: float = 0.0,
+        candidates: Optional[List[SearchResult]] = None
     ) -> List[SearchResult]:
         """
         ColBERT 기반 토큰 수준 late interaction 검색
@@ -816,50 +1910,26 @@ class AdvancedSearchEngine:
             query: 검색 쿼리
             top_k: 반환할 상위 결과 수
             threshold: 유사도 임계값
+            candidates: 주어지면 이 후보 문서만 ColBERT 점수로 다시 매김 (재채점)
             
         Returns:
             ColBERT 검색 결과
         """
         try:
-            from .colbert_search import ColBERTSearchEngine
-            
-            # ColBERT 엔진 설정
-            colbert_config = self.config.get('colbert', {})
-            
-            # ColBERT 엔진 초기화 (캐시 포함)
-            colbert_engine = ColBERTSearchEngine(
-                model_name=colbert_config.get('model_name', 'BAAI/bge-m3'),
-                device=colbert_config.get('device', self.config.get('model', {}).get('device')),
-                use_fp16=colbert_config.get('use_fp16', True),
-                cache_folder=colbert_config.get('cache_folder', self.config.get('model', {}).get('cache_folder')),
-                max_length=colbert_config.get('max_length', self.config.get('model', {}).get('max_length', 4096)),
-                cache_dir=self.cache_dir,
-                enable_cache=colbert_config.get('enable_cache', True)
-            )
-            
-            if not colbert_engine.is_available():
-                logger.warning("ColBERT 엔진을 사용할 수 없습니다. 의미적 검색으로 대체합니다.")
+            colbert_engine = self._get_colbert_engine()
+            if colbert_engine is None:
+                logger.warning("의미적 검색으로 대체합니다.")
                 return self.semantic_search(query, top_k, threshold)
             
-            # 인덱스가 없으면 구축 (캐시를 활용하여 전체 문서 처리 가능)
-            if not colbert_engine.is_indexed:
-                logger.info("ColBERT 인덱스 구축 중...")
-                max_docs = colbert_config.get('max_documents', None)  # None이면 전체 문서
-                force_rebuild = False  # 기본적으로 캐시 활용
-                
-                if not colbert_engine.build_index(
-                    self.documents, 
-                    max_documents=max_docs,
-                    force_rebuild=force_rebuild
-                ):
-                    logger.error("ColBERT 인덱스 구축 실패")
-                    return self.semantic_search(query, top_k, threshold)
-            
             # ColBERT 검색 수행
-            colbert_results = colbert_engine.search(query, top_k, threshold)
+            candidate_paths = {r.document.path for r in candidates} if candidates is not None else None
+            with StageTimer("score"):
+                colbert_results = colbert_engine.search(query, top_k, threshold, candidate_paths=candidate_paths)
             
             # SearchResult 형태로 변환
             search_results = colbert_engine.convert_to_search_results(colbert_results)
+            record_candidates("colbert", len(search_results))
+            record_scores("colbert", search_results)
             
             logger.info(f"ColBERT 검색 완료: {len(search_results)}개 결과")
             return search_results
@@ -871,6 +1941,147 @@ class AdvancedSearchEngine:
             logger.error(f"ColBERT 검색 실패: {e}. 의미적 검색으로 대체합니다.")
             return self.semantic_search(query, top_k, threshold)
     
+    def search_with_deadline(
+        self,
+        query: str,
+        search_method: str = "hybrid",
+        top_k: int = 10,
+        threshold: float = 0.0,
+        deadline_ms: Optional[float] = None,
+        use_colbert: bool = False,
+        use_reranker: bool = False
+    ) -> TieredSearchResult:
+        """
+        마감 시간 안에서 단계별로 정밀도를 높이는 검색
+        
+        1단계(의미적/키워드/하이브리드)는 항상 실행하고, ColBERT 재채점과 재순위화는
+        남은 시간이 관측된 단계 비용(후보 수 × 후보당 비용, 모델 미로드 시 로드 비용 추가)보다
+        클 때만 1단계 후보에 대해 실행한다. 건너뛴 단계와 이유는 결과의 tiers에 남는다.
+        
+        Args:
+            query: 검색 쿼리
+            search_method: 1단계 검색 방법 ("colbert"면 하이브리드로 1단계 후 ColBERT 재채점)
+            top_k: 반환할 상위 결과 수
+            threshold: 유사도 임계값
+            deadline_ms: 전체 시간 예산 (None이면 요청한 단계를 모두 실행)
+            use_colbert: ColBERT 재채점 단계 요청
+            use_reranker: 재순위화 단계 요청
+            
+        Returns:
+            TieredSearchResult (결과 + 단계별 실행 여부)
+        """
+        started = time.perf_counter()
+        deadline_config = self.config.get('search', {}).get('deadline', {})
+        use_colbert = use_colbert or search_method == "colbert"
+        base_method = search_method if search_method in ("semantic", "keyword") else "hybrid"
+        candidate_k = top_k
+        if use_colbert or use_reranker:
+            candidate_k = max(top_k, deadline_config.get('candidate_k') or min(top_k * 3, 100))
+        
+        def remaining_ms() -> Optional[float]:
+            if deadline_ms is None:
+                return None
+            return deadline_ms - (time.perf_counter() - started) * 1000
+        
+        # 1단계: 빠른 후보 검색
+        if base_method == "semantic":
+            results = self.semantic_search(query, top_k=candidate_k, threshold=threshold)
+        elif base_method == "keyword":
+            results = self.keyword_search(query, top_k=candidate_k)
+        else:
+            results = self.hybrid_search(query, top_k=candidate_k, threshold=threshold)
+        tiers = [{"tier": base_method, "ran": True, "ms": round((time.perf_counter() - started) * 1000, 3)}]
+        
+        # 2, 3단계: 예산이 허락하는 만큼 후보를 정밀하게 다시 매김
+        for tier, requested in (("colbert", use_colbert), ("rerank", use_reranker)):
+            if not requested:
+                continue
+            if not results:
+                tiers.append({"tier": tier, "ran": False, "reason": "no_candidates"})
+                continue
+            
+            warm = self._tier_warm(tier)
+            estimated = self._estimate_tier_ms(tier, len(results), warm)
+            remaining = remaining_ms()
+            if remaining is not None and estimated > remaining:
+                tiers.append({"tier": tier, "ran": False, "reason": "budget",
+                              "estimated_ms": round(estimated, 3), "remaining_ms": round(max(remaining, 0.0), 3)})
+                continue
+            
+            tier_started = time.perf_counter()
+            if tier == "colbert":
+                refined = self._rescore_colbert(query, results)
+            else:
+                refined = self._rescore_rerank(query, results)
+            if refined is None:
+                tiers.append({"tier": tier, "ran": False, "reason": "unavailable"})
+                continue
+            
+            elapsed = time.perf_counter() - tier_started
+            if warm:
+                # 모델 로드/ColBERT 인덱스 구축이 섞인 첫 실행은 비용 관측에서 제외
+                self._observe_tier_cost(tier, elapsed, len(results))
+            results = refined
+            tiers.append({"tier": tier, "ran": True, "ms": round(elapsed * 1000, 3)})
+        
+        results = results[:top_k]
+        for rank, result in enumerate(results):
+            result.rank = rank + 1
+        
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        skipped = [tier["tier"] for tier in tiers if not tier["ran"]]
+        if skipped:
+            logger.info(f"마감 시간 검색: {', '.join(skipped)} 단계 생략 ({elapsed_ms:.1f}ms / {deadline_ms}ms)")
+        return TieredSearchResult(results=results, tiers=tiers, deadline_ms=deadline_ms, elapsed_ms=round(elapsed_ms, 3))
+    
+    def _tier_warm(self, tier: str) -> bool:
+        """단계 모델이 이미 로드되어 바로 실행할 수 있는지"""
+        if tier == "colbert":
+            return self._colbert_ready()
+        return self._loaded_model('reranker') is not None
+    
+    def _estimate_tier_ms(self, tier: str, candidates: int, warm: bool) -> float:
+        """관측 비용(없으면 설정의 사전값)으로 단계 소요 시간 예측 (밀리초)"""
+        deadline_config = self.config.get('search', {}).get('deadline', {})
+        prior_ms = deadline_config.get('prior_ms_per_candidate', {}).get(tier, {"colbert": 5, "rerank": 20}[tier])
+        per_candidate = self._tier_costs.get(tier, prior_ms / 1000)
+        estimated = per_candidate * candidates * 1000
+        if not warm:
+            estimated += deadline_config.get('cold_start_ms', 10000)
+        return estimated
+    
+    def _observe_tier_cost(self, tier: str, seconds: float, candidates: int) -> None:
+        """단계의 후보당 비용을 지수 이동 평균으로 갱신"""
+        per_candidate = seconds / max(candidates, 1)
+        previous = self._tier_costs.get(tier)
+        self._tier_costs[tier] = per_candidate if previous is None else 0.8 * previous + 0.2 * per_candidate
+    
+    def _rescore_colbert(self, query: str, candidates: List[SearchResult]) -> Optional[List[SearchResult]]:
+        """후보 문서만 ColBERT 점수로 다시 정렬 (ColBERT 인덱스에 없는 후보는 원래 순서로 뒤에)"""
+        try:
+            colbert_engine = self._get_colbert_engine()
+        except ImportError:
+            colbert_engine = None
+        if colbert_engine is None:
+            return None
+        
+        with StageTimer("score"):
+            colbert_results = colbert_engine.search(
+                query, top_k=len(candidates), candidate_paths={r.document.path for r in candidates})
+        rescored = colbert_engine.convert_to_search_results(colbert_results)
+        record_scores("colbert", rescored)
+        scored_paths = {r.document.path for r in rescored}
+        return rescored + [r for r in candidates if r.document.path not in scored_paths]
+    
+    def _rescore_rerank(self, query: str, candidates: List[SearchResult]) -> Optional[List[SearchResult]]:
+        """후보 전체를 cross-encoder로 재순위화"""
+        reranker = self._get_reranker()
+        if reranker is None:
+            return None
+        with StageTimer("rerank"):
+            rerank_results = reranker.rerank(query=query, search_results=candidates, top_k=len(candidates))
+        return self._to_reranked_results(rerank_results)
+    
     def expanded_search(
         self,
         query: str,
@@ -1034,22 +2245,16 @@ class AdvancedSearchEngine:
                 return []
             
             # 기준 문서 찾기
-            base_document = None
-            for doc in self.documents:
+            base_index = None
+            for i, doc in enumerate(self.documents):
                 if doc.path == document_path or doc.title == document_path:
-                    base_document = doc
+                    base_index = i
                     break
             
-            if base_document is None:
+            if base_index is None:
                 logger.warning(f"문서를 찾을 수 없습니다: {document_path}")
                 return []
-            
-            # 기준 문서의 임베딩 가져오기
-            base_cached = self.cache.get_embedding(base_document.path)
-            if base_cached is None:
-                logger.warning(f"문서에 임베딩이 없습니다: {document_path}")
-                return []
-            base_embedding = base_cached.embedding
+            base_document = self.documents[base_index]
             
             # 지식 그래프 기반 관련성 점수 계산 (옵션)
             centrality_scores = {}
@@ -1058,29 +2263,12 @@ class AdvancedSearchEngine:
             
             # 유사도 기반 관련 문서 찾기
             related_results = []
-            base_embedding = base_embedding.reshape(1, -1)
+            candidates = self._related_candidates(base_index)
+            if candidates is None:
+                logger.warning(f"문서에 임베딩이 없습니다: {document_path}")
+                return []
             
-            for doc in self.documents:
-                # 자기 자신 제외
-                if doc.path == base_document.path:
-                    continue
-                    
-                # 문서의 임베딩 가져오기
-                doc_cached = self.cache.get_embedding(doc.path)
-                if doc_cached is None:
-                    continue
-                doc_embedding = doc_cached.embedding
-                
-                # 의미적 유사도 계산
-                doc_embedding = doc_embedding.reshape(1, -1)
-                if SKLEARN_AVAILABLE:
-                    similarity = cosine_similarity(base_embedding, doc_embedding)[0][0]
-                else:
-                    # NumPy로 코사인 유사도 계산
-                    similarity = np.dot(base_embedding[0], doc_embedding[0]) / (
-                        np.linalg.norm(base_embedding[0]) * np.linalg.norm(doc_embedding[0])
-                    )
-                
+            for doc, similarity in candidates:
                 if similarity < similarity_threshold:
                     continue
                 
@@ -1101,7 +2289,7 @@ class AdvancedSearchEngine:
                     similarity_score=final_score,
                     match_type="related_semantic",
                     matched_keywords=[],
-                    snippet=doc.content[:150] + "..." if len(doc.content) > 150 else doc.content
+                    snippet=self._generate_snippet(doc, "", max_length=150)
                 )
                 
                 related_results.append(result)
@@ -1121,6 +2309,90 @@ class AdvancedSearchEngine:
             logger.error(f"관련 문서 추천 실패: {e}")
             return []
     
+    def _related_candidates(self, base_index: int) -> Optional[List[Tuple[Document, float]]]:
+        """기준 문서와의 (문서, 코사인 유사도) 후보 목록
+        
+        최근접 이웃 표가 있으면 표의 상위 이웃만, 없으면 캐시된 임베딩과 전체 비교
+        (기준 문서 임베딩이 없으면 None)
+        """
+        neighbors = self.get_neighbor_table()
+        if neighbors is not None:
+            indices, scores = neighbors
+            return [
+                (self.documents[j], float(score))
+                for j, score in zip(indices[base_index].tolist(), scores[base_index].tolist())
+                if j != base_index
+            ]
+        
+        base_document = self.documents[base_index]
+        base_cached = self.cache.get_embedding(base_document.path)
+        if base_cached is None:
+            return None
+        base_embedding = base_cached.embedding.reshape(1, -1)
+        
+        candidates = []
+        for doc in self.documents:
+            # 자기 자신 제외
+            if doc.path == base_document.path:
+                continue
+            
+            # 문서의 임베딩 가져오기
+            doc_cached = self.cache.get_embedding(doc.path)
+            if doc_cached is None:
+                continue
+            doc_embedding = doc_cached.embedding.reshape(1, -1)
+            
+            # 의미적 유사도 계산
+            if SKLEARN_AVAILABLE:
+                similarity = cosine_similarity(base_embedding, doc_embedding)[0][0]
+            else:
+                # NumPy로 코사인 유사도 계산
+                similarity = np.dot(base_embedding[0], doc_embedding[0]) / (
+                    np.linalg.norm(base_embedding[0]) * np.linalg.norm(doc_embedding[0])
+                )
+            candidates.append((doc, float(similarity)))
+        return candidates
+    
+    def get_neighbor_table(self) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """문서별 최근접 이웃 표 (이웃 문서 인덱스, 코사인 유사도), 유사도 내림차순
+        
+        이웃 수는 related_docs.max_candidates, 인덱스 버전마다 한 번 계산 (스냅샷에서 적재 가능)
+        """
+        if not self.indexed or self.embeddings is None or len(self.documents) < 2:
+            return None
+        version, indices, scores = self._neighbors
+        if indices is not None and version == self.index_version:
+            return indices, scores
+        
+        with self._derived_lock:
+            version, indices, scores = self._neighbors
+            if indices is None or version != self.index_version:
+                indices, scores = self._compute_neighbor_table(
+                    self.config.get('related_docs', {}).get('max_candidates', 100))
+                self._neighbors = (self.index_version, indices, scores)
+            return indices, scores
+    
+    def _compute_neighbor_table(self, k: int, block_size: int = 512) -> Tuple[np.ndarray, np.ndarray]:
+        """정규화 임베딩 블록 행렬곱으로 문서별 상위 k 이웃 계산 (자기 자신 제외)"""
+        normalized = self._get_normalized_embeddings()
+        n = normalized.shape[0]
+        k = max(1, min(int(k), n - 1))
+        indices = np.empty((n, k), dtype=np.int32)
+        scores = np.empty((n, k), dtype=np.float32)
+        
+        for start in range(0, n, block_size):
+            block = normalized[start:start + block_size] @ normalized.T
+            rows = np.arange(block.shape[0])
+            block[rows, start + rows] = -np.inf
+            top = np.argpartition(-block, k - 1, axis=1)[:, :k]
+            top_scores = np.take_along_axis(block, top, axis=1)
+            order = np.argsort(-top_scores, axis=1)
+            indices[start:start + block.shape[0]] = np.take_along_axis(top, order, axis=1)
+            scores[start:start + block.shape[0]] = np.take_along_axis(top_scores, order, axis=1)
+        
+        logger.info(f"최근접 이웃 표 계산: {n}개 문서 × {k}개 이웃")
+        return indices, scores
+    
     def search_with_related(
         self,
         query: str,
@@ -1199,7 +2471,17 @@ class AdvancedSearchEngine:
             return [], []
     
     def _get_centrality_scores(self) -> Dict[str, float]:
-        """지식 그래프에서 중심성 점수를 가져옵니다."""
+        """지식 그래프에서 중심성 점수를 가져옵니다 (인덱스 버전마다 한 번 계산)."""
+        version, scores = self._centrality
+        if scores is not None and version == self.index_version:
+            return scores
+        scores = self._compute_centrality_scores()
+        if scores:
+            self._centrality = (self.index_version, scores)
+        return scores
+    
+    def _compute_centrality_scores(self) -> Dict[str, float]:
+        """지식 그래프를 구축해 문서 경로별 중심성 계산"""
         try:
             from .knowledge_graph import KnowledgeGraphBuilder
             
@@ -1322,6 +2604,7 @@ class AdvancedSearchEngine:
             # 순위 재할당
             for rank, result in enumerate(final_results):
                 result.rank = rank + 1
+            record_scores("centrality_boost", final_results)
             
             # 순위 변화 로깅
             original_order = [r.document.title for r in results[:top_k]]
@@ -7,7 +7,7 @@ BGE-M3 ColBERT 임베딩 기반 토큰 수준 late interaction 검색
 
 import os
 import logging
-from typing import List, Dict, Optional, Tuple, Union
+from typing import Callable, List, Dict, Optional, Set, Tuple, Union
 from dataclasses import dataclass
 import numpy as np
 import torch
@@ -20,6 +20,7 @@ except ImportError:
     logging.warning("FlagEmbedding not available. ColBERT functionality will be disabled.")
 
 from .advanced_search import SearchResult, Document
+from ..core.reindex_checkpoint import ReindexCancelled
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -46,7 +47,8 @@ class ColBERTSearchEngine:
         cache_folder: Optional[str] = None,
         max_length: int = 4096,
         cache_dir: Optional[str] = None,
-        enable_cache: bool = True
+        enable_cache: bool = True,
+        model=None
     ):
         """
         Args:
@@ -57,6 +59,7 @@ class ColBERTSearchEngine:
             max_length: 최대 토큰 길이
             cache_dir: 임베딩 캐시 디렉토리
             enable_cache: 캐싱 활성화 여부
+            model: 이미 로드된 BGE-M3 모델 (주어지면 로드하지 않고 공유, 인덱스는 엔진마다 따로)
         """
         self.model_name = model_name
         self.device = device
@@ -89,6 +92,12 @@ class ColBERTSearchEngine:
             logger.warning("FlagEmbedding 미설치로 인해 ColBERT 기능이 비활성화됩니다.")
             return
         
+        if model is not None:
+            self.model = model
+            self.is_initialized = True
+            logger.info(f"ColBERT 검색 엔진 초기화: {model_name} (공유 모델)")
+            return
+        
         logger.info(f"ColBERT 검색 엔진 초기화: {model_name}")
         self._initialize_model()
     
@@ -132,7 +141,15 @@ class ColBERTSearchEngine:
         """ColBERT 엔진 사용 가능 여부"""
         return BGE_AVAILABLE and self.is_initialized
     
-    def build_index(self, documents: List[Document], batch_size: int = 4, max_documents: Optional[int] = None, force_rebuild: bool = False) -> bool:
+    def build_index(
+        self,
+        documents: List[Document],
+        batch_size: int = 4,
+        max_documents: Optional[int] = None,
+        force_rebuild: bool = False,
+        reuse_after: Optional[float] = None,
+        on_batch: Optional[Callable[[int], None]] = None
+    ) -> bool:
         """
         ColBERT 인덱스 구축 (캐시 지원)
         
@@ -141,6 +158,8 @@ class ColBERTSearchEngine:
             batch_size: 배치 크기
             max_documents: 최대 문서 수 제한 (None이면 제한 없음)
             force_rebuild: 강제 재구축 여부
+            reuse_after: 강제 재구축이라도 이 시각(epoch) 이후 저장된 캐시는 재사용 (중단된 재구축 이어가기)
+            on_batch: 배치마다 처리한 문서 수로 호출 (ReindexCancelled를 던지면 중단)
             
         Returns:
             인덱싱 성공 여부
@@ -176,15 +195,17 @@ class ColBERTSearchEngine:
                 
                 # 캐시 확인
                 for idx, doc in enumerate(batch_docs):
-                    if self.cache and not force_rebuild and hasattr(doc, 'path') and doc.path:
+                    if self.cache and (not force_rebuild or reuse_after is not None) and hasattr(doc, 'path') and doc.path:
                         # 파일 해시 계산
                         file_hash = self.cache._calculate_file_hash(doc.path)
                         cached = self.cache.get_colbert_embedding(doc.path, file_hash)
+                        if cached and reuse_after is not None and cached['created_at'].timestamp() < reuse_after:
+                            cached = None
                         
                         if cached:
                             # 캐시된 임베딩 사용
                             self.colbert_embeddings.append(cached['colbert_embedding'])
-                            tokens = self._approximate_tokens(doc.content) if cached.get('token_embeddings') is None else cached.get('token_embeddings', ["[CACHED]"])
+                            tokens = self._approximate_tokens(doc.get_content()) if cached.get('token_embeddings') is None else cached.get('token_embeddings', ["[CACHED]"])
                             self.document_tokens.append(tokens)
                             cached_count += 1
                             logger.debug(f"캐시 사용: {doc.path}")
@@ -199,7 +220,7 @@ class ColBERTSearchEngine:
                 
                 # 새로운 문서들만 처리
                 if batch_to_process:
-                    batch_texts = [doc.content for doc in batch_to_process]
+                    batch_texts = [doc.get_content() for doc in batch_to_process]
                     
                     logger.info(f"ColBERT 배치 {i//batch_size + 1} 처리 중... (캐시: {cached_count}, 신규: {new_count})")
                     
@@ -221,7 +242,7 @@ class ColBERTSearchEngine:
                             self.colbert_embeddings.append(colbert_vec)
                             
                             # 토큰 정보 생성
-                            tokens = self._approximate_tokens(doc.content)
+                            tokens = self._approximate_tokens(doc.get_content())
                             self.document_tokens.append(tokens)
                             new_count += 1
                             
@@ -245,11 +266,17 @@ class ColBERTSearchEngine:
                             self.colbert_embeddings.append(np.zeros((10, 1024)))  # 임시 크기
                             self.document_tokens.append(["[EMPTY]"])
                             new_count += 1
+                
+                if on_batch is not None:
+                    on_batch(len(batch_docs))
             
             self.is_indexed = True
             logger.info(f"✅ ColBERT 인덱스 구축 완료: 총 {len(self.colbert_embeddings)}개 (캐시: {cached_count}, 신규: {new_count})")
             return True
             
+        except ReindexCancelled:
+            self.is_indexed = False
+            raise
         except Exception as e:
             logger.error(f"ColBERT 인덱스 구축 실패: {e}")
             return False
@@ -268,7 +295,8 @@ class ColBERTSearchEngine:
         self,
         query: str,
         top_k: int = 10,
-        similarity_threshold: float = 0.0
+        similarity_threshold: float = 0.0,
+        candidate_paths: Optional[Set[str]] = None
     ) -> List[ColBERTResult]:
         """
         ColBERT 기반 late interaction 검색
@@ -277,6 +305,7 @@ class ColBERTSearchEngine:
             query: 검색 쿼리
             top_k: 반환할 상위 결과 수
             similarity_threshold: 유사도 임계값
+            candidate_paths: 주어지면 이 경로의 문서만 채점 (1차 검색 후보 재채점)
             
         Returns:
             ColBERT 검색 결과 목록
@@ -313,6 +342,8 @@ class ColBERTSearchEngine:
             for i, (doc, doc_colbert, doc_tokens) in enumerate(zip(
                 self.documents, self.colbert_embeddings, self.document_tokens
             )):
+                if candidate_paths is not None and doc.path not in candidate_paths:
+                    continue
                 try:
                     # Late interaction: max_sim 계산
                     score, token_similarities, max_sims = self._compute_late_interaction(
@@ -414,7 +445,7 @@ class ColBERTSearchEngine:
             
             # 스니펫 생성 (최고 유사도 토큰 주변 텍스트)
             snippet = self._generate_colbert_snippet(
-                colbert_result.document.content,
+                colbert_result.document.get_content(),
                 colbert_result.token_similarities
             )
             
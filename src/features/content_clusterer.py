@@ -181,7 +181,7 @@ class ContentClusterer:
                 else:
                     # 임베딩이 없는 경우 생성
                     logger.warning(f"임베딩이 없는 문서: {doc.path}")
-                    embedding = self.embedding_engine.encode([doc.content])[0]
+                    embedding = self.embedding_engine.encode([doc.get_content()])[0]
                     embeddings.append(embedding)
                     
             except Exception as e:
@@ -230,7 +230,7 @@ class DocumentSummarizer:
         
         for doc in documents:
             # 문서 제목과 주요 내용 포함
-            doc_content = f"## {doc.title}\n{doc.content[:1000]}..."  # 최대 1000자
+            doc_content = f"## {doc.title}\n{doc.get_content()[:1000]}..."  # 최대 1000자
             
             if current_length + len(doc_content) > self.chunk_size:
                 if current_chunk:
@@ -360,7 +360,7 @@ class KnowledgeGraphBuilder:
                 import re
                 
                 link_pattern = r'\[\[([^\]]+)\]\]'
-                matches = re.findall(link_pattern, doc.content)
+                matches = re.findall(link_pattern, doc.get_content())
                 
                 for link in matches:
                     # 링크를 실제 파일 경로로 변환
@@ -245,7 +245,7 @@ class LearningReviewer:
                 return True
         
         # 내용에서 검색 (간단한 키워드 매칭)
-        if topic_lower in doc.content.lower():
+        if topic_lower in doc.get_content().lower():
             return True
         
         return False
@@ -311,7 +311,7 @@ class MOCGenerator:
                 
                 for doc in documents:
                     # 제목과 내용에서 키워드 매칭
-                    text_to_check = f"{doc.title} {doc.content[:500]}".lower()
+                    text_to_check = f"{doc.title} {doc.get_content()[:500]}".lower()
                     
                     # 키워드 매칭 점수 계산
                     matches = sum(1 for keyword in keywords if keyword.lower() in text_to_check)
@@ -553,6 +553,10 @@ class MOCGenerator:
             statistics={}
         )
     
+    def format_moc(self, moc_data: MOCData) -> str:
+        """MOC 파일에 쓸 마크다운 본문 (데몬이 파일 대신 CLI에 돌려줄 때 사용)"""
+        return self._format_as_markdown(moc_data)
+    
     def _export_moc(self, moc_data: MOCData, output_file: str) -> bool:
         """MOC를 마크다운 파일로 내보내기"""
         try:
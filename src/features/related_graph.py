@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Related Document Graph for Vault Intelligence System V2
+
+기준 문서에서 관련 문서를 깊이별로 확장(BFS)하고 위키링크를 더해 관계 그래프 데이터를 구성
+- 노드/엣지는 JSON으로 보낼 수 있는 dict (GraphNode/GraphEdge 필드와 동일)
+- 렌더링(pyvis)은 호출자 몫 → 데몬은 데이터만 계산하고 CLI가 HTML 생성
+"""
+
+import logging
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from .wikilink_parser import WikilinkParser
+
+logger = logging.getLogger(__name__)
+
+
+def resolve_document_path(vault_path: str, file_path: str) -> str:
+    """인덱스의 doc.path와 같은 형태(절대 경로)로 정규화"""
+    path = Path(file_path)
+    if not path.is_absolute():
+        path = Path(vault_path) / path
+    return str(path.resolve())
+
+
+def build_related_graph(
+    search_engine,
+    vault_path: str,
+    file_path: str,
+    top_k: int = 10,
+    similarity_threshold: float = 0.3,
+    depth: int = 1,
+    expand_threshold: float = 0.5
+) -> Dict:
+    """
+    관련 문서 그래프 구성 (multi-depth BFS)
+
+    Args:
+        search_engine: 인덱스가 준비된 AdvancedSearchEngine
+        vault_path: vault 경로 (위키링크 해석용)
+        file_path: 기준 문서 경로 (vault 기준 상대 경로 가능)
+        top_k: 기준 문서의 관련 문서 수 (하위 깊이는 부모 점수에 비례해 줄어듦)
+        similarity_threshold: 관련 문서 유사도 임계값
+        depth: 확장 깊이
+        expand_threshold: 이 점수 이상인 노드만 다음 깊이로 확장
+
+    Returns:
+        {"center": 기준 경로, "nodes": [...], "edges": [...]} - 관련 문서가 없으면 nodes는 기준 문서 하나
+    """
+    file_path = resolve_document_path(vault_path, file_path)
+
+    # visited: path -> (score, depth, parent_path)
+    visited: Dict[str, Tuple[float, int, str]] = {file_path: (1.0, 0, None)}
+    semantic_results = []  # (source_path, result)
+    frontier = [file_path]
+
+    for current_depth in range(1, depth + 1):
+        next_frontier = []
+        for source_path in frontier:
+            source_score = visited[source_path][0]
+            # 부모 점수에 비례한 top-k
+            depth_top_k = max(3, round(top_k * source_score))
+            results = search_engine.get_related_documents(
+                document_path=source_path,
+                top_k=depth_top_k,
+                include_centrality_boost=False,
+                similarity_threshold=similarity_threshold
+            )
+            for result in results or []:
+                path = result.document.path
+                semantic_results.append((source_path, result))
+                if path not in visited:
+                    visited[path] = (result.similarity_score, current_depth, source_path)
+                    if result.similarity_score >= expand_threshold:
+                        next_frontier.append(path)
+
+        frontier = next_frontier
+        if not frontier:
+            break
+        logger.info(f"depth {current_depth}: 다음 확장 노드 {len(next_frontier)}개")
+
+    # 그래프 안 문서끼리의 위키링크
+    parser = WikilinkParser(vault_path)
+    all_paths = set(visited)
+    wikilinks: Dict[str, List[str]] = {}
+    for path in all_paths:
+        resolved = []
+        for link in parser.extract_from_file(path):
+            target = parser.resolve_link(link)
+            if target and target in all_paths:
+                resolved.append(target)
+        if resolved:
+            wikilinks[path] = resolved
+
+    nodes = [
+        {"id": path, "label": Path(path).stem, "path": path,
+         "is_center": node_depth == 0, "score": float(score), "depth": node_depth}
+        for path, (score, node_depth, _parent) in visited.items()
+    ]
+    score_map = {path: score for path, (score, _, _) in visited.items()}
+
+    # 엣지: 의미적 관계 + 위키링크 (양쪽 모두면 both)
+    edge_set: Dict[Tuple[str, str], Tuple[str, float]] = {}
+    for source_path, result in semantic_results:
+        target = result.document.path
+        if target in all_paths:
+            key = tuple(sorted([source_path, target]))
+            if key not in edge_set:
+                edge_set[key] = ("semantic", float(result.similarity_score))
+    for source_path, targets in wikilinks.items():
+        for target in targets:
+            key = tuple(sorted([source_path, target]))
+            if key in edge_set:
+                edge_set[key] = ("both", edge_set[key][1])
+            else:
+                edge_set[key] = ("wikilink", float(score_map.get(target, 0.5)))
+
+    edges = [
+        {"source": source, "target": target, "edge_type": edge_type, "weight": weight}
+        for (source, target), (edge_type, weight) in edge_set.items()
+    ]
+    return {"center": file_path, "nodes": nodes, "edges": edges}
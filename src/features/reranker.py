@@ -19,6 +19,7 @@ except ImportError:
     logging.warning("FlagEmbedding not available. Reranker functionality will be disabled.")
 
 from .advanced_search import SearchResult
+from ..core.search_stages import StageTimer
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -149,7 +150,7 @@ class BGEReranker:
             pairs = []
             for result in candidates:
                 # 문서 요약 생성 (긴 문서 처리)
-                content = self._prepare_document_text(result.document.content)
+                content = self._prepare_document_text(result.document.get_content())
                 pairs.append([query, content])
             
             # 배치 단위로 재순위화 점수 계산
@@ -300,6 +301,7 @@ class RerankerPipeline:
         initial_k: int = 100,
         final_k: int = 10,
         similarity_threshold: float = 0.0,
+        initial_results: Optional[List] = None,
         **search_kwargs
     ) -> List[RerankResult]:
         """
@@ -311,6 +313,7 @@ class RerankerPipeline:
             initial_k: 1차 검색에서 가져올 후보 수
             final_k: 최종 반환할 결과 수
             similarity_threshold: 유사도 임계값
+            initial_results: 이미 구한 1차 검색 결과 (주어지면 1차 검색 생략)
             **search_kwargs: 추가 검색 매개변수
             
         Returns:
@@ -319,7 +322,9 @@ class RerankerPipeline:
         logger.info(f"통합 검색 시작: '{query}' (방법: {search_method})")
         
         # 1단계: 초기 검색
-        if search_method == "semantic":
+        if initial_results is not None:
+            initial_results = initial_results[:initial_k]
+        elif search_method == "semantic":
             initial_results = self.search_engine.semantic_search(
                 query, top_k=initial_k, threshold=similarity_threshold, **search_kwargs
             )
@@ -345,11 +350,12 @@ class RerankerPipeline:
             return []
         
         # 2단계: 재순위화
-        rerank_results = self.reranker.rerank(
-            query=query,
-            search_results=initial_results,
-            top_k=final_k
-        )
+        with StageTimer("rerank"):
+            rerank_results = self.reranker.rerank(
+                query=query,
+                search_results=initial_results,
+                top_k=final_k
+            )
         
         logger.info(f"재순위화 완료: {len(rerank_results)}개 최종 결과")
         
@@ -133,7 +133,7 @@ class SemanticTagger:
                 
                 # 문서 내용과 태그 연관성 학습
                 if normalized_tags:
-                    content_words = self._extract_key_words(doc.content)
+                    content_words = self._extract_key_words(doc.get_content())
                     for tag in normalized_tags:
                         self.tag_concepts[tag].extend(content_words)
                         for word in content_words:
@@ -195,10 +195,10 @@ class SemanticTagger:
         """문서 의미 분석 및 주제 추출"""
         try:
             # BGE-M3 임베딩 생성
-            embedding = self.embedding_engine.encode_text(document.content)
+            embedding = self.embedding_engine.encode_text(document.get_content())
             
             # 핵심 개념 추출
-            key_words = self._extract_key_words(document.content, 30)
+            key_words = self._extract_key_words(document.get_content(), 30)
             key_concepts = {word: 1.0 for word in key_words[:10]}  # 상위 10개
             
             # 기존 태그와의 유사도 계산
@@ -223,7 +223,7 @@ class SemanticTagger:
                 'database': ['database', 'sql', 'query', 'data', 'storage']
             }
             
-            content_lower = document.content.lower()
+            content_lower = document.get_content().lower()
             for topic, keywords in topic_keywords.items():
                 score = sum(1 for kw in keywords if kw in content_lower)
                 if score > 0:
@@ -316,7 +316,7 @@ class SemanticTagger:
                 pattern_tags.append('practices/clean-code')
             
             # 헤더에서 주요 개념 추출
-            headers = re.findall(r'^#+\s+(.+)$', document.content, re.MULTILINE)
+            headers = re.findall(r'^#+\s+(.+)$', document.get_content(), re.MULTILINE)
             header_text = ' '.join(headers).lower()
             
             if 'architecture' in header_text:
@@ -343,7 +343,7 @@ class TopicAnalyzer:
                 # 제목, 태그, 내용에서 주제 검색
                 if (query_lower in doc.title.lower() or
                     any(query_lower in tag.lower() for tag in doc.tags) or
-                    query_lower in doc.content.lower()):
+                    query_lower in doc.get_content().lower()):
                     filtered_docs.append(doc)
             
             documents = filtered_docs
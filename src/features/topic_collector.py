@@ -364,13 +364,35 @@ class TopicCollector:
             logger.error(f"컬렉션 내보내기 실패: {e}")
             return False
     
+    def format_collection(self, collection: DocumentCollection, format_type: Optional[str] = None) -> str:
+        """export_collection()이 파일에 쓸 본문 (데몬이 파일 대신 CLI에 돌려줄 때 사용)"""
+        format_type = (format_type or self.output_format).lower()
+        if format_type == "json":
+            return self._format_as_json(collection)
+        return self._format_as_markdown(collection)
+    
     def _export_as_markdown(self, collection: DocumentCollection, output_file: str) -> bool:
         """마크다운 형식으로 내보내기"""
         try:
-            metadata = collection.metadata
+            content = self._format_as_markdown(collection)
+            
+            # 파일 저장
+            with open(output_file, 'w', encoding='utf-8') as f:
+                f.write(content)
             
-            # 마크다운 콘텐츠 생성
-            content = f"""---
+            logger.info(f"마크다운 컬렉션 저장 완료: {output_file}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"마크다운 내보내기 실패: {e}")
+            return False
+    
+    def _format_as_markdown(self, collection: DocumentCollection) -> str:
+        """마크다운 형식 본문"""
+        metadata = collection.metadata
+
+        # 마크다운 콘텐츠 생성
+        content = f"""---
 tags:
   - vault-intelligence/collection
   - topic/{metadata.topic.lower().replace(' ', '-')}
@@ -397,46 +419,46 @@ total_documents: {metadata.total_documents}
 - **유사도 임계값**: {metadata.similarity_threshold}
 
 """
-            
-            # 태그 분포 (상위 10개)
-            if metadata.tag_distribution:
-                content += "\n### 🏷️ 주요 태그\n\n"
-                for tag, count in list(metadata.tag_distribution.items())[:10]:
-                    content += f"- **{tag}**: {count}개 문서\n"
-            
-            # 디렉토리 분포
-            if metadata.directory_distribution:
-                content += "\n### 📁 디렉토리별 분포\n\n"
-                for dir_path, count in metadata.directory_distribution.items():
-                    content += f"- **{dir_path}**: {count}개 문서\n"
-            
-            content += "\n## 📑 문서 목록\n\n"
-            
-            # 그룹별 문서 나열
-            for group_name, docs in collection.grouped_documents.items():
-                content += f"### {group_name}\n\n"
-                
-                # 단어 수 기준으로 정렬
-                sorted_docs = sorted(docs, key=lambda d: d.word_count, reverse=True)
-                
-                for doc in sorted_docs:
-                    content += f"- **[[{doc.path}]]**"
-                    
-                    if doc.word_count:
-                        content += f" ({doc.word_count:,} 단어)"
-                    
-                    if doc.tags:
-                        tags_str = ", ".join(f"#{tag}" for tag in doc.tags[:3])
-                        content += f" - {tags_str}"
-                    
-                    content += "\n"
-                
+
+        # 태그 분포 (상위 10개)
+        if metadata.tag_distribution:
+            content += "\n### 🏷️ 주요 태그\n\n"
+            for tag, count in list(metadata.tag_distribution.items())[:10]:
+                content += f"- **{tag}**: {count}개 문서\n"
+
+        # 디렉토리 분포
+        if metadata.directory_distribution:
+            content += "\n### 📁 디렉토리별 분포\n\n"
+            for dir_path, count in metadata.directory_distribution.items():
+                content += f"- **{dir_path}**: {count}개 문서\n"
+
+        content += "\n## 📑 문서 목록\n\n"
+
+        # 그룹별 문서 나열
+        for group_name, docs in collection.grouped_documents.items():
+            content += f"### {group_name}\n\n"
+
+            # 단어 수 기준으로 정렬
+            sorted_docs = sorted(docs, key=lambda d: d.word_count, reverse=True)
+
+            for doc in sorted_docs:
+                content += f"- **[[{doc.path}]]**"
+
+                if doc.word_count:
+                    content += f" ({doc.word_count:,} 단어)"
+
+                if doc.tags:
+                    tags_str = ", ".join(f"#{tag}" for tag in doc.tags[:3])
+                    content += f" - {tags_str}"
+
                 content += "\n"
-            
-            # 통계 섹션
-            if self.include_statistics and collection.statistics:
-                stats = collection.statistics
-                content += f"""## 📈 상세 통계
+
+            content += "\n"
+
+        # 통계 섹션
+        if self.include_statistics and collection.statistics:
+            stats = collection.statistics
+            content += f"""## 📈 상세 통계
 
 ### 문서 통계
 - **총 문서**: {stats['document_count']}개
@@ -453,8 +475,8 @@ total_documents: {metadata.total_documents}
 - **가장 오래된**: {stats['modification_dates']['oldest'].strftime('%Y-%m-%d %H:%M')}
 
 """
-            
-            content += f"""---
+
+        content += f"""---
 
 **컬렉션 정보**  
 - 생성 시스템: Vault Intelligence System V2
@@ -462,77 +484,74 @@ total_documents: {metadata.total_documents}
 - 검색 방식: Sentence Transformers (768차원)
 - 임계값: {metadata.similarity_threshold}
 """
+        
+        return content
+    
+    def _export_as_json(self, collection: DocumentCollection, output_file: str) -> bool:
+        """JSON 형식으로 내보내기"""
+        try:
+            content = self._format_as_json(collection)
             
-            # 파일 저장
             with open(output_file, 'w', encoding='utf-8') as f:
                 f.write(content)
             
-            logger.info(f"마크다운 컬렉션 저장 완료: {output_file}")
+            logger.info(f"JSON 컬렉션 저장 완료: {output_file}")
             return True
             
         except Exception as e:
-            logger.error(f"마크다운 내보내기 실패: {e}")
+            logger.error(f"JSON 내보내기 실패: {e}")
             return False
     
-    def _export_as_json(self, collection: DocumentCollection, output_file: str) -> bool:
-        """JSON 형식으로 내보내기"""
-        try:
-            import json
-            
-            # JSON 직렬화 가능한 형태로 변환
-            export_data = {
-                "metadata": {
-                    "topic": collection.metadata.topic,
-                    "total_documents": collection.metadata.total_documents,
-                    "total_word_count": collection.metadata.total_word_count,
-                    "total_size_bytes": collection.metadata.total_size_bytes,
-                    "collection_date": collection.metadata.collection_date.isoformat(),
-                    "search_query": collection.metadata.search_query,
-                    "similarity_threshold": collection.metadata.similarity_threshold,
-                    "tag_distribution": collection.metadata.tag_distribution,
-                    "directory_distribution": collection.metadata.directory_distribution
-                },
-                "documents": [
+    def _format_as_json(self, collection: DocumentCollection) -> str:
+        """JSON 형식 본문"""
+        import json
+        
+        # JSON 직렬화 가능한 형태로 변환
+        export_data = {
+            "metadata": {
+                "topic": collection.metadata.topic,
+                "total_documents": collection.metadata.total_documents,
+                "total_word_count": collection.metadata.total_word_count,
+                "total_size_bytes": collection.metadata.total_size_bytes,
+                "collection_date": collection.metadata.collection_date.isoformat(),
+                "search_query": collection.metadata.search_query,
+                "similarity_threshold": collection.metadata.similarity_threshold,
+                "tag_distribution": collection.metadata.tag_distribution,
+                "directory_distribution": collection.metadata.directory_distribution
+            },
+            "documents": [
+                {
+                    "path": doc.path,
+                    "title": doc.title,
+                    "word_count": doc.word_count,
+                    "file_size": doc.file_size,
+                    "tags": doc.tags,
+                    "modified_at": doc.modified_at.isoformat()
+                }
+                for doc in collection.documents
+            ],
+            "grouped_documents": {
+                group: [
                     {
                         "path": doc.path,
                         "title": doc.title,
-                        "word_count": doc.word_count,
-                        "file_size": doc.file_size,
-                        "tags": doc.tags,
-                        "modified_at": doc.modified_at.isoformat()
+                        "word_count": doc.word_count
                     }
-                    for doc in collection.documents
-                ],
-                "grouped_documents": {
-                    group: [
-                        {
-                            "path": doc.path,
-                            "title": doc.title,
-                            "word_count": doc.word_count
-                        }
-                        for doc in docs
-                    ]
-                    for group, docs in collection.grouped_documents.items()
-                },
-                "statistics": collection.statistics
+                    for doc in docs
+                ]
+                for group, docs in collection.grouped_documents.items()
+            },
+            "statistics": dict(collection.statistics) if collection.statistics else collection.statistics
+        }
+
+        # 날짜 객체 처리
+        if collection.statistics and 'modification_dates' in collection.statistics:
+            export_data['statistics']['modification_dates'] = {
+                'newest': collection.statistics['modification_dates']['newest'].isoformat(),
+                'oldest': collection.statistics['modification_dates']['oldest'].isoformat()
             }
-            
-            # 날짜 객체 처리
-            if collection.statistics and 'modification_dates' in collection.statistics:
-                export_data['statistics']['modification_dates'] = {
-                    'newest': collection.statistics['modification_dates']['newest'].isoformat(),
-                    'oldest': collection.statistics['modification_dates']['oldest'].isoformat()
-                }
-            
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(export_data, f, indent=2, ensure_ascii=False)
-            
-            logger.info(f"JSON 컬렉션 저장 완료: {output_file}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"JSON 내보내기 실패: {e}")
-            return False
+        
+        return json.dumps(export_data, indent=2, ensure_ascii=False)
     
     def suggest_related_topics(self, topic: str, top_k: int = 5) -> List[Tuple[str, int]]:
         """관련 주제 제안"""
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Vault Analysis Reports for Vault Intelligence System V2
+
+관련 문서/중복/지식 공백/그래프/주제 수집/MOC 분석 결과를 JSON으로 보낼 수 있는 dict로 변환
+- 데몬 엔드포인트와 CLI(데몬이 없을 때 로컬 엔진)가 같은 함수를 사용 → 출력 형식이 경로와 무관하게 동일
+- 파일 저장은 하지 않음: 저장할 본문은 render=True일 때 "document"로 돌려주고 CLI가 저장
+"""
+
+import logging
+from datetime import date, datetime
+from typing import Dict, List
+
+import numpy as np
+
+from ..core.vault_processor import Document
+from .related_graph import build_related_graph
+
+logger = logging.getLogger(__name__)
+
+
+def to_plain(value):
+    """JSON 직렬화 가능한 값으로 변환 (numpy 스칼라/배열, 날짜, 튜플/집합)"""
+    if isinstance(value, dict):
+        return {str(key): to_plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        return [to_plain(item) for item in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _document_summary(doc: Document) -> Dict:
+    return {"path": doc.path, "title": doc.title, "word_count": doc.word_count, "tags": list(doc.tags or [])}
+
+
+def related_report(
+    search_engine,
+    document_path: str,
+    top_k: int = 5,
+    similarity_threshold: float = 0.3,
+    include_centrality: bool = True
+) -> List[Dict]:
+    """관련 문서 목록 (검색 결과와 같은 필드 + tags)"""
+    results = search_engine.get_related_documents(
+        document_path=document_path,
+        top_k=top_k,
+        include_centrality_boost=include_centrality,
+        similarity_threshold=similarity_threshold
+    )
+    return [
+        {
+            "path": r.document.path,
+            "title": r.document.title,
+            "score": float(r.similarity_score),
+            "rank": r.rank or i + 1,
+            "match_type": r.match_type,
+            "snippet": r.snippet or "",
+            "tags": list(r.document.tags or []),
+        }
+        for i, r in enumerate(results)
+    ]
+
+
+def duplicate_report(search_engine, config: Dict = None) -> Dict:
+    """중복 문서 그룹"""
+    from .duplicate_detector import DuplicateDetector
+
+    analysis = DuplicateDetector(search_engine, config or {}).find_duplicates()
+    return {
+        "total_documents": analysis.total_documents,
+        "duplicate_count": analysis.duplicate_count,
+        "unique_count": analysis.unique_count,
+        "duplicate_ratio": analysis.get_duplicate_ratio(),
+        "similarity_threshold": float(analysis.similarity_threshold),
+        "groups": [
+            {
+                "id": group.id,
+                "average_similarity": float(group.average_similarity),
+                "documents": [_document_summary(doc) for doc in group.documents],
+            }
+            for group in analysis.duplicate_groups
+        ],
+    }
+
+
+def knowledge_gap_report(search_engine, similarity_threshold: float = 0.3, min_connections: int = 2) -> Dict:
+    """지식 공백 분석 (analyze_knowledge_gaps 결과 구조 그대로)"""
+    return to_plain(search_engine.analyze_knowledge_gaps(
+        similarity_threshold=similarity_threshold,
+        min_connections=min_connections
+    ))
+
+
+def graph_report(
+    search_engine,
+    vault_path: str,
+    file_path: str,
+    top_k: int = 10,
+    similarity_threshold: float = 0.3,
+    depth: int = 1,
+    expand_threshold: float = 0.5
+) -> Dict:
+    """관련 문서 그래프 노드/엣지"""
+    return build_related_graph(search_engine, vault_path, file_path, top_k=top_k,
+                               similarity_threshold=similarity_threshold,
+                               depth=depth, expand_threshold=expand_threshold)
+
+
+def collection_report(
+    search_engine,
+    topic: str,
+    top_k: int = 100,
+    threshold: float = 0.3,
+    config: Dict = None,
+    use_expansion: bool = False,
+    include_synonyms: bool = True,
+    include_hyde: bool = True,
+    render: bool = False
+) -> Dict:
+    """주제별 문서 수집 요약 (render=True면 저장할 컬렉션 본문 포함)"""
+    from .topic_collector import TopicCollector
+
+    collector = TopicCollector(search_engine, config or {})
+    collection = collector.collect_topic(
+        topic=topic,
+        top_k=top_k,
+        threshold=threshold,
+        use_expansion=use_expansion,
+        include_synonyms=include_synonyms,
+        include_hyde=include_hyde
+    )
+    metadata = collection.metadata
+    return to_plain({
+        "topic": metadata.topic,
+        "total_documents": metadata.total_documents,
+        "total_word_count": metadata.total_word_count,
+        "total_size_bytes": metadata.total_size_bytes,
+        "tag_distribution": metadata.tag_distribution,
+        "directory_distribution": metadata.directory_distribution,
+        "documents": [_document_summary(doc) for doc in collection.documents],
+        "document": collector.format_collection(collection) if render else None,
+    })
+
+
+def moc_report(
+    search_engine,
+    topic: str,
+    top_k: int = 100,
+    threshold: float = 0.3,
+    config: Dict = None,
+    include_orphans: bool = False,
+    use_expansion: bool = True,
+    render: bool = False
+) -> Dict:
+    """MOC 생성 요약 (render=True면 저장할 MOC 마크다운 포함)"""
+    from .moc_generator import MOCGenerator
+
+    generator = MOCGenerator(search_engine, config or {})
+    moc_data = generator.generate_moc(
+        topic=topic,
+        top_k=top_k,
+        threshold=threshold,
+        include_orphans=include_orphans,
+        use_expansion=use_expansion
+    )
+    return to_plain({
+        "topic": moc_data.topic,
+        "total_documents": moc_data.total_documents,
+        "core_documents": [_document_summary(doc) for doc in moc_data.core_documents],
+        "categories": [
+            {"name": category.name, "document_count": len(category.documents)}
+            for category in moc_data.categories
+        ],
+        "learning_path": [
+            {"step": step.step, "title": step.title, "difficulty_level": step.difficulty_level,
+             "document_count": len(step.documents)}
+            for step in moc_data.learning_path
+        ],
+        "related_topics": moc_data.related_topics,
+        "recent_update_count": len(moc_data.recent_updates),
+        "relationship_count": len(moc_data.relationships),
+        "document": generator.format_moc(moc_data) if render else None,
+    })
@@ -0,0 +1,488 @@
+#!/usr/bin/env python3
+"""
+Background indexing for the vis daemon server.
+
+- IndexJob: progress record for one reindex (exposed as /jobs resources); also
+  the BuildProgress the engine reports phases to and polls for cancellation
+- BackgroundIndexer: builds a new engine instance off to the side and swaps it
+  in atomically, so searches keep hitting the old index until the new one is ready
+- VaultWatcher: watches the vault (watchdog/inotify when installed, polling
+  otherwise), debounces bursts of edits and reports changed/removed notes
+- IndexRequestQueue / SnapshotFollower: pre-fork mode plumbing - workers hand
+  reindex requests to the master through files and follow the index snapshots
+  it publishes
+"""
+
+import os
+import json
+import time
+import uuid
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    WATCHDOG_AVAILABLE = False
+
+from .core.reindex_checkpoint import BuildProgress, ReindexCancelled
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class IndexJob(BuildProgress):
+    """State of one reindex job
+
+    Full rebuilds report their phase (scanning, embedding, passages, saving,
+    colbert) and per-phase document counts through the BuildProgress hooks;
+    throughput and ETA are derived from the current phase.
+    """
+    id: str
+    kind: str  # "full" or "incremental"
+    status: str = "queued"  # queued, running, succeeded, failed, cancelled
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    force: bool = False
+    with_colbert: bool = False
+    vault: Optional[str] = None  # extra vault name (None = the boot vault)
+    changed: int = 0
+    removed: int = 0
+    document_count: int = 0
+    index_version: int = 0
+    error: Optional[str] = None
+    phase: Optional[str] = None
+    phase_started_at: Optional[float] = None
+    documents_done: int = 0
+    documents_total: int = 0
+    cancel_requested: bool = False
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("succeeded", "failed", "cancelled")
+
+    def start_phase(self, phase: str, total: int = 0) -> None:
+        self.phase = phase
+        self.phase_started_at = time.time()
+        self.documents_done = 0
+        self.documents_total = total
+
+    def advance(self, count: int = 1) -> None:
+        self.documents_done += count
+
+    def is_cancelled(self) -> bool:
+        return self.cancel_requested
+
+    def cancel(self) -> None:
+        self.cancel_requested = True
+
+    def to_dict(self) -> Dict:
+        data = asdict(self)
+        now = time.time()
+        end = self.finished_at or now
+        data["duration_seconds"] = end - self.started_at if self.started_at else 0.0
+
+        # Documents per second in the current phase, and the time left at that rate
+        throughput = 0.0
+        if self.phase_started_at and self.documents_done:
+            throughput = self.documents_done / max((self.finished_at or now) - self.phase_started_at, 1e-6)
+        data["throughput"] = throughput
+        remaining = max(self.documents_total - self.documents_done, 0)
+        data["eta_seconds"] = remaining / throughput if throughput and not self.done else None
+        return data
+
+
+class BackgroundIndexer:
+    """Runs reindex jobs against a copy of the live engine and swaps the result in
+
+    Jobs are expected to run one at a time (the server's index pool has a single
+    worker and no queue), so each job starts from the engine the previous one
+    installed and no update is lost.
+    """
+
+    def __init__(self, get_engine: Callable[[], object], swap_engine: Callable[[object], None],
+                 max_jobs: int = 50, on_finished: Optional[Callable[[IndexJob], None]] = None):
+        """
+        Args:
+            get_engine: Returns the engine currently serving searches
+            swap_engine: Installs a new engine (must be a single reference assignment)
+            max_jobs: Number of finished jobs kept for /jobs
+            on_finished: Called with each job once it succeeded or failed (e.g. metrics)
+        """
+        self._get_engine = get_engine
+        self._swap_engine = swap_engine
+        self._on_finished = on_finished
+        self.max_jobs = max(max_jobs, 1)
+        self._jobs: "OrderedDict[str, IndexJob]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create_job(self, kind: str, job_id: Optional[str] = None, **fields) -> IndexJob:
+        job = IndexJob(id=job_id or uuid.uuid4().hex[:12], kind=kind, **fields)
+        with self._lock:
+            self._jobs[job.id] = job
+            # Drop the oldest finished jobs beyond max_jobs
+            excess = len(self._jobs) - self.max_jobs
+            if excess > 0:
+                for job_id in [j.id for j in self._jobs.values() if j.done][:excess]:
+                    del self._jobs[job_id]
+        return job
+
+    def discard_job(self, job: IndexJob) -> None:
+        """Forget a job that was never scheduled"""
+        with self._lock:
+            self._jobs.pop(job.id, None)
+
+    def get_job(self, job_id: str) -> Optional[IndexJob]:
+        return self._jobs.get(job_id)
+
+    def list_jobs(self) -> List[IndexJob]:
+        with self._lock:
+            return list(reversed(self._jobs.values()))
+
+    def cancel(self, job_id: str) -> Optional[IndexJob]:
+        """Ask a job to stop at its next checkpoint; returns the job (None if unknown)"""
+        job = self._jobs.get(job_id)
+        if job is not None and not job.done:
+            job.cancel()
+            logger.info(f"Cancellation requested for index job {job.id}")
+        return job
+
+    def run_full(self, job: IndexJob) -> bool:
+        """Rebuild the whole index into a copy of the engine
+
+        Progress is checkpointed to the cache, so a cancelled or killed rebuild
+        picks up where it stopped when the next one starts.
+        """
+        return self._run(job, lambda engine: engine.rebuild_index(
+            force_rebuild=job.force, with_colbert=job.with_colbert, progress=job))
+
+    def run_incremental(self, job: IndexJob, changed: List[str], removed: List[str]) -> bool:
+        """Re-embed only the touched notes into a copy of the engine"""
+        job.changed = len(changed)
+        job.removed = len(removed)
+        return self._run(job, lambda engine: engine.refresh_documents(changed, removed))
+
+    def _run(self, job: IndexJob, build: Callable[[object], Optional[object]]) -> bool:
+        job.status = "running"
+        job.started_at = time.time()
+        try:
+            if job.cancel_requested:
+                raise ReindexCancelled("cancelled before start")
+            engine = self._get_engine()
+            if engine is None:
+                raise RuntimeError("search engine not initialized")
+
+            new_engine = build(engine)
+            if new_engine is None:
+                raise RuntimeError(f"{job.kind} reindex failed")
+
+            self._swap_engine(new_engine)
+            job.document_count = len(new_engine.documents)
+            version = getattr(new_engine, "index_version", 0)
+            job.index_version = version if isinstance(version, int) else 0
+            job.status = "succeeded"
+            logger.info(f"Index job {job.id} ({job.kind}) finished: {job.document_count} documents, "
+                        f"version {job.index_version}")
+            return True
+        except ReindexCancelled as e:
+            job.status = "cancelled"
+            job.error = str(e)
+            logger.info(f"Index job {job.id} ({job.kind}) cancelled: {e}")
+            return False
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+            logger.error(f"Index job {job.id} ({job.kind}) failed: {e}")
+            return False
+        finally:
+            job.finished_at = time.time()
+            if self._on_finished is not None:
+                try:
+                    self._on_finished(job)
+                except Exception as e:
+                    logger.debug(f"Job callback failed: {e}")
+
+
+class VaultWatcher:
+    """Reports debounced vault changes to a callback
+
+    on_changes(changed, removed) is called from the watcher thread once no new
+    event has arrived for debounce_seconds. If it returns False (e.g. a reindex
+    is already running) the changes are kept and offered again later.
+    """
+
+    def __init__(self, processor, on_changes: Callable[[List[str], List[str]], bool],
+                 debounce_seconds: float = 2.0, poll_interval: float = 10.0, use_native: bool = True):
+        """
+        Args:
+            processor: VaultProcessor (file enumeration and include/exclude rules)
+            on_changes: Callback receiving (changed_paths, removed_paths)
+            debounce_seconds: Quiet period before a batch of changes is reported
+            poll_interval: Seconds between scans in polling mode
+            use_native: Use watchdog (inotify/FSEvents) when installed
+        """
+        self.processor = processor
+        self.on_changes = on_changes
+        self.debounce = max(debounce_seconds, 0.0)
+        self.poll_interval = max(poll_interval, 0.1)
+        self.mode = "native" if use_native and WATCHDOG_AVAILABLE else "polling"
+
+        self._pending: Dict[str, bool] = {}  # path -> removed
+        self._last_event = 0.0
+        self._rescan = False
+        self._snapshot: Dict[str, Tuple[float, int]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._observer = None
+
+    def start(self) -> None:
+        self._snapshot = self._scan()
+        if self.mode == "native":
+            self._observer = Observer()
+            self._observer.schedule(_WatchdogHandler(self), str(self.processor.vault_path), recursive=True)
+            self._observer.start()
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="vis-watcher", daemon=True)
+        self._thread.start()
+        logger.info(f"Watching vault for changes ({self.mode}, debounce {self.debounce}s): "
+                    f"{len(self._snapshot)} files")
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout=5)
+            self._observer = None
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def record(self, path: str, removed: bool = False) -> None:
+        """Queue one changed/removed path (called from watchdog or polling)"""
+        if not self.processor.should_process(Path(path)):
+            return
+        with self._lock:
+            self._pending[str(path)] = removed
+            self._last_event = time.monotonic()
+
+    def request_rescan(self) -> None:
+        """Diff against the last snapshot on the next tick (directory moves/deletes)"""
+        self._rescan = True
+
+    def _scan(self) -> Dict[str, Tuple[float, int]]:
+        snapshot = {}
+        for file_path in self.processor.find_all_files():
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                continue
+            snapshot[str(file_path)] = (stat.st_mtime, stat.st_size)
+        return snapshot
+
+    def poll(self) -> None:
+        """Compare the vault against the last snapshot and record the differences"""
+        current = self._scan()
+        for path, signature in current.items():
+            if self._snapshot.get(path) != signature:
+                self.record(path)
+        for path in self._snapshot.keys() - current.keys():
+            self.record(path, removed=True)
+        self._snapshot = current
+
+    def flush(self, force: bool = False) -> bool:
+        """Report pending changes once the debounce window has passed"""
+        with self._lock:
+            if not self._pending:
+                return False
+            if not force and time.monotonic() - self._last_event < self.debounce:
+                return False
+            batch, self._pending = self._pending, {}
+
+        changed = sorted(path for path, removed in batch.items() if not removed)
+        removed = sorted(path for path, removed in batch.items() if removed)
+        try:
+            accepted = self.on_changes(changed, removed)
+        except Exception as e:
+            logger.error(f"Change callback failed: {e}")
+            accepted = False
+
+        if not accepted:
+            # Put them back without overwriting events that arrived meanwhile
+            with self._lock:
+                for path, was_removed in batch.items():
+                    self._pending.setdefault(path, was_removed)
+                self._last_event = time.monotonic()
+        return accepted
+
+    def _loop(self) -> None:
+        tick = min(max(self.debounce / 2, 0.1), 1.0)
+        last_poll = time.monotonic()
+        while not self._stop.wait(tick):
+            try:
+                now = time.monotonic()
+                if self._rescan or (self.mode == "polling" and now - last_poll >= self.poll_interval):
+                    self._rescan = False
+                    last_poll = now
+                    self.poll()
+                self.flush()
+            except Exception as e:
+                logger.error(f"Vault watcher error: {e}")
+
+
+def _write_json(path: Path, data: Dict) -> None:
+    """Write JSON so readers in other processes never see a partial file"""
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(data), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _read_json(path: Path) -> Optional[Dict]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+class IndexRequestQueue:
+    """File-based reindex requests and job states shared by pre-fork processes
+
+    Workers submit requests; the master (the only process that writes the index)
+    claims them, runs them and writes job states back, so /jobs answers the same
+    on every worker.
+    """
+
+    def __init__(self, root: str, max_jobs: int = 50):
+        self.requests_dir = Path(root) / "requests"
+        self.jobs_dir = Path(root) / "jobs"
+        self.cancel_dir = Path(root) / "cancel"
+        for directory in (self.requests_dir, self.jobs_dir, self.cancel_dir):
+            directory.mkdir(parents=True, exist_ok=True)
+        self.max_jobs = max(max_jobs, 1)
+
+    def submit(self, kind: str = "full", force: bool = False, with_colbert: bool = False) -> Dict:
+        """Queue a request for the master; returns the queued job state"""
+        job = IndexJob(id=uuid.uuid4().hex[:12], kind=kind, force=force, with_colbert=with_colbert)
+        data = job.to_dict()
+        self.write_job(data)
+        _write_json(self.requests_dir / f"{job.id}.json", {"id": job.id, "kind": kind, "force": force,
+                                                           "with_colbert": with_colbert,
+                                                           "created_at": job.created_at})
+        return data
+
+    def request_cancel(self, job_id: str) -> None:
+        """Ask the master to cancel a queued or running job"""
+        _write_json(self.cancel_dir / f"{job_id}.json", {"id": job_id})
+
+    def take_cancellations(self) -> List[str]:
+        """Master: job ids whose cancellation was requested since the last call"""
+        job_ids = []
+        for path in self.cancel_dir.glob("*.json"):
+            job_ids.append(path.stem)
+            path.unlink(missing_ok=True)
+        return job_ids
+
+    def is_pending(self, job_id: str) -> bool:
+        return (self.requests_dir / f"{job_id}.json").exists()
+
+    def pending(self) -> List[Dict]:
+        """Unclaimed requests, oldest first"""
+        requests = [_read_json(path) for path in self.requests_dir.glob("*.json")]
+        return sorted((r for r in requests if r), key=lambda r: r.get("created_at", 0))
+
+    def claim(self, job_id: str) -> None:
+        try:
+            (self.requests_dir / f"{job_id}.json").unlink()
+        except FileNotFoundError:
+            pass
+
+    def write_job(self, data: Dict) -> None:
+        _write_json(self.jobs_dir / f"{data['id']}.json", data)
+        stale = sorted(self.jobs_dir.glob("*.json"), key=lambda path: path.stat().st_mtime)[:-self.max_jobs]
+        for path in stale:
+            path.unlink(missing_ok=True)
+
+    def read_job(self, job_id: str) -> Optional[Dict]:
+        return _read_json(self.jobs_dir / f"{job_id}.json")
+
+    def list_jobs(self) -> List[Dict]:
+        jobs = [_read_json(path) for path in self.jobs_dir.glob("*.json")]
+        return sorted((j for j in jobs if j), key=lambda j: j.get("created_at", 0), reverse=True)
+
+
+class SnapshotFollower:
+    """Polls for a newly published index snapshot and hands it to a loader
+
+    on_snapshot(snapshot_id) returns True once the snapshot is installed; on
+    False the same snapshot is retried at the next poll.
+    """
+
+    def __init__(self, get_current: Callable[[], Optional[str]], on_snapshot: Callable[[str], bool],
+                 interval: float = 1.0):
+        self.get_current = get_current
+        self.on_snapshot = on_snapshot
+        self.interval = max(interval, 0.05)
+        self.loaded_id: Optional[str] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def check(self) -> bool:
+        """Load the current snapshot if it changed; True if a new one was installed"""
+        with self._lock:
+            current = self.get_current()
+            if current is None or current == self.loaded_id:
+                return False
+            try:
+                installed = self.on_snapshot(current)
+            except Exception as e:
+                logger.error(f"Failed to load index snapshot {current}: {e}")
+                installed = False
+            if installed:
+                self.loaded_id = current
+            return installed
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="vis-snapshot-follower", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.check()
+
+
+if WATCHDOG_AVAILABLE:
+    class _WatchdogHandler(FileSystemEventHandler):
+        """Forwards watchdog events to VaultWatcher"""
+
+        def __init__(self, watcher: VaultWatcher):
+            self.watcher = watcher
+
+        def on_any_event(self, event):
+            if event.is_directory:
+                if event.event_type in ("moved", "deleted"):
+                    self.watcher.request_rescan()
+                return
+
+            if event.event_type in ("created", "modified", "closed"):
+                self.watcher.record(event.src_path)
+            elif event.event_type == "deleted":
+                self.watcher.record(event.src_path, removed=True)
+            elif event.event_type == "moved":
+                self.watcher.record(event.src_path, removed=True)
+                self.watcher.record(event.dest_path)
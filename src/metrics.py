@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Prometheus-style metrics for the vis daemon server.
+
+Minimal in-process counters, gauges and histograms rendered in the text
+exposition format (version 0.0.4), so /metrics can be scraped without a
+client library or any external service.
+"""
+
+import math
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; covers cached responses (~ms) up to cold model loads
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+REINDEX_BUCKETS = (0.1, 0.5, 1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0, 3600.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra is not None:
+        pairs.append(f'{extra[0]}="{_escape(extra[1])}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labelvalues: Sequence) -> Tuple[str, ...]:
+        if len(labelvalues) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {labelvalues}")
+        return tuple(str(v) for v in labelvalues)
+
+    def _samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+
+class _ValueMetric(_Metric):
+    """One float value per label set"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, *labelvalues) -> None:
+        key = self._key(labelvalues)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def value(self, *labelvalues) -> float:
+        return self._values.get(self._key(labelvalues), 0.0)
+
+    def _samples(self) -> Iterable[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Counter(_ValueMetric):
+    """Monotonically increasing value per label set
+
+    set() is for mirroring a counter maintained elsewhere (e.g. cache statistics).
+    """
+    kind = "counter"
+
+    def inc(self, *labelvalues, amount: float = 1.0) -> None:
+        key = self._key(labelvalues)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(_ValueMetric):
+    """Point-in-time value per label set (set at scrape time)"""
+    kind = "gauge"
+
+
+class Histogram(_Metric):
+    """Cumulative bucket counts, sum and count per label set"""
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # key -> [per-bucket counts..., +Inf count], sum
+        self._counts: Dict[Tuple[str, ...], List[int]] = {}
+        self._sums: Dict[Tuple[str, ...], float] = {}
+
+    def observe(self, value: float, *labelvalues) -> None:
+        key = self._key(labelvalues)
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None:
+                counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+                self._sums[key] = 0.0
+            counts[index] += 1
+            self._sums[key] += value
+
+    def count(self, *labelvalues) -> int:
+        return sum(self._counts.get(self._key(labelvalues), []))
+
+    def _samples(self) -> Iterable[str]:
+        with self._lock:
+            items = sorted((key, list(counts), self._sums[key]) for key, counts in self._counts.items())
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, ("le", _format_value(bound)))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class MetricsRegistry:
+    """Ordered collection of metrics rendered together"""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def _register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class ServerMetrics:
+    """Metrics exported by the vis daemon"""
+
+    def __init__(self):
+        registry = self.registry = MetricsRegistry()
+
+        self.requests = registry.counter(
+            "vis_search_requests_total", "Search requests by method and outcome", ("method", "status"))
+        self.request_duration = registry.histogram(
+            "vis_search_request_duration_seconds", "End-to-end /search latency by method", ("method",))
+        self.stage_duration = registry.histogram(
+            "vis_search_stage_duration_seconds",
+            "Latency of search stages (encode, score, keyword, fuse, rerank, snippet)", ("stage",))
+
+        self.reindex_total = registry.counter(
+            "vis_reindex_total", "Reindex jobs by kind and outcome", ("kind", "status"))
+        self.reindex_duration = registry.histogram(
+            "vis_reindex_duration_seconds", "Reindex job duration by kind", ("kind",), buckets=REINDEX_BUCKETS)
+
+        self.cache_hits = registry.counter("vis_cache_hits_total", "Cache hits since start", ("cache",))
+        self.cache_misses = registry.counter("vis_cache_misses_total", "Cache misses since start", ("cache",))
+        self.cache_hit_ratio = registry.gauge("vis_cache_hit_ratio", "Cache hit ratio since start", ("cache",))
+        self.cache_entries = registry.gauge("vis_cache_entries", "Entries currently cached", ("cache",))
+
+        self.index_documents = registry.gauge("vis_index_documents", "Documents in the live index")
+        self.index_passages = registry.gauge("vis_index_passages", "Passages in the live passage index")
+        self.index_bytes = registry.gauge("vis_index_embedding_bytes", "Bytes held by dense embedding matrices")
+        self.index_version = registry.gauge("vis_index_version", "Version of the live index")
+        self.resident_models = registry.gauge("vis_resident_models", "Models loaded in memory")
+        self.pool_in_flight = registry.gauge("vis_pool_in_flight", "Tasks running or queued per work pool", ("pool",))
+        self.vault_memory = registry.gauge(
+            "vis_vault_memory_bytes", "Estimated index memory per hosted vault (0 when unloaded)", ("vault",))
+        self.vault_loaded = registry.gauge("vis_vault_loaded", "Whether a hosted vault's index is loaded", ("vault",))
+
+        self.admission_rejected = registry.counter(
+            "vis_admission_rejected_total", "Searches shed by admission control by cost class and reason",
+            ("class", "reason"))
+        self.admission_running = registry.gauge(
+            "vis_admission_running", "Admitted searches running per cost class", ("class",))
+        self.admission_queued = registry.gauge(
+            "vis_admission_queued", "Searches waiting for admission per cost class", ("class",))
+
+    def observe_stage(self, stage: str, seconds: float) -> None:
+        self.stage_duration.observe(seconds, stage)
+
+    def observe_request(self, method: str, status: str, seconds: float) -> None:
+        self.requests.inc(method, status)
+        self.request_duration.observe(seconds, method)
+
+    def observe_reindex(self, kind: str, status: str, seconds: float) -> None:
+        self.reindex_total.inc(kind, status)
+        self.reindex_duration.observe(seconds, kind)
+
+    def set_cache_statistics(self, cache: str, stats: Optional[Dict]) -> None:
+        if not isinstance(stats, dict):
+            return
+        hits, misses = stats.get("hits", 0), stats.get("misses", 0)
+        self.cache_hits.set(hits, cache)
+        self.cache_misses.set(misses, cache)
+        self.cache_hit_ratio.set(hits / (hits + misses) if hits + misses else 0.0, cache)
+        self.cache_entries.set(stats.get("entries", 0), cache)
+
+    def set_admission_statistics(self, stats: Optional[Dict]) -> None:
+        if not isinstance(stats, dict):
+            return
+        for name, counts in stats.get("classes", {}).items():
+            self.admission_running.set(counts.get("running", 0), name)
+            self.admission_queued.set(counts.get("queued", 0), name)
+        for key, count in stats.get("rejected", {}).items():
+            name, _, reason = key.partition(":")
+            self.admission_rejected.set(count, name, reason)
+
+    def render(self) -> str:
+        return self.registry.render()
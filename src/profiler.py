@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Sampling profiler for the running vis daemon server.
+
+A pure-Python wall-clock stack sampler: the profiling thread reads every
+thread's current frame (sys._current_frames) at a fixed interval and counts
+identical stacks. The result is in the collapsed ("folded") format that
+flamegraph.pl, speedscope and inferno read directly. Optionally tracemalloc
+traces allocations made during the same window and reports the top sites.
+
+No profiler has to wrap the server process, so a latency regression can be
+looked at on the live daemon without restarting it.
+"""
+
+import os
+import sys
+import time
+import threading
+import tracemalloc
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+# Leaf frames of threads that are blocked waiting for work; left out by default
+# so the flame graph shows where time is spent, not where threads sleep
+IDLE_LEAVES = frozenset({
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+    ("socket.py", "accept"),
+})
+
+MAX_DEPTH = 128
+
+# Frames show paths relative to sys.path entries (site-packages/..., src/...)
+_SHORTEN_PREFIXES = tuple(sorted(
+    {os.path.join(path, "") for path in sys.path if path and os.path.isdir(path)} | {os.path.join(os.getcwd(), "")},
+    key=len, reverse=True
+))
+
+
+class ProfileInProgress(Exception):
+    """Raised when a profile is requested while another one is running"""
+    pass
+
+
+@dataclass
+class ProfileResult:
+    """Outcome of one sampling window"""
+    seconds: float
+    interval: float
+    samples: int = 0
+    stacks: Counter = field(default_factory=Counter)
+    threads: Dict[str, int] = field(default_factory=dict)
+    idle_samples: int = 0
+    top_allocations: Optional[List[Dict]] = None
+
+    def collapsed(self, limit: int = 0) -> str:
+        """Folded stacks, one `thread;frame;...;leaf count` line per distinct stack, most frequent first"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common(limit or None))
+
+    def to_dict(self, top_stacks: int = 0) -> Dict:
+        leaves = Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        return {
+            "seconds": self.seconds,
+            "interval_ms": self.interval * 1000,
+            "samples": self.samples,
+            "idle_samples": self.idle_samples,
+            "threads": self.threads,
+            "top_functions": [{"frame": frame, "samples": count} for frame, count in leaves.most_common(20)],
+            "collapsed": self.collapsed(top_stacks),
+            "top_allocations": self.top_allocations,
+        }
+
+
+def _frame_label(code) -> str:
+    filename = code.co_filename
+    for prefix in _SHORTEN_PREFIXES:
+        if filename.startswith(prefix):
+            filename = filename[len(prefix):]
+            break
+    # Semicolons separate frames in the folded format (the count follows the last space)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(";", ":")
+
+
+def _is_idle(frame) -> bool:
+    code = frame.f_code
+    return (os.path.basename(code.co_filename), code.co_name) in IDLE_LEAVES
+
+
+class StackSampler:
+    """Samples all Python threads' stacks at a fixed interval (one profile at a time)"""
+
+    _running = threading.Lock()
+
+    def __init__(self, interval: float = 0.005, include_idle: bool = False):
+        """
+        Args:
+            interval: Seconds between samples (wall clock)
+            include_idle: Keep stacks of threads blocked waiting for work
+        """
+        self.interval = max(interval, 0.001)
+        self.include_idle = include_idle
+
+    def run(self, seconds: float, memory_top: int = 0) -> ProfileResult:
+        """Sample for `seconds` on the calling thread and return the aggregated stacks
+
+        Args:
+            seconds: Length of the sampling window
+            memory_top: When > 0, trace allocations during the window and report this many top sites
+
+        Raises:
+            ProfileInProgress: If another profile is running in this process
+        """
+        if not StackSampler._running.acquire(blocking=False):
+            raise ProfileInProgress("A profile is already running")
+        started_tracing = False
+        try:
+            if memory_top > 0 and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+
+            result = self._sample(seconds)
+
+            if memory_top > 0:
+                result.top_allocations = self._top_allocations(memory_top)
+            return result
+        finally:
+            if started_tracing:
+                tracemalloc.stop()
+            StackSampler._running.release()
+
+    def _sample(self, seconds: float) -> ProfileResult:
+        result = ProfileResult(seconds=seconds, interval=self.interval)
+        own_thread = threading.get_ident()
+        names: Dict[int, str] = {}
+        deadline = time.perf_counter() + seconds
+        next_sample = time.perf_counter()
+
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            if now < next_sample:
+                time.sleep(next_sample - now)
+            next_sample += self.interval
+
+            frames = sys._current_frames()
+            if names.keys() != frames.keys():
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+            result.samples += 1
+            for thread_id, frame in frames.items():
+                if thread_id == own_thread:
+                    continue
+                if not self.include_idle and _is_idle(frame):
+                    result.idle_samples += 1
+                    continue
+                thread_name = names.get(thread_id, f"thread-{thread_id}")
+                result.stacks[self._collapse(thread_name, frame)] += 1
+                result.threads[thread_name] = result.threads.get(thread_name, 0) + 1
+        return result
+
+    @staticmethod
+    def _collapse(thread_name: str, frame) -> str:
+        labels: List[str] = []
+        while frame is not None and len(labels) < MAX_DEPTH:
+            labels.append(_frame_label(frame.f_code))
+            frame = frame.f_back
+        labels.append(thread_name.replace(";", ":").replace(" ", "_"))
+        return ";".join(reversed(labels))
+
+    @staticmethod
+    def _top_allocations(limit: int) -> List[Dict]:
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ))
+        return [
+            {"file": stat.traceback[0].filename, "line": stat.traceback[0].lineno,
+             "size_bytes": stat.size, "count": stat.count}
+            for stat in snapshot.statistics("lineno")[:limit]
+        ]
+
+
+def profile(seconds: float, interval: float = 0.005, include_idle: bool = False,
+            memory_top: int = 0) -> ProfileResult:
+    """Sample the current process for `seconds` (see StackSampler.run)"""
+    return StackSampler(interval=interval, include_idle=include_idle).run(seconds, memory_top=memory_top)
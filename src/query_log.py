@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Query log for the vis daemon server.
+
+Appends one JSON line per search (query hash, parameters, latency, outcome) to
+a local file and keeps per-request frequencies in memory, so the server can
+prewarm its caches with the most frequent queries after a restart or reindex.
+
+The query text itself is only written when store_text is enabled. Without it
+the log on disk holds hashes, parameters and latencies only, and the texts of
+queries seen since the process started live in memory. Prewarming after a
+reindex works either way; prewarming right after a restart needs store_text.
+(The query-embedding cache persists embeddings under a hash, not the text.)
+
+Counts are aged: when max_tracked distinct requests are reached, and whenever
+the log is rotated, every count is halved and requests that drop to zero are
+forgotten, so yesterday's popular queries give way to today's.
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Request parameters that identify a cached /search response (query aside)
+PARAMS = ("top_k", "threshold", "search_method", "rerank")
+
+
+def query_hash(query: str) -> str:
+    return hashlib.sha256(query.encode("utf-8")).hexdigest()[:32]
+
+
+class QueryLog:
+    """Append-only JSON-lines query log with in-memory frequency counts"""
+
+    def __init__(self, path: str, store_text: bool = False, max_bytes: int = 16 * 1024 * 1024,
+                 max_tracked: int = 10000):
+        """
+        Args:
+            path: Log file (rotated once to <path>.1 when it exceeds max_bytes)
+            store_text: Also write the query text (needed to prewarm right after a restart)
+            max_bytes: Size at which the log is rotated
+            max_tracked: Maximum distinct requests counted in memory (counts are aged to make room)
+        """
+        self.path = Path(path)
+        self.store_text = store_text
+        self.max_bytes = max(max_bytes, 1024)
+        self.max_tracked = max(max_tracked, 1)
+
+        # (hash, top_k, threshold, search_method, rerank) -> count
+        self._counts: Counter = Counter()
+        self._texts: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._file = None
+        self.recorded = 0
+
+    def load(self) -> int:
+        """Count the entries already on disk (rotated file first); returns the number read"""
+        read = 0
+        for path in (self.path.with_name(self.path.name + ".1"), self.path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                            self._count(entry["hash"], tuple(entry[name] for name in PARAMS), entry.get("query"))
+                        except (ValueError, KeyError, TypeError):
+                            continue
+                        read += 1
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                logger.warning(f"Cannot read query log {path}: {e}")
+        if read:
+            logger.info(f"Query log: {read} entries, {len(self._counts)} distinct requests")
+        return read
+
+    def _count(self, digest: str, params: Tuple, query: Optional[str]) -> None:
+        key = (digest,) + params
+        while key not in self._counts and len(self._counts) >= self.max_tracked:
+            self._age()
+        self._counts[key] += 1
+        if query is not None and digest not in self._texts:
+            self._texts[digest] = query
+
+    def _age(self) -> None:
+        """Halve every count and forget requests that reach zero (lock held or loading)"""
+        self._counts = Counter({key: count // 2 for key, count in self._counts.items() if count > 1})
+        live = {key[0] for key in self._counts}
+        self._texts = {digest: text for digest, text in self._texts.items() if digest in live}
+
+    def record(self, query: str, params: Dict, latency_ms: float, outcome: str) -> None:
+        """Append one search (params: top_k, threshold, search_method, rerank)"""
+        digest = query_hash(query)
+        entry = {"ts": round(time.time(), 3), "hash": digest,
+                 **{name: params[name] for name in PARAMS},
+                 "latency_ms": round(latency_ms, 3), "outcome": outcome}
+        if self.store_text:
+            entry["query"] = query
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+
+        with self._lock:
+            self._count(digest, tuple(params[name] for name in PARAMS), query)
+            try:
+                if self._file is None:
+                    self.path.parent.mkdir(parents=True, exist_ok=True)
+                    self._file = open(self.path, "a", encoding="utf-8", buffering=1)
+                self._file.write(line)
+                self.recorded += 1
+                if self._file.tell() > self.max_bytes:
+                    self._rotate()
+            except OSError as e:
+                logger.warning(f"Query log write failed: {e}")
+
+    def _rotate(self) -> None:
+        """Keep one previous file and age the counts (lock held)"""
+        self._file.close()
+        self._file = None
+        os.replace(self.path, self.path.with_name(self.path.name + ".1"))
+        self._age()
+
+    def top(self, n: int, min_count: int = 2) -> List[Tuple[str, Dict]]:
+        """Most frequent requests whose text is known, as (query, params)"""
+        with self._lock:
+            ranked = self._counts.most_common()
+            texts = dict(self._texts)
+        requests = []
+        for key, count in ranked:
+            if len(requests) >= n or count < min_count:
+                break
+            query = texts.get(key[0])
+            if query is not None:
+                requests.append((query, dict(zip(PARAMS, key[1:]))))
+        return requests
+
+    def get_statistics(self) -> Dict:
+        with self._lock:
+            return {
+                "recorded": self.recorded,
+                "distinct": len(self._counts),
+                "replayable": sum(1 for key in self._counts if key[0] in self._texts),
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Response cache for the vis daemon server.
+
+Caches finished /search responses keyed by the request parameters and the
+engine's index version, bounded by entry count, total bytes and TTL.
+"""
+
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ResultCache:
+    """LRU response cache bounded by entries, bytes and TTL"""
+
+    def __init__(self, max_entries: int = 512, max_bytes: int = 32 * 1024 * 1024, ttl_seconds: float = 300.0):
+        """
+        Args:
+            max_entries: Maximum number of cached responses
+            max_bytes: Maximum total size of cached responses (serialized bytes)
+            ttl_seconds: Time to live per entry (0 disables expiry)
+        """
+        self.max_entries = max(max_entries, 1)
+        self.max_bytes = max(max_bytes, 1)
+        self.ttl = ttl_seconds
+
+        # key -> (stored_at, size, value)
+        self._entries: "OrderedDict[Hashable, Tuple[float, int, Any]]" = OrderedDict()
+        self._bytes = 0
+        self._version: Any = None
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _check_version(self, version: Any) -> None:
+        """Drop everything when the index version changes (lock held)"""
+        if version != self._version:
+            if self._entries:
+                self.invalidations += len(self._entries)
+                logger.info(f"Index version changed ({self._version} -> {version}), "
+                            f"dropping {len(self._entries)} cached responses")
+            self._entries.clear()
+            self._bytes = 0
+            self._version = version
+
+    def _remove(self, key: Hashable) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def get(self, key: Hashable, version: Any) -> Optional[Any]:
+        """Return the cached value for key at this index version, or None"""
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            stored_at, _, value = entry
+            if self.ttl and time.monotonic() - stored_at > self.ttl:
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, version: Any, value: Any, size: int) -> None:
+        """Store value; entries larger than the whole budget are skipped"""
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            self._check_version(version)
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = (time.monotonic(), size, value)
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def get_statistics(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
@@ -7,20 +7,42 @@ Keeps BGE-M3 model and index in memory for fast search responses.
 
 import os
 import sys
+import asyncio
 import logging
 import signal
+import socket
+import threading
+import time
+import contextvars
+import copy
+import json
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List
+from typing import AsyncIterator, Callable, Dict, List, NamedTuple, Optional, Set, Tuple, Union
 from contextlib import asynccontextmanager
 
 import yaml
 import uvicorn
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask
 from pydantic import BaseModel
 
-from .features.advanced_search import AdvancedSearchEngine, SearchResult
+from .features.advanced_search import AdvancedSearchEngine, SearchResult, TieredSearchResult
+from .features import vault_reports
 from .core.vault_processor import Document
-from .constants import DEFAULT_PORT, PID_FILE
+from .constants import DEFAULT_PORT, PID_FILE, socket_path
+from .result_cache import ResultCache
+from .admission import AdmissionController, AdmissionRejected, AdmissionTicket, cost_class
+from .indexer import BackgroundIndexer, IndexJob, IndexRequestQueue, SnapshotFollower, VaultWatcher
+from .vault_pool import VaultPool, engine_memory_bytes
+from .core.index_snapshot import IndexSnapshotStore
+from .metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, ServerMetrics
+from .profiler import ProfileInProgress, profile as sample_profile
+from .query_log import QueryLog
+from .core.search_stages import (
+    SearchTrace, activate_trace, add_stage_observer, current_trace, record_cache, record_stage
+)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -29,19 +51,920 @@ logger = logging.getLogger(__name__)
 _state: Dict = {
     "engine": None,
     "config": None,
+    "phase": "starting",  # starting -> warming -> ready
+    "warmup": None,
+    "prewarm": None,
 }
 
+SEARCH_METHODS = ("semantic", "keyword", "hybrid", "colbert")
 
-def _is_indexed() -> bool:
+
+class ExecutorSaturated(Exception):
+    """Raised when a work pool's queue is full"""
+
+
+class BoundedExecutor:
+    """Thread pool with a bounded number of running + queued tasks
+
+    Engine calls are synchronous, so they must run off the event loop. A plain
+    ThreadPoolExecutor queues without limit; this wrapper rejects new work once
+    max_workers + max_queue tasks are in flight so a burst of slow queries turns
+    into fast 503s instead of an ever-growing backlog.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue: int):
+        self.name = name
+        self.max_workers = max(max_workers, 1)
+        self.capacity = self.max_workers + max(max_queue, 0)
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=f"vis-{name}")
+        self._slots = threading.BoundedSemaphore(self.capacity)
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    async def run(self, fn: Callable, *args, **kwargs):
+        """Run fn(*args, **kwargs) on the pool and await the result
+
+        The caller's context (e.g. the request's SearchTrace) is carried into the
+        worker thread, and the time spent waiting for a worker is recorded as the
+        "queue" stage.
+        """
+        if not self._slots.acquire(blocking=False):
+            raise ExecutorSaturated(f"{self.name} pool is full ({self.capacity} tasks in flight)")
+
+        with self._lock:
+            self._in_flight += 1
+        submitted = time.perf_counter()
+        context = contextvars.copy_context()
+
+        def _call():
+            record_stage("queue", time.perf_counter() - submitted)
+            return fn(*args, **kwargs)
+
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._pool, context.run, _call)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+            self._slots.release()
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """Schedule fn without awaiting it (usable from non-async threads)"""
+        if not self._slots.acquire(blocking=False):
+            raise ExecutorSaturated(f"{self.name} pool is full ({self.capacity} tasks in flight)")
+
+        with self._lock:
+            self._in_flight += 1
+
+        def _release(_future):
+            with self._lock:
+                self._in_flight -= 1
+            self._slots.release()
+
+        try:
+            future = self._pool.submit(fn, *args, **kwargs)
+        except Exception:
+            _release(None)
+            raise
+        future.add_done_callback(_release)
+        return future
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+# Work pools (created lazily so the app also works without lifespan, e.g. in tests)
+# - model: BGE-M3 / reranker / ColBERT forward passes; few workers to avoid
+#   oversubscribing cores that torch already parallelizes over
+# - cpu: lexical work (keyword scan) that does not touch the model
+# - index: reindex, one at a time
+# - analysis: long topic analyses (/collect, /moc) that encode many queries;
+#   kept off the model pool so they never hold the worker searches wait on
+_EXECUTOR_DEFAULTS = {"model": 1, "cpu": 2, "index": 1, "analysis": 1}
+_executors: Dict[str, BoundedExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def _get_executor(kind: str) -> BoundedExecutor:
+    """Return the work pool for kind ('model', 'cpu', 'index' or 'analysis')"""
+    executor = _executors.get(kind)
+    if executor is not None:
+        return executor
+
+    with _executors_lock:
+        if kind not in _executors:
+            server_config = (_state.get("config") or {}).get("server", {})
+            _executors[kind] = BoundedExecutor(
+                kind,
+                max_workers=server_config.get(f"{kind}_workers", _EXECUTOR_DEFAULTS[kind]),
+                max_queue=server_config.get("max_queue", 32) if kind != "index" else 0
+            )
+        return _executors[kind]
+
+
+def _shutdown_executors():
+    with _executors_lock:
+        for executor in _executors.values():
+            executor.shutdown()
+        _executors.clear()
+
+
+class _PendingQuery(NamedTuple):
+    engine: object
+    query: str
+    top_k: int
+    threshold: float
+    future: asyncio.Future
+    trace: Optional[SearchTrace]
+
+
+class QueryBatcher:
+    """Collects concurrent semantic queries into one encode + one matmul
+
+    The first query of a batch waits at most window_ms for company; the batch
+    is flushed early once max_batch_size queries are pending. The batch runs
+    as a single engine.semantic_search_batch() call on the model pool and each
+    caller gets its own slice of the results.
+    """
+
+    def __init__(self, window_ms: float = 5.0, max_batch_size: int = 16):
+        self.window = max(window_ms, 0.0) / 1000.0
+        self.max_batch_size = max(max_batch_size, 1)
+        self._pending: List[_PendingQuery] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # Strong references to running batches (the loop only keeps weak ones)
+        self._tasks: Set[asyncio.Task] = set()
+        self.batches = 0
+        self.queries = 0
+
+    async def search(self, engine, query: str, top_k: int, threshold: float) -> List[SearchResult]:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append(_PendingQuery(engine, query, top_k, threshold, future, current_trace()))
+
+        if len(self._pending) >= self.max_batch_size or self.window == 0:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(lambda done: self._batch_done(done, batch))
+
+    def _batch_done(self, task: asyncio.Task, batch: List[_PendingQuery]) -> None:
+        self._tasks.discard(task)
+        if task.cancelled():
+            error = None
+        else:
+            error = task.exception()
+            if error is None:
+                return
+            logger.error(f"Query batch of {len(batch)} failed: {error!r}")
+        # Callers must not wait forever on a batch that died before answering them
+        for item in batch:
+            if item.future.done():
+                continue
+            if error is None:
+                item.future.cancel()
+            else:
+                item.future.set_exception(error)
+
+    async def _run(self, batch):
+        # An engine swap between submit and flush must not mix indexes
+        by_engine: Dict[int, List[_PendingQuery]] = {}
+        for item in batch:
+            by_engine.setdefault(id(item.engine), []).append(item)
+
+        for items in by_engine.values():
+            self.batches += 1
+            self.queries += len(items)
+            # Stage timings of the shared batch are copied into every traced request
+            batch_trace = SearchTrace() if any(item.trace is not None for item in items) else None
+            try:
+                with activate_trace(batch_trace):
+                    results = await _get_executor("model").run(
+                        items[0].engine.semantic_search_batch,
+                        [item.query for item in items],
+                        top_ks=[item.top_k for item in items],
+                        thresholds=[item.threshold for item in items]
+                    )
+            except Exception as e:
+                for item in items:
+                    if not item.future.done():
+                        item.future.set_exception(e)
+                continue
+
+            for item, result in zip(items, results):
+                if item.trace is not None:
+                    item.trace.merge(batch_trace)
+                    item.trace.add_candidates("semantic", len(result))
+                    item.trace.notes["batch_size"] = len(items)
+                if not item.future.done():
+                    item.future.set_result(result)
+
+    def get_statistics(self) -> Dict:
+        return {
+            "batches": self.batches,
+            "queries": self.queries,
+            "avg_batch_size": self.queries / self.batches if self.batches else 0.0,
+        }
+
+
+_batcher: Optional[QueryBatcher] = None
+
+
+def _get_batcher() -> Optional[QueryBatcher]:
+    """Return the shared query batcher, or None when batching is disabled"""
+    global _batcher
+    server_config = (_state.get("config") or {}).get("server", {})
+    if not server_config.get("batching", True):
+        return None
+    if _batcher is None:
+        _batcher = QueryBatcher(
+            window_ms=server_config.get("batch_window_ms", 5),
+            max_batch_size=server_config.get("max_batch_size", 16)
+        )
+    return _batcher
+
+
+async def _semantic_search(engine, query: str, top_k: int, threshold: float) -> List[SearchResult]:
+    """Semantic search through the batcher when enabled (explain requests run alone)"""
+    batcher = _get_batcher()
+    trace = current_trace()
+    if batcher is None or (trace is not None and trace.explain):
+        return await _get_executor("model").run(engine.semantic_search, query, top_k=top_k, threshold=threshold)
+    return await batcher.search(engine, query, top_k, threshold)
+
+
+async def _dispatch_search(engine, query: str, top_k: int, threshold: float,
+                           search_method: str, rerank: bool) -> List[SearchResult]:
+    """Run one search on the pool matching its workload (off the event loop)"""
+    if rerank:
+        return await _get_executor("model").run(
+            engine.search_with_reranking,
+            query=query,
+            search_method=search_method,
+            initial_k=min(top_k * 3, 100),
+            final_k=top_k,
+            threshold=threshold,
+            use_reranker=True
+        )
+
+    # Direct search without reranking
+    if search_method == "semantic":
+        return await _semantic_search(engine, query, top_k, threshold)
+    if search_method == "keyword":
+        return await _get_executor("cpu").run(engine.keyword_search, query, top_k=top_k)
+    if search_method == "colbert":
+        return await _get_executor("model").run(engine.colbert_search, query, top_k=top_k, threshold=threshold)
+    if search_method == "hybrid":
+        # Semantic half is batched with concurrent queries; fusion is CPU work
+        semantic_results = await _semantic_search(engine, query, top_k * 2, 0.0)
+        return await _get_executor("cpu").run(
+            engine.hybrid_search, query, top_k=top_k, threshold=threshold,
+            semantic_results=semantic_results)
+    raise HTTPException(status_code=400, detail=f"Invalid search method: {search_method}")
+
+
+async def _dispatch_deadline(engine, query: str, top_k: int, threshold: float, search_method: str,
+                             rerank: bool, deadline_ms: float, started: float) -> TieredSearchResult:
+    """Run the tiered planner with whatever is left of the budget when a model worker picks it up"""
+    if search_method not in SEARCH_METHODS:
+        raise HTTPException(status_code=400, detail=f"Invalid search method: {search_method}")
+
+    def _run():
+        remaining_ms = max(deadline_ms - (time.perf_counter() - started) * 1000, 0.0)
+        return engine.search_with_deadline(
+            query, search_method=search_method, top_k=top_k, threshold=threshold,
+            deadline_ms=remaining_ms, use_colbert=search_method == "colbert", use_reranker=rerank)
+
+    return await _get_executor("model").run(_run)
+
+
+def _server_timing_enabled() -> bool:
+    return bool((_state.get("config") or {}).get("server", {}).get("server_timing", True))
+
+
+_result_cache: Optional[ResultCache] = None
+# A ResultCache holds one index version at a time, so each extra vault gets its own
+_vault_result_caches: Dict[str, ResultCache] = {}
+
+
+def _get_result_cache(vault: Optional[str] = None) -> Optional[ResultCache]:
+    """Return the /search response cache of `vault` (None = the boot vault), or None when disabled"""
+    global _result_cache
+    cache_config = (_state.get("config") or {}).get("server", {}).get("result_cache", {})
+    if not cache_config.get("enabled", True):
+        return None
+
+    def new_cache() -> ResultCache:
+        return ResultCache(
+            max_entries=cache_config.get("max_entries", 512),
+            max_bytes=int(cache_config.get("max_mb", 32) * 1024 * 1024),
+            ttl_seconds=cache_config.get("ttl_seconds", 300)
+        )
+
+    if vault and vault != DEFAULT_VAULT:
+        if vault not in _vault_result_caches:
+            _vault_result_caches[vault] = new_cache()
+        return _vault_result_caches[vault]
+    if _result_cache is None:
+        _result_cache = new_cache()
+    return _result_cache
+
+
+_admission: Optional[AdmissionController] = None
+
+
+def _get_admission() -> Optional[AdmissionController]:
+    """Return the search admission controller, or None when disabled"""
+    global _admission
+    admission_config = (_state.get("config") or {}).get("server", {}).get("admission", {})
+    if not admission_config.get("enabled", True):
+        return None
+    if _admission is None:
+        _admission = AdmissionController(
+            classes=admission_config.get("methods"),
+            max_concurrent=admission_config.get("max_concurrent", 8)
+        )
+    return _admission
+
+
+async def _admit(search_class: str, deadline: Optional[float] = None, weight: int = 1) -> Optional[AdmissionTicket]:
+    """Wait for an admission slot; shed requests become 429/503 with Retry-After
+
+    Args:
+        deadline: time.monotonic() by which the search must have started
+        weight: Number of searches the slot covers (batch requests)
+    """
+    admission = _get_admission()
+    if admission is None:
+        return None
+    waited = time.perf_counter()
+    try:
+        ticket = await admission.acquire(search_class, deadline=deadline, weight=weight)
+    except AdmissionRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=f"Server busy ({search_class}: {e.reason})",
+                            headers={"Retry-After": str(e.retry_after)})
+    record_stage("admission", time.perf_counter() - waited)
+    return ticket
+
+
+def _index_version(engine) -> int:
+    version = getattr(engine, "index_version", 0)
+    return version if isinstance(version, int) else 0
+
+
+_metrics: Optional[ServerMetrics] = None
+_metrics_lock = threading.Lock()
+
+
+def _get_metrics() -> ServerMetrics:
+    """Return the process-wide metrics (search stage timing starts on first use)"""
+    global _metrics
+    if _metrics is None:
+        with _metrics_lock:
+            if _metrics is None:
+                metrics = ServerMetrics()
+                add_stage_observer(metrics.observe_stage)
+                _metrics = metrics
+    return _metrics
+
+
+def _collect_engine_metrics(metrics: ServerMetrics) -> None:
+    """Refresh scrape-time gauges from the live engine, pools and caches"""
     engine = _state["engine"]
-    return engine is not None and engine.indexed
+    metrics.index_documents.set(_document_count())
+    metrics.index_version.set(_index_version(engine))
+
+    passage_ids = getattr(engine, "passage_ids", None)
+    metrics.index_passages.set(len(passage_ids) if isinstance(passage_ids, list) else 0)
+    metrics.index_bytes.set(sum(
+        getattr(matrix, "nbytes", 0) for matrix in (
+            getattr(engine, "embeddings", None), getattr(engine, "passage_embeddings", None))
+        if isinstance(getattr(matrix, "nbytes", None), int)
+    ))
+
+    resident = engine.get_resident_models() if engine is not None else []
+    metrics.resident_models.set(len(resident) if isinstance(resident, list) else 0)
+
+    for kind in _EXECUTOR_DEFAULTS:
+        executor = _executors.get(kind)
+        metrics.pool_in_flight.set(executor.in_flight if executor is not None else 0, kind)
+    if _admission is not None:
+        metrics.set_admission_statistics(_admission.statistics())
+
+    result_cache = _get_result_cache()
+    if result_cache is not None:
+        metrics.set_cache_statistics("result", result_cache.get_statistics())
+    query_cache = getattr(getattr(engine, "engine", None), "query_cache", None)
+    if query_cache is not None:
+        metrics.set_cache_statistics("query_embedding", query_cache.get_statistics())
+    similar_query_cache = getattr(engine, "similar_query_cache", None)
+    if similar_query_cache is not None:
+        metrics.set_cache_statistics("similar_query", similar_query_cache.get_statistics())
+
+    metrics.vault_memory.set(engine_memory_bytes(engine), DEFAULT_VAULT)
+    metrics.vault_loaded.set(1 if engine is not None else 0, DEFAULT_VAULT)
+    if _vault_pool is not None:
+        for vault in _vault_pool.statistics():
+            metrics.vault_memory.set(vault["memory_bytes"], vault["name"])
+            metrics.vault_loaded.set(1 if vault["loaded"] else 0, vault["name"])
+
+
+def _record_job(job: IndexJob) -> None:
+    duration = (job.finished_at or time.time()) - (job.started_at or job.created_at)
+    _get_metrics().observe_reindex(job.kind, job.status, duration)
+    if _index_requests is not None:
+        _index_requests.write_job(job.to_dict())
+
+
+_indexer: Optional[BackgroundIndexer] = None
+_watcher: Optional[VaultWatcher] = None
+
+# Pre-fork mode: the master owns the index and publishes read-only snapshots
+# under $VIS_INDEX_SNAPSHOTS; workers memory-map them and forward reindex requests.
+SNAPSHOT_ENV = "VIS_INDEX_SNAPSHOTS"
+_snapshot_store: Optional[IndexSnapshotStore] = None
+_index_requests: Optional[IndexRequestQueue] = None
+_follower: Optional[SnapshotFollower] = None
+
+
+def _is_prefork_worker() -> bool:
+    return _state.get("prefork") == "worker"
+
+
+def _swap_engine(engine) -> None:
+    """Install a new engine; in-flight requests keep the instance they started with
+
+    The pre-fork master then publishes it as a snapshot, and workers pick it up
+    through their SnapshotFollower. A single-process server only refreshes its
+    boot snapshot, debounced, so watcher updates do not pay for a full snapshot
+    (neighbor table included) on every change.
+    """
+    _state["engine"] = engine
+    if _snapshot_store is None or not engine.indexed or _is_prefork_worker():
+        return
+    if _state.get("prefork") == "master":
+        _snapshot_store.publish(engine)
+    else:
+        _schedule_snapshot_publish()
+
+
+_snapshot_timer: Optional[threading.Timer] = None
+_snapshot_lock = threading.Lock()
+_snapshot_publish_lock = threading.Lock()
+
+
+def _schedule_snapshot_publish() -> None:
+    """(Re)start the boot snapshot timer; only the last engine of a burst is published"""
+    global _snapshot_timer
+    snapshot_config = (_state.get("config") or {}).get("server", {}).get("snapshot", {})
+    delay = max(float(snapshot_config.get("publish_delay_seconds", 30)), 0.0)
+    with _snapshot_lock:
+        if _snapshot_timer is not None:
+            _snapshot_timer.cancel()
+        _snapshot_timer = threading.Timer(delay, _publish_boot_snapshot)
+        _snapshot_timer.daemon = True
+        _snapshot_timer.start()
+
+
+def _publish_boot_snapshot() -> None:
+    global _snapshot_timer
+    with _snapshot_lock:
+        _snapshot_timer = None
+    with _snapshot_publish_lock:
+        engine = _state.get("engine")
+        if _snapshot_store is None or engine is None or not engine.indexed:
+            return
+        try:
+            _snapshot_store.publish(engine)
+        except Exception as e:
+            logger.warning(f"Boot snapshot publish failed: {e}")
+
 
+def _flush_snapshot_publish() -> None:
+    """Shutdown: publish a pending boot snapshot now instead of dropping it"""
+    with _snapshot_lock:
+        timer = _snapshot_timer
+        if timer is not None:
+            timer.cancel()
+    if timer is not None:
+        _publish_boot_snapshot()
 
-def _document_count() -> int:
+
+def _load_snapshot(snapshot_id: str) -> bool:
+    """Worker: map a published snapshot into a copy of the engine and swap it in"""
     engine = _state["engine"]
+    if engine is None or _snapshot_store is None:
+        return False
+    clone = copy.copy(engine)
+    if clone.text_store is not None:
+        # The master may have written new text blocks for this snapshot
+        clone.text_store.reload()
+    if _snapshot_store.load(clone, snapshot_id) is None:
+        return False
+    _state["engine"] = clone
+    return True
+
+
+async def _forward_reindex(force: bool, background: bool):
+    """Worker: hand a reindex to the master and (unless background) wait for its snapshot"""
+    job = _index_requests.submit("full", force=force)
+    logger.info(f"Reindex forwarded to the master (force={force}, job={job['id']})")
+    if background:
+        return JSONResponse(status_code=202, content=job, headers={"Location": f"/jobs/{job['id']}"})
+
+    while job["status"] not in ("succeeded", "failed"):
+        await asyncio.sleep(0.25)
+        job = _index_requests.read_job(job["id"]) or job
+    if job["status"] == "failed":
+        raise HTTPException(status_code=500, detail=f"Reindex failed: {job.get('error')}")
+
+    # Pick up the new snapshot now rather than at the follower's next poll
+    await _get_executor("cpu").run(_follower.check)
+    return ReindexResponse(
+        document_count=job["document_count"],
+        message=f"Successfully reindexed {job['document_count']} documents",
+        job_id=job["id"]
+    )
+
+
+def _init_prefork_worker(root: str) -> None:
+    """Worker startup: model only, index comes from the master's snapshots"""
+    global _snapshot_store, _index_requests, _follower
+    _state["prefork"] = "worker"
+    _snapshot_store = IndexSnapshotStore(root)
+    _index_requests = IndexRequestQueue(root)
+    _state["engine"] = _init_engine(auto_load=False)
+
+    prefork_config = (_state.get("config") or {}).get("server", {}).get("prefork", {})
+    _follower = SnapshotFollower(_snapshot_store.current_id, _load_snapshot,
+                                 interval=prefork_config.get("snapshot_poll_seconds", 1.0))
+    if not _follower.check():
+        logger.warning("No index snapshot published yet; waiting for the master")
+    _follower.start()
+
+
+def _serve_index_requests(stop: threading.Event) -> None:
+    """Master: run reindex requests submitted by workers, one at a time
+
+    Also applies cancellations workers forward and publishes the progress of
+    running jobs so /jobs/{id} answers the same on every worker.
+    """
+    while not stop.wait(0.5):
+        indexer = _get_indexer()
+        for job_id in _index_requests.take_cancellations():
+            if indexer.cancel(job_id) is None and _index_requests.is_pending(job_id):
+                # Never started: drop the request and record the job as cancelled
+                _index_requests.claim(job_id)
+                job = _index_requests.read_job(job_id) or {"id": job_id}
+                job.update(status="cancelled", finished_at=time.time(), error="cancelled before start")
+                _index_requests.write_job(job)
+
+        for job in indexer.list_jobs():
+            if job.status == "running":
+                _index_requests.write_job(job.to_dict())
+
+        for request in _index_requests.pending():
+            job = indexer.create_job(request.get("kind", "full"), job_id=request["id"],
+                                     force=request.get("force", False),
+                                     with_colbert=request.get("with_colbert", False))
+            try:
+                _get_executor("index").submit(indexer.run_full, job)
+            except ExecutorSaturated:
+                # Leave the request queued until the running job finishes
+                indexer.discard_job(job)
+                break
+            _index_requests.claim(request["id"])
+            _index_requests.write_job(job.to_dict())
+            logger.info(f"Reindexing for a worker request (force={job.force}, job={job.id})")
+
+
+def _get_indexer() -> BackgroundIndexer:
+    global _indexer
+    if _indexer is None:
+        _indexer = BackgroundIndexer(lambda: _state["engine"], _swap_engine, on_finished=_record_job)
+    return _indexer
+
+
+def _find_job(job_id: str) -> Optional[IndexJob]:
+    """A job of the boot vault's indexer or of any extra vault's"""
+    job = _get_indexer().get_job(job_id)
+    pool = _get_vault_pool()
+    if job is None and pool is not None:
+        job = pool.find_job(job_id)
+    return job
+
+
+def _submit_incremental(changed: List[str], removed: List[str]) -> bool:
+    """Watcher callback: queue an incremental reindex, False if one is already running"""
+    indexer = _get_indexer()
+    job = indexer.create_job("incremental", changed=len(changed), removed=len(removed))
+    try:
+        _get_executor("index").submit(indexer.run_incremental, job, changed, removed)
+    except ExecutorSaturated:
+        indexer.discard_job(job)
+        return False
+    logger.info(f"Vault changed: {len(changed)} updated, {len(removed)} removed (job {job.id})")
+    return True
+
+
+def _start_watcher(engine) -> None:
+    global _watcher
+    watch_config = (_state.get("config") or {}).get("server", {}).get("watch", {})
+    if not watch_config.get("enabled", True) or engine is None:
+        return
+    try:
+        _watcher = VaultWatcher(
+            engine.processor,
+            _submit_incremental,
+            debounce_seconds=watch_config.get("debounce_seconds", 2.0),
+            poll_interval=watch_config.get("poll_interval", 10.0),
+            use_native=watch_config.get("native", True)
+        )
+        _watcher.start()
+    except Exception as e:
+        logger.error(f"Failed to start vault watcher: {e}")
+        _watcher = None
+
+
+def _stop_watcher() -> None:
+    global _watcher
+    if _watcher is not None:
+        _watcher.stop()
+        _watcher = None
+
+
+def _is_ready() -> bool:
+    """Ready = index loaded and warm-up finished (live = /health answers at all)"""
+    return _state.get("phase") == "ready" and _is_indexed()
+
+
+_warmup_task: Optional[asyncio.Task] = None
+
+
+async def _warm_up(engine) -> None:
+    """Pay first-query costs (first encode, kernel selection, optional model loads) before reporting ready
+
+    Runs on the model pool so warm-up encodes never overlap a search's inference.
+    """
+    warmup_config = (_state.get("config") or {}).get("server", {}).get("warmup", {})
+    _state["phase"] = "warming"
+    started = time.perf_counter()
+    try:
+        if warmup_config.get("enabled", True) and engine is not None:
+            steps = await _get_executor("model").run(
+                engine.warm_up, warmup_config.get("queries"), warmup_config.get("models") or [])
+            _state["warmup"] = {
+                "steps_ms": steps,
+                "total_ms": round((time.perf_counter() - started) * 1000, 3),
+            }
+            logger.info(f"✅ Warm-up finished in {_state['warmup']['total_ms']:.0f} ms: {steps}")
+    except Exception as e:
+        logger.error(f"Warm-up failed: {e}")
+    finally:
+        _state["phase"] = "ready"
+
+
+def _start_warmup() -> None:
+    global _warmup_task
+    _warmup_task = asyncio.create_task(_warm_up(_state["engine"]))
+
+
+# Query log: anonymized record of searches on the boot vault; its most frequent
+# queries are replayed after start-up and after every engine swap (reindex,
+# watcher update, new snapshot) so they do not pay cold-cache latency.
+_query_log: Optional[QueryLog] = None
+_prewarm_task: Optional[asyncio.Task] = None
+PREWARM_POLL_SECONDS = 1.0
+
+
+def _query_log_config() -> Dict:
+    return (_state.get("config") or {}).get("server", {}).get("query_log", {})
+
+
+def _get_query_log() -> Optional[QueryLog]:
+    """Return the query log, or None when disabled (server.query_log.enabled)"""
+    global _query_log
+    log_config = _query_log_config()
+    if not log_config.get("enabled", False):
+        return None
+    if _query_log is None:
+        path = Path(log_config.get("path", "cache/query_log.jsonl")).expanduser()
+        if not path.is_absolute():
+            path = Path(os.environ.get('VIS_DATA_DIR', str(Path.home() / 'git/vault-intelligence'))) / path
+        _query_log = QueryLog(
+            str(path),
+            store_text=log_config.get("store_text", False),
+            max_bytes=int(log_config.get("max_mb", 16) * 1024 * 1024),
+            max_tracked=log_config.get("max_tracked", 10000)
+        )
+        _query_log.load()
+    return _query_log
+
+
+def _log_search(vault: Optional[str], query: str, top_k: int, threshold: float, search_method: str,
+                rerank: bool, elapsed: float, outcome: str) -> None:
+    if vault and vault != DEFAULT_VAULT:
+        return
+    query_log = _get_query_log()
+    if query_log is not None:
+        query_log.record(query, {"top_k": top_k, "threshold": threshold, "search_method": search_method,
+                                 "rerank": rerank}, elapsed * 1000, outcome)
+
+
+async def _prewarm(engine) -> Dict:
+    """Replay the most frequent logged queries against `engine`
+
+    Fills the result cache for the engine's index version and, through the
+    searches' query encodes, the query-embedding cache. Queries run one at a
+    time on the regular pools, so live traffic is served in between. Only the
+    cost classes in prewarm.classes are replayed (rerank and ColBERT are not by
+    default), and each query takes an admission slot only when one is free with
+    nobody waiting; otherwise the round stops.
+    """
+    prewarm_config = _query_log_config().get("prewarm", {})
+    classes = set(prewarm_config.get("classes", ["semantic", "keyword", "hybrid"]))
+    requests = [
+        (query, params)
+        for query, params in _get_query_log().top(prewarm_config.get("top_n", 200), prewarm_config.get("min_count", 2))
+        if cost_class(params["search_method"], params["rerank"]) in classes
+    ]
+    admission = _get_admission()
+    result_cache = _get_result_cache()
+    version = _cache_version(engine)
+    started = time.perf_counter()
+    warmed = 0
+    for query, params in requests:
+        if _state["engine"] is not engine:
+            break  # swapped again; the next round warms the new engine
+        ticket = None
+        if admission is not None:
+            ticket = admission.try_acquire(cost_class(params["search_method"], params["rerank"]))
+            if ticket is None:
+                logger.info("Prewarm stopped: live searches are waiting")
+                break
+        try:
+            results = await _dispatch_search(engine, query, params["top_k"], params["threshold"],
+                                             params["search_method"], params["rerank"])
+        except ExecutorSaturated:
+            logger.info("Prewarm stopped: server busy")
+            break
+        except Exception as e:
+            logger.debug(f"Prewarm query failed: {e}")
+            continue
+        finally:
+            if ticket is not None:
+                ticket.release()
+        if result_cache is not None:
+            response = _search_response(query, params["search_method"], results)
+            result_cache.put((query, params["top_k"], params["threshold"], params["search_method"],
+                              params["rerank"]), version, response, len(response.model_dump_json()))
+        warmed += 1
+
+    summary = {
+        "queries": warmed,
+        "candidates": len(requests),
+        "index_version": _index_version(engine),
+        "total_ms": round((time.perf_counter() - started) * 1000, 3),
+    }
+    if warmed:
+        logger.info(f"Prewarmed {warmed}/{len(requests)} frequent queries in {summary['total_ms']:.0f} ms")
+    return summary
+
+
+async def _prewarm_loop() -> None:
+    """Prewarm once the server is ready, then again whenever a different engine is swapped in"""
+    min_interval = _query_log_config().get("prewarm", {}).get("min_interval_seconds", 60)
+    warmed_engine = None
+    last_run = None
+    while True:
+        await asyncio.sleep(PREWARM_POLL_SECONDS)
+        engine = _state["engine"]
+        if engine is warmed_engine or not _is_ready():
+            continue
+        # Frequent swaps (watcher updates) defer the next round rather than skip it
+        if last_run is not None and time.monotonic() - last_run < min_interval:
+            continue
+        warmed_engine = engine
+        last_run = time.monotonic()
+        try:
+            _state["prewarm"] = await _prewarm(engine)
+        except Exception as e:
+            logger.error(f"Prewarm failed: {e}")
+
+
+def _start_prewarm() -> None:
+    global _prewarm_task
+    query_log = _get_query_log()
+    if query_log is not None and _query_log_config().get("prewarm", {}).get("enabled", True):
+        if not query_log.store_text:
+            logger.info("Query log stores no query text: prewarming starts with queries seen "
+                        "after this start (set server.query_log.store_text to prewarm on restart)")
+        _prewarm_task = asyncio.create_task(_prewarm_loop())
+
+
+def _stop_query_log() -> None:
+    global _query_log, _prewarm_task
+    if _prewarm_task is not None and not _prewarm_task.done():
+        _prewarm_task.cancel()
+    _prewarm_task = None
+    if _query_log is not None:
+        _query_log.close()
+        _query_log = None
+
+
+def _is_indexed(engine=None) -> bool:
+    engine = engine if engine is not None else _state["engine"]
+    return engine is not None and engine.indexed
+
+
+def _document_count(engine=None) -> int:
+    engine = engine if engine is not None else _state["engine"]
     return len(engine.documents) if engine and hasattr(engine, 'documents') else 0
 
 
+# Multi-vault: server.vaults names extra vaults served next to the boot vault
+# ("default"). They share the boot engine's embedding, reranker and ColBERT
+# models and are loaded on first use, then unloaded LRU-first under
+# server.vault_memory_budget_mb (the boot index and the shared models count
+# against the budget but are never unloaded).
+DEFAULT_VAULT = "default"
+_vault_pool: Optional[VaultPool] = None
+
+
+def _get_vault_pool() -> Optional[VaultPool]:
+    global _vault_pool
+    server_config = (_state.get("config") or {}).get("server", {})
+    vaults = server_config.get("vaults") or {}
+    if _vault_pool is None and vaults and _state["engine"] is not None:
+        data_dir = os.environ.get('VIS_DATA_DIR', str(Path.home() / 'git/vault-intelligence'))
+        specs = {
+            name: {"path": str(Path(spec["path"] if isinstance(spec, dict) else str(spec)).expanduser()),
+                   "cache_dir": str(Path(data_dir) / 'cache' / 'vaults' / name)}
+            for name, spec in vaults.items() if name != DEFAULT_VAULT
+        }
+        _vault_pool = VaultPool(
+            specs, _load_vault_engine,
+            memory_budget_bytes=int(server_config.get("vault_memory_budget_mb", 0) or 0) * 1024 * 1024,
+            pinned_bytes=lambda: engine_memory_bytes(_state["engine"]),
+            on_job_finished=_record_job
+        )
+    return _vault_pool
+
+
+def _load_vault_engine(vault_path: str, cache_dir: str) -> AdvancedSearchEngine:
+    """Engine for an extra vault: its own index cache, the boot engine's models"""
+    Path(cache_dir).mkdir(parents=True, exist_ok=True)
+    return AdvancedSearchEngine(
+        vault_path=vault_path,
+        cache_dir=cache_dir,
+        config=_state.get("config") or {},
+        auto_load=True,
+        embedding_engine=_state["engine"].engine,
+        model_host=_state["engine"]
+    )
+
+
+async def _resolve_engine(vault: Optional[str]):
+    """Engine serving `vault` (None or "default" = the boot vault), loading it if needed"""
+    if not vault or vault == DEFAULT_VAULT:
+        return _state["engine"]
+    pool = _get_vault_pool()
+    if pool is None or not pool.has(vault):
+        raise HTTPException(status_code=404, detail=f"Unknown vault: {vault}")
+    if pool.loaded(vault) is not None:
+        return pool.get(vault)
+    try:
+        return await _get_executor("cpu").run(pool.get, vault)
+    except ExecutorSaturated:
+        raise HTTPException(status_code=503, detail="Server busy", headers={"Retry-After": "1"})
+
+
+def _unload_vaults() -> None:
+    global _vault_pool
+    _vault_pool = None
+    _vault_result_caches.clear()
+
+
+def _cache_version(engine) -> Tuple:
+    """Result-cache version: entries never cross vaults, engines or index versions"""
+    return (str(getattr(engine, "vault_path", "")), id(engine), _index_version(engine))
+
+
 # Pydantic models
 class SearchResultResponse(BaseModel):
     """Single search result"""
@@ -51,6 +974,7 @@ class SearchResultResponse(BaseModel):
     snippet: str
     rank: int = 0
     match_type: str = ""
+    section: str = ""
 
 
 class SearchResponse(BaseModel):
@@ -59,12 +983,72 @@ class SearchResponse(BaseModel):
     query: str
     search_method: str
     total: int
+    tiers: Optional[List[Dict]] = None
+    degraded: Optional[bool] = None
+    near_duplicate: Optional[Dict] = None
+    explain: Optional[Dict] = None
+
+
+class BatchQuery(BaseModel):
+    """One query of a batch; unset fields fall back to the batch defaults"""
+    query: str
+    top_k: Optional[int] = None
+    threshold: Optional[float] = None
+    search_method: Optional[str] = None
+    rerank: Optional[bool] = None
+
+
+class BatchSearchRequest(BaseModel):
+    """Batch search API request"""
+    queries: List[Union[str, BatchQuery]]
+    top_k: int = 10
+    threshold: float = 0.0
+    search_method: str = "hybrid"
+    rerank: bool = False
+    vault: Optional[str] = None
+
+
+class RelatedDocumentResponse(SearchResultResponse):
+    """Related document of GET /related"""
+    tags: List[str] = []
+
+
+class BatchSearchResponse(BaseModel):
+    """Batch search API response (one SearchResponse per query, in request order)"""
+    responses: List[SearchResponse]
+    total: int
 
 
 class ReindexResponse(BaseModel):
     """Reindex API response"""
     document_count: int
     message: str
+    job_id: Optional[str] = None
+
+
+class JobResponse(BaseModel):
+    """Index job state (phase progress: documents_done/documents_total, throughput in documents/s)"""
+    id: str
+    kind: str
+    status: str
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    duration_seconds: float = 0.0
+    force: bool = False
+    with_colbert: bool = False
+    vault: Optional[str] = None
+    changed: int = 0
+    removed: int = 0
+    document_count: int = 0
+    index_version: int = 0
+    error: Optional[str] = None
+    phase: Optional[str] = None
+    documents_done: int = 0
+    documents_total: int = 0
+    throughput: float = 0.0
+    eta_seconds: Optional[float] = None
+    cancel_requested: bool = False
 
 
 class HealthResponse(BaseModel):
@@ -72,6 +1056,17 @@ class HealthResponse(BaseModel):
     status: str
     indexed: bool
     document_count: int
+    index_version: int = 0
+    result_cache: Optional[Dict] = None
+    watcher: Optional[str] = None
+    snapshot: Optional[str] = None
+    vault: Optional[str] = None
+    vaults: Optional[List[str]] = None
+    live: bool = True
+    ready: bool = False
+    phase: str = "starting"
+    warmup: Optional[Dict] = None
+    prewarm: Optional[Dict] = None
 
 
 def _get_config() -> Dict:
@@ -94,8 +1089,13 @@ def _get_config() -> Dict:
         return {}
 
 
-def _init_engine() -> AdvancedSearchEngine:
-    """Initialize AdvancedSearchEngine once"""
+def _init_engine(auto_load: bool = True) -> AdvancedSearchEngine:
+    """Initialize AdvancedSearchEngine once
+
+    Args:
+        auto_load: Restore the index from the embedding cache (False for
+            pre-fork workers, which map the master's snapshot instead)
+    """
     config = _get_config()
 
     # Get vault path from environment or config
@@ -112,12 +1112,88 @@ def _init_engine() -> AdvancedSearchEngine:
     engine = AdvancedSearchEngine(
         vault_path=vault_path,
         cache_dir=cache_dir,
-        config=config
+        config=config,
+        auto_load=auto_load
     )
 
     return engine
 
 
+def _boot_engine() -> AdvancedSearchEngine:
+    """Create the engine from the boot snapshot when it matches the vault
+
+    The vault check only stats files, so a matching snapshot boots without
+    reading notes or the embedding cache. Otherwise the index is restored from
+    the embedding cache (or built) and published as the next boot snapshot.
+    """
+    global _snapshot_store
+    snapshot_config = (_state.get("config") or {}).get("server", {}).get("snapshot", {})
+    engine = _init_engine(auto_load=False)
+
+    if snapshot_config.get("enabled", True):
+        _snapshot_store = IndexSnapshotStore(str(Path(engine.cache_dir) / "snapshots"),
+                                             keep=snapshot_config.get("keep", 2))
+        started = time.perf_counter()
+        snapshot_id = _snapshot_store.load(engine, vault_fingerprint=engine.processor.vault_fingerprint())
+        if snapshot_id is not None:
+            logger.info(f"✅ Booted from index snapshot {snapshot_id} "
+                        f"in {(time.perf_counter() - started) * 1000:.0f} ms")
+            return engine
+
+    # load_index() restores from cached embeddings; build_index() only on a cache miss
+    if engine.load_index():
+        logger.info("✅ Loaded existing index from cache")
+    else:
+        logger.info("Building search index...")
+        engine.build_index()
+    if _snapshot_store is not None and engine.indexed:
+        _snapshot_store.publish(engine)
+    return engine
+
+
+async def _dispatch_batch(engine, queries: List[BatchQuery]) -> List[List[SearchResult]]:
+    """Run a batch of resolved queries with shared encoding and scoring
+
+    Semantic and hybrid queries without reranking are encoded and scored in one
+    semantic_search_batch() call; keyword matching and hybrid fusion then run as
+    a single CPU-pool task. Reranked and ColBERT queries run one by one.
+    """
+    results: List[Optional[List[SearchResult]]] = [None] * len(queries)
+
+    dense = [i for i, q in enumerate(queries) if not q.rerank and q.search_method in ("semantic", "hybrid")]
+    if dense:
+        dense_results = await _get_executor("model").run(
+            engine.semantic_search_batch,
+            [queries[i].query for i in dense],
+            top_ks=[queries[i].top_k * 2 if queries[i].search_method == "hybrid" else queries[i].top_k
+                    for i in dense],
+            thresholds=[0.0 if queries[i].search_method == "hybrid" else queries[i].threshold for i in dense]
+        )
+        for i, result in zip(dense, dense_results):
+            results[i] = result
+
+    lexical = [i for i, q in enumerate(queries) if not q.rerank and q.search_method in ("keyword", "hybrid")]
+    if lexical:
+        def _run_lexical() -> List[List[SearchResult]]:
+            out = []
+            for i in lexical:
+                q = queries[i]
+                if q.search_method == "keyword":
+                    out.append(engine.keyword_search(q.query, top_k=q.top_k))
+                else:
+                    out.append(engine.hybrid_search(q.query, top_k=q.top_k, threshold=q.threshold,
+                                                    semantic_results=results[i]))
+            return out
+
+        for i, result in zip(lexical, await _get_executor("cpu").run(_run_lexical)):
+            results[i] = result
+
+    for i, q in enumerate(queries):
+        if results[i] is None:
+            results[i] = await _dispatch_search(engine, q.query, q.top_k, q.threshold, q.search_method, q.rerank)
+    return results
+
+
 def _convert_search_result(result: SearchResult, rank: int = 0) -> SearchResultResponse:
     """Convert SearchResult to SearchResultResponse"""
     # Extract document info
@@ -129,9 +1205,178 @@ def _convert_search_result(result: SearchResult, rank: int = 0) -> SearchResultR
         title=doc.title,
         snippet=result.snippet or "",
         rank=rank,
-        match_type=result.match_type
+        match_type=result.match_type,
+        section=getattr(result, "section", "") or ""
+    )
+
+
+
+def _search_response(query: str, search_method: str, results: List[SearchResult],
+                     tiered: Optional[TieredSearchResult] = None) -> SearchResponse:
+    """SearchResponse for ranked results (the form kept in the result cache)
+
+    near_duplicate is set when the semantic leg rescored the candidates of a
+    recent, nearly identical query instead of scanning the whole vault.
+    """
+    response_results = [_convert_search_result(r, rank=i + 1) for i, r in enumerate(results)]
+    reuse = next((r.reuse for r in results if getattr(r, "reuse", None) is not None), None)
+    return SearchResponse(
+        results=response_results,
+        query=query,
+        search_method=search_method,
+        total=len(response_results),
+        tiers=tiered.tiers if tiered is not None else None,
+        degraded=tiered.degraded if tiered is not None else None,
+        near_duplicate={"similarity": round(reuse.similarity, 4), "candidates": reuse.candidates}
+        if reuse is not None else None
     )
 
+async def _run_analysis(kind: str, pool: str, fn: Callable, *args, vault: Optional[str] = None,
+                        admission_class: Optional[str] = None, **kwargs):
+    """Run a vault analysis fn(engine, ...) on the resident engine of `vault`, off the event loop
+
+    The CLI used to construct a fresh engine (model + index) for each of these.
+    With admission_class the analysis also holds an admission slot of that class
+    while it runs, so live searches are admitted ahead of it.
+    """
+    started = time.perf_counter()
+    outcome = "error"
+    ticket = None
+    try:
+        engine = await _resolve_engine(vault)
+        if not _is_indexed(engine):
+            outcome = "unavailable"
+            raise HTTPException(status_code=503, detail="Index not built yet")
+        if admission_class is not None:
+            outcome = "rejected"  # until admitted
+            ticket = await _admit(admission_class)
+            outcome = "error"
+        result = await _get_executor(pool).run(fn, engine, *args, **kwargs)
+        outcome = "ok"
+        return result
+    except HTTPException:
+        raise
+    except ExecutorSaturated as e:
+        outcome = "rejected"
+        logger.warning(f"{kind} rejected: {e}")
+        raise HTTPException(status_code=503, detail="Server busy", headers={"Retry-After": "1"})
+    except Exception as e:
+        logger.error(f"{kind} failed: {e}")
+        raise HTTPException(status_code=500, detail=f"{kind} failed: {str(e)}")
+    finally:
+        if ticket is not None:
+            ticket.release()
+        _get_metrics().observe_request(kind, outcome, time.perf_counter() - started)
+
+
+STREAM_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "sse": "text/event-stream"}
+
+
+def _format_stream_event(stream_format: str, event: str, payload: Dict) -> str:
+    """Encode one progressive-search event as an NDJSON line or an SSE frame"""
+    data = json.dumps({"event": event, **payload}, ensure_ascii=False)
+    if stream_format == "sse":
+        return f"event: {event}\ndata: {data}\n\n"
+    return data + "\n"
+
+
+async def _stream_search(engine, query: str, top_k: int, threshold: float, search_method: str,
+                         rerank: bool, stream_format: str,
+                         ticket: Optional[AdmissionTicket] = None,
+                         vault: Optional[str] = None) -> AsyncIterator[str]:
+    """Progressive search: fast first-stage results, then refined ones, then timings
+
+    Plain searches produce a single (final) results event. Reranked searches first
+    send the base method's top results and then rerank those same candidates;
+    ColBERT searches first send hybrid results while token-level scoring runs.
+    """
+    started = time.perf_counter()
+    outcome = "error"
+    trace = SearchTrace()
+    stages: List[Dict] = []
+
+    def results_event(stage: str, method: str, results: List[SearchResult], final: bool) -> str:
+        stages.append({"stage": stage, "elapsed_ms": round((time.perf_counter() - started) * 1000, 3)})
+        return _format_stream_event(stream_format, "results", {
+            "stage": stage,
+            "final": final,
+            "query": query,
+            "search_method": method,
+            "results": [_convert_search_result(r, rank=i + 1).model_dump() for i, r in enumerate(results)],
+            "total": len(results),
+            "elapsed_ms": stages[-1]["elapsed_ms"],
+        })
+
+    result_cache = _get_result_cache(vault)
+    cache_key = (query, top_k, threshold, search_method, rerank)
+    version = _cache_version(engine)
+    try:
+        with activate_trace(trace):
+            cached = None
+            if result_cache is not None:
+                cached = result_cache.get(cache_key, version)
+                record_cache("result", cached is not None)
+            if cached is not None:
+                outcome = "cached"
+                stages.append({"stage": "cached", "elapsed_ms": round((time.perf_counter() - started) * 1000, 3)})
+                yield _format_stream_event(stream_format, "results", {
+                    "stage": "cached", "final": True, **cached.model_dump(exclude_none=True),
+                    "elapsed_ms": stages[-1]["elapsed_ms"]})
+            elif search_method == "colbert":
+                # Hybrid needs no extra model, so it answers while ColBERT scoring runs
+                yield results_event("initial", "hybrid",
+                                    await _dispatch_search(engine, query, top_k, threshold, "hybrid", False),
+                                    final=False)
+                results = await _dispatch_search(engine, query, top_k, threshold, "colbert", False)
+                if rerank:
+                    yield results_event("colbert", "colbert", results, final=False)
+                    results = await _get_executor("model").run(
+                        engine.search_with_reranking, query=query, search_method="colbert",
+                        initial_k=len(results), final_k=top_k, threshold=threshold,
+                        use_reranker=True, initial_results=results)
+                    yield results_event("reranked", search_method, results, final=True)
+                else:
+                    yield results_event("colbert", search_method, results, final=True)
+            elif rerank:
+                candidates = await _dispatch_search(engine, query, min(top_k * 3, 100), threshold,
+                                                    search_method, False)
+                yield results_event("initial", search_method, candidates[:top_k], final=False)
+                results = await _get_executor("model").run(
+                    engine.search_with_reranking, query=query, search_method=search_method,
+                    initial_k=len(candidates), final_k=top_k, threshold=threshold,
+                    use_reranker=True, initial_results=candidates)
+                yield results_event("reranked", search_method, results, final=True)
+            else:
+                results = await _dispatch_search(engine, query, top_k, threshold, search_method, False)
+                yield results_event("final", search_method, results, final=True)
+
+            if outcome != "cached" and result_cache is not None:
+                response_results = [_convert_search_result(r, rank=i + 1) for i, r in enumerate(results)]
+                response = SearchResponse(results=response_results, query=query,
+                                          search_method=search_method, total=len(response_results))
+                result_cache.put(cache_key, version, response, len(response.model_dump_json()))
+            if outcome != "cached":
+                outcome = "ok"
+    except ExecutorSaturated as e:
+        outcome = "rejected"
+        logger.warning(f"Streaming search rejected: {e}")
+        yield _format_stream_event(stream_format, "error", {"status": 503, "detail": "Server busy"})
+    except Exception as e:
+        logger.error(f"Streaming search failed: {e}")
+        yield _format_stream_event(stream_format, "error", {"status": 500, "detail": f"Search failed: {str(e)}"})
+    finally:
+        if ticket is not None:
+            ticket.release()
+        elapsed = time.perf_counter() - started
+        _get_metrics().observe_request("stream", outcome, elapsed)
+
+    yield _format_stream_event(stream_format, "done", {
+        "stages": stages,
+        "stages_ms": {stage: round(seconds * 1000, 3) for stage, seconds in trace.stages.items()},
+        "cache": {name: dict(counts) for name, counts in trace.cache.items()},
+        "total_ms": round(elapsed * 1000, 3),
+    })
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -143,23 +1388,25 @@ async def lifespan(app: FastAPI):
         config = _get_config()
         _state["config"] = config
 
-        logger.info("Initializing search engine...")
-        engine = _init_engine()
-        _state["engine"] = engine
-
-        # load_index()는 AdvancedSearchEngine 생성자에서 이미 호출됨
-        # 캐시로 복원 성공 시 build_index() 건너뜀
-        if engine.indexed:
-            logger.info("✅ Loaded existing index from cache")
-            success = True
+        snapshot_root = os.environ.get(SNAPSHOT_ENV)
+        if snapshot_root:
+            logger.info(f"Starting pre-fork worker (pid {os.getpid()}), index snapshots: {snapshot_root}")
+            _init_prefork_worker(snapshot_root)
+            _start_warmup()
+            _start_prewarm()
         else:
-            logger.info("Building search index...")
-            success = engine.build_index()
+            logger.info("Initializing search engine...")
+            engine = _boot_engine()
+            _state["engine"] = engine
 
-        if success:
-            logger.info(f"✅ Index built successfully: {_document_count()} documents")
-        else:
-            logger.warning("⚠️  Index build failed or no documents found")
+            if engine.indexed:
+                logger.info(f"✅ Index ready: {_document_count()} documents")
+            else:
+                logger.warning("⚠️  Index build failed or no documents found")
+
+            _start_watcher(engine)
+            _start_warmup()
+            _start_prewarm()
 
     except Exception as e:
         logger.error(f"Failed to initialize server: {e}")
@@ -168,8 +1415,20 @@ async def lifespan(app: FastAPI):
 
     # Shutdown
     logger.info("Shutting down Vault Intelligence Server...")
+    if _warmup_task is not None and not _warmup_task.done():
+        _warmup_task.cancel()
+    _stop_watcher()
+    _flush_snapshot_publish()
+    _stop_query_log()
+    if _follower is not None:
+        _follower.stop()
+    _shutdown_executors()
+    _unload_vaults()
     _state["engine"] = None
     _state["config"] = None
+    _state["phase"] = "starting"
+    _state["warmup"] = None
+    _state["prewarm"] = None
 
 
 def create_app() -> FastAPI:
@@ -183,96 +1442,505 @@ def create_app() -> FastAPI:
 
     @app.get("/health", response_model=HealthResponse)
     async def health_check():
-        """Health check endpoint"""
+        """Health check: answering at all means live; `ready` once the index is loaded and warm-up finished"""
+        result_cache = _get_result_cache()
         return HealthResponse(
             status="ok" if _is_indexed() else "not_indexed",
             indexed=_is_indexed(),
-            document_count=_document_count()
+            document_count=_document_count(),
+            index_version=_index_version(_state["engine"]),
+            result_cache=result_cache.get_statistics() if result_cache is not None else None,
+            watcher=_watcher.mode if _watcher is not None else None,
+            snapshot=_follower.loaded_id if _follower is not None else None,
+            vault=str(_state["engine"].vault_path) if _state["engine"] is not None else None,
+            vaults=_get_vault_pool().names() if _get_vault_pool() is not None else None,
+            ready=_is_ready(),
+            phase=_state.get("phase", "starting"),
+            warmup=_state.get("warmup"),
+            prewarm=_state.get("prewarm")
         )
 
-    @app.get("/search", response_model=SearchResponse)
+    @app.get("/vaults")
+    async def list_vaults():
+        """Hosted vaults: the boot vault ("default") and server.vaults, with load state and index memory"""
+        engine = _state["engine"]
+        vaults = [{
+            "name": DEFAULT_VAULT,
+            "path": str(engine.vault_path) if engine is not None else None,
+            "loaded": engine is not None,
+            "indexed": _is_indexed(),
+            "document_count": _document_count(),
+            "memory_bytes": engine_memory_bytes(engine),
+            "last_used": None,
+            "loads": 1 if engine is not None else 0,
+        }]
+        pool = _get_vault_pool()
+        if pool is not None:
+            vaults.extend(pool.statistics())
+        return {
+            "vaults": vaults,
+            "memory_bytes": sum(vault["memory_bytes"] for vault in vaults),
+            "memory_budget_bytes": pool.memory_budget_bytes if pool is not None else 0,
+            "evictions": pool.evictions if pool is not None else 0,
+        }
+
+    @app.get("/metrics")
+    async def metrics():
+        """Prometheus text exposition of request, stage, cache and index metrics"""
+        server_metrics = _get_metrics()
+        _collect_engine_metrics(server_metrics)
+        return Response(content=server_metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
+    @app.get("/debug/profile")
+    async def debug_profile(
+        seconds: float = Query(5.0, gt=0, description="Sampling window in seconds"),
+        interval_ms: float = Query(5.0, ge=1, le=1000, description="Milliseconds between stack samples"),
+        memory_top: int = Query(20, ge=0, le=500, description="Top allocation sites to report (0 = no tracemalloc)"),
+        include_idle: bool = Query(False, description="Keep stacks of threads blocked waiting for work"),
+        format: str = Query("json", description="json, or collapsed for a flame graph tool"),
+    ):
+        """Sample the running server's Python stacks (opt-in: server.debug.profile)"""
+        debug_config = (_state.get("config") or {}).get("server", {}).get("debug", {})
+        if not debug_config.get("profile", False):
+            raise HTTPException(status_code=404, detail="Profiling is disabled (server.debug.profile)")
+        max_seconds = debug_config.get("max_profile_seconds", 60)
+        if seconds > max_seconds:
+            raise HTTPException(status_code=400, detail=f"seconds must be <= {max_seconds}")
+        if format not in ("json", "collapsed"):
+            raise HTTPException(status_code=400, detail=f"Invalid format: {format}")
+
+        # A thread of its own: the sampler must not occupy a search worker or block the event loop
+        try:
+            result = await asyncio.to_thread(sample_profile, seconds, interval_ms / 1000,
+                                             include_idle, memory_top)
+        except ProfileInProgress as e:
+            raise HTTPException(status_code=409, detail=str(e))
+        logger.info(f"Profiled {seconds:g}s: {result.samples} samples, {len(result.stacks)} distinct stacks")
+        if format == "collapsed":
+            return Response(content=result.collapsed(), media_type="text/plain; charset=utf-8")
+        return result.to_dict()
+
+    @app.get("/search", response_model=SearchResponse, response_model_exclude_none=True)
     async def search(
+        http_response: Response,
         query: str = Query(..., description="Search query"),
         top_k: int = Query(10, description="Number of results to return"),
         threshold: float = Query(0.0, description="Similarity threshold"),
         search_method: str = Query("hybrid", description="Search method: semantic, keyword, hybrid, colbert"),
-        rerank: bool = Query(False, description="Enable reranking")
+        rerank: bool = Query(False, description="Enable reranking"),
+        explain: bool = Query(False, description="Include per-stage timings, candidate counts and score changes"),
+        deadline_ms: Optional[float] = Query(None, gt=0, description=(
+            "Latency budget: ColBERT rescoring and reranking run only if their observed cost fits")),
+        vault: Optional[str] = Query(None, description="Named vault from server.vaults (default: the boot vault)")
     ):
         """Search endpoint"""
-        if not _is_indexed():
+        started = time.perf_counter()
+        admission_deadline = time.monotonic() + deadline_ms / 1000 if deadline_ms is not None else None
+        outcome = "error"
+        trace = SearchTrace(explain=explain) if explain or _server_timing_enabled() else None
+        try:
+            with activate_trace(trace):
+                engine: AdvancedSearchEngine = await _resolve_engine(vault)
+                if not _is_indexed(engine):
+                    outcome = "unavailable"
+                    raise HTTPException(status_code=503, detail="Index not built yet")
+
+                # Identical requests against the same engine + index version are served from cache
+                result_cache = _get_result_cache(vault)
+                cache_key = (query, top_k, threshold, search_method, rerank)
+                version = _cache_version(engine)
+                response = None
+                if result_cache is not None:
+                    response = result_cache.get(cache_key, version)
+                    record_cache("result", response is not None)
+                    if response is not None:
+                        outcome = "cached"
+
+                if response is None:
+                    ticket = None
+                    tiered: Optional[TieredSearchResult] = None
+                    try:
+                        if search_method in SEARCH_METHODS:
+                            ticket = await _admit(cost_class(search_method, rerank), deadline=admission_deadline)
+                        if deadline_ms is not None:
+                            tiered = await _dispatch_deadline(engine, query, top_k, threshold, search_method,
+                                                              rerank, deadline_ms, started)
+                            results = tiered.results
+                        else:
+                            results = await _dispatch_search(engine, query, top_k, threshold, search_method, rerank)
+                    except HTTPException as e:
+                        if e.status_code == 400:
+                            outcome = "invalid"
+                        elif e.status_code in (429, 503):
+                            outcome = "rejected"
+                        raise
+                    except ExecutorSaturated as e:
+                        outcome = "rejected"
+                        logger.warning(f"Search rejected: {e}")
+                        raise HTTPException(status_code=503, detail="Server busy", headers={"Retry-After": "1"})
+                    except Exception as e:
+                        logger.error(f"Search failed: {e}")
+                        raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
+                    finally:
+                        if ticket is not None:
+                            ticket.release()
+
+                    response = _search_response(query, search_method, results, tiered)
+                    # Budgeted responses depend on load at the time, so only full responses are cached
+                    if result_cache is not None and tiered is None:
+                        result_cache.put(cache_key, version, response, len(response.model_dump_json()))
+                    outcome = "degraded" if tiered is not None and tiered.degraded else "ok"
+
+            if explain:
+                # Cached entries never carry an explain payload; attach this request's trace to a copy
+                response = response.model_copy(update={
+                    "explain": trace.to_dict(order=[r.path for r in response.results])
+                })
+            return response
+        finally:
+            elapsed = time.perf_counter() - started
+            if trace is not None:
+                http_response.headers["Server-Timing"] = trace.server_timing(total=elapsed)
+            method_label = search_method if search_method in SEARCH_METHODS else "other"
+            _get_metrics().observe_request(method_label, outcome, elapsed)
+            if outcome in ("ok", "cached", "degraded"):
+                _log_search(vault, query, top_k, threshold, search_method, rerank, elapsed, outcome)
+
+    @app.get("/search/stream")
+    async def search_stream(
+        request: Request,
+        query: str = Query(..., description="Search query"),
+        top_k: int = Query(10, description="Number of results to return"),
+        threshold: float = Query(0.0, description="Similarity threshold"),
+        search_method: str = Query("hybrid", description="Search method: semantic, keyword, hybrid, colbert"),
+        rerank: bool = Query(False, description="Enable reranking"),
+        format: Optional[str] = Query(None, description="ndjson or sse (default: from Accept, else ndjson)"),
+        vault: Optional[str] = Query(None, description="Named vault from server.vaults (default: the boot vault)")
+    ):
+        """Progressive search endpoint - first-stage results as soon as they exist, refined results after"""
+        stream_format = format or ("sse" if "text/event-stream" in request.headers.get("accept", "") else "ndjson")
+        if stream_format not in STREAM_MEDIA_TYPES:
+            raise HTTPException(status_code=400, detail=f"Invalid stream format: {stream_format}")
+        if search_method not in SEARCH_METHODS:
+            raise HTTPException(status_code=400, detail=f"Invalid search method: {search_method}")
+        engine = await _resolve_engine(vault)
+        if not _is_indexed(engine):
             raise HTTPException(status_code=503, detail="Index not built yet")
 
-        engine: AdvancedSearchEngine = _state["engine"]
-        if engine is None:
-            raise HTTPException(status_code=503, detail="Search engine not initialized")
+        # The slot is held for the whole stream; the background task also frees it
+        # when the client disconnects before the generator starts
+        ticket = await _admit(cost_class(search_method, rerank))
+        return StreamingResponse(
+            _stream_search(engine, query, top_k, threshold, search_method, rerank, stream_format,
+                           ticket=ticket, vault=vault),
+            media_type=STREAM_MEDIA_TYPES[stream_format],
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+            background=BackgroundTask(ticket.release) if ticket is not None else None
+        )
 
+    @app.post("/search/batch", response_model=BatchSearchResponse)
+    async def search_batch(request: BatchSearchRequest):
+        """Batch search endpoint - many queries in one request with shared encoding"""
+        started = time.perf_counter()
+        outcome = "error"
         try:
-            # Execute search based on method and rerank option
-            if rerank:
-                results: List[SearchResult] = engine.search_with_reranking(
-                    query=query,
-                    search_method=search_method,
-                    initial_k=min(top_k * 3, 100),
-                    final_k=top_k,
-                    threshold=threshold,
-                    use_reranker=True
+            max_queries = (_state.get("config") or {}).get("server", {}).get("max_batch_queries", 256)
+            if len(request.queries) > max_queries:
+                outcome = "invalid"
+                raise HTTPException(status_code=400,
+                                    detail=f"Too many queries: {len(request.queries)} (max {max_queries})")
+
+            queries = [
+                BatchQuery(
+                    query=q if isinstance(q, str) else q.query,
+                    top_k=request.top_k if isinstance(q, str) or q.top_k is None else q.top_k,
+                    threshold=request.threshold if isinstance(q, str) or q.threshold is None else q.threshold,
+                    search_method=(request.search_method if isinstance(q, str) or q.search_method is None
+                                   else q.search_method),
+                    rerank=request.rerank if isinstance(q, str) or q.rerank is None else q.rerank
                 )
-            else:
-                # Direct search without reranking
-                if search_method == "semantic":
-                    results = engine.semantic_search(query, top_k=top_k, threshold=threshold)
-                elif search_method == "keyword":
-                    results = engine.keyword_search(query, top_k=top_k)
-                elif search_method == "colbert":
-                    results = engine.colbert_search(query, top_k=top_k, threshold=threshold)
-                elif search_method == "hybrid":
-                    results = engine.hybrid_search(query, top_k=top_k, threshold=threshold)
-                else:
-                    raise HTTPException(status_code=400, detail=f"Invalid search method: {search_method}")
-
-            # Convert results
-            response_results = [
-                _convert_search_result(r, rank=i+1)
-                for i, r in enumerate(results)
+                for q in request.queries
             ]
+            invalid = sorted({q.search_method for q in queries if q.search_method not in SEARCH_METHODS})
+            if invalid:
+                outcome = "invalid"
+                raise HTTPException(status_code=400, detail=f"Invalid search method: {', '.join(invalid)}")
+
+            engine: AdvancedSearchEngine = await _resolve_engine(request.vault)
+            if not _is_indexed(engine):
+                outcome = "unavailable"
+                raise HTTPException(status_code=503, detail="Index not built yet")
+
+            # Serve what we can from the result cache, run the rest as one batch
+            result_cache = _get_result_cache(request.vault)
+            version = _cache_version(engine)
+            responses: List[Optional[SearchResponse]] = [None] * len(queries)
+            if result_cache is not None:
+                for i, q in enumerate(queries):
+                    responses[i] = result_cache.get(
+                        (q.query, q.top_k, q.threshold, q.search_method, q.rerank), version)
+            pending = [i for i, response in enumerate(responses) if response is None]
+
+            # Charge every query: one weighted ticket per cost class, most expensive class first
+            tickets: List[AdmissionTicket] = []
+            try:
+                admission = _get_admission()
+                if pending and admission is not None:
+                    per_class: Dict[str, int] = {}
+                    for i in pending:
+                        search_class = cost_class(queries[i].search_method, queries[i].rerank)
+                        per_class[search_class] = per_class.get(search_class, 0) + 1
+                    for search_class in sorted(per_class, key=lambda c: -admission.classes.get(c, {}).get("priority", 0)):
+                        tickets.append(await _admit(search_class, weight=per_class[search_class]))
+                batch_results = await _dispatch_batch(engine, [queries[i] for i in pending])
+            except HTTPException as e:
+                if e.status_code in (429, 503):
+                    outcome = "rejected"
+                raise
+            except ExecutorSaturated as e:
+                outcome = "rejected"
+                logger.warning(f"Batch search rejected: {e}")
+                raise HTTPException(status_code=503, detail="Server busy", headers={"Retry-After": "1"})
+            except Exception as e:
+                logger.error(f"Batch search failed: {e}")
+                raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
+            finally:
+                for ticket in tickets:
+                    ticket.release()
+
+            for i, results in zip(pending, batch_results):
+                q = queries[i]
+                responses[i] = _search_response(q.query, q.search_method, results)
+                if result_cache is not None:
+                    result_cache.put((q.query, q.top_k, q.threshold, q.search_method, q.rerank), version,
+                                     responses[i], len(responses[i].model_dump_json()))
+
+            outcome = "ok"
+            elapsed = time.perf_counter() - started
+            for q in queries:
+                _log_search(request.vault, q.query, q.top_k, q.threshold, q.search_method, q.rerank,
+                            elapsed, "batch")
+            return BatchSearchResponse(responses=responses, total=len(responses))
+        finally:
+            _get_metrics().observe_request("batch", outcome, time.perf_counter() - started)
+
+    @app.get("/related", response_model=List[RelatedDocumentResponse])
+    async def related(
+        path: str = Query(..., description="Document path or title"),
+        top_k: int = Query(5, ge=1),
+        similarity_threshold: float = Query(0.3),
+        include_centrality: bool = Query(True, description="Boost central documents"),
+        vault: Optional[str] = Query(None, description="Named vault from server.vaults (default: the boot vault)")
+    ):
+        """Documents related to one note"""
+        return await _run_analysis("related", "cpu", vault_reports.related_report, path, top_k=top_k,
+                                   similarity_threshold=similarity_threshold,
+                                   include_centrality=include_centrality, vault=vault)
+
+    @app.get("/duplicates")
+    async def duplicates(
+        vault: Optional[str] = Query(None, description="Named vault from server.vaults (default: the boot vault)")
+    ):
+        """Groups of near-duplicate documents"""
+        return await _run_analysis("duplicates", "cpu", vault_reports.duplicate_report,
+                                   config=_state.get("config"), vault=vault)
+
+    @app.get("/gaps")
+    async def knowledge_gaps(
+        similarity_threshold: float = Query(0.3),
+        min_connections: int = Query(2, ge=0),
+        vault: Optional[str] = Query(None, description="Named vault from server.vaults (default: the boot vault)")
+    ):
+        """Knowledge gap analysis: isolated and weakly connected documents, isolated tags"""
+        return await _run_analysis("gaps", "cpu", vault_reports.knowledge_gap_report,
+                                   similarity_threshold=similarity_threshold, min_connections=min_connections,
+                                   vault=vault)
+
+    @app.get("/graph")
+    async def graph(
+        path: str = Query(..., description="Center document path (absolute or relative to the vault)"),
+        top_k: int = Query(10, ge=1),
+        similarity_threshold: float = Query(0.3),
+        depth: int = Query(1, ge=1, le=3),
+        expand_threshold: float = Query(0.5),
+        vault: Optional[str] = Query(None, description="Named vault from server.vaults (default: the boot vault)")
+    ):
+        """Related-document graph around a note (nodes and edges; the caller renders it)"""
+        def graph_report(engine):
+            return vault_reports.graph_report(engine, str(engine.vault_path), path, top_k=top_k,
+                                              similarity_threshold=similarity_threshold,
+                                              depth=depth, expand_threshold=expand_threshold)
+
+        return await _run_analysis("graph", "cpu", graph_report, vault=vault)
+
+    @app.get("/collect")
+    async def collect(
+        topic: str = Query(...),
+        top_k: int = Query(100, ge=1),
+        threshold: float = Query(0.3),
+        use_expansion: bool = Query(False),
+        include_synonyms: bool = Query(True),
+        include_hyde: bool = Query(True),
+        render: bool = Query(False, description="Include the collection document the CLI would save"),
+        vault: Optional[str] = Query(None, description="Named vault from server.vaults (default: the boot vault)")
+    ):
+        """Collect the documents of a topic"""
+        return await _run_analysis("collect", "analysis", vault_reports.collection_report, topic, top_k=top_k,
+                                   threshold=threshold, config=_state.get("config"), admission_class="analysis",
+                                   use_expansion=use_expansion, include_synonyms=include_synonyms,
+                                   include_hyde=include_hyde, render=render, vault=vault)
+
+    @app.get("/moc")
+    async def moc(
+        topic: str = Query(...),
+        top_k: int = Query(100, ge=1),
+        threshold: float = Query(0.3),
+        include_orphans: bool = Query(False),
+        use_expansion: bool = Query(True),
+        render: bool = Query(False, description="Include the MOC markdown the CLI would save"),
+        vault: Optional[str] = Query(None, description="Named vault from server.vaults (default: the boot vault)")
+    ):
+        """Generate a Map of Content for a topic"""
+        return await _run_analysis("moc", "analysis", vault_reports.moc_report, topic, top_k=top_k,
+                                   threshold=threshold, config=_state.get("config"), admission_class="analysis",
+                                   include_orphans=include_orphans, use_expansion=use_expansion,
+                                   render=render, vault=vault)
+
+    @app.post("/reindex", response_model=ReindexResponse, deprecated=True)
+    async def reindex(
+        force: bool = Query(False, description="Force rebuild index"),
+        background: bool = Query(False, description="Return immediately with a job id")
+    ):
+        """Blocking reindex endpoint (kept for older clients; use POST /jobs/reindex)
 
-            return SearchResponse(
-                results=response_results,
-                query=query,
-                search_method=search_method,
-                total=len(response_results)
-            )
-
-        except HTTPException:
-            # Re-raise HTTP exceptions as-is
-            raise
-        except Exception as e:
-            logger.error(f"Search failed: {e}")
-            raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
-
-    @app.post("/reindex", response_model=ReindexResponse)
-    async def reindex(force: bool = Query(False, description="Force rebuild index")):
-        """Reindex endpoint"""
-        engine: AdvancedSearchEngine = _state["engine"]
-        if engine is None:
+        The new index is built into a copy of the engine and swapped in when
+        complete, so searches keep being served from the old index meanwhile.
+        """
+        if _state["engine"] is None:
             raise HTTPException(status_code=503, detail="Search engine not initialized")
 
+        if _is_prefork_worker():
+            return await _forward_reindex(force, background)
+
+        indexer = _get_indexer()
+        job = indexer.create_job("full", force=force)
+        logger.info(f"Reindexing... (force={force}, job={job.id})")
+
         try:
-            logger.info(f"Reindexing... (force={force})")
-            success = engine.build_index(force_rebuild=force)
+            if background:
+                _get_executor("index").submit(indexer.run_full, job)
+                return JSONResponse(status_code=202, content=job.to_dict(),
+                                    headers={"Location": f"/jobs/{job.id}"})
 
+            success = await _get_executor("index").run(indexer.run_full, job)
             if success:
                 return ReindexResponse(
                     document_count=_document_count(),
-                    message=f"Successfully reindexed {_document_count()} documents"
+                    message=f"Successfully reindexed {_document_count()} documents",
+                    job_id=job.id
                 )
+            elif job.status == "cancelled":
+                raise HTTPException(status_code=409, detail=f"Reindex cancelled: {job.error}")
             else:
-                raise HTTPException(status_code=500, detail="Reindex failed")
+                raise HTTPException(status_code=500, detail=f"Reindex failed: {job.error}")
 
+        except HTTPException:
+            raise
+        except ExecutorSaturated:
+            indexer.discard_job(job)
+            raise HTTPException(status_code=409, detail="Reindex already in progress")
         except Exception as e:
             logger.error(f"Reindex failed: {e}")
             raise HTTPException(status_code=500, detail=f"Reindex failed: {str(e)}")
 
+    @app.post("/jobs/reindex", status_code=202, response_model=JobResponse)
+    async def start_reindex_job(
+        response: Response,
+        force: bool = Query(False, description="Ignore cached embeddings and re-embed every note"),
+        with_colbert: bool = Query(False, description="Also rebuild the ColBERT index"),
+        vault: Optional[str] = Query(None, description="Named vault from server.vaults (default: the boot vault)")
+    ):
+        """Start a full reindex job and return it immediately
+
+        Poll GET /jobs/{id} for phase, documents done/total, throughput and ETA.
+        Progress is checkpointed to the cache: a cancelled or killed rebuild
+        resumes where it stopped the next time one is started.
+        """
+        if _state["engine"] is None:
+            raise HTTPException(status_code=503, detail="Search engine not initialized")
+        extra_vault = vault if vault and vault != DEFAULT_VAULT else None
+        if extra_vault is not None:
+            pool = _get_vault_pool()
+            if pool is None or not pool.has(extra_vault):
+                raise HTTPException(status_code=404, detail=f"Unknown vault: {extra_vault}")
+            if _is_prefork_worker():
+                raise HTTPException(status_code=400,
+                                    detail="Reindexing extra vaults is not supported in pre-fork mode")
+
+        if _is_prefork_worker():
+            job_data = _index_requests.submit("full", force=force, with_colbert=with_colbert)
+            logger.info(f"Reindex job forwarded to the master (force={force}, job={job_data['id']})")
+        else:
+            indexer = _get_vault_pool().indexer(extra_vault) if extra_vault is not None else _get_indexer()
+            job = indexer.create_job("full", force=force, with_colbert=with_colbert, vault=extra_vault)
+            try:
+                _get_executor("index").submit(indexer.run_full, job)
+            except ExecutorSaturated:
+                indexer.discard_job(job)
+                raise HTTPException(status_code=409, detail="Reindex already in progress")
+            logger.info(f"Reindex job started (vault={extra_vault or DEFAULT_VAULT}, force={force}, "
+                        f"with_colbert={with_colbert}, job={job.id})")
+            job_data = job.to_dict()
+
+        response.headers["Location"] = f"/jobs/{job_data['id']}"
+        return job_data
+
+    @app.post("/jobs/{job_id}/cancel", status_code=202, response_model=JobResponse)
+    async def cancel_job(job_id: str):
+        """Cancel a running full reindex at its next checkpoint (finished work stays cached)"""
+        if _is_prefork_worker():
+            data = _index_requests.read_job(job_id)
+            if data is None:
+                raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+            if data["status"] in ("succeeded", "failed", "cancelled"):
+                raise HTTPException(status_code=409, detail=f"Job already {data['status']}")
+            _index_requests.request_cancel(job_id)
+            return {**data, "cancel_requested": True}
+
+        job = _find_job(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+        if job.done:
+            raise HTTPException(status_code=409, detail=f"Job already {job.status}")
+        if job.kind != "full":
+            raise HTTPException(status_code=409, detail="Only full reindex jobs can be cancelled")
+        job.cancel()
+        logger.info(f"Cancellation requested for index job {job.id}")
+        return job.to_dict()
+
+    @app.get("/jobs", response_model=List[JobResponse])
+    async def list_jobs():
+        """Recent index jobs, newest first"""
+        if _is_prefork_worker():
+            return _index_requests.list_jobs()
+        jobs = _get_indexer().list_jobs()
+        pool = _get_vault_pool()
+        if pool is not None:
+            jobs = sorted(jobs + pool.jobs(), key=lambda job: job.created_at, reverse=True)
+        return [job.to_dict() for job in jobs]
+
+    @app.get("/jobs/{job_id}", response_model=JobResponse)
+    async def get_job(job_id: str):
+        """State of one index job"""
+        if _is_prefork_worker():
+            data = _index_requests.read_job(job_id)
+        else:
+            job = _find_job(job_id)
+            data = job.to_dict() if job is not None else None
+        if data is None:
+            raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+        return data
+
     return app
 
 
@@ -302,12 +1970,95 @@ def _handle_shutdown(signum, frame):
     sys.exit(0)
 
 
-def run_server(host: str = "127.0.0.1", port: int = DEFAULT_PORT):
+def _bind_unix_socket(path: str) -> Optional[socket.socket]:
+    """Bind the daemon's Unix domain socket, replacing a stale socket file
+
+    Returns None (TCP only) if another process is already serving the path.
+    """
+    if os.path.exists(path):
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(path)
+            logger.warning(f"Unix socket {path} is in use by another process, serving TCP only")
+            return None
+        except OSError:
+            os.unlink(path)
+        finally:
+            probe.close()
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.bind(path)
+    os.chmod(path, 0o600)
+    logger.info(f"Serving on Unix socket {path}")
+    return sock
+
+
+def _remove_socket_file(path: Optional[str]):
+    try:
+        if path and os.path.exists(path):
+            os.unlink(path)
+    except Exception as e:
+        logger.error(f"Failed to remove socket file: {e}")
+
+
+def _run_prefork(host: str, port: int, workers: int, unix_sock: Optional[socket.socket]) -> None:
+    """Master of the pre-fork server
+
+    Loads (or builds) the index once, publishes it as a memory-mapped snapshot
+    and then supervises `workers` uvicorn worker processes that serve searches
+    from that snapshot. The master keeps the only writable engine: it runs the
+    vault watcher and the reindex requests workers forward, and every finished
+    job publishes a new snapshot that workers swap in.
+    """
+    global _snapshot_store, _index_requests
+    from uvicorn.supervisors import Multiprocess
+
+    _state["config"] = _get_config()
+    _state["prefork"] = "master"
+    engine = _boot_engine()
+
+    root = str(Path(engine.cache_dir) / "snapshots")
+    _index_requests = IndexRequestQueue(root)
+    if _snapshot_store is None:
+        # Boot snapshots disabled, but workers still need one to map
+        _snapshot_store = IndexSnapshotStore(root)
+        _swap_engine(engine)
+    else:
+        _state["engine"] = engine
+    _start_watcher(engine)
+
+    stop = threading.Event()
+    threading.Thread(target=_serve_index_requests, args=(stop,), name="vis-index-requests", daemon=True).start()
+
+    # Workers are spawned (not forked) and find the snapshots through the environment
+    os.environ[SNAPSHOT_ENV] = root
+    config = uvicorn.Config("src.server:create_app", factory=True, host=host, port=port,
+                            workers=workers, log_level="info")
+    sockets = [config.bind_socket()] + ([unix_sock] if unix_sock is not None else [])
+    logger.info(f"Starting {workers} workers sharing index snapshots in {root}")
+    try:
+        try:
+            supervisor = Multiprocess(config, sockets=sockets)
+        except TypeError:  # older uvicorn takes the worker target explicitly
+            supervisor = Multiprocess(config, target=uvicorn.Server(config).run, sockets=sockets)
+        supervisor.run()
+    finally:
+        stop.set()
+        _stop_watcher()
+        _shutdown_executors()
+
+
+def run_server(host: str = "127.0.0.1", port: int = DEFAULT_PORT, uds: Optional[str] = None,
+               workers: Optional[int] = None):
     """Run the server with uvicorn
 
     Args:
         host: Host to bind to
         port: Port to bind to
+        uds: Unix domain socket to serve in addition to TCP (default: the
+            per-port socket path when server.unix_socket is enabled)
+        workers: Worker processes (default: server.workers); more than one
+            runs the pre-fork mode with a shared memory-mapped index
     """
     # Set up signal handlers
     signal.signal(signal.SIGINT, _handle_shutdown)
@@ -316,12 +2067,31 @@ def run_server(host: str = "127.0.0.1", port: int = DEFAULT_PORT):
     # Write PID file
     _write_pid_file(os.getpid())
 
+    server_config = _get_config().get('server', {})
+    if uds is None and hasattr(socket, "AF_UNIX") and server_config.get('unix_socket', True):
+        uds = str(socket_path(port))
+    if workers is None:
+        workers = server_config.get('workers', 1)
+
+    unix_sock = None
     try:
         # Create app and run
+        unix_sock = _bind_unix_socket(uds) if uds else None
+        if workers > 1:
+            _run_prefork(host, port, workers, unix_sock)
+            return
+
         app = create_app()
-        uvicorn.run(app, host=host, port=port, log_level="info")
+        if unix_sock is None:
+            uvicorn.run(app, host=host, port=port, log_level="info")
+        else:
+            # One server process, two listeners: TCP for remote/compat, UDS for the local CLI
+            config = uvicorn.Config(app, host=host, port=port, log_level="info")
+            uvicorn.Server(config).run(sockets=[config.bind_socket(), unix_sock])
     finally:
         _remove_pid_file()
+        if unix_sock is not None:
+            _remove_socket_file(uds)
 
 
 if __name__ == "__main__":
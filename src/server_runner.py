@@ -20,6 +20,15 @@ if __name__ == "__main__":
         default=DEFAULT_PORT,
         help=f"Port to bind to (default: {DEFAULT_PORT})"
     )
+    parser.add_argument(
+        "--uds",
+        help="Unix domain socket to serve in addition to TCP (default: per-port socket in $HOME)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Worker processes sharing a memory-mapped index (default: server.workers in settings.yaml)"
+    )
     args = parser.parse_args()
 
-    run_server(host=args.host, port=args.port)
+    run_server(host=args.host, port=args.port, uds=args.uds, workers=args.workers)
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Multi-vault hosting for the vis daemon server.
+
+- VaultPool: extra named vault indexes served next to the boot vault. Engines
+  share the boot engine's models (one BGE-M3, reranker and ColBERT model per
+  process), are loaded from their own cache directory on first use and are
+  unloaded least-recently-used first when indexes and models together exceed
+  a memory budget.
+- Each vault has its own BackgroundIndexer, so /jobs/reindex?vault=... swaps
+  only that vault's engine.
+"""
+
+import time
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from .indexer import BackgroundIndexer, IndexJob
+
+logger = logging.getLogger(__name__)
+
+
+def engine_memory_bytes(engine) -> int:
+    """Estimated bytes held by an engine: its index plus the model weights it loaded
+
+    Models borrowed from another engine are counted by that engine only.
+    """
+    if engine is None:
+        return 0
+    try:
+        total = engine.memory_usage().get("total", 0)
+    except Exception:
+        return 0
+    if not isinstance(total, int):
+        return 0
+    model_bytes = getattr(engine, "resident_model_bytes", None)
+    if callable(model_bytes):
+        try:
+            total += sum(model_bytes().values())
+        except Exception:
+            pass
+    return total
+
+
+@dataclass
+class VaultEntry:
+    """One hosted vault and its (possibly unloaded) engine"""
+    name: str
+    path: str
+    cache_dir: str
+    engine: Optional[object] = None
+    last_used: float = 0.0
+    loads: int = 0
+    indexer: Optional[BackgroundIndexer] = None
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class VaultPool:
+    """Named vault engines with lazy loading and LRU unloading under a memory budget
+
+    Unloading only drops the pool's reference: requests already running keep the
+    engine they resolved, and the memory is freed once they finish.
+    """
+
+    def __init__(self, vaults: Dict[str, Dict[str, str]], load_engine: Callable[[str, str], object],
+                 memory_budget_bytes: int = 0, pinned_bytes: Callable[[], int] = lambda: 0,
+                 on_job_finished: Optional[Callable[[IndexJob], None]] = None):
+        """
+        Args:
+            vaults: name -> {"path": vault path, "cache_dir": index cache directory}
+            load_engine: Builds an engine for (vault_path, cache_dir), restoring its index from the cache
+            memory_budget_bytes: Limit for all vault indexes together, 0 = unlimited
+            pinned_bytes: Memory of indexes that are never unloaded (the boot vault)
+            on_job_finished: Passed to each vault's BackgroundIndexer (e.g. metrics)
+        """
+        self._entries: Dict[str, VaultEntry] = {
+            name: VaultEntry(name=name, path=spec["path"], cache_dir=spec["cache_dir"])
+            for name, spec in vaults.items()
+        }
+        self._load_engine = load_engine
+        self.memory_budget_bytes = max(int(memory_budget_bytes or 0), 0)
+        self._pinned_bytes = pinned_bytes
+        self._on_job_finished = on_job_finished
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def names(self) -> List[str]:
+        return list(self._entries)
+
+    def has(self, name: str) -> bool:
+        return name in self._entries
+
+    def loaded(self, name: str) -> Optional[object]:
+        """The vault's engine if it is loaded (no loading, no LRU update)"""
+        entry = self._entries.get(name)
+        return entry.engine if entry is not None else None
+
+    def get(self, name: str) -> object:
+        """The vault's engine, loading it first if needed; may unload other vaults"""
+        entry = self._entries[name]
+        with entry.lock:
+            if entry.engine is None:
+                started = time.perf_counter()
+                entry.engine = self._load_engine(entry.path, entry.cache_dir)
+                entry.loads += 1
+                logger.info(f"Loaded vault '{name}' ({entry.path}) in "
+                            f"{(time.perf_counter() - started) * 1000:.0f} ms, "
+                            f"{engine_memory_bytes(entry.engine) / 1024 / 1024:.1f} MB")
+            entry.last_used = time.time()
+            engine = entry.engine
+        self.evict(keep=name)
+        return engine
+
+    def swap(self, name: str, engine) -> None:
+        """Install a rebuilt engine for a vault (called by its indexer)"""
+        entry = self._entries[name]
+        entry.engine = engine
+        entry.last_used = time.time()
+
+    def unload(self, name: str) -> bool:
+        entry = self._entries.get(name)
+        if entry is None or entry.engine is None:
+            return False
+        entry.engine = None
+        logger.info(f"Unloaded vault '{name}'")
+        return True
+
+    def indexer(self, name: str) -> BackgroundIndexer:
+        """The vault's job runner (rebuilds go into a copy of its engine, as for the boot vault)"""
+        entry = self._entries[name]
+        with self._lock:
+            if entry.indexer is None:
+                entry.indexer = BackgroundIndexer(lambda: self.get(name), lambda engine: self.swap(name, engine),
+                                                  on_finished=self._on_job_finished)
+        return entry.indexer
+
+    def find_job(self, job_id: str) -> Optional[IndexJob]:
+        for entry in self._entries.values():
+            if entry.indexer is not None:
+                job = entry.indexer.get_job(job_id)
+                if job is not None:
+                    return job
+        return None
+
+    def jobs(self) -> List[IndexJob]:
+        return [job for entry in self._entries.values() if entry.indexer is not None
+                for job in entry.indexer.list_jobs()]
+
+    def _busy(self, entry: VaultEntry) -> bool:
+        return entry.indexer is not None and any(not job.done for job in entry.indexer.list_jobs())
+
+    def memory_bytes(self) -> int:
+        """Estimated bytes of all loaded vault indexes, the pinned boot vault included"""
+        return self._pinned_bytes() + sum(engine_memory_bytes(entry.engine) for entry in self._entries.values())
+
+    def evict(self, keep: Optional[str] = None) -> List[str]:
+        """Unload least recently used vaults until the budget is met
+
+        The vault just used (keep) and vaults with a running reindex are never unloaded.
+        """
+        if not self.memory_budget_bytes:
+            return []
+        unloaded = []
+        with self._lock:
+            while self.memory_bytes() > self.memory_budget_bytes:
+                candidates = [entry for entry in self._entries.values()
+                              if entry.engine is not None and entry.name != keep and not self._busy(entry)]
+                if not candidates:
+                    break
+                victim = min(candidates, key=lambda entry: entry.last_used)
+                self.unload(victim.name)
+                unloaded.append(victim.name)
+                self.evictions += 1
+        if unloaded:
+            logger.info(f"Vault memory over budget ({self.memory_budget_bytes / 1024 / 1024:.0f} MB): "
+                        f"unloaded {', '.join(unloaded)}")
+        return unloaded
+
+    def statistics(self) -> List[Dict]:
+        """Per-vault state for /vaults"""
+        stats = []
+        for entry in self._entries.values():
+            engine = entry.engine
+            stats.append({
+                "name": entry.name,
+                "path": entry.path,
+                "loaded": engine is not None,
+                "indexed": bool(engine is not None and engine.indexed),
+                "document_count": len(engine.documents) if engine is not None else 0,
+                "memory_bytes": engine_memory_bytes(engine),
+                "last_used": entry.last_used or None,
+                "loads": entry.loads,
+            })
+        return stats
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Shared test factories - documents and engines used by several test modules.
+"""
+
+import functools
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import numpy as np
+import pytest
+
+from src.core.vault_processor import Document
+from src.features.advanced_search import AdvancedSearchEngine, SearchResult
+
+
+NOTE = "이 노트는 증분 인덱싱 테스트를 위한 충분히 긴 본문을 가지고 있습니다 {}."
+
+
+class FakeEmbeddingEngine:
+    """호출된 문서를 기록하는 가짜 임베딩 엔진"""
+    model_name = "fake-model"
+    embedding_dimension = 2
+
+    def __init__(self):
+        self.encoded = []
+
+    def encode_documents(self, texts):
+        self.encoded.extend(texts)
+        return np.array([[1.0, float(len(text))] for text in texts], dtype=np.float32)
+
+
+def _make_document(path: str, content: str, file_hash: str = "hash") -> Document:
+    return Document(
+        path=path,
+        title=path,
+        content=content,
+        tags=[],
+        frontmatter={},
+        word_count=len(content.split()),
+        char_count=len(content),
+        file_size=len(content),
+        modified_at=datetime.now(),
+        file_hash=file_hash
+    )
+
+
+def _make_engine(vault_path, cache_dir, model_host=None) -> AdvancedSearchEngine:
+    """FakeEmbeddingEngine을 쓰는 빈 엔진 (텍스트 저장소 없음, 인덱스 자동 로드 안 함)"""
+    config = {"text_store": {"enabled": False}, "vault": {"min_word_count": 3}}
+    return AdvancedSearchEngine(str(vault_path), str(cache_dir), config, auto_load=False,
+                                embedding_engine=FakeEmbeddingEngine(), model_host=model_host)
+
+
+def _make_indexed_engine(vault_path, cache_dir, model_host=None) -> AdvancedSearchEngine:
+    """vault를 FakeEmbeddingEngine으로 인덱싱한 엔진 (index_version 1)"""
+    engine = _make_engine(vault_path, cache_dir, model_host=model_host)
+    engine.documents = engine.processor.process_all_files()
+    engine.embeddings = engine.engine.encode_documents([doc.get_content() for doc in engine.documents])
+    engine.indexed = True
+    engine.index_version = 1
+    engine.engine.encoded.clear()
+    return engine
+
+
+def _make_tiered_engine(directory, reranker=None) -> AdvancedSearchEngine:
+    """하이브리드 검색을 고정 결과로 대체한 단계별 검색 엔진 (모델 없음)"""
+    engine = _make_engine(directory / "vault", directory / "cache")
+    engine.index_version = 1
+
+    docs = [_make_document(f"note{i}.md", f"본문 {i}") for i in range(5)]
+    engine.hybrid_search = Mock(side_effect=lambda query, top_k=10, threshold=0.0: [
+        SearchResult(document=doc, similarity_score=1.0 - i / 10, match_type="hybrid")
+        for i, doc in enumerate(docs[:top_k])
+    ])
+    engine._get_reranker = Mock(return_value=reranker)
+    engine._get_colbert_engine = Mock(return_value=None)
+    if reranker is not None:
+        engine._resident_models["reranker"] = reranker
+    return engine
+
+
+def _reversing_reranker():
+    """후보 순서를 뒤집는 가짜 재순위화 모델"""
+    def rerank(query, search_results, top_k):
+        return [SimpleNamespace(search_result=r, rerank_score=float(i), new_rank=i)
+                for i, r in enumerate(reversed(search_results))][:top_k]
+    return Mock(rerank=Mock(side_effect=rerank))
+
+
+@pytest.fixture
+def make_document():
+    """Document(path, content, file_hash) factory"""
+    return _make_document
+
+
+@pytest.fixture
+def note_text():
+    """note_text(name): a note long enough to be indexed (min_word_count=3)"""
+    return NOTE.format
+
+
+@pytest.fixture
+def make_indexed_engine():
+    """Factory (vault_path, cache_dir, model_host=None) for an engine indexed with FakeEmbeddingEngine"""
+    return _make_indexed_engine
+
+
+@pytest.fixture
+def make_tiered_engine(tmp_path):
+    """Factory for an engine whose hybrid_search returns note0..note4 (optional reranker)"""
+    return functools.partial(_make_tiered_engine, tmp_path)
+
+
+@pytest.fixture
+def reversing_reranker():
+    return _reversing_reranker()
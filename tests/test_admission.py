@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Tests for search admission control
+"""
+
+import asyncio
+
+import pytest
+
+from src.admission import AdmissionController, AdmissionRejected, cost_class
+
+
+def test_cost_class_puts_reranking_first():
+    assert cost_class("keyword", True) == "rerank"
+    assert cost_class("colbert", False) == "colbert"
+
+
+def test_full_queue_is_rejected_with_429():
+    async def scenario():
+        controller = AdmissionController({"rerank": {"concurrency": 1, "queue": 1}})
+        running = await controller.acquire("rerank")
+        queued = asyncio.create_task(controller.acquire("rerank"))
+        await asyncio.sleep(0)
+
+        with pytest.raises(AdmissionRejected) as rejected:
+            await controller.acquire("rerank")
+
+        # Other classes are not affected by the rerank backlog
+        cheap = await controller.acquire("keyword")
+        cheap.release()
+
+        running.release()
+        (await queued).release()
+        return rejected.value, controller.statistics()
+
+    rejected, stats = asyncio.run(scenario())
+    assert rejected.status_code == 429 and rejected.retry_after >= 1
+    assert stats["rejected"] == {"rerank:queue_full": 1}
+    assert stats["running"] == 0
+
+
+def test_try_acquire_yields_to_waiting_requests():
+    async def scenario():
+        controller = AdmissionController({"hybrid": {"concurrency": 1}}, max_concurrent=2)
+        running = await controller.acquire("hybrid")
+        queued = asyncio.create_task(controller.acquire("hybrid"))
+        await asyncio.sleep(0)
+
+        blocked = controller.try_acquire("keyword")  # a free slot, but a live search is waiting
+        running.release()
+        (await queued).release()
+        background = controller.try_acquire("keyword")
+        background.release()
+        return blocked, background, controller.statistics()
+
+    blocked, background, stats = asyncio.run(scenario())
+    assert blocked is None and background is not None
+    assert stats["rejected"] == {} and stats["running"] == 0
+
+
+def test_weighted_acquire_holds_one_slot_per_search():
+    async def scenario():
+        controller = AdmissionController({"semantic": {"concurrency": 4}}, max_concurrent=8)
+        batch = await controller.acquire("semantic", weight=3)
+        running = controller.statistics()["classes"]["semantic"]["running"]
+        single = await controller.acquire("semantic")
+        waiting = asyncio.create_task(controller.acquire("semantic"))  # class full (3 + 1)
+        await asyncio.sleep(0)
+        queued = controller.statistics()["classes"]["semantic"]["queued"]
+
+        batch.release()
+        (await waiting).release()
+        single.release()
+        # A weight above the class limit is capped instead of waiting forever
+        capped = await controller.acquire("semantic", weight=100)
+        capped_weight = capped.weight
+        capped.release()
+        return running, queued, capped_weight, controller.statistics()
+
+    running, queued, capped_weight, stats = asyncio.run(scenario())
+    assert running == 3 and queued == 1
+    assert capped_weight == 4
+    assert stats["running"] == 0
+
+
+def test_queue_timeout_and_deadline_reject_with_503():
+    async def scenario():
+        controller = AdmissionController({"colbert": {"concurrency": 1, "queue": 8,
+                                                      "queue_timeout_seconds": 0.05}})
+        running = await controller.acquire("colbert")
+        with pytest.raises(AdmissionRejected) as timed_out:
+            await controller.acquire("colbert")
+
+        # Once the class is known to be slow, a request that cannot start in time fails fast
+        controller._service_time["colbert"] = 10.0
+        with pytest.raises(AdmissionRejected) as unreachable:
+            await controller.acquire("colbert")
+
+        running.release()
+        return timed_out.value, unreachable.value
+
+    timed_out, unreachable = asyncio.run(scenario())
+    assert (timed_out.status_code, timed_out.reason) == (503, "timeout")
+    assert (unreachable.status_code, unreachable.reason) == (503, "deadline")
+    assert unreachable.retry_after >= 10
+
+
+def test_freed_slots_go_to_cheap_methods_first():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1)
+        running = await controller.acquire("hybrid")
+        order = []
+
+        async def wait(name):
+            ticket = await controller.acquire(name)
+            order.append(name)
+            ticket.release()
+
+        expensive = asyncio.create_task(wait("rerank"))
+        await asyncio.sleep(0)
+        cheap = asyncio.create_task(wait("keyword"))
+        await asyncio.sleep(0)
+
+        running.release()
+        await asyncio.gather(expensive, cheap)
+        return order
+
+    assert asyncio.run(scenario()) == ["keyword", "rerank"]
@@ -3,7 +3,11 @@
 Tests for VisClient - HTTP client for vis daemon server.
 """
 
+import os
 import signal
+import socket
+import tempfile
+import time
 from unittest.mock import Mock, patch, MagicMock
 
 import pytest
@@ -42,7 +46,7 @@ class TestVisClient:
         mock_response.status_code = 200
 
         mock_client = MagicMock()
-        mock_client.__enter__.return_value.get.return_value = mock_response
+        mock_client.request.return_value = mock_response
         mock_client_class.return_value = mock_client
 
         client = VisClient()
@@ -53,7 +57,7 @@ class TestVisClient:
         """Test is_server_running handles connection errors gracefully"""
         # Mock connection error
         mock_client = MagicMock()
-        mock_client.__enter__.return_value.get.side_effect = httpx.ConnectError("Connection refused")
+        mock_client.request.side_effect = httpx.ConnectError("Connection refused")
         mock_client_class.return_value = mock_client
 
         client = VisClient()
@@ -64,7 +68,7 @@ class TestVisClient:
         """Test is_server_running handles timeout gracefully"""
         # Mock timeout
         mock_client = MagicMock()
-        mock_client.__enter__.return_value.get.side_effect = httpx.TimeoutException("Timeout")
+        mock_client.request.side_effect = httpx.TimeoutException("Timeout")
         mock_client_class.return_value = mock_client
 
         client = VisClient()
@@ -105,19 +109,18 @@ class TestVisClient:
         }
 
         mock_client = MagicMock()
-        mock_client.__enter__.return_value.get.return_value = mock_response
+        mock_client.request.return_value = mock_response
         mock_client_class.return_value = mock_client
 
-        # Mock is_server_running to return True
-        with patch.object(client, 'is_server_running', return_value=True):
-            results = client.search(
-                query="test query",
-                top_k=5,
-                threshold=0.5,
-                search_method="hybrid",
-                rerank=True,
-                auto_start=False
-            )
+        # No pre-flight /health request: the search itself is the only call
+        results = client.search(
+            query="test query",
+            top_k=5,
+            threshold=0.5,
+            search_method="hybrid",
+            rerank=True,
+            auto_start=False
+        )
 
         # Verify results
         assert len(results) == 1
@@ -125,15 +128,71 @@ class TestVisClient:
         assert results[0]["score"] == 0.95
 
         # Verify request was made with correct parameters
-        mock_client.__enter__.return_value.get.assert_called_once()
-        call_args = mock_client.__enter__.return_value.get.call_args
-        assert call_args[0][0].endswith("/search")
+        mock_client.request.assert_called_once()
+        call_args = mock_client.request.call_args
+        assert call_args[0][1].endswith("/search")
         assert call_args[1]["params"]["query"] == "test query"
         assert call_args[1]["params"]["top_k"] == 5
         assert call_args[1]["params"]["threshold"] == 0.5
         assert call_args[1]["params"]["search_method"] == "hybrid"
         assert call_args[1]["params"]["rerank"] is True
 
+    @patch('httpx.Client')
+    def test_search_batch_posts_all_queries_at_once(self, mock_client_class):
+        """Test search_batch sends one request and returns results per query"""
+        client = VisClient()
+
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {
+            "responses": [
+                {"results": [{"path": "/vault/a.md", "score": 0.9}], "query": "a", "search_method": "hybrid", "total": 1},
+                {"results": [], "query": "b", "search_method": "keyword", "total": 0}
+            ],
+            "total": 2
+        }
+
+        mock_client = MagicMock()
+        mock_client.request.return_value = mock_response
+        mock_client_class.return_value = mock_client
+
+        results = client.search_batch(
+            ["a", {"query": "b", "search_method": "keyword"}], top_k=3, auto_start=False
+        )
+
+        assert results == [[{"path": "/vault/a.md", "score": 0.9}], []]
+        post = mock_client.request
+        post.assert_called_once()
+        assert post.call_args[0][1].endswith("/search/batch")
+        assert post.call_args[1]["json"]["queries"][1] == {"query": "b", "search_method": "keyword"}
+        assert post.call_args[1]["json"]["top_k"] == 3
+
+    @patch('httpx.Client')
+    def test_search_stream_yields_events_as_lines_arrive(self, mock_client_class):
+        """Test search_stream streams the response and yields one dict per NDJSON line"""
+        client = VisClient()
+
+        mock_response = MagicMock()
+        mock_response.is_error = False
+        mock_response.iter_lines.return_value = iter([
+            '{"event": "results", "stage": "initial", "final": false, "results": []}',
+            '',
+            '{"event": "done", "total_ms": 12.5}',
+        ])
+
+        mock_client = MagicMock()
+        mock_client.send.return_value = mock_response
+        mock_client_class.return_value = mock_client
+
+        events = list(client.search_stream("python", rerank=True, auto_start=False))
+
+        assert [e["event"] for e in events] == ["results", "done"]
+        assert mock_client.send.call_args[1]["stream"] is True
+        build = mock_client.build_request.call_args
+        assert build[0][1].endswith("/search/stream")
+        assert build[1]["params"]["rerank"] is True
+        mock_response.close.assert_called_once()
+
     @patch('httpx.Client')
     def test_reindex_delegates_to_server(self, mock_client_class):
         """Test reindex delegates to server correctly"""
@@ -148,22 +207,19 @@ class TestVisClient:
         }
 
         mock_client = MagicMock()
-        mock_client.__enter__.return_value.post.return_value = mock_response
+        mock_client.request.return_value = mock_response
         mock_client_class.return_value = mock_client
 
-        # Mock is_server_running and _ensure_server
-        with patch.object(client, 'is_server_running', return_value=True):
-            with patch.object(client, '_ensure_server'):
-                result = client.reindex(force=True)
+        result = client.reindex(force=True)
 
         # Verify result
         assert result["document_count"] == 100
         assert "Successfully reindexed" in result["message"]
 
         # Verify request was made with correct parameters
-        mock_client.__enter__.return_value.post.assert_called_once()
-        call_args = mock_client.__enter__.return_value.post.call_args
-        assert call_args[0][0].endswith("/reindex")
+        mock_client.request.assert_called_once()
+        call_args = mock_client.request.call_args
+        assert call_args[0][1].endswith("/reindex")
         assert call_args[1]["params"]["force"] is True
 
     @patch('httpx.Client')
@@ -181,7 +237,7 @@ class TestVisClient:
         }
 
         mock_client = MagicMock()
-        mock_client.__enter__.return_value.get.return_value = mock_response
+        mock_client.request.return_value = mock_response
         mock_client_class.return_value = mock_client
 
         result = client.health()
@@ -191,6 +247,114 @@ class TestVisClient:
         assert result["indexed"] is True
         assert result["document_count"] == 100
 
+    @patch('httpx.Client')
+    def test_connection_pool_is_reused_across_calls(self, mock_client_class):
+        """Test one pooled httpx.Client serves consecutive requests"""
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {"results": []}
+        mock_client_class.return_value.request.return_value = mock_response
+
+        client = VisClient(use_socket=False)
+        client.search("a", auto_start=False)
+        client.search("b", auto_start=False)
+        client.health()
+
+        assert mock_client_class.call_count == 1
+        assert mock_client_class.return_value.request.call_count == 3
+
+    @patch('httpx.Client')
+    def test_stale_socket_falls_back_to_tcp(self, mock_client_class, tmp_path):
+        """Test a connect failure on the Unix socket is retried over TCP"""
+        stale_socket = tmp_path / "vis.sock"
+        stale_socket.touch()
+
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {"results": [{"path": "/vault/a.md"}]}
+        uds_client, tcp_client = MagicMock(), MagicMock()
+        uds_client.request.side_effect = httpx.ConnectError("Connection refused")
+        tcp_client.request.return_value = mock_response
+        mock_client_class.side_effect = [uds_client, tcp_client]
+
+        client = VisClient(socket_path=str(stale_socket))
+        results = client.search("a", auto_start=False)
+
+        assert results == [{"path": "/vault/a.md"}]
+        assert mock_client_class.call_args_list[0][1]["transport"] is not None
+        assert mock_client_class.call_args_list[1][1]["transport"] is None
+        assert client.transport == "tcp"
+
+    @patch('httpx.Client')
+    def test_connect_failure_starts_server_when_auto_start(self, mock_client_class):
+        """Test auto-start happens only after the request fails to connect"""
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {"results": []}
+        down, up = MagicMock(), MagicMock()
+        down.request.side_effect = httpx.ConnectError("Connection refused")
+        up.request.return_value = mock_response
+        mock_client_class.side_effect = [down, up]
+
+        client = VisClient(use_socket=False)
+        with patch.object(client, '_start_server') as mock_start:
+            assert client.search("a", auto_start=True) == []
+
+        mock_start.assert_called_once()
+
+    @patch('time.sleep')
+    @patch('subprocess.Popen')
+    def test_start_server_waits_for_readiness(self, mock_popen, mock_sleep):
+        """Test auto-start returns only once /health reports ready, not merely live"""
+        client = VisClient(use_socket=False)
+        health = [None, {"live": True, "ready": False, "phase": "warming"}, {"live": True, "ready": True}]
+
+        with patch.object(client, '_health_status', side_effect=health) as mock_health:
+            client._start_server()
+
+        mock_popen.assert_called_once()
+        assert mock_health.call_count == 3
+
+    def test_cli_routes_through_daemon_only_for_the_same_vault(self, tmp_path):
+        """Test analysis commands reuse the daemon only when it serves the requested vault"""
+        from src.__main__ import _daemon_client
+
+        with patch.object(VisClient, 'health', return_value={"indexed": True, "vault": str(tmp_path)}):
+            assert isinstance(_daemon_client(str(tmp_path)), VisClient)
+            assert _daemon_client(str(tmp_path / "other")) is None
+        with patch.object(VisClient, 'health', side_effect=ServerNotRunning("down")):
+            assert _daemon_client(str(tmp_path)) is None
+
+    @pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="Unix sockets not supported")
+    def test_unix_socket_transport_end_to_end(self):
+        """Test requests reach a real server over a Unix domain socket"""
+        import threading
+        import uvicorn
+        from fastapi import FastAPI
+
+        app = FastAPI()
+
+        @app.get("/health")
+        def health():
+            return {"status": "ok", "indexed": True, "document_count": 1}
+
+        path = os.path.join(tempfile.mkdtemp(), "vis.sock")
+        server = uvicorn.Server(uvicorn.Config(app, uds=path, log_level="warning"))
+        thread = threading.Thread(target=server.run, daemon=True)
+        thread.start()
+        try:
+            for _ in range(100):
+                if os.path.exists(path):
+                    break
+                time.sleep(0.02)
+
+            with VisClient(port=59999, socket_path=path) as client:
+                assert client.health()["status"] == "ok"
+                assert client.transport == "uds"
+        finally:
+            server.should_exit = True
+            thread.join(timeout=5)
+
     @patch('os.kill')
     @patch('pathlib.Path.exists')
     @patch('pathlib.Path.read_text')
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Tests for latency-budgeted tiered search (search_with_deadline).
+"""
+
+
+def test_tight_budget_skips_cold_tiers(make_tiered_engine):
+    engine = make_tiered_engine()
+
+    outcome = engine.search_with_deadline("tdd", top_k=2, deadline_ms=50, use_colbert=True, use_reranker=True)
+
+    assert [r.document.path for r in outcome.results] == ["note0.md", "note1.md"]
+    assert engine.hybrid_search.call_args.kwargs["top_k"] == 6  # top_k * 3 후보
+    assert [(t["tier"], t["ran"]) for t in outcome.tiers] == [("hybrid", True), ("colbert", False), ("rerank", False)]
+    assert outcome.tiers[2]["reason"] == "budget" and outcome.tiers[2]["estimated_ms"] > 50
+    assert outcome.degraded
+    engine._get_reranker.assert_not_called()
+
+
+def test_tiers_run_when_budget_allows_and_report_unavailable_models(make_tiered_engine, reversing_reranker):
+    engine = make_tiered_engine(reranker=reversing_reranker)
+    engine._tier_costs["rerank"] = 0.0001  # 관측된 후보당 비용
+
+    outcome = engine.search_with_deadline("tdd", top_k=2, deadline_ms=1000, use_colbert=True, use_reranker=True)
+
+    assert [(t["tier"], t["ran"]) for t in outcome.tiers] == [("hybrid", True), ("colbert", False), ("rerank", True)]
+    assert outcome.tiers[1]["reason"] == "budget"  # ColBERT 모델 미로드 → 로드 비용이 예산 초과
+    assert [r.document.path for r in outcome.results] == ["note4.md", "note3.md"]
+    assert [r.rank for r in outcome.results] == [1, 2]
+    assert engine._tier_costs["rerank"] != 0.0001  # 실행 비용이 평균에 반영됨
+
+
+def test_without_deadline_every_requested_tier_runs(make_tiered_engine, reversing_reranker):
+    engine = make_tiered_engine(reranker=reversing_reranker)
+    del engine._resident_models["reranker"]  # 콜드 모델도 예산이 없으면 실행
+
+    outcome = engine.search_with_deadline("tdd", search_method="colbert", top_k=3, use_reranker=True)
+
+    assert [(t["tier"], t["ran"]) for t in outcome.tiers] == [("hybrid", True), ("colbert", False), ("rerank", True)]
+    assert outcome.tiers[1]["reason"] == "unavailable"  # 조용히 대체하지 않고 보고
+    assert "rerank" not in engine._tier_costs  # 로드가 섞인 첫 실행은 비용 관측 제외
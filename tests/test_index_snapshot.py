@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Tests for shared index snapshots - publish, memory-mapped load and atomic pointer swap.
+"""
+
+import numpy as np
+import pytest
+
+from src.core.index_snapshot import IndexSnapshotStore
+from src.core.text_store import DocumentTextStore
+from src.features.advanced_search import AdvancedSearchEngine
+
+
+def _worker_engine(source, text_store) -> AdvancedSearchEngine:
+    """스냅샷만 적재하는 워커 엔진 (모델/설정은 원본과 같다고 가정)"""
+    engine = AdvancedSearchEngine.__new__(AdvancedSearchEngine)
+    engine.engine = source.engine
+    engine.config = source.config
+    engine.passage_config = source.passage_config
+    engine.text_store = text_store
+    engine.indexed = False
+    engine._reset_passage_index()
+    engine._reset_derived_index()
+    return engine
+
+
+@pytest.fixture
+def indexed_engine(tmp_path, note_text, make_indexed_engine):
+    vault = tmp_path / "vault"
+    vault.mkdir()
+    for name in ("a", "b", "c"):
+        (vault / f"{name}.md").write_text(note_text(name * 3), encoding="utf-8")
+    engine = make_indexed_engine(vault, tmp_path / "cache")
+    engine.text_store = DocumentTextStore(str(tmp_path / "cache"))
+    engine._offload_document_texts()
+    return engine
+
+
+def test_snapshot_round_trip_is_memory_mapped(indexed_engine, tmp_path):
+    store = IndexSnapshotStore(str(tmp_path / "snapshots"))
+    snapshot_id = store.publish(indexed_engine)
+
+    worker = _worker_engine(indexed_engine, DocumentTextStore(str(tmp_path / "cache")))
+    assert store.load(worker, snapshot_id) == snapshot_id
+
+    assert worker.indexed and worker.index_version == indexed_engine.index_version
+    assert isinstance(worker.embeddings, np.memmap)
+    assert isinstance(worker._get_normalized_embeddings(), np.memmap)
+    assert [d.path for d in worker.documents] == [d.path for d in indexed_engine.documents]
+    assert worker.documents[0].content == indexed_engine.documents[0].content
+
+    query = np.array([[1.0, 40.0]], dtype=np.float32)
+    expected, _ = indexed_engine._score_documents_batch(query)
+    actual, _ = worker._score_documents_batch(query)
+    np.testing.assert_allclose(actual, expected, rtol=1e-6)
+
+
+def test_publish_swaps_pointer_and_prunes_old_snapshots(indexed_engine, tmp_path):
+    store = IndexSnapshotStore(str(tmp_path / "snapshots"), keep=1)
+
+    first = store.publish(indexed_engine)
+    indexed_engine.index_version += 1
+    second = store.publish(indexed_engine)
+    indexed_engine.index_version += 1
+    third = store.publish(indexed_engine)
+
+    assert store.current_id() == third
+    assert store.read_manifest()["index_version"] == indexed_engine.index_version
+    remaining = sorted(p.name for p in store.root.iterdir() if p.is_dir())
+    assert remaining == sorted([second, third])
+    assert first not in remaining
+
+
+def test_snapshot_restores_lexical_index_and_neighbors(indexed_engine, tmp_path):
+    store = IndexSnapshotStore(str(tmp_path / "snapshots"))
+    expected_keyword = [(r.document.path, r.similarity_score) for r in indexed_engine.keyword_search("aaa")]
+    expected_neighbors = indexed_engine.get_neighbor_table()
+    snapshot_id = store.publish(indexed_engine)
+
+    worker = _worker_engine(indexed_engine, DocumentTextStore(str(tmp_path / "cache")))
+    assert store.load(worker, snapshot_id) == snapshot_id
+    assert worker._lexical_index[0] == worker.index_version
+
+    actual_keyword = [(r.document.path, r.similarity_score) for r in worker.keyword_search("aaa")]
+    assert actual_keyword == expected_keyword and actual_keyword
+    np.testing.assert_array_equal(worker.get_neighbor_table()[0], expected_neighbors[0])
+
+
+def test_load_rejects_snapshot_of_changed_vault(indexed_engine, tmp_path, note_text):
+    store = IndexSnapshotStore(str(tmp_path / "snapshots"))
+    store.publish(indexed_engine)
+    processor = indexed_engine.processor
+    assert store.load(_worker_engine(indexed_engine, None),
+                      vault_fingerprint=processor.vault_fingerprint()) is not None
+
+    (tmp_path / "vault" / "d.md").write_text(note_text("ddd"), encoding="utf-8")
+    worker = _worker_engine(indexed_engine, None)
+    assert store.load(worker, vault_fingerprint=processor.vault_fingerprint()) is None
+    assert not worker.indexed
+
+
+def test_load_rejects_snapshot_built_with_other_settings(indexed_engine, tmp_path):
+    store = IndexSnapshotStore(str(tmp_path / "snapshots"))
+    store.publish(indexed_engine)
+
+    worker = _worker_engine(indexed_engine, None)
+    worker.passage_config = {"enabled": True}
+    assert store.load(worker) is None
+
+    worker = _worker_engine(indexed_engine, None)
+    worker.engine = type(indexed_engine.engine)()
+    worker.engine.model_name = "other-model"
+    assert store.load(worker) is None
+    assert not worker.indexed
+
+
+def test_load_without_snapshot_returns_none(indexed_engine, tmp_path):
+    store = IndexSnapshotStore(str(tmp_path / "empty"))
+    assert store.load(_worker_engine(indexed_engine, None)) is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
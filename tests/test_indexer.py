@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Tests for background indexing - incremental refresh, job runner and vault watcher.
+"""
+
+import time
+
+import numpy as np
+import pytest
+
+from src.core.passage_splitter import approximate_token_count
+from src.core.reindex_checkpoint import BuildProgress, ReindexCancelled, ReindexCheckpointStore
+from src.core.vault_processor import VaultProcessor
+from src.features.advanced_search import AdvancedSearchEngine
+from src.indexer import BackgroundIndexer, IndexRequestQueue, SnapshotFollower, VaultWatcher
+
+
+def test_refresh_documents_reembeds_only_touched_notes(tmp_path, note_text, make_indexed_engine):
+    vault = tmp_path / "vault"
+    vault.mkdir()
+    for name in ("a", "b", "c"):
+        (vault / f"{name}.md").write_text(note_text(name), encoding="utf-8")
+
+    engine = make_indexed_engine(vault, tmp_path / "cache")
+    old_documents = list(engine.documents)
+
+    (vault / "b.md").write_text(note_text("수정됨"), encoding="utf-8")
+    (vault / "c.md").unlink()
+    (vault / "d.md").write_text(note_text("d"), encoding="utf-8")
+
+    refreshed = engine.refresh_documents(
+        [str(vault / "b.md"), "d.md"], [str(vault / "c.md")]
+    )
+
+    assert refreshed is not engine
+    assert sorted(doc.path.rsplit("/", 1)[-1] for doc in refreshed.documents) == ["a.md", "b.md", "d.md"]
+    assert refreshed.embeddings.shape == (3, 2)
+    assert len(engine.engine.encoded) == 2  # b, d 만 임베딩
+    assert refreshed.index_version == 2
+
+    # 원본 인스턴스는 그대로
+    assert engine.documents == old_documents
+    assert engine.index_version == 1
+
+
+def test_refresh_documents_reads_passages_only_for_touched_notes(tmp_path, note_text, make_indexed_engine):
+    vault = tmp_path / "vault"
+    vault.mkdir()
+    for name in ("a", "b"):
+        (vault / f"{name}.md").write_text(f"# {name}1\n\n{note_text(name)}\n\n# {name}2\n\n{note_text(name)}", encoding="utf-8")
+
+    engine = make_indexed_engine(vault, tmp_path / "cache")
+    engine.passage_config = {"enabled": True}
+    engine.engine.count_tokens = approximate_token_count
+    engine.engine.encode_passages = lambda texts, max_length=512: np.array([[1.0, float(len(t))] for t in texts])
+    engine._build_passage_index()
+    assert len(engine.passage_ids) == 4
+
+    (vault / "b.md").write_text(f"# b1\n\n{note_text('수정됨')}\n\n# b2\n\n{note_text('b')}", encoding="utf-8")
+    read = []
+    get_passage_embeddings = engine.cache.get_passage_embeddings
+    engine.cache.get_passage_embeddings = lambda path, *args: read.append(path) or get_passage_embeddings(path, *args)
+
+    refreshed = engine.refresh_documents(["b.md"])
+
+    assert read == [str(vault / "b.md")]  # 변경 없는 a는 메모리의 패시지 행을 재사용
+    before = dict(zip(engine.passage_ids, engine.passage_hashes))
+    after = dict(zip(refreshed.passage_ids, refreshed.passage_hashes))
+    assert sorted(after) == sorted(before)
+    assert [pid for pid in after if after[pid] != before[pid]] == [str(vault / "b.md") + "#p0"]
+    embeddings = dict(zip(refreshed.passage_ids, refreshed.passage_embeddings))
+    for pid, embedding in zip(engine.passage_ids, engine.passage_embeddings):
+        if pid.startswith(str(vault / "a.md")):
+            np.testing.assert_allclose(embeddings[pid], embedding)
+
+
+def test_refresh_documents_refuses_sampled_index(tmp_path):
+    engine = AdvancedSearchEngine.__new__(AdvancedSearchEngine)
+    engine.indexed = True
+    engine.is_sampled = True
+
+    assert engine.refresh_documents(["a.md"]) is None
+
+
+class _CancelAfter(BuildProgress):
+    """지정한 수만큼 임베딩한 뒤 취소를 요청하는 진행 보고"""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.embedded = 0
+
+    def advance(self, count=1):
+        self.embedded += count
+
+    def is_cancelled(self):
+        return self.embedded >= self.limit
+
+
+def test_cancelled_force_rebuild_resumes_from_checkpoint(tmp_path, note_text, make_indexed_engine):
+    vault = tmp_path / "vault"
+    vault.mkdir()
+    for name in ("a", "b", "c", "d"):
+        (vault / f"{name}.md").write_text(note_text(name), encoding="utf-8")
+
+    engine = make_indexed_engine(vault, tmp_path / "cache")
+    engine.cache_dir = str(tmp_path / "cache")
+    engine.config = {"indexing": {"checkpoint_every": 1}}
+
+    with pytest.raises(ReindexCancelled):
+        engine.build_index(force_rebuild=True, progress=_CancelAfter(2))
+    assert len(engine.engine.encoded) == 2
+    checkpoint = ReindexCheckpointStore(engine.cache_dir).load()
+    assert checkpoint.force and checkpoint.status == "cancelled"
+
+    # 다시 강제 재구축하면 이미 다시 만든 2개는 건너뜀
+    engine.engine.encoded.clear()
+    assert engine.build_index(force_rebuild=True)
+    assert len(engine.engine.encoded) == 2
+    assert engine.embeddings.shape == (4, 2)
+    assert ReindexCheckpointStore(engine.cache_dir).load() is None
+
+    # 체크포인트가 없는 새 강제 재구축은 전부 다시 임베딩
+    engine.engine.encoded.clear()
+    assert engine.build_index(force_rebuild=True)
+    assert len(engine.engine.encoded) == 4
+
+
+class _Engine:
+    def __init__(self, version, documents=(), fail=False):
+        self.index_version = version
+        self.documents = list(documents)
+        self.fail = fail
+
+    def refresh_documents(self, changed, removed):
+        if self.fail:
+            return None
+        return _Engine(self.index_version + 1, self.documents + changed)
+
+
+def test_indexer_swaps_only_on_success():
+    state = {"engine": _Engine(1)}
+    indexer = BackgroundIndexer(lambda: state["engine"], lambda e: state.update(engine=e))
+
+    job = indexer.create_job("incremental")
+    assert indexer.run_incremental(job, ["x.md"], [])
+    assert state["engine"].index_version == 2
+    assert job.status == "succeeded" and job.document_count == 1
+
+    state["engine"].fail = True
+    failed = indexer.create_job("incremental")
+    assert not indexer.run_incremental(failed, ["y.md"], [])
+    assert failed.status == "failed" and failed.error
+    assert state["engine"].index_version == 2
+    assert [j.id for j in indexer.list_jobs()] == [failed.id, job.id]
+
+
+def test_polling_watcher_debounces_and_retries(tmp_path, note_text):
+    vault = tmp_path / "vault"
+    vault.mkdir()
+    (vault / "a.md").write_text(note_text("a"), encoding="utf-8")
+    (vault / "b.md").write_text(note_text("b"), encoding="utf-8")
+
+    calls = []
+    accept = {"value": False}
+
+    def on_changes(changed, removed):
+        calls.append((changed, removed))
+        return accept["value"]
+
+    watcher = VaultWatcher(VaultProcessor(str(vault)), on_changes, debounce_seconds=0.05, use_native=False)
+    watcher._snapshot = watcher._scan()
+
+    (vault / "a.md").write_text(note_text("수정") * 2, encoding="utf-8")
+    (vault / "b.md").unlink()
+    (vault / "note.txt").write_text("처리 대상 아님", encoding="utf-8")
+    watcher.poll()
+
+    assert not watcher.flush()  # 디바운스 구간 안
+    time.sleep(0.06)
+    assert not watcher.flush()  # 콜백 거절 → 보류
+    accept["value"] = True
+    time.sleep(0.06)
+    assert watcher.flush()
+
+    expected = ([str(vault / "a.md")], [str(vault / "b.md")])
+    assert calls == [expected, expected]
+    assert not watcher.flush(force=True)  # 남은 변경 없음
+
+
+def test_request_queue_hands_jobs_across_processes(tmp_path):
+    worker_side = IndexRequestQueue(str(tmp_path))
+    master_side = IndexRequestQueue(str(tmp_path))
+
+    queued = worker_side.submit("full", force=True)
+    assert worker_side.read_job(queued["id"])["status"] == "queued"
+
+    [request] = master_side.pending()
+    assert request["id"] == queued["id"] and request["force"] is True
+
+    indexer = BackgroundIndexer(lambda: _Engine(1), lambda e: None,
+                                on_finished=lambda job: master_side.write_job(job.to_dict()))
+    job = indexer.create_job("incremental", job_id=request["id"])
+    master_side.claim(request["id"])
+    indexer.run_incremental(job, ["x.md"], [])
+
+    assert master_side.pending() == []
+    assert worker_side.read_job(queued["id"])["status"] == "succeeded"
+    assert [j["id"] for j in worker_side.list_jobs()] == [queued["id"]]
+
+
+def test_snapshot_follower_retries_until_loaded():
+    current = {"id": None}
+    loaded = []
+    accept = {"value": False}
+
+    def on_snapshot(snapshot_id):
+        loaded.append(snapshot_id)
+        return accept["value"]
+
+    follower = SnapshotFollower(lambda: current["id"], on_snapshot)
+    assert not follower.check()  # 게시된 스냅샷 없음
+
+    current["id"] = "v1"
+    assert not follower.check()  # 적재 실패 → 다음에 재시도
+    accept["value"] = True
+    assert follower.check()
+    assert not follower.check()  # 이미 적재됨
+    assert follower.loaded_id == "v1" and loaded == ["v1", "v1"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
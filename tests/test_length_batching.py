@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Tests for token-length-aware batching in AdvancedEmbeddingEngine.
+"""
+
+import numpy as np
+
+from src.core.sentence_transformer_engine import AdvancedEmbeddingEngine
+
+
+class _FakeTokenizer:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, texts, add_special_tokens=True):
+        self.calls += 1
+        return {"input_ids": [text.split() for text in texts]}
+
+
+class _FakeModel:
+    """텍스트 단어 수를 첫 번째 차원에 담아 돌려주는 가짜 모델"""
+
+    def __init__(self):
+        self.tokenizer = _FakeTokenizer()
+        self.batches = []
+
+    def encode(self, texts, batch_size, max_length, **kwargs):
+        self.batches.append(list(texts))
+        vecs = np.zeros((len(texts), 4), dtype=np.float32)
+        vecs[:, 0] = [len(text.split()) for text in texts]
+        return {"dense_vecs": vecs}
+
+
+def _make_engine(token_budget: int = 20, max_batch_size: int = 8) -> AdvancedEmbeddingEngine:
+    engine = AdvancedEmbeddingEngine.__new__(AdvancedEmbeddingEngine)
+    engine.model = _FakeModel()
+    engine.embedding_dimension = 4
+    engine.max_length = 16
+    engine.token_budget = token_budget
+    engine.max_batch_size = max_batch_size
+    engine._token_length_cache = {}
+    engine.last_encode_stats = {}
+    return engine
+
+
+def test_plan_length_batches_groups_similar_lengths():
+    lengths = [10, 1, 10, 1, 1, 10]
+    batches = AdvancedEmbeddingEngine.plan_length_batches(lengths, token_budget=20, max_batch_size=8)
+
+    assert sorted(i for batch in batches for i in batch) == list(range(len(lengths)))
+    # 짧은 문서끼리, 긴 문서끼리 묶이고 예산을 넘지 않음
+    assert batches[0] == [1, 3, 4]
+    for batch in batches:
+        assert len(batch) * max(lengths[i] for i in batch) <= 20
+
+
+def test_encode_bucketed_restores_input_order():
+    engine = _make_engine()
+    texts = ["a " * 10, "b", "c " * 3, "d " * 12, "e e"]
+
+    embeddings = engine.encode_bucketed(texts)
+
+    assert embeddings[:, 0].tolist() == [10, 1, 3, 12, 2]
+    assert len(engine.model.batches) > 1
+    stats = engine.last_encode_stats
+    assert stats["documents"] == len(texts)
+    assert stats["tokens_per_sec"] > 0 and stats["docs_per_sec"] > 0
+
+
+def test_token_lengths_cached_by_content():
+    engine = _make_engine()
+    engine.measure_token_lengths(["one two", "three"])
+    engine.measure_token_lengths(["three", "one two"])
+
+    assert engine.model.tokenizer.calls == 1
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Tests for the Prometheus-style metrics registry and search stage timing.
+"""
+
+import pytest
+
+from src.core.search_stages import (
+    SearchTrace, StageTimer, activate_trace, add_stage_observer, record_cache, remove_stage_observer
+)
+from src.metrics import MetricsRegistry, ServerMetrics
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latency", ("method",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, "semantic")
+    histogram.observe(0.5, "semantic")
+    histogram.observe(3.0, "semantic")
+
+    text = registry.render()
+
+    assert "# TYPE latency_seconds histogram" in text
+    assert 'latency_seconds_bucket{method="semantic",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{method="semantic",le="1"} 2' in text
+    assert 'latency_seconds_bucket{method="semantic",le="+Inf"} 3' in text
+    assert 'latency_seconds_count{method="semantic"} 3' in text
+    assert 'latency_seconds_sum{method="semantic"} 3.55' in text
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    registry.counter("requests_total", "Requests", ("method",)).inc('a"b\\c')
+
+    assert 'requests_total{method="a\\"b\\\\c"} 1' in registry.render()
+
+
+def test_label_count_is_checked():
+    counter = MetricsRegistry().counter("requests_total", "Requests", ("method", "status"))
+    with pytest.raises(ValueError):
+        counter.inc("semantic")
+
+
+def test_stage_timer_reports_only_with_observer():
+    metrics = ServerMetrics()
+
+    with StageTimer("encode"):
+        pass
+    assert metrics.stage_duration.count("encode") == 0
+
+    add_stage_observer(metrics.observe_stage)
+    try:
+        with StageTimer("encode"):
+            pass
+    finally:
+        remove_stage_observer(metrics.observe_stage)
+
+    assert metrics.stage_duration.count("encode") == 1
+
+
+def test_cache_statistics_hit_ratio():
+    metrics = ServerMetrics()
+    metrics.set_cache_statistics("result", {"hits": 3, "misses": 1, "entries": 2})
+
+    text = metrics.render()
+    assert 'vis_cache_hit_ratio{cache="result"} 0.75' in text
+    assert 'vis_cache_hits_total{cache="result"} 3' in text
+
+
+def test_trace_collects_stages_and_cache_for_active_request_only():
+    with activate_trace(SearchTrace()) as trace:
+        with StageTimer("encode"):
+            pass
+        record_cache("query_embedding", hit=True)
+
+    with StageTimer("score"):
+        pass  # 추적 해제 후에는 기록되지 않음
+
+    assert list(trace.stages) == ["encode"]
+    header = trace.server_timing(total=0.01)
+    assert header.startswith("encode;dur=")
+    assert 'query-embedding-cache;desc="hit=1 miss=0"' in header
+    assert header.endswith("total;dur=10.00")
+
+
+def test_trace_orders_explain_scores_by_final_ranking():
+    trace = SearchTrace(explain=True)
+    trace.add_scores("semantic", [("a.md", 0.9), ("b.md", 0.8), ("c.md", 0.7)])
+    trace.add_scores("rerank", [("c.md", 0.95), ("a.md", 0.5)])
+
+    explain = trace.to_dict(order=["c.md", "a.md"])
+
+    assert [s["path"] for s in explain["scores"]] == ["c.md", "a.md", "b.md"]
+    assert explain["scores"][0] == {"path": "c.md", "semantic": 0.7, "rerank": 0.95}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
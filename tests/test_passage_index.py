@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Tests for passage-level indexing - splitter, passage cache and score aggregation.
+"""
+
+import numpy as np
+import pytest
+
+from src.core.embedding_cache import EmbeddingCache
+from src.core.passage_splitter import approximate_token_count, split_passages, split_sections
+from src.core.vault_processor import VaultProcessor
+from src.features.advanced_search import AdvancedSearchEngine
+
+
+LONG_NOTE = """서문 문단입니다.
+
+# TDD
+
+테스트를 먼저 작성합니다.
+
+```python
+# 코드 블록 안의 주석은 헤딩이 아님
+def test(): pass
+```
+
+## Refactoring
+
+리팩토링은 동작을 유지하면서 구조를 개선합니다.
+"""
+
+
+def test_split_sections_ignores_code_fences():
+    sections = split_sections(LONG_NOTE)
+
+    assert [s.anchor for s in sections] == ["", "TDD", "Refactoring"]
+    assert "코드 블록 안의 주석" in sections[1].text
+    assert sections[2].level == 2
+
+
+def test_split_passages_respects_max_tokens():
+    text = "# Big\n\n" + "\n\n".join(" ".join(f"w{p}_{i}" for i in range(30)) for p in range(10))
+    passages = split_passages(text, max_tokens=50)
+
+    assert len(passages) > 1
+    assert all(p.token_count <= 50 for p in passages)
+    assert all(p.anchor == "Big" for p in passages)
+    assert [p.index for p in passages] == list(range(len(passages)))
+
+
+def test_split_passages_without_headings():
+    passages = split_passages(LONG_NOTE, max_tokens=512, split_on_headings=False)
+    assert len(passages) == 1
+    assert passages[0].anchor == ""
+
+
+def test_passage_embeddings_round_trip(tmp_path):
+    cache = EmbeddingCache(str(tmp_path))
+    passages = split_passages(LONG_NOTE)
+    embeddings = np.random.rand(len(passages), 8).astype(np.float32)
+
+    assert cache.store_passage_embeddings("note.md", "h1", passages, embeddings, "test-model")
+
+    cached = cache.get_passage_embeddings("note.md", "h1")
+    assert [c.anchor for c in cached] == [p.anchor for p in passages]
+    np.testing.assert_allclose(cached[1].embedding, embeddings[1])
+
+    # 부모 문서가 바뀌면 미스
+    assert cache.get_passage_embeddings("note.md", "h2") is None
+    assert cache.remove_passage_embeddings("note.md")
+    assert cache.get_passage_embeddings("note.md") is None
+
+
+def _make_search_engine(aggregation: str) -> AdvancedSearchEngine:
+    engine = AdvancedSearchEngine.__new__(AdvancedSearchEngine)
+    engine.passage_config = {"aggregation": aggregation, "top_m": 2}
+    # 문서 0은 문서 단위 점수만, 문서 1은 패시지 3개
+    engine.embeddings = np.array([[0.5, np.sqrt(0.75)], [0.1, 0.0]], dtype=np.float32)
+    engine.passage_embeddings = np.array([[0.0, 1.0], [1.0, 0.0], [0.6, 0.8]], dtype=np.float32)
+    engine.passage_offsets = np.array([0])
+    engine.passage_doc_indices = np.array([1])
+    engine.passage_ids = ["b.md#p0", "b.md#p1", "b.md#p2"]
+    return engine
+
+
+def test_score_documents_max_aggregation():
+    scores, best = _make_search_engine("max")._score_documents(np.array([1.0, 0.0]))
+
+    assert scores[0] == pytest.approx(0.5)
+    assert scores[1] == pytest.approx(1.0)
+    assert best == {1: 1}
+
+
+def test_score_documents_batch_matches_single_queries():
+    engine = _make_search_engine("max")
+    queries = np.array([[1.0, 0.0], [0.0, 2.0]])
+
+    scores, best = engine._score_documents_batch(queries)
+
+    for i, query in enumerate(queries):
+        single_scores, single_best = engine._score_documents(query)
+        np.testing.assert_allclose(scores[i], single_scores)
+        assert best[i] == single_best
+
+
+def test_score_candidates_matches_full_scoring_and_reuses_group_table():
+    engine = _make_search_engine("max")
+    engine.documents = [None, None]
+    query = np.array([1.0, 0.0], dtype=np.float32)
+
+    scores, best = engine._score_candidates(query, np.array([1]))
+    groups = engine._get_passage_groups()
+
+    full_scores, full_best = engine._score_documents(query)
+    assert scores[1] == pytest.approx(full_scores[1]) and scores[0] == -np.inf
+    assert best == full_best
+    assert groups.tolist() == [-1, 0]
+    engine._score_candidates(query, np.array([0, 1]))
+    assert engine._get_passage_groups() is groups  # 패시지 배열이 그대로면 재구성하지 않음
+
+
+def test_score_documents_top_m_mean_aggregation():
+    scores, _ = _make_search_engine("top_m_mean")._score_documents(np.array([1.0, 0.0]))
+
+    assert scores[1] == pytest.approx((1.0 + 0.6) / 2)
+
+
+class _CountingEngine:
+    """인코딩된 패시지를 기록하는 가짜 임베딩 엔진"""
+    model_name = "fake-model"
+
+    def __init__(self):
+        self.encoded = []
+
+    def count_tokens(self, text):
+        return approximate_token_count(text)
+
+    def encode_passages(self, texts, max_length=512):
+        self.encoded.extend(texts)
+        return np.array([[len(text), 1.0] for text in texts], dtype=np.float32)
+
+
+def test_compose_note_embeddings_reencodes_only_changed_sections(tmp_path, make_document):
+    note = tmp_path / "long.md"
+    note.write_text("# A\n\n첫 번째 섹션 내용입니다.\n\n# B\n\n두 번째 섹션 내용입니다.\n", encoding="utf-8")
+
+    engine = AdvancedSearchEngine.__new__(AdvancedSearchEngine)
+    engine.vault_path = tmp_path
+    engine.engine = _CountingEngine()
+    engine.cache = EmbeddingCache(str(tmp_path / "cache"))
+    engine.processor = VaultProcessor(str(tmp_path))
+    engine.passage_config = {"max_tokens": 512}
+    engine.documents = [make_document(str(note), "", file_hash="v1")]
+
+    first = engine._compose_note_embeddings([0])
+    assert len(engine.engine.encoded) == 2
+    assert np.linalg.norm(first[0]) == pytest.approx(1.0)
+
+    # 두 번째 섹션만 수정
+    note.write_text("# A\n\n첫 번째 섹션 내용입니다.\n\n# B\n\n두 번째 섹션을 고쳤습니다.\n", encoding="utf-8")
+    engine.documents = [make_document(str(note), "", file_hash="v2")]
+    engine.engine.encoded.clear()
+
+    engine._compose_note_embeddings([0])
+    assert len(engine.engine.encoded) == 1
+    assert "고쳤습니다" in engine.engine.encoded[0]
+    assert len(engine.cache.get_passage_embeddings(str(note), "v2")) == 2
+
+    # 강제 재구축은 캐시된 섹션도 다시 임베딩
+    engine.engine.encoded.clear()
+    engine._compose_note_embeddings([0], force_rebuild=True)
+    assert len(engine.engine.encoded) == 2
+
+
+def test_failed_passage_encodes_are_not_cached(tmp_path, make_document):
+    note = tmp_path / "long.md"
+    note.write_text("# A\n\n첫 번째 섹션 내용입니다.\n\n# B\n\n두 번째 섹션 내용입니다.\n", encoding="utf-8")
+
+    engine = AdvancedSearchEngine.__new__(AdvancedSearchEngine)
+    engine.vault_path = tmp_path
+    engine.engine = _CountingEngine()
+    engine.cache = EmbeddingCache(str(tmp_path / "cache"))
+    engine.processor = VaultProcessor(str(tmp_path))
+    engine.passage_config = {"max_tokens": 512}
+    engine.documents = [make_document(str(note), "", file_hash="v1")]
+
+    # encode_passages는 실패 시 0 벡터를 돌려줌
+    engine.engine.encode_passages = lambda texts, max_length=512: np.zeros((len(texts), 2), dtype=np.float32)
+    assert engine._compose_note_embeddings([0]) == {}
+    assert engine.cache.get_passage_embeddings(str(note), "v1") is None
+
+    # 다음 시도에서는 두 섹션 모두 다시 임베딩
+    del engine.engine.encode_passages
+    engine._compose_note_embeddings([0])
+    assert len(engine.engine.encoded) == 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,66 @@
+"""
+Tests for the pure-Python stack sampler behind /debug/profile.
+"""
+
+import threading
+import time
+
+import pytest
+
+from src.profiler import ProfileInProgress, StackSampler, profile
+
+
+def _spin(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_busy_thread_dominates_collapsed_stacks():
+    stop = threading.Event()
+    worker = threading.Thread(target=_spin, args=(stop,), name="busy worker")
+    worker.start()
+    try:
+        result = profile(0.3, interval=0.002, memory_top=3)
+    finally:
+        stop.set()
+        worker.join()
+
+    stack, count = result.stacks.most_common(1)[0]
+    assert stack.startswith("busy_worker;")
+    assert stack.rsplit(";", 1)[1].startswith("_spin (")
+    assert count >= result.samples // 2
+    assert result.collapsed().splitlines()[0] == f"{stack} {count}"
+    assert result.top_allocations is not None and len(result.top_allocations) <= 3
+
+
+def test_idle_threads_are_skipped_unless_requested():
+    stop = threading.Event()
+    waiter = threading.Thread(target=stop.wait, name="waiter")
+    waiter.start()
+    try:
+        quiet = profile(0.1, interval=0.005)
+        verbose = profile(0.1, interval=0.005, include_idle=True)
+    finally:
+        stop.set()
+        waiter.join()
+
+    assert "waiter" not in quiet.threads and quiet.idle_samples > 0
+    assert "waiter" in verbose.threads
+
+
+def test_only_one_profile_runs_at_a_time():
+    started = threading.Event()
+
+    def hold():
+        started.set()
+        profile(0.3)
+
+    holder = threading.Thread(target=hold)
+    holder.start()
+    started.wait()
+    time.sleep(0.05)
+    try:
+        with pytest.raises(ProfileInProgress):
+            StackSampler().run(0.1)
+    finally:
+        holder.join()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Tests for QueryEmbeddingCache - LRU cache for query embeddings.
+"""
+
+import numpy as np
+
+from src.core.query_embedding_cache import QueryEmbeddingCache
+from src.core.sentence_transformer_engine import AdvancedEmbeddingEngine
+
+
+def test_normalized_key_and_lru_eviction():
+    cache = QueryEmbeddingCache("model", 512, max_entries=2)
+    cache.put("TDD   테스트 ", np.ones(4))
+    cache.put("리팩토링", np.full(4, 2.0))
+
+    assert cache.get("TDD 테스트") is not None  # 공백 정규화
+    cache.put("클린 코드", np.full(4, 3.0))
+
+    assert cache.get("리팩토링") is None  # 가장 오래 안 쓴 항목 축출
+    stats = cache.get_statistics()
+    assert stats["entries"] == 2
+    assert stats["hits"] == 1 and stats["misses"] == 1
+
+
+def test_long_texts_are_not_cached():
+    cache = QueryEmbeddingCache("model", 512, max_chars=10)
+    cache.put("a" * 50, np.ones(4))
+
+    assert cache.get("a" * 50) is None
+    assert cache.get_statistics()["entries"] == 0
+
+
+def test_persistence_and_model_invalidation(tmp_path):
+    cache = QueryEmbeddingCache("model-a", 512, cache_dir=str(tmp_path))
+    cache.put("query", np.arange(4, dtype=np.float32) + 1)
+    cache.close()
+
+    reopened = QueryEmbeddingCache("model-a", 512, cache_dir=str(tmp_path))
+    np.testing.assert_allclose(reopened.get("query"), [1, 2, 3, 4])
+
+    changed = QueryEmbeddingCache("model-b", 512, cache_dir=str(tmp_path))
+    assert changed.get("query") is None
+
+
+def test_put_defers_sqlite_writes_to_flush(tmp_path):
+    cache = QueryEmbeddingCache("model", 512, max_entries=2, cache_dir=str(tmp_path), flush_interval=60)
+    cache.put("a", np.ones(4))
+    cache.put("b", np.ones(4))
+    cache.put("c", np.ones(4))
+
+    assert QueryEmbeddingCache("model", 512, cache_dir=str(tmp_path)).get("b") is None
+    assert cache.get_statistics()["pending_writes"] == 2
+
+    assert cache.flush() == 2
+    reopened = QueryEmbeddingCache("model", 512, cache_dir=str(tmp_path))
+    assert reopened.get("b") is not None
+    assert reopened.get("a") is None
+    cache.close()
+
+
+def test_persisted_rows_do_not_contain_query_text(tmp_path):
+    import sqlite3
+
+    cache = QueryEmbeddingCache("model", 512, cache_dir=str(tmp_path))
+    cache.put("비밀 쿼리", np.ones(4))
+    cache.close()
+
+    with sqlite3.connect(tmp_path / "query_embeddings.db") as conn:
+        assert conn.execute("SELECT query_text FROM query_embeddings").fetchall() == [("",)]
+    assert QueryEmbeddingCache("model", 512, cache_dir=str(tmp_path)).get("비밀 쿼리") is not None
+
+
+class _FakeModel:
+    def __init__(self):
+        self.calls = 0
+
+    def encode(self, texts, **kwargs):
+        self.calls += 1
+        return {"dense_vecs": np.ones((len(texts), 4), dtype=np.float32)}
+
+
+def test_engine_encode_text_uses_cache():
+    engine = AdvancedEmbeddingEngine.__new__(AdvancedEmbeddingEngine)
+    engine.model = _FakeModel()
+    engine.max_length = 512
+    engine.embedding_dimension = 4
+    engine.query_cache = QueryEmbeddingCache("model", 512)
+
+    engine.encode_text("TDD")
+    engine.encode_text(" TDD ")
+
+    assert engine.model.calls == 1
+    assert engine.query_cache.get_statistics()["hits"] == 1
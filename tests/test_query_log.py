@@ -0,0 +1,57 @@
+"""
+Tests for the query log behind cache prewarming.
+"""
+
+import json
+
+from src.query_log import QueryLog, query_hash
+
+PARAMS = {"top_k": 10, "threshold": 0.0, "search_method": "hybrid", "rerank": False}
+
+
+def test_log_is_anonymous_unless_text_is_stored(tmp_path):
+    path = tmp_path / "query_log.jsonl"
+    log = QueryLog(str(path))
+    for _ in range(3):
+        log.record("TDD 사례", PARAMS, 12.5, "ok")
+    log.record("rare", PARAMS, 3.0, "ok")
+    log.close()
+
+    entries = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert len(entries) == 4
+    assert all("query" not in entry for entry in entries)
+    assert entries[0]["hash"] == query_hash("TDD 사례") and entries[0]["latency_ms"] == 12.5
+
+    # In-process the text is known; after a restart only the counts are
+    assert log.top(10) == [("TDD 사례", PARAMS)]
+    reloaded = QueryLog(str(path))
+    assert reloaded.load() == 4
+    assert reloaded.top(10) == []
+    assert reloaded.get_statistics()["distinct"] == 2
+
+
+def test_stored_text_survives_restart_and_rotation(tmp_path):
+    path = tmp_path / "query_log.jsonl"
+    log = QueryLog(str(path), store_text=True, max_bytes=1024)
+    for i in range(40):
+        log.record("frequent", PARAMS, 1.0, "ok")
+        log.record(f"once {i}", {**PARAMS, "top_k": 5}, 1.0, "ok")
+    log.close()
+
+    assert (tmp_path / "query_log.jsonl.1").exists()
+    reloaded = QueryLog(str(path), store_text=True)
+    reloaded.load()
+    assert reloaded.top(5) == [("frequent", PARAMS)]
+
+
+def test_counts_age_to_make_room(tmp_path):
+    log = QueryLog(str(tmp_path / "query_log.jsonl"), max_tracked=2)
+    for _ in range(3):
+        log.record("popular", PARAMS, 1.0, "ok")
+    log.record("stale", PARAMS, 1.0, "ok")
+    log.record("new", PARAMS, 1.0, "ok")  # full: counts halve, "stale" is forgotten
+    log.close()
+
+    assert log.top(10, min_count=1) == [("popular", PARAMS), ("new", PARAMS)]
+    assert log.get_statistics()["distinct"] == 2
+
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Tests for ResultCache - bounded /search response cache.
+"""
+
+from unittest.mock import patch
+
+from src.result_cache import ResultCache
+
+
+def test_evicts_by_entries_and_bytes():
+    cache = ResultCache(max_entries=2, max_bytes=100)
+    cache.put("a", 1, "A", 10)
+    cache.put("b", 1, "B", 10)
+    cache.put("c", 1, "C", 10)
+
+    assert cache.get("a", 1) is None
+    assert cache.get("c", 1) == "C"
+
+    cache.put("big", 1, "X", 90)
+    assert cache.get_statistics()["bytes"] <= 100
+    assert cache.get_statistics()["evictions"] >= 2
+
+
+def test_oversized_entries_are_not_cached():
+    cache = ResultCache(max_bytes=10)
+    cache.put("a", 1, "A", 11)
+    assert cache.get("a", 1) is None
+
+
+def test_version_change_invalidates():
+    cache = ResultCache()
+    cache.put("a", 1, "A", 1)
+
+    assert cache.get("a", 2) is None
+    assert cache.get("a", 1) is None
+    assert cache.get_statistics()["invalidations"] == 1
+
+
+def test_ttl_expiry():
+    cache = ResultCache(ttl_seconds=10)
+    with patch("src.result_cache.time.monotonic", return_value=100.0):
+        cache.put("a", 1, "A", 1)
+    with patch("src.result_cache.time.monotonic", return_value=111.0):
+        assert cache.get("a", 1) is None
+    assert cache.get_statistics()["expirations"] == 1
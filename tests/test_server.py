@@ -7,6 +7,7 @@ because model loading is slow and not suitable for unit tests.
 """
 
 import os
+import json
 import pytest
 from pathlib import Path
 from unittest.mock import Mock, patch
@@ -141,6 +142,9 @@ def mock_engine():
 
     # Mock build_index to return success
     engine.build_index = Mock(return_value=True)
+    # Reindex builds into a copy and swaps it in; the mock just returns itself
+    engine.rebuild_index = Mock(return_value=engine)
+    engine.refresh_documents = Mock(return_value=engine)
 
     # Mock search methods to return SearchResults
     def make_search_results(query, top_k=10, **kwargs):
@@ -166,6 +170,9 @@ def mock_engine():
     engine.keyword_search = Mock(side_effect=make_search_results)
     engine.colbert_search = Mock(side_effect=make_search_results)
     engine.search_with_reranking = Mock(side_effect=make_search_results)
+    engine.semantic_search_batch = Mock(side_effect=lambda queries, top_ks, thresholds: [
+        make_search_results(query, top_k) for query, top_k in zip(queries, top_ks)
+    ])
 
     return engine
 
@@ -366,5 +373,698 @@ def test_concurrent_searches(client):
         assert response.status_code == 200
 
 
+def test_health_responds_while_search_is_blocked(client, mock_engine):
+    """A slow engine call must not block the event loop"""
+    import asyncio
+    import threading
+    import httpx
+
+    started = threading.Event()
+    release = threading.Event()
+    finished = threading.Event()
+
+    def slow_search(queries, **kwargs):
+        started.set()
+        release.wait(5)
+        finished.set()
+        return [[] for _ in queries]
+
+    mock_engine.semantic_search_batch = Mock(side_effect=slow_search)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=client.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            search_task = asyncio.create_task(
+                http.get("/search", params={"query": "slow", "search_method": "semantic"})
+            )
+            while not started.is_set():
+                await asyncio.sleep(0.01)
+
+            health = await http.get("/health")
+            answered_while_blocked = not finished.is_set()
+
+            release.set()
+            search = await search_task
+            return health, answered_while_blocked, search
+
+    health, answered_while_blocked, search = asyncio.run(scenario())
+
+    assert health.status_code == 200
+    assert answered_while_blocked
+    assert search.status_code == 200
+
+
+def test_search_rejected_when_model_pool_is_full(client):
+    """A saturated pool answers 503 with Retry-After instead of queueing forever"""
+    from src.server import ExecutorSaturated
+
+    with patch("src.server.BoundedExecutor.run", side_effect=ExecutorSaturated("full")):
+        response = client.get("/search", params={"query": "test", "search_method": "semantic"})
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_expensive_searches_are_shed_without_blocking_cheap_ones(client, monkeypatch):
+    """A full rerank queue answers 429 + Retry-After and is counted; keyword search still runs"""
+    from src.admission import AdmissionController
+
+    admission = AdmissionController({"rerank": {"concurrency": 1, "queue": 0}})
+    monkeypatch.setattr("src.server._admission", admission)
+    busy = admission._grant("rerank")  # a rerank query already running
+
+    shed = client.get("/search", params={"query": "deep", "search_method": "keyword", "rerank": True})
+    cheap = client.get("/search", params={"query": "quick", "search_method": "keyword"})
+    busy.release()
+
+    assert shed.status_code == 429
+    assert shed.headers["Retry-After"] == "1"
+    assert cheap.status_code == 200
+    metrics = client.get("/metrics").text
+    assert 'vis_admission_rejected_total{class="rerank",reason="queue_full"} 1' in metrics
+    assert 'vis_search_requests_total{method="keyword",status="rejected"} 1' in metrics
+
+
+def test_concurrent_semantic_queries_are_batched(client, mock_engine):
+    """Queries arriving together share one semantic_search_batch call"""
+    import asyncio
+    import httpx
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=client.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            return await asyncio.gather(*[
+                http.get("/search", params={"query": f"q{i}", "search_method": "semantic", "top_k": 1})
+                for i in range(4)
+            ])
+
+    responses = asyncio.run(scenario())
+
+    assert all(r.status_code == 200 for r in responses)
+    assert all(r.json()["total"] == 1 for r in responses)
+    batched_queries = [call.args[0] for call in mock_engine.semantic_search_batch.call_args_list]
+    assert sorted(q for batch in batched_queries for q in batch) == ["q0", "q1", "q2", "q3"]
+    assert len(batched_queries) < 4
+
+
+def test_failed_query_batch_is_reported_to_its_callers():
+    """A batch task that dies outside the engine call fails its callers and is not kept"""
+    import asyncio
+    from src.server import QueryBatcher
+
+    batcher = QueryBatcher(window_ms=0)
+
+    async def broken_run(batch):
+        raise RuntimeError("batch crashed")
+    batcher._run = broken_run
+
+    async def scenario():
+        with pytest.raises(RuntimeError, match="batch crashed"):
+            await batcher.search(Mock(), "q", top_k=1, threshold=0.0)
+        await asyncio.sleep(0)
+
+    asyncio.run(scenario())
+    assert batcher._tasks == set()
+
+
+def test_repeated_search_is_served_from_result_cache(client, mock_engine):
+    """Identical requests hit the cache until the index version changes"""
+    params = {"query": "cached query", "search_method": "keyword", "top_k": 2}
+
+    first = client.get("/search", params=params)
+    second = client.get("/search", params=params)
+
+    assert first.json() == second.json()
+    assert mock_engine.keyword_search.call_count == 1
+
+    mock_engine.index_version = 2
+    client.get("/search", params=params)
+    assert mock_engine.keyword_search.call_count == 2
+
+    stats = client.get("/health").json()["result_cache"]
+    assert stats["hits"] >= 1
+    assert stats["invalidations"] >= 1
+
+
+def test_background_reindex_exposes_job(client, mock_engine):
+    """background=true returns 202 with a job that can be polled"""
+    import time
+
+    response = client.post("/reindex", params={"background": True})
+    assert response.status_code == 202
+    job_id = response.json()["id"]
+    assert response.headers["Location"] == f"/jobs/{job_id}"
+
+    for _ in range(50):
+        job = client.get(f"/jobs/{job_id}").json()
+        if job["status"] == "succeeded":
+            break
+        time.sleep(0.02)
+
+    assert job["status"] == "succeeded"
+    assert job["document_count"] == 2
+    mock_engine.rebuild_index.assert_called_once()
+    kwargs = mock_engine.rebuild_index.call_args.kwargs
+    assert kwargs["force_rebuild"] is False and kwargs["progress"].id == job_id
+    assert any(j["id"] == job_id for j in client.get("/jobs").json())
+
+
+def test_unknown_job_returns_404(client):
+    assert client.get("/jobs/does-not-exist").status_code == 404
+
+
+def test_reindex_job_reports_progress_and_can_be_cancelled(client, mock_engine):
+    """POST /jobs/reindex returns at once; cancel stops the build at its next checkpoint"""
+    import threading
+    import time
+    from src.core.reindex_checkpoint import ReindexCancelled
+
+    started = threading.Event()
+
+    def rebuild(force_rebuild, with_colbert, progress):
+        progress.start_phase("embedding", 10)
+        progress.advance(4)
+        started.set()
+        while not progress.is_cancelled():
+            time.sleep(0.01)
+        raise ReindexCancelled("embedding 4/10")
+
+    mock_engine.rebuild_index = Mock(side_effect=rebuild)
+
+    response = client.post("/jobs/reindex", params={"force": True, "with_colbert": True})
+    assert response.status_code == 202
+    job_id = response.json()["id"]
+    assert response.headers["Location"] == f"/jobs/{job_id}"
+    assert started.wait(2)
+
+    job = client.get(f"/jobs/{job_id}").json()
+    assert job["status"] == "running" and job["with_colbert"] is True
+    assert (job["phase"], job["documents_done"], job["documents_total"]) == ("embedding", 4, 10)
+    assert job["throughput"] > 0 and job["eta_seconds"] is not None
+
+    assert client.post(f"/jobs/{job_id}/cancel").status_code == 202
+    for _ in range(100):
+        job = client.get(f"/jobs/{job_id}").json()
+        if job["status"] != "running":
+            break
+        time.sleep(0.02)
+
+    assert job["status"] == "cancelled"
+    assert client.post(f"/jobs/{job_id}/cancel").status_code == 409
+
+
+def test_reindex_swaps_engine_without_touching_old_one(client, mock_engine):
+    """Searches after the job hit the new engine; the old one is not rebuilt in place"""
+    from src.server import _state
+
+    new_engine = Mock(wraps=mock_engine)
+    new_engine.documents = mock_engine.documents
+    new_engine.indexed = True
+    new_engine.index_version = 7
+    mock_engine.rebuild_index = Mock(return_value=new_engine)
+
+    response = client.post("/reindex")
+
+    assert response.status_code == 200
+    assert _state["engine"] is new_engine
+    mock_engine.build_index.assert_not_called()
+    assert client.get("/health").json()["index_version"] == 7
+
+
+def test_metrics_endpoint_exposes_requests_and_index(client):
+    client.get("/search", params={"query": "metrics", "search_method": "keyword"})
+    client.get("/search", params={"query": "metrics", "search_method": "bogus"})
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    text = response.text
+    assert 'vis_search_requests_total{method="keyword",status="ok"}' in text
+    assert 'vis_search_requests_total{method="other",status="invalid"}' in text
+    assert 'vis_search_request_duration_seconds_count{method="keyword"}' in text
+    assert "vis_index_documents 2" in text
+    assert "vis_resident_models" in text
+
+
+def test_search_sets_server_timing_header(client):
+    response = client.get("/search", params={"query": "timing", "search_method": "keyword"})
+
+    assert response.status_code == 200
+    timing = response.headers["Server-Timing"]
+    assert "queue;dur=" in timing
+    assert "result-cache;desc=" in timing
+    assert "total;dur=" in timing
+    assert "explain" not in response.json()
+
+
+def test_search_explain_reports_stages_candidates_and_scores(client, mock_engine):
+    """Trace recorded by engine code on a pool thread reaches the response"""
+    from src.core.search_stages import StageTimer, record_candidates, record_scores
+
+    plain_search = mock_engine.semantic_search.side_effect
+
+    def traced_search(query, top_k=10, **kwargs):
+        with StageTimer("encode"):
+            results = plain_search(query, top_k)
+        record_candidates("semantic", len(results))
+        record_scores("semantic", results)
+        return results
+
+    mock_engine.semantic_search = Mock(side_effect=traced_search)
+    params = {"query": "explain me", "search_method": "semantic"}
+    client.get("/search", params=params)  # cache the plain response
+    mock_engine.semantic_search_batch.reset_mock()
+
+    response = client.get("/search", params={**params, "explain": True})
+
+    explain = response.json()["explain"]
+    assert explain["cache"]["result"] == {"hits": 1, "misses": 0}
+
+    fresh = client.get("/search", params={"query": "explain fresh", "search_method": "semantic", "explain": True})
+    mock_engine.semantic_search_batch.assert_not_called()  # explain bypasses the batcher
+    explain = fresh.json()["explain"]
+    assert "encode" in explain["stages_ms"] and "queue" in explain["stages_ms"]
+    assert explain["candidates"] == {"semantic": 2}
+    assert [s["path"] for s in explain["scores"]] == ["test_doc1.md", "test_doc2.md"]
+    assert explain["scores"][0]["semantic"] == 0.95
+
+
+def test_search_with_deadline_reports_tiers_and_is_not_cached(client, mock_engine):
+    from src.features.advanced_search import TieredSearchResult
+
+    def tiered(query, search_method, top_k, threshold, deadline_ms, use_colbert, use_reranker):
+        return TieredSearchResult(
+            results=mock_engine.hybrid_search(query, top_k=top_k),
+            tiers=[{"tier": "hybrid", "ran": True, "ms": 3.0},
+                   {"tier": "rerank", "ran": False, "reason": "budget", "estimated_ms": 400.0, "remaining_ms": 90.0}],
+            deadline_ms=deadline_ms)
+
+    mock_engine.search_with_deadline = Mock(side_effect=tiered)
+    params = {"query": "budget", "rerank": True, "deadline_ms": 100}
+
+    data = client.get("/search", params=params).json()
+    client.get("/search", params=params)
+
+    assert data["degraded"] is True
+    assert [t["tier"] for t in data["tiers"]] == ["hybrid", "rerank"]
+    assert data["total"] == 2
+    call = mock_engine.search_with_deadline.call_args
+    assert call.kwargs["use_reranker"] is True and 0 < call.kwargs["deadline_ms"] <= 100
+    assert mock_engine.search_with_deadline.call_count == 2  # 예산 제한 응답은 캐시하지 않음
+    mock_engine.search_with_reranking.assert_not_called()
+    assert "tiers" not in client.get("/search", params={"query": "plain"}).json()
+
+
+def test_batch_search_encodes_dense_queries_together(client, mock_engine):
+    """Semantic and hybrid queries share one batched encode; per-query params override defaults"""
+    response = client.post("/search/batch", json={
+        "queries": [
+            "first",
+            {"query": "second", "search_method": "semantic", "top_k": 1},
+            {"query": "third", "search_method": "keyword"},
+        ],
+        "search_method": "hybrid",
+        "top_k": 2
+    })
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 3
+    assert [r["query"] for r in data["responses"]] == ["first", "second", "third"]
+    assert [r["search_method"] for r in data["responses"]] == ["hybrid", "semantic", "keyword"]
+    assert data["responses"][1]["total"] == 1
+
+    mock_engine.semantic_search_batch.assert_called_once()
+    call = mock_engine.semantic_search_batch.call_args
+    assert call.args[0] == ["first", "second"]
+    assert call.kwargs["top_ks"] == [4, 1]
+    assert mock_engine.hybrid_search.call_args.kwargs["semantic_results"] is not None
+    mock_engine.keyword_search.assert_called_once()
+
+
+def test_batch_search_charges_admission_per_query(client, mock_engine):
+    """A batch holds one admission slot per query, grouped by cost class"""
+    from src import server
+
+    admission = server._get_admission()
+    acquired = []
+    acquire = admission.acquire
+
+    async def recording_acquire(search_class, deadline=None, weight=1):
+        acquired.append((search_class, weight))
+        return await acquire(search_class, deadline=deadline, weight=weight)
+    admission.acquire = recording_acquire
+
+    response = client.post("/search/batch", json={
+        "queries": ["first", "second", {"query": "third", "search_method": "keyword"}],
+        "search_method": "hybrid"
+    })
+
+    assert response.status_code == 200
+    assert sorted(acquired) == [("hybrid", 2), ("keyword", 1)]
+    assert admission.statistics()["running"] == 0
+
+
+def test_batch_search_reuses_result_cache(client, mock_engine):
+    client.get("/search", params={"query": "cached", "search_method": "keyword", "top_k": 10})
+
+    response = client.post("/search/batch", json={"queries": ["cached", "fresh"], "search_method": "keyword"})
+
+    assert response.status_code == 200
+    assert mock_engine.keyword_search.call_count == 2  # "cached"는 캐시에서
+
+
+def test_batch_search_rejects_invalid_method(client):
+    response = client.post("/search/batch", json={"queries": [{"query": "x", "search_method": "bogus"}]})
+    assert response.status_code == 400
+
+
+def _stream_events(response):
+    return [json.loads(line) for line in response.text.splitlines() if line.strip()]
+
+
+def test_search_stream_sends_initial_then_reranked_results(client, mock_engine):
+    """Reranked streams send first-stage results first and rerank those same candidates"""
+    response = client.get("/search/stream", params={"query": "python", "search_method": "keyword",
+                                                    "rerank": True, "top_k": 1})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    events = _stream_events(response)
+    assert [(e["event"], e.get("stage")) for e in events] == [
+        ("results", "initial"), ("results", "reranked"), ("done", None)]
+    assert events[0]["final"] is False and events[1]["final"] is True
+    assert events[0]["total"] == 1
+    assert events[1]["results"][0]["path"] == "test_doc1.md"
+    assert [s["stage"] for s in events[-1]["stages"]] == ["initial", "reranked"]
+    assert "total_ms" in events[-1]
+
+    mock_engine.keyword_search.assert_called_once()
+    assert mock_engine.keyword_search.call_args.kwargs["top_k"] == 3
+    assert mock_engine.search_with_reranking.call_args.kwargs["initial_results"] is not None
+
+
+def test_search_stream_sse_format_and_cache(client, mock_engine):
+    params = {"query": "python", "search_method": "keyword"}
+    first = client.get("/search/stream", params=params, headers={"Accept": "text/event-stream"})
+
+    assert first.headers["content-type"].startswith("text/event-stream")
+    assert first.text.startswith("event: results\ndata: ")
+    assert first.text.rstrip().split("\n\n")[-1].startswith("event: done")
+
+    # The streamed result is cached for plain /search and later streams
+    client.get("/search", params=params)
+    cached = _stream_events(client.get("/search/stream", params=params))
+    assert cached[0]["stage"] == "cached" and cached[0]["total"] == 2
+    mock_engine.keyword_search.assert_called_once()
+
+
+def test_search_stream_reports_errors_in_band(client, mock_engine):
+    mock_engine.colbert_search.side_effect = RuntimeError("model missing")
+
+    events = _stream_events(client.get("/search/stream", params={"query": "x", "search_method": "colbert"}))
+
+    assert [(e["event"], e.get("stage")) for e in events] == [
+        ("results", "initial"), ("error", None), ("done", None)]
+    assert events[0]["search_method"] == "hybrid"
+    assert events[1]["status"] == 500
+    assert client.get("/search/stream", params={"query": "x", "format": "xml"}).status_code == 400
+
+
+def test_unix_socket_bind_replaces_stale_file_only():
+    import socket
+    import tempfile
+    from src.server import _bind_unix_socket
+
+    path = os.path.join(tempfile.mkdtemp(), "vis.sock")
+    open(path, "w").close()  # stale file, nobody listening
+
+    sock = _bind_unix_socket(path)
+    assert sock is not None
+    sock.listen(1)
+    try:
+        assert _bind_unix_socket(path) is None  # live listener is left alone
+        assert oct(os.stat(path).st_mode & 0o777) == "0o600"
+    finally:
+        sock.close()
+
+
+def test_prefork_worker_forwards_reindex_to_master(client, tmp_path, monkeypatch):
+    """A worker queues the reindex for the master and serves job state from shared files"""
+    import src.server as server
+    from src.indexer import IndexRequestQueue
+
+    queue = IndexRequestQueue(str(tmp_path / "snapshots"))
+    monkeypatch.setitem(server._state, "prefork", "worker")
+    monkeypatch.setattr(server, "_index_requests", queue)
+
+    response = client.post("/reindex", params={"background": True, "force": True})
+
+    assert response.status_code == 202
+    job_id = response.json()["id"]
+    assert [r["id"] for r in queue.pending()] == [job_id]
+    assert client.get(f"/jobs/{job_id}").json()["status"] == "queued"
+    assert [j["id"] for j in client.get("/jobs").json()] == [job_id]
+
+
+def test_swap_engine_debounces_boot_snapshot_publish(mock_engine, monkeypatch):
+    """A single-process server swaps at once and publishes the boot snapshot later"""
+    import src.server as server
+
+    store = Mock()
+    monkeypatch.setattr(server, "_snapshot_store", store)
+    monkeypatch.setitem(server._state, "prefork", None)
+    monkeypatch.setitem(server._state, "config", {"server": {"snapshot": {"publish_delay_seconds": 60}}})
+    previous = server._state["engine"]
+    mock_engine.indexed = True
+
+    try:
+        server._swap_engine(mock_engine)
+        server._swap_engine(mock_engine)
+        assert server._state["engine"] is mock_engine
+        store.publish.assert_not_called()
+
+        server._flush_snapshot_publish()
+        store.publish.assert_called_once_with(mock_engine)
+    finally:
+        server._state["engine"] = previous
+
+
+def test_health_reports_readiness_after_warmup(client, mock_engine, monkeypatch):
+    """The server is live while warming up and ready only once warm-up finished"""
+    import asyncio
+    import src.server as server
+
+    monkeypatch.setitem(server._state, "phase", "starting")
+    monkeypatch.setitem(server._state, "warmup", None)
+    mock_engine.warm_up = Mock(return_value={"encode": 12.5, "search": 3.0})
+
+    health = client.get("/health").json()
+    assert health["live"] is True and health["ready"] is False
+
+    asyncio.run(server._warm_up(mock_engine))
+
+    mock_engine.warm_up.assert_called_once_with(None, [])
+    health = client.get("/health").json()
+    assert health["ready"] is True and health["phase"] == "ready"
+    assert health["warmup"]["steps_ms"] == {"encode": 12.5, "search": 3.0}
+
+
+def test_related_returns_results_with_tags(client, mock_engine):
+    from src.features.advanced_search import SearchResult
+
+    mock_engine.get_related_documents = Mock(return_value=[
+        SearchResult(document=mock_engine.documents[1], similarity_score=0.8, match_type="semantic", rank=1)
+    ])
+
+    response = client.get("/related", params={"path": "test_doc1.md", "top_k": 3})
+
+    assert response.status_code == 200
+    assert response.json()[0]["path"] == "test_doc2.md"
+    assert response.json()[0]["tags"] == ["test", "javascript"]
+    assert mock_engine.get_related_documents.call_args.kwargs["top_k"] == 3
+
+
+def test_graph_expands_related_documents_by_depth(client, mock_engine, test_vault):
+    from dataclasses import replace
+    from src.features.advanced_search import SearchResult
+
+    center = str((test_vault / "test_doc1.md").resolve())
+    neighbor = replace(mock_engine.documents[1], path=str((test_vault / "test_doc2.md").resolve()))
+    mock_engine.vault_path = str(test_vault)
+    mock_engine.get_related_documents = Mock(side_effect=lambda document_path, **kwargs: [
+        SearchResult(document=neighbor, similarity_score=0.7, match_type="semantic")
+    ] if document_path == center else [])
+
+    graph = client.get("/graph", params={"path": "test_doc1.md", "depth": 2}).json()
+
+    assert graph["center"] == center
+    assert {n["path"]: n["depth"] for n in graph["nodes"]} == {center: 0, neighbor.path: 1}
+    assert [(e["edge_type"], e["weight"]) for e in graph["edges"]] == [("semantic", 0.7)]
+
+
+def test_gaps_and_duplicates_are_json_safe(client, mock_engine):
+    import numpy as np
+
+    mock_engine.analyze_knowledge_gaps = Mock(return_value={
+        "summary": {"isolation_rate": np.float32(0.5)},
+        "isolated_tags": {"orphan": ("test_doc1.md",)},
+    })
+
+    gaps = client.get("/gaps", params={"min_connections": 1}).json()
+
+    assert gaps == {"summary": {"isolation_rate": 0.5}, "isolated_tags": {"orphan": ["test_doc1.md"]}}
+    assert mock_engine.analyze_knowledge_gaps.call_args.kwargs == {"similarity_threshold": 0.3, "min_connections": 1}
+
+
+def test_collect_renders_document_instead_of_writing(client, mock_engine):
+    mock_engine.config = {}
+
+    report = client.get("/collect", params={"topic": "python", "render": True}).json()
+
+    assert report["total_documents"] == 2
+    assert [d["path"] for d in report["documents"]] == ["test_doc1.md", "test_doc2.md"]
+    assert report["document"].startswith("---") and "[[test_doc1.md]]" in report["document"]
+
+
+def test_collect_runs_in_the_analysis_pool_behind_searches(client, mock_engine):
+    """Topic analyses take a low-priority admission slot and never occupy the model pool"""
+    from src import server
+
+    mock_engine.config = {}
+    admission = server._get_admission()
+    acquired = []
+    acquire = admission.acquire
+
+    async def recording_acquire(search_class, deadline=None, weight=1):
+        acquired.append(search_class)
+        return await acquire(search_class, deadline=deadline, weight=weight)
+    admission.acquire = recording_acquire
+    used_pools = []
+    get_executor = server._get_executor
+    server._get_executor = lambda kind: used_pools.append(kind) or get_executor(kind)
+    try:
+        response = client.get("/collect", params={"topic": "python"})
+    finally:
+        server._get_executor = get_executor
+
+    assert response.status_code == 200
+    assert acquired == ["analysis"]
+    assert used_pools == ["analysis"]
+    assert admission.classes["analysis"]["priority"] > admission.classes["rerank"]["priority"]
+
+
+
+def test_named_vault_is_loaded_on_demand_and_searched_separately(client, mock_engine, tmp_path, monkeypatch):
+    from src import server
+    from src.core.vault_processor import Document
+    from src.features.advanced_search import SearchResult
+
+    work_doc = Document(path="work.md", title="Work", content="Quarterly plan", tags=[], frontmatter={},
+                        word_count=2, char_count=14, file_size=14, modified_at=None, file_hash="w")
+    work_engine = Mock()
+    work_engine.documents = [work_doc]
+    work_engine.indexed = True
+    work_engine.vault_path = tmp_path
+    work_engine.memory_usage = Mock(return_value={"total": 4096})
+    work_engine.semantic_search_batch = Mock(side_effect=lambda queries, top_ks, thresholds: [[] for _ in queries])
+    work_engine.hybrid_search = Mock(return_value=[
+        SearchResult(document=work_doc, similarity_score=0.9, match_type="hybrid", snippet="", rank=1)
+    ])
+    loader = Mock(return_value=work_engine)
+    monkeypatch.setitem(server._state, "config", {"server": {"vaults": {"work": str(tmp_path)}}})
+    monkeypatch.setattr(server, "_load_vault_engine", loader)
+    monkeypatch.setattr(server, "_vault_pool", None)
+
+    assert client.get("/health").json()["vaults"] == ["work"]
+    default = client.get("/search", params={"query": "plan"}).json()
+    work = client.get("/search", params={"query": "plan", "vault": "work"}).json()
+
+    assert [r["path"] for r in default["results"]] == ["test_doc1.md", "test_doc2.md"]
+    assert [r["path"] for r in work["results"]] == ["work.md"]
+    assert loader.call_args.args[0] == str(tmp_path)
+    assert client.get("/search", params={"query": "plan", "vault": "nope"}).status_code == 404
+
+    # Each vault keeps its own cached responses
+    client.get("/search", params={"query": "plan"})
+    client.get("/search", params={"query": "plan", "vault": "work"})
+    assert mock_engine.hybrid_search.call_count == 1
+    assert work_engine.hybrid_search.call_count == 1
+
+    vaults = {v["name"]: v for v in client.get("/vaults").json()["vaults"]}
+    assert set(vaults) == {"default", "work"}
+    assert vaults["work"]["loaded"] and vaults["work"]["memory_bytes"] == 4096
+
+
+
+def test_profile_endpoint_is_opt_in_and_returns_collapsed_stacks(client, monkeypatch):
+    from src import server
+
+    assert client.get("/debug/profile", params={"seconds": 0.1}).status_code == 404
+
+    monkeypatch.setitem(server._state, "config", {"server": {"debug": {"profile": True, "max_profile_seconds": 1}}})
+    assert client.get("/debug/profile", params={"seconds": 5}).status_code == 400
+
+    report = client.get("/debug/profile", params={"seconds": 0.2, "include_idle": True, "memory_top": 5}).json()
+    assert report["samples"] > 0
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in report["collapsed"].splitlines())
+    assert isinstance(report["top_allocations"], list)
+
+    folded = client.get("/debug/profile", params={"seconds": 0.1, "include_idle": True, "format": "collapsed"})
+    assert folded.headers["content-type"].startswith("text/plain")
+    assert folded.text.strip()
+
+
+
+def test_logged_queries_prewarm_the_result_cache(client, mock_engine, tmp_path, monkeypatch):
+    import asyncio
+    from src import server
+
+    log_path = tmp_path / "query_log.jsonl"
+    monkeypatch.setitem(server._state, "config", {"server": {"query_log": {
+        "enabled": True, "path": str(log_path), "store_text": True}}})
+    monkeypatch.setattr(server, "_query_log", None)
+    monkeypatch.setattr(server, "_result_cache", None)
+
+    client.get("/search", params={"query": "frequent topic"})
+    client.get("/search", params={"query": "frequent topic"})
+    client.get("/search", params={"query": "one-off"})
+    for _ in range(2):  # frequent, but reranking is too expensive to replay
+        client.get("/search", params={"query": "reranked topic", "rerank": True})
+    assert len(log_path.read_text(encoding="utf-8").splitlines()) == 5
+
+    # Restart: a new log is read back from disk, the result cache starts empty
+    server._query_log.close()
+    monkeypatch.setattr(server, "_query_log", None)
+    monkeypatch.setattr(server, "_result_cache", None)
+    mock_engine.hybrid_search.reset_mock()
+
+    summary = asyncio.run(server._prewarm(mock_engine))
+
+    assert summary["queries"] == 1
+    assert mock_engine.hybrid_search.call_count == 1
+    client.get("/search", params={"query": "frequent topic"})
+    assert mock_engine.hybrid_search.call_count == 1
+    server._query_log.close()
+
+
+
+def test_search_flags_near_duplicate_candidate_reuse(client, mock_engine):
+    from src.core.similar_query_cache import CandidateReuse
+    from src.features.advanced_search import SearchResult
+
+    doc = mock_engine.documents[0]
+    mock_engine.hybrid_search = Mock(return_value=[SearchResult(
+        document=doc, similarity_score=0.9, match_type="hybrid", rank=1,
+        reuse=CandidateReuse(similarity=0.97312, candidates=100))])
+
+    reused = client.get("/search", params={"query": "TDD 예시"}).json()
+    plain = client.get("/search", params={"query": "TDD 사례", "search_method": "keyword"}).json()
+
+    assert reused["near_duplicate"] == {"similarity": 0.9731, "candidates": 100}
+    assert "near_duplicate" not in plain
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
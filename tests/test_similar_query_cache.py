@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Tests for the near-duplicate query cache - candidate reuse for paraphrased queries.
+"""
+
+import numpy as np
+
+import pytest
+
+from src.core.similar_query_cache import SimilarQueryCache
+
+
+class _QueryEncoder:
+    """쿼리별 고정 임베딩을 돌려주는 가짜 인코더"""
+    embedding_dimension = 2
+
+    def __init__(self, vectors):
+        self.vectors = vectors
+
+    def encode_text(self, text):
+        return np.array(self.vectors[text], dtype=np.float32)
+
+    def encode_texts(self, texts, show_progress=False):
+        return np.array([self.vectors[text] for text in texts], dtype=np.float32)
+
+
+@pytest.fixture
+def engine(tmp_path, note_text, make_indexed_engine):
+    vault = tmp_path / "vault"
+    vault.mkdir()
+    for i, name in enumerate(("a", "b", "c", "d")):
+        (vault / f"{name}.md").write_text(note_text(name) + " 추가" * i, encoding="utf-8")
+    engine = make_indexed_engine(vault, tmp_path / "cache")
+    engine.engine = _QueryEncoder({"TDD 사례": [1.0, 60.0], "TDD 예시": [1.0, 61.0], "다른 주제": [1.0, -5.0]})
+    engine.similar_query_cache = SimilarQueryCache(threshold=0.99, candidates=2)
+    return engine
+
+
+def test_paraphrased_query_rescores_cached_candidates(engine):
+
+    first = engine.semantic_search("TDD 사례", top_k=2)
+    second = engine.semantic_search("TDD 예시", top_k=2)
+    unrelated = engine.semantic_search("다른 주제", top_k=2)
+
+    assert all(r.reuse is None for r in first)
+    assert [r.document.path for r in second] == [r.document.path for r in first]
+    assert second[0].reuse.candidates == 2 and second[0].reuse.similarity > 0.99
+    assert all(r.reuse is None for r in unrelated)
+    # More results than the stored candidates: full scan
+    assert all(r.reuse is None for r in engine.semantic_search("TDD 예시", top_k=3))
+    assert engine.similar_query_cache.get_statistics()["hits"] == 1
+
+
+def test_new_index_version_drops_cached_queries(engine):
+    engine.semantic_search_batch(["TDD 사례"], top_ks=[2])
+
+    engine.index_version += 1
+    [results] = engine.semantic_search_batch(["TDD 예시"], top_ks=[2])
+
+    assert all(r.reuse is None for r in results)
+
+
+def test_cache_blends_candidates_of_matching_queries():
+    cache = SimilarQueryCache(threshold=0.9, candidates=2)
+    cache.add(np.array([1.0, 0.0], dtype=np.float32), np.array([0.9, 0.8, 0.1, 0.0]), version=1)
+    cache.add(np.array([0.99, 0.141], dtype=np.float32), np.array([0.1, 0.0, 0.9, 0.8]), version=1)
+
+    candidates, reuse = cache.lookup(np.array([1.0, 0.05], dtype=np.float32), version=1, top_k=2)
+
+    assert sorted(candidates.tolist()) == [0, 1, 2, 3]
+    assert reuse.candidates == 4
+    assert cache.lookup(np.array([0.0, 1.0], dtype=np.float32), version=1, top_k=2) is None
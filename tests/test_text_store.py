@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Tests for DocumentTextStore - compressed, block-addressed document text store.
+"""
+
+import pickle
+from dataclasses import asdict
+
+import pytest
+
+from src.core.text_store import DocumentTextStore
+
+
+def test_round_trip_across_blocks_and_reopen(tmp_path):
+    """Texts spanning several blocks survive a reopen"""
+    store = DocumentTextStore(str(tmp_path), codec="zlib", block_size=128)
+    texts = {f"doc_{i}.md": f"문서 {i} 본문 " * (i + 10) for i in range(12)}
+
+    written = store.put_many((doc_id, "h", text) for doc_id, text in texts.items())
+    assert written == len(texts)
+
+    reopened = DocumentTextStore(str(tmp_path), codec="zlib", block_size=128)
+    for doc_id, text in texts.items():
+        assert reopened.get_text(doc_id) == text
+
+    stats = reopened.get_statistics()
+    assert stats["documents"] == len(texts)
+    assert stats["blocks"] > 1
+
+
+def test_content_hash_mismatch_returns_none(tmp_path):
+    """A stale content hash is treated as a miss"""
+    store = DocumentTextStore(str(tmp_path), codec="zlib")
+    store.put_many([("a.md", "v1", "old text")])
+
+    assert store.get_text("a.md", "v1") == "old text"
+    assert store.get_text("a.md", "v2") is None
+    assert store.has_text("a.md", "v1")
+    assert not store.has_text("a.md", "v2")
+
+
+def test_same_hash_is_not_rewritten(tmp_path):
+    """Unchanged documents are skipped on re-put"""
+    store = DocumentTextStore(str(tmp_path), codec="zlib")
+    assert store.put_many([("a.md", "v1", "text")]) == 1
+    assert store.put_many([("a.md", "v1", "text")]) == 0
+
+
+def test_compact_drops_replaced_texts(tmp_path):
+    """Replacing texts accumulates garbage that compact() reclaims"""
+    store = DocumentTextStore(str(tmp_path), codec="zlib", block_size=64)
+    store.put_many([("a.md", "v1", "a" * 200), ("b.md", "v1", "b" * 200)])
+    store.put_many([("a.md", "v2", "A" * 200)])
+    store.retain(["a.md"])
+
+    assert store.garbage_ratio() > 0.5
+    assert store.compact() is True
+    assert store.garbage_ratio() == 0.0
+    assert store.get_text("a.md", "v2") == "A" * 200
+    assert store.get_text("b.md") is None
+
+
+def test_compact_keeps_old_blocks_for_stale_readers(tmp_path):
+    """A reader that has not reloaded still reads its old blocks until the grace period ends"""
+    writer = DocumentTextStore(str(tmp_path), codec="zlib", block_size=64)
+    writer.put_many([("a.md", "v1", "a" * 200), ("b.md", "v1", "b" * 200)])
+    reader = DocumentTextStore(str(tmp_path), codec="zlib", block_size=64)
+    old_block = reader._entries["a.md"][1]
+
+    writer.retain(["a.md"])
+    assert writer.compact() is True
+    assert writer._entries["a.md"][1] > old_block
+    assert reader.get_text("a.md") == "a" * 200
+
+    reader.reload()
+    assert reader.get_text("a.md") == "a" * 200
+    assert reader.get_text("b.md") is None
+
+    writer.retire_grace_seconds = 0
+    writer.compact()
+    assert writer.get_statistics()["blocks"] == 1
+
+
+def test_max_chars_prefix(tmp_path):
+    """max_chars returns only the prefix"""
+    store = DocumentTextStore(str(tmp_path), codec="zlib")
+    store.put_many([("a.md", "v1", "0123456789")])
+    assert store.get_text("a.md", max_chars=4) == "0123"
+
+
+def test_detached_document_reads_from_store(tmp_path, make_document):
+    """Document.get_content() is served from the store after detach_content()"""
+    store = DocumentTextStore(str(tmp_path), codec="zlib")
+    doc = make_document("note.md", "Python programming content", file_hash="h1")
+    store.put_many([(doc.path, doc.file_hash, doc.content)])
+
+    doc.detach_content(store)
+
+    assert doc.content is None
+    assert doc.get_content() == "Python programming content"
+    # 본문은 상주시키지 않음
+    assert doc.content_loaded is False
+    # 비교/repr/asdict는 저장소를 읽지 않음
+    assert "Python" not in repr(doc)
+    assert asdict(doc)["content"] is None
+
+
+def test_detached_document_pickles_with_its_content(tmp_path, make_document):
+    """A pickled detached document carries its text instead of the store handle"""
+    store = DocumentTextStore(str(tmp_path), codec="zlib")
+    doc = make_document("note.md", "Python programming content", file_hash="h1")
+    store.put_many([(doc.path, doc.file_hash, doc.content)])
+    doc.detach_content(store)
+
+    restored = pickle.loads(pickle.dumps(doc))
+
+    assert restored.content == "Python programming content"
+    assert doc.content is None
+
+
+def test_unknown_codec_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        DocumentTextStore(str(tmp_path), codec="lz4")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
+
+
+def test_case_sensitive_keyword_search_reads_only_candidate_texts(tmp_path, note_text, make_indexed_engine):
+    """Case-sensitive keyword search narrows candidates with the lexical index before reading texts"""
+    vault = tmp_path / "vault"
+    vault.mkdir()
+    (vault / "upper.md").write_text(note_text("upper") + " Python", encoding="utf-8")
+    (vault / "lower.md").write_text(note_text("lower") + " python", encoding="utf-8")
+    (vault / "other.md").write_text(note_text("other"), encoding="utf-8")
+    engine = make_indexed_engine(vault, tmp_path / "cache")
+    engine.text_store = DocumentTextStore(str(tmp_path / "texts"))
+    engine._offload_document_texts()
+    engine._get_lexical_index()  # 인덱스 버전당 한 번 구축
+
+    read = []
+    get_text = engine.text_store.get_text
+    engine.text_store.get_text = lambda doc_id, *args, **kwargs: read.append(doc_id) or get_text(doc_id, *args, **kwargs)
+
+    results = engine.keyword_search("python", case_sensitive=True)
+
+    assert [r.document.path for r in results] == [str(vault / "lower.md")]
+    assert not any(path.endswith("other.md") for path in read)
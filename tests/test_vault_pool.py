@@ -0,0 +1,94 @@
+"""
+Tests for VaultPool: lazy loading and LRU unloading under a memory budget.
+"""
+
+from types import SimpleNamespace
+
+from src.vault_pool import VaultPool, engine_memory_bytes
+
+
+def _fake_engine(size):
+    return SimpleNamespace(indexed=True, documents=[], memory_usage=lambda: {"total": size})
+
+
+def _pool(budget, pinned=0):
+    loaded = []
+
+    def load(path, cache_dir):
+        loaded.append(path)
+        return _fake_engine(100)
+
+    vaults = {name: {"path": f"/vaults/{name}", "cache_dir": f"/cache/{name}"} for name in ("a", "b", "c")}
+    return VaultPool(vaults, load, memory_budget_bytes=budget, pinned_bytes=lambda: pinned), loaded
+
+
+def test_vaults_load_lazily_once():
+    pool, loaded = _pool(budget=0)
+
+    engine = pool.get("a")
+
+    assert pool.get("a") is engine
+    assert loaded == ["/vaults/a"]
+    assert pool.loaded("b") is None
+
+
+def test_least_recently_used_vault_is_unloaded_over_budget():
+    pool, loaded = _pool(budget=250, pinned=50)
+
+    pool.get("a")
+    pool.get("b")
+    pool.get("a")  # b is now the least recently used
+    pool.get("c")
+
+    assert [name for name in ("a", "b", "c") if pool.loaded(name) is not None] == ["a", "c"]
+    assert pool.evictions == 1
+    assert pool.memory_bytes() == 250
+
+    pool.get("b")
+    assert loaded.count("/vaults/b") == 2
+    assert pool.loaded("a") is None
+
+
+def test_engine_memory_usage_counts_index_arrays(tmp_path, make_indexed_engine):
+    vault = tmp_path / "vault"
+    vault.mkdir()
+    for name in ("a", "b"):
+        (vault / f"{name}.md").write_text(f"# {name}\nnote {name} body text here", encoding="utf-8")
+    engine = make_indexed_engine(vault, tmp_path / "cache")
+
+    usage = engine.memory_usage()
+
+    assert usage["embeddings"] == engine.embeddings.nbytes
+    assert usage["total"] == sum(value for key, value in usage.items() if key != "total")
+
+
+class _Weights:
+    def __init__(self, count):
+        self.count = count
+
+    def numel(self):
+        return self.count
+
+    def element_size(self):
+        return 2
+
+
+def _fake_model(count):
+    return SimpleNamespace(model=SimpleNamespace(parameters=lambda: [_Weights(count)]), is_available=lambda: True)
+
+
+def test_vault_engines_borrow_the_hosts_models(tmp_path, make_indexed_engine):
+    vault = tmp_path / "vault"
+    vault.mkdir()
+    (vault / "a.md").write_text("# a\nnote a body text here", encoding="utf-8")
+    host = make_indexed_engine(vault, tmp_path / "host")
+    reranker = host._get_resident_model("reranker", lambda: _fake_model(1000))
+
+    guest = make_indexed_engine(vault, tmp_path / "guest", model_host=host)
+
+    assert guest._get_resident_model("reranker", lambda: _fake_model(5)) is reranker
+    assert guest._tier_warm("rerank")
+    assert host.resident_model_bytes() == {"reranker": 2000}
+    assert guest.resident_model_bytes() == {}
+    assert engine_memory_bytes(host) == host.memory_usage()["total"] + 2000
+
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Tests for engine warm-up - representative encodes and optional model loads.
+"""
+
+from unittest.mock import Mock
+
+
+def test_warm_up_encodes_searches_and_loads_configured_models(make_tiered_engine, reversing_reranker):
+    engine = make_tiered_engine(reranker=reversing_reranker)
+    engine.indexed = True
+    engine.documents = []
+    engine.engine = Mock()
+
+    timings = engine.warm_up(["tdd"], models=["reranker", "colbert"])
+
+    engine.engine.encode_documents.assert_called_once_with(["tdd"])  # 쿼리 캐시를 거치지 않는 인코딩
+    assert engine.hybrid_search.call_count == 2  # 대표 쿼리 검색 + 재순위화 후보
+    engine._get_reranker.return_value.rerank.assert_called_once()
+    assert timings["encode"] is not None and timings["reranker"] is not None
+    assert timings["colbert"] is None  # 사용할 수 없는 모델은 None으로 보고
+
+
+def test_warm_up_without_queries_or_documents_is_a_no_op(make_tiered_engine):
+    engine = make_tiered_engine()
+    engine.indexed = False
+    engine.documents = []
+    engine.engine = Mock()
+
+    assert engine.warm_up() == {}
+    engine.engine.encode_documents.assert_not_called()